@@ -4,19 +4,33 @@ Congress Data API Server
 
 This module implements a Flask API server that provides access to Congress.gov data
 stored in DynamoDB, with comprehensive Swagger/OpenAPI documentation.
+
+Use create_app() to build the application. Importing the module does no network
+or disk work: the DynamoDB table is connected on first use and the OpenAPI
+document is generated at build time by openapi_spec.py.
 """
 import os
 import json
+import time
+import gzip
+import zlib
+import hashlib
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, send_from_directory
+import itertools
+import threading
+from flask import Blueprint, Flask, Response, g, jsonify, request, send_from_directory, stream_with_context
 from flask_swagger_ui import get_swaggerui_blueprint
-from apispec import APISpec
-from apispec.ext.marshmallow import MarshmallowPlugin
-from apispec_webframeworks.flask import FlaskPlugin
-import boto3
 from botocore.exceptions import ClientError
 import logging
 from logger_config import setup_logger
+from query_planner import planner, encode_cursor, decode_cursor, cursor_scope
+from response_cache import LRUCache, MISSING
+from histogram import LatencyHistogram
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Set up logging
 log_config = {
@@ -25,211 +39,127 @@ log_config = {
     'max_size': 10485760,
     'backup_count': 5
 }
-logger = setup_logger(log_config)
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Import our export utilities
-import os
-import csv
-import tempfile
-from export_data import export_to_json, export_to_csv, get_data_from_dynamodb
-
-# Initialize DynamoDB client
-try:
-    dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_DEFAULT_REGION', 'us-west-2'))
-    table_name = os.environ.get('DYNAMODB_TABLE', 'prameya-development-dynamodb-table')
-    table = dynamodb.Table(table_name)
-    logger.info(f"Connected to DynamoDB table: {table_name}")
-except Exception as e:
-    logger.error(f"Failed to initialize DynamoDB client: {str(e)}")
-    dynamodb = None
-    table = None
-
-# Create APISpec
-spec = APISpec(
-    title="Congress Data API",
-    version="1.0.0",
-    openapi_version="3.0.2",
-    info=dict(
-        description="API for accessing Congress.gov data",
-        contact=dict(email="support@example.com")
-    ),
-    plugins=[FlaskPlugin(), MarshmallowPlugin()],
+logger = logging.getLogger('congress_downloader')
+
+# Routes live on a blueprint so create_app() can build fresh application instances
+api = Blueprint('api', __name__)
+
+# DynamoDB table, connected on first use (see get_table)
+table_name = os.environ.get('DYNAMODB_TABLE', 'prameya-development-dynamodb-table')
+_table = None
+_table_lock = threading.Lock()
+
+# Cache of serialized list responses. Keys include the data version token of
+# the route's type, which DynamoHandler bumps after every ingestion write, so
+# entries become unreachable as soon as new data lands.
+response_cache = LRUCache(
+    max_entries=int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512)),
+    ttl_seconds=float(os.environ.get('RESPONSE_CACHE_TTL', 300)),
+    max_size=int(os.environ.get('RESPONSE_CACHE_MAX_MB', 64)) * 1024 * 1024
 )
+DATA_VERSION_CHECK_SECONDS = float(os.environ.get('DATA_VERSION_CHECK_SECONDS', 5))
+_data_versions = {}
+
+# Read-through cache for single-item lookups. Misses are cached too (negative
+# caching) but for a shorter time, so newly ingested items appear quickly.
+item_cache = LRUCache(
+    max_entries=int(os.environ.get('ITEM_CACHE_MAX_ENTRIES', 4096)),
+    ttl_seconds=float(os.environ.get('ITEM_CACHE_TTL', 30))
+)
+ITEM_CACHE_NEGATIVE_TTL = float(os.environ.get('ITEM_CACHE_NEGATIVE_TTL', 5))
+
+# Item type served by each collection route
+COLLECTION_TYPES = {
+    'bills': 'bill',
+    'committees': 'committee',
+    'hearings': 'hearing',
+    'amendments': 'amendment',
+    'nominations': 'nomination',
+    'treaties': 'treaty'
+}
 
-# Create export schema
-spec.components.schema("ExportOptions", {
-    "type": "object",
-    "properties": {
-        "format": {"type": "string", "enum": ["json", "csv"], "description": "Export format"},
-        "data_type": {"type": "string", "enum": ["bill", "committee", "hearing", "amendment", "nomination", "treaty"], "description": "Type of data to export"},
-        "congress": {"type": "integer", "description": "Congress number to filter by"},
-        "start_date": {"type": "string", "format": "date", "description": "Start date for filtering (YYYY-MM-DD)"},
-        "end_date": {"type": "string", "format": "date", "description": "End date for filtering (YYYY-MM-DD)"}
-    }
-})
-
-# Define schemas for Swagger documentation
-spec.components.schema("Error", {
-    "type": "object",
-    "properties": {
-        "error": {"type": "string", "description": "Error message"},
-        "status": {"type": "integer", "description": "HTTP status code"}
-    }
-})
-
-spec.components.schema("Bill", {
-    "type": "object",
-    "properties": {
-        "id": {"type": "string", "description": "Unique identifier for the bill"},
-        "type": {"type": "string", "description": "Type of data (always 'bill')"},
-        "congress": {"type": "integer", "description": "Congress number"},
-        "update_date": {"type": "string", "format": "date", "description": "Last update date"},
-        "bill_type": {"type": "string", "description": "Type of bill (hr, s, etc.)"},
-        "bill_number": {"type": "integer", "description": "Bill number"},
-        "title": {"type": "string", "description": "Bill title"},
-        "origin_chamber": {"type": "string", "description": "Chamber where bill originated"},
-        "latest_action": {
-            "type": "object",
-            "properties": {
-                "text": {"type": "string", "description": "Latest action text"},
-                "action_date": {"type": "string", "format": "date", "description": "Action date"}
-            }
-        }
-    }
-})
-
-spec.components.schema("Committee", {
-    "type": "object",
-    "properties": {
-        "id": {"type": "string", "description": "Unique identifier for the committee"},
-        "type": {"type": "string", "description": "Type of data (always 'committee')"},
-        "congress": {"type": "integer", "description": "Congress number"},
-        "update_date": {"type": "string", "format": "date", "description": "Last update date"},
-        "name": {"type": "string", "description": "Committee name"},
-        "chamber": {"type": "string", "description": "Chamber (House/Senate)"},
-        "committee_type": {"type": "string", "description": "Committee type (standing, etc.)"},
-        "system_code": {"type": "string", "description": "Committee system code"},
-        "parent_committee": {
-            "type": "object",
-            "properties": {
-                "name": {"type": "string", "description": "Parent committee name"},
-                "system_code": {"type": "string", "description": "Parent committee system code"},
-                "url": {"type": "string", "description": "URL to parent committee data"}
-            }
-        },
-        "subcommittees": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Subcommittee name"},
-                    "system_code": {"type": "string", "description": "Subcommittee system code"},
-                    "url": {"type": "string", "description": "URL to subcommittee data"}
-                }
-            }
-        }
+# Pagination: read capacity one list request may spend filling its page, the
+# key used to sign next_token cursors (required outside development, see
+# create_app) and the page size bounds
+READ_BUDGET_PER_REQUEST = float(os.environ.get('API_READ_BUDGET', 25))
+CURSOR_SECRET = os.environ['API_CURSOR_SECRET'].encode('utf-8') if os.environ.get('API_CURSOR_SECRET') else None
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Response compression (brotli is used when the package is installed)
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv'}
+
+# Local full-text index, memory-mapped on the first search (see search_index.py)
+SEARCH_INDEX_DIR = os.environ.get('SEARCH_INDEX_DIR', 'search_index')
+_search_index = None
+_search_index_lock = threading.Lock()
+
+# Largest number of IDs accepted by /api/items
+MAX_BATCH_IDS = int(os.environ.get('API_MAX_BATCH_IDS', 500))
+
+# Optional SQLite read model kept in sync from the table's stream (see
+# read_model.py). When set, list routes are served from it instead of DynamoDB.
+READ_MODEL_PATH = os.environ.get('API_READ_MODEL')
+_read_model = None
+_read_model_lock = threading.Lock()
+
+# Latency histogram per route rule (see /api/metrics/latency)
+route_latency = {}
+_route_latency_lock = threading.Lock()
+
+def dynamodb_config():
+    """DynamoHandler config from the environment; API_DYNAMODB_BACKEND=memory serves the in-memory table"""
+    return {
+        'table_name': table_name,
+        'region': os.environ.get('AWS_DEFAULT_REGION', 'us-west-2'),
+        'backend': os.environ.get('API_DYNAMODB_BACKEND', 'aws')
     }
-})
-
-spec.components.schema("Hearing", {
-    "type": "object",
-    "properties": {
-        "id": {"type": "string", "description": "Unique identifier for the hearing"},
-        "type": {"type": "string", "description": "Type of data (always 'hearing')"},
-        "congress": {"type": "integer", "description": "Congress number"},
-        "update_date": {"type": "string", "format": "date", "description": "Last update date"},
-        "chamber": {"type": "string", "description": "Chamber (House/Senate)"},
-        "date": {"type": "string", "format": "date", "description": "Hearing date"},
-        "time": {"type": "string", "description": "Hearing time"},
-        "location": {"type": "string", "description": "Hearing location"},
-        "title": {"type": "string", "description": "Hearing title"},
-        "committee": {
-            "type": "object",
-            "properties": {
-                "name": {"type": "string", "description": "Committee name"},
-                "system_code": {"type": "string", "description": "Committee system code"},
-                "url": {"type": "string", "description": "URL to committee data"}
-            }
-        }
-    }
-})
-
-spec.components.schema("Amendment", {
-    "type": "object",
-    "properties": {
-        "id": {"type": "string", "description": "Unique identifier for the amendment"},
-        "type": {"type": "string", "description": "Type of data (always 'amendment')"},
-        "congress": {"type": "integer", "description": "Congress number"},
-        "update_date": {"type": "string", "format": "date", "description": "Last update date"},
-        "amendment_number": {"type": "integer", "description": "Amendment number"},
-        "amendment_type": {"type": "string", "description": "Type of amendment"},
-        "title": {"type": "string", "description": "Amendment title"},
-        "description": {"type": "string", "description": "Amendment description"},
-        "purpose": {"type": "string", "description": "Amendment purpose"},
-        "latest_action": {
-            "type": "object",
-            "properties": {
-                "text": {"type": "string", "description": "Latest action text"},
-                "action_date": {"type": "string", "format": "date", "description": "Action date"}
-            }
-        }
-    }
-})
-
-spec.components.schema("Nomination", {
-    "type": "object",
-    "properties": {
-        "id": {"type": "string", "description": "Unique identifier for the nomination"},
-        "type": {"type": "string", "description": "Type of data (always 'nomination')"},
-        "congress": {"type": "integer", "description": "Congress number"},
-        "update_date": {"type": "string", "format": "date", "description": "Last update date"},
-        "number": {"type": "integer", "description": "Nomination number"},
-        "received_date": {"type": "string", "format": "date", "description": "Date nomination was received"},
-        "description": {"type": "string", "description": "Nomination description"},
-        "organization": {"type": "string", "description": "Organization"},
-        "nomination_type": {
-            "type": "object",
-            "properties": {
-                "is_civilian": {"type": "boolean", "description": "Whether the nomination is civilian"}
-            }
-        },
-        "latest_action": {
-            "type": "object",
-            "properties": {
-                "text": {"type": "string", "description": "Latest action text"},
-                "action_date": {"type": "string", "format": "date", "description": "Action date"}
-            }
-        }
-    }
-})
-
-spec.components.schema("Treaty", {
-    "type": "object",
-    "properties": {
-        "id": {"type": "string", "description": "Unique identifier for the treaty"},
-        "type": {"type": "string", "description": "Type of data (always 'treaty')"},
-        "congress": {"type": "integer", "description": "Congress number"},
-        "update_date": {"type": "string", "format": "date", "description": "Last update date"},
-        "treaty_number": {"type": "string", "description": "Treaty number"},
-        "description": {"type": "string", "description": "Treaty description"},
-        "country": {"type": "string", "description": "Country"},
-        "subject": {"type": "string", "description": "Subject"},
-        "received_date": {"type": "string", "format": "date", "description": "Date received"},
-        "latest_action": {
-            "type": "object",
-            "properties": {
-                "text": {"type": "string", "description": "Latest action text"},
-                "action_date": {"type": "string", "format": "date", "description": "Action date"}
-            }
-        }
-    }
-})
+
+def get_table():
+    """DynamoDB table, connected on first use. Returns None if the connection fails."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                try:
+                    config = dynamodb_config()
+                    if config['backend'] == 'memory':
+                        # A fresh process has an empty in-memory store: create the table first
+                        _table = get_db_handler().table
+                    else:
+                        from dynamo_handler import dynamodb_resource
+                        _table = dynamodb_resource(config).Table(table_name)
+                    logger.info(f"Connected to DynamoDB table: {table_name}")
+                except Exception as e:
+                    logger.error(f"Failed to initialize DynamoDB client: {str(e)}")
+    return _table
+
+@api.before_app_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+# Registered before compress_response, so it runs after it and the timing
+# includes compression. Streamed bodies are timed to the first byte.
+@api.after_app_request
+def record_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        duration = time.perf_counter() - start
+        with _route_latency_lock:
+            histogram = route_latency.get(route)
+            if histogram is None:
+                histogram = route_latency[route] = LatencyHistogram()
+            histogram.record(duration)
+    return response
+
 
 # Flask routes
-@app.route("/")
+@api.route("/")
 def home():
     """Home endpoint that provides API information."""
     return jsonify({
@@ -243,13 +173,245 @@ def home():
             "amendments": "/api/amendments",
             "nominations": "/api/nominations",
             "treaties": "/api/treaties",
+            "items": "/api/items",
+            "stats": "/api/stats",
+            "search": "/api/search",
             "export": "/api/export",
+            "export_jobs": "/api/export/jobs",
         },
         "status": "operational"
     })
 
 
-@app.route("/api/bills")
+def get_data_version(table, item_type):
+    """Data version token for a type, re-read from DynamoDB at most every few seconds.
+
+    Returns None if the token cannot be read, in which case responses are not cached.
+    """
+    from dynamo_handler import data_version_key
+
+    now = time.monotonic()
+    cached = _data_versions.get(item_type)
+    if cached and now - cached[1] < DATA_VERSION_CHECK_SECONDS:
+        return cached[0]
+
+    try:
+        response = table.get_item(
+            Key={'id': data_version_key(item_type)},
+            ProjectionExpression='data_version'
+        )
+        version = int(response.get('Item', {}).get('data_version', 0))
+    except ClientError as e:
+        logger.warning(f"Unable to read data version for {item_type}: {str(e)}")
+        return None
+
+    _data_versions[item_type] = (version, now)
+    return version
+
+
+def _response_cache_key(data_version):
+    """Cache key from the route and its normalized query arguments"""
+    args = tuple(sorted(
+        (key, tuple(sorted(values)))
+        for key, values in request.args.lists()
+        if any(values)
+    ))
+    return (request.path, args, data_version)
+
+
+def _result_set_etag(items, pagination, data_version):
+    """Strong ETag for a page of results.
+
+    Every write bumps the data version, so the version plus the id and
+    update_date of each item identify the page without serializing it.
+    """
+    digest = hashlib.sha256(f"{data_version}|{pagination.get('next_token', '')}".encode('utf-8'))
+    for item in items:
+        digest.update(f"|{item.get('id')}@{item.get('update_date', '')}".encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def _matching_etag(etag):
+    """Return the If-None-Match tag that matches etag (or one of its encoded variants)"""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    for candidate in (etag, f"{etag}-br", f"{etag}-gzip"):
+        if if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def _not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def get_read_model():
+    """SQLite read model, opened on first use"""
+    global _read_model
+    if _read_model is None:
+        with _read_model_lock:
+            if _read_model is None:
+                from read_model import ReadModel
+                _read_model = ReadModel(READ_MODEL_PATH)
+                logger.info(f"Serving list routes from read model {READ_MODEL_PATH}")
+    return _read_model
+
+
+def _page_limit():
+    """The request's limit parameter, clamped to 1..MAX_PAGE_SIZE"""
+    return max(1, min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+
+
+def _list_items_from_read_model(item_type, result_key, chamber, date_field, predicates):
+    """Serve a list route from the SQLite read model.
+
+    Accepts the same filters as the DynamoDB path plus sort (update_date, date,
+    congress or title) and order (asc or desc).
+    """
+    congress = request.args.get('congress')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
+    limit = _page_limit()
+    next_token = request.args.get('next_token')
+    sort = request.args.get('sort', date_field)
+    order = request.args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be asc or desc")
+
+    scope = cursor_scope('read_model', item_type, congress, chamber, date_field, start_date, end_date,
+                         predicates, sort, order)
+    after = decode_cursor(next_token, CURSOR_SECRET, scope) if next_token else None
+    if after is not None and set(after) != {'v', 'id'}:
+        raise ValueError("next_token does not belong to this query")
+
+    items, cursor = get_read_model().list_items(
+        item_type,
+        congress=int(congress) if congress else None,
+        chamber=chamber,
+        date_field=date_field,
+        date_range=(start_date, end_date) if start_date else None,
+        predicates=predicates,
+        sort=sort,
+        descending=order == 'desc',
+        limit=limit,
+        after=after
+    )
+
+    pagination = {}
+    if cursor:
+        pagination['next_token'] = encode_cursor(cursor, CURSOR_SECRET, scope)
+
+    response = jsonify({
+        result_key: items,
+        "count": len(items),
+        **pagination
+    })
+    etag = hashlib.sha256(response.get_data()).hexdigest()[:32]
+    matched = _matching_etag(etag)
+    if matched:
+        return _not_modified(matched)
+    response.set_etag(etag)
+    return response
+
+
+def _list_items(item_type, result_key, chamber=None, date_field='update_date', predicates=None):
+    """Serve a list route through the query planner.
+
+    The planner picks the GSI that matches the request (date range, congress
+    or chamber) and pushes the remaining filters into a FilterExpression.
+    """
+    try:
+        if READ_MODEL_PATH:
+            return _list_items_from_read_model(item_type, result_key, chamber, date_field, predicates)
+
+        table = get_table()
+        if not table:
+            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
+
+        # Parse common query parameters
+        congress = request.args.get('congress')
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
+        limit = _page_limit()
+        next_token = request.args.get('next_token')
+
+        # Serve repeated queries from memory while the type's data is unchanged
+        data_version = get_data_version(table, item_type)
+        cache_key = _response_cache_key(data_version) if data_version is not None else None
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not MISSING:
+                cached_body, etag = cached
+                matched = _matching_etag(etag)
+                if matched:
+                    return _not_modified(matched)
+                response = Response(cached_body, mimetype='application/json', headers={'X-Cache': 'HIT'})
+                response.set_etag(etag)
+                return response
+
+        plan = planner.plan(
+            item_type,
+            congress=int(congress) if congress else None,
+            chamber=chamber,
+            date_field=date_field,
+            date_range=(start_date, end_date) if start_date else None,
+            predicates=predicates
+        )
+
+        exclusive_start_key = decode_cursor(next_token, CURSOR_SECRET, plan.cursor_scope) if next_token else None
+        if exclusive_start_key and not set(exclusive_start_key) <= set(plan.key_attributes):
+            raise ValueError("next_token does not belong to this query")
+
+        # Execute query, reading until the page is full or the read budget is spent
+        logger.info(f"Executing DynamoDB {plan.describe()}")
+        items, last_key, consumed = plan.fetch_page(table, exclusive_start_key, limit, READ_BUDGET_PER_REQUEST)
+        logger.debug(f"Page of {len(items)} items consumed {consumed} read capacity units")
+
+        # Handle pagination
+        pagination = {}
+        if last_key:
+            pagination['next_token'] = encode_cursor(last_key, CURSOR_SECRET, plan.cursor_scope)
+
+        # Revalidation: answer 304 before the page is serialized
+        etag = _result_set_etag(items, pagination, data_version) if data_version is not None else None
+        if etag:
+            matched = _matching_etag(etag)
+            if matched:
+                return _not_modified(matched)
+
+        response = jsonify({
+            result_key: items,
+            "count": len(items),
+            **pagination
+        })
+        body = response.get_data()
+        if not etag:
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            matched = _matching_etag(etag)
+            if matched:
+                return _not_modified(matched)
+        response.set_etag(etag)
+        if cache_key:
+            response_cache.set(cache_key, (body, etag), size=len(body))
+            response.headers['X-Cache'] = 'MISS'
+        return response
+
+    except ValueError as e:
+        logger.error(f"Invalid parameter: {str(e)}")
+        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
+    except ClientError as e:
+        logger.error(f"DynamoDB error: {str(e)}")
+        return jsonify({"error": f"Database error: {str(e)}", "status": 500}), 500
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
+
+
+@api.route("/api/bills")
 def get_bills():
     """
     Get bills with optional filtering.
@@ -315,81 +477,13 @@ def get_bills():
               schema:
                 $ref: '#/components/schemas/Error'
     """
-    try:
-        if not table:
-            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
-
-        # Parse query parameters
-        congress = request.args.get('congress')
-        bill_type = request.args.get('bill_type')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
-        limit = min(int(request.args.get('limit', 20)), 100)  # Cap at 100
-        next_token = request.args.get('next_token')
-
-        # Build query parameters
-        query_params = {
-            'FilterExpression': 'attribute_exists(id) AND #type = :type_val',
-            'ExpressionAttributeNames': {
-                '#type': 'type'
-            },
-            'ExpressionAttributeValues': {
-                ':type_val': 'bill'
-            },
-            'Limit': limit
-        }
-
-        # Apply congress filter if provided
-        if congress:
-            query_params['FilterExpression'] += ' AND congress = :congress_val'
-            query_params['ExpressionAttributeValues'][':congress_val'] = int(congress)
-
-        # Apply bill_type filter if provided
-        if bill_type:
-            query_params['FilterExpression'] += ' AND bill_type = :bill_type_val'
-            query_params['ExpressionAttributeValues'][':bill_type_val'] = bill_type
-
-        # Apply date range filter if provided
-        if start_date:
-            query_params['FilterExpression'] += ' AND update_date BETWEEN :start_date AND :end_date'
-            query_params['ExpressionAttributeValues'][':start_date'] = start_date
-            query_params['ExpressionAttributeValues'][':end_date'] = end_date
-
-        # Add pagination token if provided
-        if next_token:
-            query_params['ExclusiveStartKey'] = json.loads(next_token)
-
-        # Execute query
-        logger.info(f"Executing DynamoDB query with params: {query_params}")
-        response = table.scan(**query_params)
-
-        # Extract results
-        bills = response.get('Items', [])
-        count = len(bills)
-
-        # Handle pagination
-        pagination = {}
-        if 'LastEvaluatedKey' in response:
-            pagination['next_token'] = json.dumps(response['LastEvaluatedKey'])
-
-        return jsonify({
-            "bills": bills,
-            "count": count,
-            **pagination
-        })
+    bill_type = request.args.get('bill_type')
+    predicates = [('bill_type', '=', bill_type)] if bill_type else []
+    return _list_items('bill', 'bills', predicates=predicates)
 
-    except ValueError as e:
-        logger.error(f"Invalid parameter: {str(e)}")
-        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
-    except ClientError as e:
-        logger.error(f"DynamoDB error: {str(e)}")
-        return jsonify({"error": f"Database error: {str(e)}", "status": 500}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
 
-@app.route("/api/committees")
+@api.route("/api/committees")
 def get_committees():
     """
     Get committees with optional filtering.
@@ -455,81 +549,11 @@ def get_committees():
               schema:
                 $ref: '#/components/schemas/Error'
     """
-    try:
-        if not table:
-            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
-
-        # Parse query parameters
-        congress = request.args.get('congress')
-        chamber = request.args.get('chamber')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
-        limit = min(int(request.args.get('limit', 20)), 100)  # Cap at 100
-        next_token = request.args.get('next_token')
-
-        # Build query parameters
-        query_params = {
-            'FilterExpression': 'attribute_exists(id) AND #type = :type_val',
-            'ExpressionAttributeNames': {
-                '#type': 'type'
-            },
-            'ExpressionAttributeValues': {
-                ':type_val': 'committee'
-            },
-            'Limit': limit
-        }
-
-        # Apply congress filter if provided
-        if congress:
-            query_params['FilterExpression'] += ' AND congress = :congress_val'
-            query_params['ExpressionAttributeValues'][':congress_val'] = int(congress)
-
-        # Apply chamber filter if provided
-        if chamber:
-            query_params['FilterExpression'] += ' AND chamber = :chamber_val'
-            query_params['ExpressionAttributeValues'][':chamber_val'] = chamber
-
-        # Apply date range filter if provided
-        if start_date:
-            query_params['FilterExpression'] += ' AND update_date BETWEEN :start_date AND :end_date'
-            query_params['ExpressionAttributeValues'][':start_date'] = start_date
-            query_params['ExpressionAttributeValues'][':end_date'] = end_date
-
-        # Add pagination token if provided
-        if next_token:
-            query_params['ExclusiveStartKey'] = json.loads(next_token)
-
-        # Execute query
-        logger.info(f"Executing DynamoDB query with params: {query_params}")
-        response = table.scan(**query_params)
-
-        # Extract results
-        committees = response.get('Items', [])
-        count = len(committees)
+    return _list_items('committee', 'committees', chamber=request.args.get('chamber'))
 
-        # Handle pagination
-        pagination = {}
-        if 'LastEvaluatedKey' in response:
-            pagination['next_token'] = json.dumps(response['LastEvaluatedKey'])
-
-        return jsonify({
-            "committees": committees,
-            "count": count,
-            **pagination
-        })
-
-    except ValueError as e:
-        logger.error(f"Invalid parameter: {str(e)}")
-        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
-    except ClientError as e:
-        logger.error(f"DynamoDB error: {str(e)}")
-        return jsonify({"error": f"Database error: {str(e)}", "status": 500}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
 
-@app.route("/api/hearings")
+@api.route("/api/hearings")
 def get_hearings():
     """
     Get hearings with optional filtering.
@@ -600,88 +624,14 @@ def get_hearings():
               schema:
                 $ref: '#/components/schemas/Error'
     """
-    try:
-        if not table:
-            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
-
-        # Parse query parameters
-        congress = request.args.get('congress')
-        committee = request.args.get('committee')
-        chamber = request.args.get('chamber')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
-        limit = min(int(request.args.get('limit', 20)), 100)  # Cap at 100
-        next_token = request.args.get('next_token')
-
-        # Build query parameters
-        query_params = {
-            'FilterExpression': 'attribute_exists(id) AND #type = :type_val',
-            'ExpressionAttributeNames': {
-                '#type': 'type'
-            },
-            'ExpressionAttributeValues': {
-                ':type_val': 'hearing'
-            },
-            'Limit': limit
-        }
-
-        # Apply congress filter if provided
-        if congress:
-            query_params['FilterExpression'] += ' AND congress = :congress_val'
-            query_params['ExpressionAttributeValues'][':congress_val'] = int(congress)
-
-        # Apply committee filter if provided
-        if committee:
-            query_params['FilterExpression'] += ' AND committee.system_code = :committee_val'
-            query_params['ExpressionAttributeValues'][':committee_val'] = committee
-
-        # Apply chamber filter if provided
-        if chamber:
-            query_params['FilterExpression'] += ' AND chamber = :chamber_val'
-            query_params['ExpressionAttributeValues'][':chamber_val'] = chamber
-
-        # Apply date range filter if provided
-        if start_date:
-            query_params['FilterExpression'] += ' AND #date BETWEEN :start_date AND :end_date'
-            query_params['ExpressionAttributeNames']['#date'] = 'date'
-            query_params['ExpressionAttributeValues'][':start_date'] = start_date
-            query_params['ExpressionAttributeValues'][':end_date'] = end_date
-
-        # Add pagination token if provided
-        if next_token:
-            query_params['ExclusiveStartKey'] = json.loads(next_token)
-
-        # Execute query
-        logger.info(f"Executing DynamoDB query with params: {query_params}")
-        response = table.scan(**query_params)
-
-        # Extract results
-        hearings = response.get('Items', [])
-        count = len(hearings)
-
-        # Handle pagination
-        pagination = {}
-        if 'LastEvaluatedKey' in response:
-            pagination['next_token'] = json.dumps(response['LastEvaluatedKey'])
+    committee = request.args.get('committee')
+    predicates = [('committee.system_code', '=', committee)] if committee else []
+    return _list_items('hearing', 'hearings', chamber=request.args.get('chamber'),
+                       date_field='date', predicates=predicates)
 
-        return jsonify({
-            "hearings": hearings,
-            "count": count,
-            **pagination
-        })
-
-    except ValueError as e:
-        logger.error(f"Invalid parameter: {str(e)}")
-        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
-    except ClientError as e:
-        logger.error(f"DynamoDB error: {str(e)}")
-        return jsonify({"error": f"Database error: {str(e)}", "status": 500}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
 
-@app.route("/api/amendments")
+@api.route("/api/amendments")
 def get_amendments():
     """
     Get amendments with optional filtering.
@@ -747,81 +697,13 @@ def get_amendments():
               schema:
                 $ref: '#/components/schemas/Error'
     """
-    try:
-        if not table:
-            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
-
-        # Parse query parameters
-        congress = request.args.get('congress')
-        amendment_type = request.args.get('amendment_type')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
-        limit = min(int(request.args.get('limit', 20)), 100)  # Cap at 100
-        next_token = request.args.get('next_token')
-
-        # Build query parameters
-        query_params = {
-            'FilterExpression': 'attribute_exists(id) AND #type = :type_val',
-            'ExpressionAttributeNames': {
-                '#type': 'type'
-            },
-            'ExpressionAttributeValues': {
-                ':type_val': 'amendment'
-            },
-            'Limit': limit
-        }
+    amendment_type = request.args.get('amendment_type')
+    predicates = [('amendment_type', '=', amendment_type)] if amendment_type else []
+    return _list_items('amendment', 'amendments', predicates=predicates)
 
-        # Apply congress filter if provided
-        if congress:
-            query_params['FilterExpression'] += ' AND congress = :congress_val'
-            query_params['ExpressionAttributeValues'][':congress_val'] = int(congress)
-
-        # Apply amendment_type filter if provided
-        if amendment_type:
-            query_params['FilterExpression'] += ' AND amendment_type = :amendment_type_val'
-            query_params['ExpressionAttributeValues'][':amendment_type_val'] = amendment_type
-
-        # Apply date range filter if provided
-        if start_date:
-            query_params['FilterExpression'] += ' AND update_date BETWEEN :start_date AND :end_date'
-            query_params['ExpressionAttributeValues'][':start_date'] = start_date
-            query_params['ExpressionAttributeValues'][':end_date'] = end_date
-
-        # Add pagination token if provided
-        if next_token:
-            query_params['ExclusiveStartKey'] = json.loads(next_token)
-
-        # Execute query
-        logger.info(f"Executing DynamoDB query with params: {query_params}")
-        response = table.scan(**query_params)
-
-        # Extract results
-        amendments = response.get('Items', [])
-        count = len(amendments)
-
-        # Handle pagination
-        pagination = {}
-        if 'LastEvaluatedKey' in response:
-            pagination['next_token'] = json.dumps(response['LastEvaluatedKey'])
-
-        return jsonify({
-            "amendments": amendments,
-            "count": count,
-            **pagination
-        })
-
-    except ValueError as e:
-        logger.error(f"Invalid parameter: {str(e)}")
-        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
-    except ClientError as e:
-        logger.error(f"DynamoDB error: {str(e)}")
-        return jsonify({"error": f"Database error: {str(e)}", "status": 500}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
 
-@app.route("/api/nominations")
+@api.route("/api/nominations")
 def get_nominations():
     """
     Get nominations with optional filtering.
@@ -887,81 +769,13 @@ def get_nominations():
               schema:
                 $ref: '#/components/schemas/Error'
     """
-    try:
-        if not table:
-            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
-
-        # Parse query parameters
-        congress = request.args.get('congress')
-        organization = request.args.get('organization')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
-        limit = min(int(request.args.get('limit', 20)), 100)  # Cap at 100
-        next_token = request.args.get('next_token')
+    organization = request.args.get('organization')
+    predicates = [('organization', 'contains', organization)] if organization else []
+    return _list_items('nomination', 'nominations', predicates=predicates)
 
-        # Build query parameters
-        query_params = {
-            'FilterExpression': 'attribute_exists(id) AND #type = :type_val',
-            'ExpressionAttributeNames': {
-                '#type': 'type'
-            },
-            'ExpressionAttributeValues': {
-                ':type_val': 'nomination'
-            },
-            'Limit': limit
-        }
-
-        # Apply congress filter if provided
-        if congress:
-            query_params['FilterExpression'] += ' AND congress = :congress_val'
-            query_params['ExpressionAttributeValues'][':congress_val'] = int(congress)
-
-        # Apply organization filter if provided
-        if organization:
-            query_params['FilterExpression'] += ' AND contains(organization, :organization_val)'
-            query_params['ExpressionAttributeValues'][':organization_val'] = organization
-
-        # Apply date range filter if provided
-        if start_date:
-            query_params['FilterExpression'] += ' AND update_date BETWEEN :start_date AND :end_date'
-            query_params['ExpressionAttributeValues'][':start_date'] = start_date
-            query_params['ExpressionAttributeValues'][':end_date'] = end_date
-
-        # Add pagination token if provided
-        if next_token:
-            query_params['ExclusiveStartKey'] = json.loads(next_token)
-
-        # Execute query
-        logger.info(f"Executing DynamoDB query with params: {query_params}")
-        response = table.scan(**query_params)
-
-        # Extract results
-        nominations = response.get('Items', [])
-        count = len(nominations)
-
-        # Handle pagination
-        pagination = {}
-        if 'LastEvaluatedKey' in response:
-            pagination['next_token'] = json.dumps(response['LastEvaluatedKey'])
-
-        return jsonify({
-            "nominations": nominations,
-            "count": count,
-            **pagination
-        })
-
-    except ValueError as e:
-        logger.error(f"Invalid parameter: {str(e)}")
-        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
-    except ClientError as e:
-        logger.error(f"DynamoDB error: {str(e)}")
-        return jsonify({"error": f"Database error: {str(e)}", "status": 500}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
 
-@app.route("/api/treaties")
+@api.route("/api/treaties")
 def get_treaties():
     """
     Get treaties with optional filtering.
@@ -1027,67 +841,251 @@ def get_treaties():
               schema:
                 $ref: '#/components/schemas/Error'
     """
-    try:
-        if not table:
-            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
+    country = request.args.get('country')
+    predicates = [('country', 'contains', country)] if country else []
+    return _list_items('treaty', 'treaties', predicates=predicates)
 
-        # Parse query parameters
-        congress = request.args.get('congress')
-        country = request.args.get('country')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
-        limit = min(int(request.args.get('limit', 20)), 100)  # Cap at 100
-        next_token = request.args.get('next_token')
 
-        # Build query parameters
-        query_params = {
-            'FilterExpression': 'attribute_exists(id) AND #type = :type_val',
-            'ExpressionAttributeNames': {
-                '#type': 'type'
-            },
-            'ExpressionAttributeValues': {
-                ':type_val': 'treaty'
-            },
-            'Limit': limit
-        }
 
-        # Apply congress filter if provided
-        if congress:
-            query_params['FilterExpression'] += ' AND congress = :congress_val'
-            query_params['ExpressionAttributeValues'][':congress_val'] = int(congress)
+@api.route("/api/items", methods=['GET', 'POST'])
+def get_items():
+    """
+    Get many items by ID.
+    ---
+    get:
+      summary: Batch item lookup
+      description: Fetch up to API_MAX_BATCH_IDS items (default 500) by ID. Items are returned in request order; IDs that do not exist are listed under missing.
+      parameters:
+        - in: query
+          name: ids
+          schema:
+            type: string
+          required: true
+          description: Comma-separated item IDs (the parameter may also be repeated)
+      responses:
+        200:
+          description: Successful response
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  items:
+                    type: array
+                    items:
+                      type: object
+                  count:
+                    type: integer
+                  missing:
+                    type: array
+                    items:
+                      type: string
+        400:
+          description: Bad request
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    post:
+      summary: Batch item lookup
+      description: Same as GET with the IDs sent as a JSON body, for lists too long for a URL.
+      requestBody:
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                ids:
+                  type: array
+                  items:
+                    type: string
+      responses:
+        200:
+          description: Successful response
+        400:
+          description: Bad request
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    """
+    try:
+        if not get_table():
+            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
 
-        # Apply country filter if provided
-        if country:
-            query_params['FilterExpression'] += ' AND contains(country, :country_val)'
-            query_params['ExpressionAttributeValues'][':country_val'] = country
+        if request.method == 'POST':
+            ids = (request.get_json(silent=True) or {}).get('ids')
+            if not isinstance(ids, list) or not all(isinstance(item_id, str) for item_id in ids):
+                raise ValueError("ids must be a list of strings")
+        else:
+            ids = [item_id for value in request.args.getlist('ids') for item_id in value.split(',')]
 
-        # Apply date range filter if provided
-        if start_date:
-            query_params['FilterExpression'] += ' AND update_date BETWEEN :start_date AND :end_date'
-            query_params['ExpressionAttributeValues'][':start_date'] = start_date
-            query_params['ExpressionAttributeValues'][':end_date'] = end_date
+        # Drop blanks and duplicates, keeping the requested order
+        ids = list(dict.fromkeys(item_id.strip() for item_id in ids if item_id.strip()))
+        if not ids:
+            raise ValueError("ids is required")
+        if len(ids) > MAX_BATCH_IDS:
+            raise ValueError(f"at most {MAX_BATCH_IDS} ids may be requested at once")
 
-        # Add pagination token if provided
-        if next_token:
-            query_params['ExclusiveStartKey'] = json.loads(next_token)
+        results = get_db_handler().get_items(ids)
+        items = [item for item in results if item is not None]
+        missing = [item_id for item_id, item in zip(ids, results) if item is None]
 
-        # Execute query
-        logger.info(f"Executing DynamoDB query with params: {query_params}")
-        response = table.scan(**query_params)
+        return jsonify({
+            "items": items,
+            "count": len(items),
+            "missing": missing
+        })
 
-        # Extract results
-        treaties = response.get('Items', [])
-        count = len(treaties)
+    except ValueError as e:
+        logger.error(f"Invalid parameter: {str(e)}")
+        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
-        # Handle pagination
-        pagination = {}
-        if 'LastEvaluatedKey' in response:
-            pagination['next_token'] = json.dumps(response['LastEvaluatedKey'])
+@api.route("/api/<any(bills, committees, hearings, amendments, nominations, treaties):collection>/<path:item_id>")
+def get_item(collection, item_id):
+    """
+    Get a single item by ID.
+    ---
+    get:
+      summary: Get item by ID
+      description: Fetch one bill, committee, hearing, amendment, nomination or treaty. Recently viewed items are served from an in-memory cache for up to ITEM_CACHE_TTL seconds.
+      parameters:
+        - in: path
+          name: collection
+          schema:
+            type: string
+            enum: [bills, committees, hearings, amendments, nominations, treaties]
+          required: true
+        - in: path
+          name: item_id
+          schema:
+            type: string
+          required: true
+      responses:
+        200:
+          description: The item
+        404:
+          description: No item with this ID in the collection
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    """
+    try:
+        if not get_table():
+            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
+
+        item = item_cache.get(item_id)
+        cache_status = 'HIT'
+        if item is MISSING:
+            cache_status = 'MISS'
+            item = get_db_handler().get_item(item_id)
+            item_cache.set(item_id, item, ttl_seconds=None if item else ITEM_CACHE_NEGATIVE_TTL)
+
+        if not item or item.get('type') != COLLECTION_TYPES[collection]:
+            return jsonify({"error": f"{COLLECTION_TYPES[collection].capitalize()} {item_id} not found",
+                            "status": 404}), 404
+
+        response = jsonify(item)
+        response.headers['X-Cache'] = cache_status
+        response.add_etag()
+        return response.make_conditional(request)
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
+
+
+@api.route("/api/stats")
+def get_stats():
+    """
+    Get item counts.
+    ---
+    get:
+      summary: Item counts
+      description: Counts of items by type, congress, chamber and month of last update, read from counters maintained during ingestion instead of scanning the table.
+      parameters:
+        - in: query
+          name: type
+          schema:
+            type: string
+            enum: [bill, committee, hearing, amendment, nomination, treaty]
+          description: Only count items of this type
+        - in: query
+          name: congress
+          schema:
+            type: integer
+          description: Only count items from this congress
+        - in: query
+          name: chamber
+          schema:
+            type: string
+          description: Only count items from this chamber
+        - in: query
+          name: group_by
+          schema:
+            type: string
+            default: type
+          description: Comma-separated dimensions to group by (type, congress, chamber, month)
+      responses:
+        200:
+          description: Successful response
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  total:
+                    type: integer
+                  group_by:
+                    type: array
+                    items:
+                      type: string
+                  groups:
+                    type: array
+                    items:
+                      type: object
+        400:
+          description: Bad request
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    """
+    try:
+        if not get_table():
+            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
+
+        congress = request.args.get('congress')
+        if congress:
+            congress = str(int(congress))
+        group_by = [dimension.strip() for dimension in request.args.get('group_by', 'type').split(',') if dimension.strip()]
+        invalid = [dimension for dimension in group_by if dimension not in ('type', 'congress', 'chamber', 'month')]
+        if invalid:
+            raise ValueError(f"cannot group by {', '.join(invalid)}")
+
+        rows = get_db_handler().get_stats(
+            item_type=request.args.get('type'),
+            congress=congress,
+            chamber=request.args.get('chamber')
+        )
+
+        groups = {}
+        for row in rows:
+            key = tuple(row[dimension] for dimension in group_by)
+            groups[key] = groups.get(key, 0) + row['count']
 
         return jsonify({
-            "treaties": treaties,
-            "count": count,
-            **pagination
+            "total": sum(groups.values()),
+            "group_by": group_by,
+            "groups": [
+                {**dict(zip(group_by, key)), "count": count}
+                for key, count in sorted(groups.items())
+                if count
+            ]
         })
 
     except ValueError as e:
@@ -1100,55 +1098,235 @@ def get_treaties():
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
+def get_search_index():
+    """Search index reader, opened on first use"""
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                from search_index import SearchIndex
+                _search_index = SearchIndex(SEARCH_INDEX_DIR)
+    return _search_index
+
+
+@api.route("/api/search")
+def search():
+    """
+    Full-text search.
+    ---
+    get:
+      summary: Search items
+      description: Rank items whose title, description, purpose or subject match the query (BM25). Served from a local index built during ingestion.
+      parameters:
+        - in: query
+          name: q
+          schema:
+            type: string
+          required: true
+          description: Search terms
+        - in: query
+          name: type
+          schema:
+            type: string
+            enum: [bill, committee, hearing, amendment, nomination, treaty]
+          description: Only return items of this type
+        - in: query
+          name: limit
+          schema:
+            type: integer
+            default: 20
+            maximum: 100
+          description: Maximum number of results
+      responses:
+        200:
+          description: Ranked results
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  results:
+                    type: array
+                    items:
+                      type: object
+                      properties:
+                        id:
+                          type: string
+                        type:
+                          type: string
+                        title:
+                          type: string
+                        score:
+                          type: number
+                  count:
+                    type: integer
+                  took_ms:
+                    type: number
+        400:
+          description: Bad request
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+        503:
+          description: Search index has not been built
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise ValueError("q is required")
+        limit = _page_limit()
+
+        index = get_search_index()
+        if not index.available:
+            index.maybe_reload()
+            if not index.available:
+                return jsonify({"error": "Search index has not been built", "status": 503}), 503
+
+        start = time.perf_counter()
+        results = index.search(query, limit=limit, item_type=request.args.get('type'))
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
+        })
+
+    except ValueError as e:
+        logger.error(f"Invalid parameter: {str(e)}")
+        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
+
+@api.route("/api/metrics/latency")
+def get_latency():
+    """
+    Get request latency percentiles per route.
+    ---
+    get:
+      summary: Route latency
+      description: Request count, mean, p50, p95, p99 and maximum latency in milliseconds for each route since the server started.
+      responses:
+        200:
+          description: Latency summary keyed by route
+    """
+    with _route_latency_lock:
+        snapshot = {route: histogram.copy() for route, histogram in route_latency.items()}
+    return jsonify({route: histogram.summary() for route, histogram in sorted(snapshot.items())})
+
+
+@api.route("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: route latency, cache counters and the process's MetricsCollector"""
+    from prometheus import Exposition, CONTENT_TYPE
+    from monitoring import metrics
+
+    with _route_latency_lock:
+        snapshot = {route: histogram.copy() for route, histogram in route_latency.items()}
+    caches = {'responses': response_cache.stats(), 'items': item_cache.stats()}
+
+    exposition = Exposition('congress_api_server_')
+    exposition.histogram('request_duration_seconds', 'API server request latency by route',
+                         [({'route': route}, histogram) for route, histogram in sorted(snapshot.items())])
+    for field in ('hits', 'misses', 'evictions'):
+        exposition.counter(f'cache_{field}_total', f'In-memory cache {field}',
+                           [({'cache': name}, stats[field]) for name, stats in caches.items()])
+    exposition.gauge('cache_entries', 'Entries held by the in-memory caches',
+                     [({'cache': name}, stats['entries']) for name, stats in caches.items()])
+
+    return Response(exposition.render() + metrics.render_prometheus(), content_type=CONTENT_TYPE)
+
+
+@api.route("/api/cache/stats")
+def get_cache_stats():
+    """
+    Get in-memory cache statistics.
+    ---
+    get:
+      summary: Cache statistics
+      description: Entry counts, hits, misses, evictions and hit ratio of the list response cache and the single-item cache.
+      responses:
+        200:
+          description: Cache statistics
+    """
+    return jsonify({
+        "responses": response_cache.stats(),
+        "items": item_cache.stats()
+    })
 
-# Create Swagger UI blueprint
+# Swagger UI location and the OpenAPI document it loads
 SWAGGER_URL = '/swagger'
 API_URL = '/static/swagger.json'
 
-swaggerui_blueprint = get_swaggerui_blueprint(
-    SWAGGER_URL,
-    API_URL,
-    config={
-        'app_name': "Congress Data API"
-    }
-)
+EXPORT_MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+_db_handler = None
+_db_handler_lock = threading.Lock()
 
-# Register blueprint
-app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
-# Create static directory if it doesn't exist
-os.makedirs('static', exist_ok=True)
+def get_db_handler():
+    """DynamoHandler shared by export and batch lookup requests, created on first use"""
+    global _db_handler
+    if _db_handler is None:
+        with _db_handler_lock:
+            if _db_handler is None:
+                from dynamo_handler import DynamoHandler
+                config = dynamodb_config()
+                # The in-memory table only exists once this process creates it
+                _db_handler = DynamoHandler(config, ensure_table=config['backend'] == 'memory')
+    return _db_handler
 
-# Generate OpenAPI spec
-with app.test_request_context():
-    # Add paths to spec
-    spec.path(view=get_bills)
-    spec.path(view=get_committees)
-    spec.path(view=get_hearings)
-    spec.path(view=get_amendments)
-    spec.path(view=get_nominations)
-    spec.path(view=get_treaties)
-    spec.path(view=export_data)
 
-# Write OpenAPI spec to file
-with open('static/swagger.json', 'w') as f:
-    json.dump(spec.to_dict(), f)
+_export_jobs = None
 
-# Serve static files
-@app.route('/api/export')
+
+def get_export_jobs():
+    """Background export queue, created on first use.
+
+    The pool size caps how many scans run against the table at once.
+    """
+    global _export_jobs
+    if _export_jobs is None:
+        from export_jobs import ExportJobManager
+        _export_jobs = ExportJobManager(
+            get_db_handler,
+            output_dir=os.environ.get('EXPORT_JOBS_DIR', 'exports'),
+            max_concurrent=int(os.environ.get('EXPORT_JOBS_MAX_CONCURRENT', 2)),
+            result_ttl_seconds=float(os.environ.get('EXPORT_JOBS_RESULT_TTL', 3600))
+        )
+    return _export_jobs
+
+
+def _log_stream_errors(chunks, filename):
+    """Log failures that happen after the response headers were sent"""
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Export {filename} aborted mid-stream: {str(e)}")
+        raise
+
+
+@api.route('/api/export')
 def export_data():
     """
-    Export congressional data to JSON or CSV.
+    Export congressional data to JSON, NDJSON or CSV.
     ---
     get:
       summary: Export data
-      description: Export congressional data with optional filtering to JSON or CSV format
+      description: Stream congressional data with optional filtering as JSON, NDJSON or CSV
       parameters:
         - in: query
           name: format
           schema:
             type: string
-            enum: [json, csv]
+            enum: [json, ndjson, csv]
             default: json
           description: Export format
         - in: query
@@ -1176,16 +1354,26 @@ def export_data():
           description: Filter by update date (end date, format YYYY-MM-DD)
       responses:
         200:
-          description: Successful response, returns file download
+          description: Successful response, streams a file download
           content:
             application/json:
               schema:
                 type: string
                 format: binary
+            application/x-ndjson:
+              schema:
+                type: string
+                format: binary
             text/csv:
               schema:
                 type: string
                 format: binary
+        404:
+          description: No data found
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
         400:
           description: Bad request
           content:
@@ -1200,9 +1388,9 @@ def export_data():
                 $ref: '#/components/schemas/Error'
     """
     try:
-        if not table:
+        if not get_table():
             return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
-            
+
         # Parse query parameters
         export_format = request.args.get('format', 'json').lower()
         data_type = request.args.get('data_type')
@@ -1213,45 +1401,31 @@ def export_data():
         end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
         
         # Validate export format
-        if export_format not in ['json', 'csv']:
-            return jsonify({"error": "Invalid export format. Use 'json' or 'csv'", "status": 400}), 400
-            
-        # Load configuration for DynamoDB client
-        config = {
-            'dynamodb_table': table_name,
-            'region': os.environ.get('AWS_DEFAULT_REGION', 'us-west-2')
-        }
-        
-        # Get data from DynamoDB with filtration
-        data = get_data_from_dynamodb(config, data_type, congress, start_date, end_date)
-        
-        if not data:
+        if export_format not in EXPORT_MIMETYPES:
+            return jsonify({"error": "Invalid export format. Use 'json', 'ndjson' or 'csv'", "status": 400}), 400
+
+        from export_data import iter_data_from_dynamodb, iter_export_chunks
+
+        # Items are read page by page as the response is written; the first
+        # page is fetched up front so an empty result can still become a 404
+        items = iter_data_from_dynamodb(None, data_type, congress, start_date, end_date,
+                                        db_handler=get_db_handler())
+        first_item = next(items, None)
+        if first_item is None:
             return jsonify({"error": "No data found matching the criteria", "status": 404}), 404
-            
-        # Create a temporary file for the export
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{export_format}') as temp_file:
-            temp_path = temp_file.name
-            
-        # Export the data to the appropriate format
-        if export_format == 'json':
-            export_to_json(data, temp_path)
-            mimetype = 'application/json'
-        else:  # csv
-            export_to_csv(data, temp_path)
-            mimetype = 'text/csv'
-            
+
         # Generate a timestamp for the filename
         timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
         type_str = data_type if data_type else 'all'
         filename = f"{type_str}_export_{timestamp}.{export_format}"
-        
-        # Return the file as a download
-        return send_from_directory(os.path.dirname(temp_path), 
-                                   os.path.basename(temp_path),
-                                   as_attachment=True,
-                                   attachment_filename=filename,
-                                   mimetype=mimetype)
-                                   
+
+        chunks = iter_export_chunks(itertools.chain([first_item], items), export_format, data_type)
+        return Response(
+            stream_with_context(_log_stream_errors(chunks, filename)),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
     except ValueError as e:
         logger.error(f"Invalid parameter: {str(e)}")
         return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
@@ -1263,10 +1437,257 @@ def export_data():
         return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
 
 
-@app.route('/static/<path:path>')
+@api.route('/api/export/jobs', methods=['POST'])
+def create_export_job():
+    """
+    Queue a background export.
+    ---
+    post:
+      summary: Create export job
+      description: Queue an export that runs in the background. Parameters may be sent as a JSON body or as query parameters and match /api/export. Identical requests share one job.
+      requestBody:
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                format:
+                  type: string
+                  enum: [json, ndjson, csv]
+                data_type:
+                  type: string
+                congress:
+                  type: integer
+                start_date:
+                  type: string
+                  format: date
+                end_date:
+                  type: string
+                  format: date
+      responses:
+        202:
+          description: Job accepted; the body is the job status
+        400:
+          description: Bad request
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    """
+    try:
+        if not get_table():
+            return jsonify({"error": "DynamoDB not configured", "status": 500}), 500
+
+        args = request.get_json(silent=True) or request.args
+        congress = args.get('congress')
+        params = {
+            'format': str(args.get('format', 'json')).lower(),
+            'data_type': args.get('data_type'),
+            'congress': int(congress) if congress else None,
+            'start_date': args.get('start_date'),
+            'end_date': args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
+        }
+
+        job = get_export_jobs().submit(params)
+        response = jsonify(job)
+        response.status_code = 202
+        response.headers['Location'] = f"/api/export/jobs/{job['id']}"
+        return response
+
+    except ValueError as e:
+        logger.error(f"Invalid parameter: {str(e)}")
+        return jsonify({"error": f"Invalid parameter: {str(e)}", "status": 400}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": f"Unexpected error: {str(e)}", "status": 500}), 500
+
+
+@api.route('/api/export/jobs/<job_id>')
+def get_export_job(job_id):
+    """
+    Get export job status.
+    ---
+    get:
+      summary: Export job status
+      description: Status of a background export with rows written, percent complete and ETA. Progress is estimated from the table item count.
+      parameters:
+        - in: path
+          name: job_id
+          schema:
+            type: string
+          required: true
+      responses:
+        200:
+          description: Job status
+        404:
+          description: Unknown or expired job
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    """
+    job = get_export_jobs().get(job_id)
+    if not job:
+        return jsonify({"error": "Export job not found", "status": 404}), 404
+    return jsonify(job)
+
+
+@api.route('/api/export/jobs/<job_id>/download')
+def download_export_job(job_id):
+    """
+    Download a finished export.
+    ---
+    get:
+      summary: Download export job result
+      parameters:
+        - in: path
+          name: job_id
+          schema:
+            type: string
+          required: true
+      responses:
+        200:
+          description: The exported file
+        404:
+          description: Unknown or expired job
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+        409:
+          description: Job has not completed
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+    """
+    job = get_export_jobs().get(job_id)
+    if not job:
+        return jsonify({"error": "Export job not found", "status": 404}), 404
+
+    path = get_export_jobs().get_result_path(job_id)
+    if not path:
+        return jsonify({"error": f"Export job is {job['status']}", "status": 409}), 409
+
+    export_format = job['params']['format']
+    type_str = job['params'].get('data_type') or 'all'
+    return send_from_directory(os.path.dirname(os.path.abspath(path)), os.path.basename(path),
+                               as_attachment=True,
+                               download_name=f"{type_str}_export_{job_id}.{export_format}",
+                               mimetype=EXPORT_MIMETYPES[export_format])
+
+
+def _negotiate_encoding():
+    """Pick the best content coding the client accepts"""
+    offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offers)
+
+
+def _compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+@api.after_app_request
+def compress_response(response):
+    """Apply gzip/brotli to JSON and CSV responses when the client accepts it"""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _negotiate_encoding()
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESSION_MIN_BYTES:
+            return response
+        response.set_data(_compress_body(body, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+    # Each coding is a different representation, so it gets its own strong tag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+# Serve static files
+@api.route('/static/<path:path>')
 def send_static(path):
+    if path == 'swagger.json' and not os.path.exists(os.path.join('static', path)):
+        # Normally generated at build time; fall back to generating it once here
+        from openapi_spec import write_spec
+        from flask import current_app
+        write_spec(current_app)
     return send_from_directory('static', path)
 
+
+def create_app(development=False):
+    """Create the Flask application.
+
+    API_CURSOR_SECRET must be set so every server process signs cursors with
+    the same key; only in development is a random per-process key used instead.
+    """
+    global CURSOR_SECRET
+    if not logger.handlers:
+        setup_logger(log_config)
+    if CURSOR_SECRET is None:
+        if not development:
+            raise RuntimeError("API_CURSOR_SECRET must be set; cursors signed with a per-process key "
+                               "fail on other server processes")
+        logger.warning("API_CURSOR_SECRET is not set; next_token cursors will not survive a restart "
+                       "or work across server processes")
+        CURSOR_SECRET = os.urandom(32)
+
+    # Static files are served by the blueprint's send_static route
+    app = Flask(__name__, static_folder=None)
+    app.register_blueprint(api)
+    app.register_blueprint(
+        get_swaggerui_blueprint(SWAGGER_URL, API_URL, config={'app_name': "Congress Data API"}),
+        url_prefix=SWAGGER_URL
+    )
+    return app
+
+
+_app = None
+
+
+def __getattr__(name):
+    """Create the module-level `app` (e.g. for `gunicorn api_server:app`) on first access"""
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
+    create_app(development=True).run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+End-to-end ingestion benchmark against the local fake Congress.gov API.
+
+Starts fake_congress_api.FakeCongressServer in this process, then runs each
+download mode (bulk, incremental, refresh) through
+congress_downloader.process_date_range in a fresh interpreter, so peak RSS
+is per mode and the server's CPU time is not counted:
+
+    python benchmark_ingestion.py [--modes bulk refresh] [--latency 0.05] [--error-rate-429 0.01]
+
+Reports items/s, server requests per stored item, throttled and failed
+requests, the time spent in each pipeline stage and peak RSS. By default
+items are counted and dropped after validation (DiscardStore), so storage
+costs are not included. With --store memory they go through DynamoHandler
+into the in-memory table (fake_dynamodb), which charges and throttles
+capacity like a provisioned table:
+
+    python benchmark_ingestion.py --modes refresh --store memory --write-capacity 5 --simulated-clock
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+MODES = ('bulk', 'incremental', 'refresh')
+
+class DiscardStore:
+    """Stands in for DynamoHandler: counts the items it is given and drops them"""
+    search_index = None
+
+    def __init__(self):
+        self.items = 0
+
+    def reset_processed_ids(self) -> None:
+        pass
+
+    def batch_store_items(self, items: List[Dict[str, Any]], ttl_hours: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        self.items += len(items)
+        return len(items), []
+
+def mode_dates(mode: str, api_client, spec: Dict[str, Any]) -> Tuple[datetime, datetime]:
+    """Date range congress_downloader.py would use for a mode"""
+    end_date = datetime.now()
+    if mode == 'bulk':
+        return api_client.get_earliest_date(), end_date
+    if mode == 'incremental':
+        return end_date - timedelta(days=spec['lookback_days']), end_date
+    return datetime.strptime(spec['refresh_start'], '%Y-%m-%d'), datetime.strptime(spec['refresh_end'], '%Y-%m-%d')
+
+def run_worker(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one mode in this process and return its measurements"""
+    import time
+    import random
+    import logging
+    import resource
+
+    os.environ.setdefault('METRICS_SINK', 'null')
+    from congress_api import CongressAPI
+    from monitoring import metrics
+    import congress_downloader
+
+    logger = logging.getLogger('congress_downloader')
+    logger.setLevel(logging.WARNING)
+    logging.getLogger('congress_api').setLevel(logging.ERROR)
+    random.seed(0)
+
+    api_client = CongressAPI({
+        'base_url': spec['base_url'],
+        'api_key': 'benchmark',
+        'endpoints': spec['endpoints'],
+        'rate_limit': {'requests_per_second': spec['requests_per_second'], 'max_retries': 3, 'retry_delay': 0.05}
+    })
+    if spec['store'] == 'memory':
+        import fake_dynamodb
+        from dynamo_handler import DynamoHandler
+        store = DynamoHandler({'table_name': 'benchmark', 'backend': 'memory', 'memory': spec['memory']})
+    else:
+        store = DiscardStore()
+    start_date, end_date = mode_dates(spec['mode'], api_client, spec)
+
+    started = time.perf_counter()
+    items, failed_dates = congress_downloader.process_date_range(api_client, store, start_date, end_date,
+                                                                 logger, spec['workers'])
+    seconds = time.perf_counter() - started
+
+    stages: Dict[str, float] = {}
+    for (stage, _), (_, _, stage_seconds, _) in metrics.stage_stats.items():
+        stages[stage] = stages.get(stage, 0.0) + stage_seconds
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    sample = {
+        'mode': spec['mode'],
+        'dates': (end_date.date() - start_date.date()).days + 1,
+        'items': items,
+        'failed_dates': len(failed_dates),
+        'seconds': seconds,
+        'client_requests': api_client.request_count,
+        'stage_seconds': stages,
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        'peak_rss_bytes': peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+    }
+    if spec['store'] == 'memory':
+        dynamodb = fake_dynamodb.resource()
+        sample['dynamo'] = dynamodb.stats()['benchmark']
+        if isinstance(dynamodb.clock, fake_dynamodb.SimulatedClock):
+            sample['dynamo']['simulated_seconds'] = dynamodb.clock.time()
+    return sample
+
+def run_mode(server, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one mode in a fresh interpreter and add the server-side counts"""
+    server.reset_stats()
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', json.dumps(spec)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{spec['mode']} run failed:\n{result.stderr[-2000:]}")
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    stats = server.stats_snapshot()
+    sample['server_requests'] = stats['requests']
+    sample['throttled'] = stats['by_status'].get('429', 0)
+    sample['server_errors'] = sum(count for status, count in stats['by_status'].items() if status.startswith('5'))
+    sample['items_per_second'] = sample['items'] / sample['seconds'] if sample['seconds'] else 0.0
+    sample['requests_per_item'] = stats['requests'] / sample['items'] if sample['items'] else None
+    return sample
+
+def print_report(samples: Dict[str, List[Dict[str, Any]]]) -> None:
+    print(f"{'mode':<12}{'dates':>7}{'items':>9}{'seconds':>9}{'items/s':>10}{'req/item':>10}"
+          f"{'429s':>6}{'5xx':>6}{'peak RSS':>11}")
+    for mode, runs in samples.items():
+        median = sorted(runs, key=lambda sample: sample['items_per_second'])[len(runs) // 2]
+        requests_per_item = f"{median['requests_per_item']:.3f}" if median['requests_per_item'] is not None else '-'
+        print(f"{mode:<12}{median['dates']:>7}{median['items']:>9}{median['seconds']:>9.2f}"
+              f"{statistics.median(run['items_per_second'] for run in runs):>10.0f}{requests_per_item:>10}"
+              f"{median['throttled']:>6}{median['server_errors']:>6}"
+              f"{max(run['peak_rss_bytes'] for run in runs) / 1024 / 1024:>8.1f} MB")
+
+    print("\nSeconds per stage (summed over workers, median run):")
+    for mode, runs in samples.items():
+        median = sorted(runs, key=lambda sample: sample['items_per_second'])[len(runs) // 2]
+        stages = ', '.join(f"{stage} {seconds:.2f}" for stage, seconds in median['stage_seconds'].items())
+        print(f"  {mode:<12}{stages}")
+
+    if not any('dynamo' in run for runs in samples.values() for run in runs):
+        return
+    print("\nIn-memory DynamoDB (median run):")
+    print(f"{'mode':<12}{'table WCU':>10}{'all WCU':>9}{'ampl.':>7}{'RCU':>8}{'throttles':>10}"
+          f"{'unproc.':>9}{'retries':>9}{'backoff s':>10}{'failed':>8}{'sim. s':>9}")
+    for mode, runs in samples.items():
+        median = sorted(runs, key=lambda sample: sample['items_per_second'])[len(runs) // 2]
+        dynamo = median['dynamo']
+        amplification = f"{dynamo['write_amplification']:.2f}" if dynamo['write_amplification'] else '-'
+        simulated = f"{dynamo['simulated_seconds']:.1f}" if 'simulated_seconds' in dynamo else '-'
+        print(f"{mode:<12}{dynamo['consumed_wcu']['table']:>10.0f}{sum(dynamo['consumed_wcu'].values()):>9.0f}"
+              f"{amplification:>7}{sum(dynamo['consumed_rcu'].values()):>8.0f}"
+              f"{sum(dynamo['throttled'].values()):>10}"
+              f"{dynamo['unprocessed_items'] + dynamo['unprocessed_keys']:>9}{dynamo['sdk_retries']:>9}"
+              f"{dynamo['sdk_backoff_seconds']:>10.1f}{dynamo['failed_requests']:>8}{simulated:>9}")
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--worker':
+        print(json.dumps(run_worker(json.loads(sys.argv[2]))))
+        return
+
+    today = datetime.now()
+    parser = argparse.ArgumentParser(description='Measure ingestion throughput against a local fake Congress.gov API')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--runs', type=int, default=1, help='Runs per mode (the median is reported)')
+    parser.add_argument('--workers', type=int, default=3, help='Parallel workers, as --parallel-workers')
+    parser.add_argument('--endpoints', nargs='+', help="Endpoints to fetch, or 'all' (default: the downloader's)")
+    parser.add_argument('--requests-per-second', type=float, default=1000, help='Client rate limit per endpoint')
+    parser.add_argument('--lookback-days', type=int, default=7, help='Incremental mode lookback')
+    parser.add_argument('--refresh-start', default=(today - timedelta(days=90)).strftime('%Y-%m-%d'))
+    parser.add_argument('--refresh-end', default=(today - timedelta(days=60)).strftime('%Y-%m-%d'))
+    parser.add_argument('--earliest-congress', type=int, default=119,
+                        help='Congress the fake API reports as earliest (sets the bulk mode range)')
+    parser.add_argument('--items-per-day', type=int, default=20, help='Mean items per endpoint and day')
+    parser.add_argument('--page-size', type=int, default=250, help='Largest page the fake API serves')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    parser.add_argument('--error-rate-429', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--error-rate-5xx', type=float, default=0.0, help='Share of requests answered with 503')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--store', choices=('discard', 'memory'), default='discard',
+                        help='Drop validated items, or write them to the in-memory DynamoDB table')
+    parser.add_argument('--write-capacity', type=int,
+                        help='WCU of the in-memory table and each GSI (default: on-demand, never throttled)')
+    parser.add_argument('--read-capacity', type=int,
+                        help='RCU of the in-memory table and each GSI (default: 5 when --write-capacity is set)')
+    parser.add_argument('--burst-seconds', type=float, default=300,
+                        help='Unused capacity the in-memory table banks, in seconds')
+    parser.add_argument('--simulated-clock', action='store_true',
+                        help='Throttling backoff advances a virtual clock instead of sleeping')
+    parser.add_argument('--json', action='store_true', help='Print raw samples as JSON')
+    args = parser.parse_args()
+
+    from congress_api import DEFAULT_ENDPOINTS, ENDPOINT_KEYS
+    from fake_congress_api import FakeCongressServer
+
+    if not args.endpoints:
+        endpoints = DEFAULT_ENDPOINTS
+    elif args.endpoints == ['all']:
+        endpoints = list(ENDPOINT_KEYS)
+    else:
+        endpoints = args.endpoints
+
+    server = FakeCongressServer(items_per_day=args.items_per_day, page_size=args.page_size, latency=args.latency,
+                                jitter=args.jitter, error_rate_429=args.error_rate_429,
+                                error_rate_5xx=args.error_rate_5xx, retry_after=args.retry_after,
+                                earliest_congress=args.earliest_congress)
+    base_url = server.start()
+
+    memory = {
+        'provisioned': args.write_capacity is not None or args.read_capacity is not None,
+        'burst_seconds': args.burst_seconds,
+        'clock': 'simulated' if args.simulated_clock else 'real'
+    }
+    if args.write_capacity is not None:
+        memory['write_capacity'] = args.write_capacity
+    if args.read_capacity is not None:
+        memory['read_capacity'] = args.read_capacity
+
+    samples: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        for mode in args.modes:
+            spec = {
+                'mode': mode, 'base_url': base_url, 'endpoints': endpoints, 'workers': args.workers,
+                'requests_per_second': args.requests_per_second, 'lookback_days': args.lookback_days,
+                'refresh_start': args.refresh_start, 'refresh_end': args.refresh_end,
+                'store': args.store, 'memory': memory
+            }
+            samples[mode] = [run_mode(server, spec) for _ in range(args.runs)]
+    finally:
+        server.stop()
+
+    if args.json:
+        print(json.dumps(samples, indent=2))
+    else:
+        print_report(samples)
+
+if __name__ == "__main__":
+    main()
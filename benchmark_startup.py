@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the API server.
+
+Each run starts a fresh interpreter, imports api_server, creates the app and
+serves GET / through the test client, timing each step:
+
+    python benchmark_startup.py [--runs 10]
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Executed in a fresh interpreter per run so every measurement is a cold start
+PROBE = r"""
+import json, time
+start = time.perf_counter()
+import api_server
+imported = time.perf_counter()
+app = api_server.create_app(development=True)
+created = time.perf_counter()
+response = app.test_client().get('/')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+    'total_ms': (served - start) * 1000,
+}))
+"""
+
+def run_once():
+    """Run the probe in a new interpreter and return its timings"""
+    result = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure API server cold start time')
+    parser.add_argument('--runs', type=int, default=10, help='Number of cold starts to measure')
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+
+    print(f"Cold start over {args.runs} runs (ms):")
+    print(f"{'step':<18}{'median':>10}{'min':>10}{'max':>10}")
+    for step in ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms'):
+        values = [sample[step] for sample in samples]
+        print(f"{step[:-3]:<18}{statistics.median(values):>10.1f}{min(values):>10.1f}{max(values):>10.1f}")
+
+if __name__ == "__main__":
+    main()
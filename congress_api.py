@@ -1,55 +1,223 @@
 #!/usr/bin/env python3
 
 """
-Simplified Congress API implementation for health checking
+Congress.gov API client.
+
+get_data_for_date() pages through each configured endpoint for one day,
+transforms and validates the items, and returns them ready for storage.
+Each stage (rate limiter wait, HTTP, JSON decoding, transform, validation)
+is timed per endpoint through monitoring.metrics.stage().
 """
 
+import re
 import json
 import os
+import time
+import random
+import hashlib
 import logging
+import threading
 import requests
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime
 
+from data_validator import DataValidator
+from monitoring import metrics
+from tracing import tracer
+
+# Response key holding the items of each endpoint's list call
+ENDPOINT_KEYS = {
+    'bill': 'bills',
+    'amendment': 'amendments',
+    'nomination': 'nominations',
+    'treaty': 'treaties',
+    'committee': 'committees',
+    'hearing': 'hearings',
+    'committee-report': 'committeeReports',
+    'congressional-record': 'congressionalRecords',
+    'house-communication': 'houseCommunications',
+    'senate-communication': 'senateCommunications',
+    'member': 'members',
+    'summaries': 'summaries',
+    'committee-print': 'committeePrints',
+    'committee-meeting': 'committeeMeetings',
+    'daily-congressional-record': 'dailyCongressionalRecord',  # Note: singular form
+    'bound-congressional-record': 'boundCongressionalRecord',  # Note: singular form
+    'congress': 'congresses',
+    'house-requirement': 'houseRequirements'
+}
+
+# Endpoints fetched by get_data_for_date unless config['endpoints'] says otherwise
+DEFAULT_ENDPOINTS = ['bill', 'amendment', 'nomination', 'treaty', 'committee', 'hearing']
+
+PAGE_SIZE = 250  # Largest page the API serves
+MAX_OFFSET = 10000  # Safety limit per endpoint and day
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Item ID scheme of each type, as stored by earlier versions of this client;
+# health_check.check_item_ids() compares stored IDs against them
+ID_PATTERNS = {
+    'bill': re.compile(r'\d+-[a-z]+-\d+'),
+    'amendment': re.compile(r'\d+-[a-z]+-\d+'),
+    'nomination': re.compile(r'\d+-nom-\d+(-\d+)?'),
+    'treaty': re.compile(r'\d+-treaty-\w+'),
+    'committee': re.compile(r'\d+-[a-z]*-[a-z0-9]+'),
+    'hearing': re.compile(r'\d+-[a-z]+-[a-z0-9]+-\d+'),
+    'committee-report': re.compile(r'\d+-crpt-[a-z]+-\d+'),
+    'house-communication': re.compile(r'\d+-hcomm-[a-z]+-\d+'),
+    'senate-communication': re.compile(r'\d+-scomm-[a-z]+-\d+'),
+    'congressional-record': re.compile(r'\d+-cr-[a-z]+-\d+'),
+    'member': re.compile(r'\d+-mem-[A-Z0-9]+')
+}
+
+# ID prefix of the endpoints whose items are keyed {congress}-{prefix}-{type}-{number}
+NUMBERED_ID_PREFIXES = {
+    'committee-report': 'crpt',
+    'house-communication': 'hcomm',
+    'senate-communication': 'scomm'
+}
+
+def congress_for_date(date: datetime) -> int:
+    """Number of the Congress in session on a date (each starts January 3 of an odd year)"""
+    year = date.year
+    if year % 2 == 1 and (date.month, date.day) < (1, 3):
+        year -= 1
+    return (year - 1789) // 2 + 1
+
 class RateLimiter:
-    """Basic rate limiter for API requests"""
-    def __init__(self, config):
+    """Spaces requests to each endpoint and counts consecutive errors.
+
+    Backoff after errors is left to CongressAPI._make_request (Retry-After or
+    _retry_sleep), so a failing request is delayed by one mechanism only.
+    """
+    def __init__(self, config: Dict[str, Any], endpoint_rate_limits: Optional[Dict[str, float]] = None):
         self.config = config
         self.logger = logging.getLogger('congress_api.rate_limiter')
-    
-    def wait(self, endpoint: str) -> None:
-        """Simulate rate limiting wait"""
-        pass
-    
+        self.requests_per_second = config.get('requests_per_second', 5)
+        self.max_retries = config.get('max_retries', 3)
+        self.retry_delay = config.get('retry_delay', 1)
+        self.test_mode = config.get('test_mode', False)
+        self.endpoint_rate_limits = endpoint_rate_limits or {}
+        self.consecutive_errors: Dict[str, int] = {}
+        self.endpoint_counts: Dict[str, int] = {}
+        self.total_wait_time = 0.0
+        self.start_time = time.time()
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get_rate_limit(self, endpoint: str) -> float:
+        """Requests per second allowed for an endpoint"""
+        return self.endpoint_rate_limits.get(endpoint, self.endpoint_rate_limits.get('default', self.requests_per_second))
+
+    def wait(self, endpoint: str) -> float:
+        """Block until the endpoint's next request slot; returns the seconds waited"""
+        with self._lock:
+            self.endpoint_counts[endpoint] = self.endpoint_counts.get(endpoint, 0) + 1
+            if self.test_mode:
+                return 0.0
+            interval = 1.0 / self.get_rate_limit(endpoint)
+            # Reserve the slot under the lock so parallel workers queue up
+            # behind each other instead of all firing at once
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(endpoint, 0.0))
+            self._next_slot[endpoint] = slot + interval
+            delay = slot - now
+            self.total_wait_time += delay
+
+        if delay > 0:
+            metrics.track_rate_limit_wait(endpoint, delay)
+            time.sleep(delay)
+        return delay
+
     def record_success(self, endpoint: str) -> None:
         """Record successful request"""
-        pass
-    
+        with self._lock:
+            self.consecutive_errors[endpoint] = 0
+
     def record_error(self, endpoint: str, error_type: str = 'unknown') -> None:
         """Record failed request"""
-        pass
+        with self._lock:
+            self.consecutive_errors[endpoint] = self.consecutive_errors.get(endpoint, 0) + 1
+            errors = self.consecutive_errors[endpoint]
+        self.logger.warning(f"Recorded {error_type} error for {endpoint} (consecutive errors: {errors})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rate limiter statistics for reporting"""
+        with self._lock:
+            return {
+                'total_requests': sum(self.endpoint_counts.values()),
+                'endpoint_counts': dict(self.endpoint_counts),
+                'consecutive_errors': dict(self.consecutive_errors),
+                'total_wait_time': self.total_wait_time,
+                'uptime': time.time() - self.start_time
+            }
+
+class RecordedResponses:
+    """Congress.gov responses saved as NDJSON, one {endpoint, params, status, body} per line.
+
+    A client created with api.record_responses appends every 200 and 404
+    response it receives; one created with api.replay_responses serves
+    requests from such a file instead of the network.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.responses: Dict[str, tuple] = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.responses[self.key(record['endpoint'], record['params'])] = (record['status'], record['body'])
+
+    @staticmethod
+    def key(endpoint: str, params: Dict[str, Any]) -> str:
+        return json.dumps([endpoint, {k: v for k, v in params.items() if k != 'api_key'}],
+                          sort_keys=True, default=str)
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[tuple]:
+        """(status, body) recorded for a request, or None"""
+        return self.responses.get(self.key(endpoint, params))
 
 class CongressAPI:
-    """Simplified Congress API client for health checking"""
-    
+    """Congress.gov API client"""
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.api_key = os.environ.get('CONGRESS_API_KEY', config.get('api_key', ''))
-        self.base_url = config.get('base_url', 'https://api.congress.gov/v3')
+        self.base_url = config.get('base_url', 'https://api.congress.gov/v3').rstrip('/')
         self.logger = logging.getLogger('congress_api')
-        self.rate_limiter = RateLimiter(config.get('rate_limit', {}))
-        self.validator = None  # Mock validator
+        self.rate_limiter = RateLimiter(config.get('rate_limit', {}), config.get('endpoint_rate_limits'))
+        self.validator = DataValidator()
+        self.endpoints = config.get('endpoints', DEFAULT_ENDPOINTS)
+        self.timeout_config = config.get('timeout_config', {})
         self._response_cache = {}
+        self.replay = RecordedResponses(config['replay_responses']) if config.get('replay_responses') else None
+        self._record_path = config.get('record_responses')
+        self._record_lock = threading.Lock()
         self.session = requests.Session()
+        # One pooled connection per download worker
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.get('max_connections', 16))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.request_count = 0
         self.error_count = 0
-        
+        self.start_time = time.time()
+        self._counter_lock = threading.Lock()
+        self._transformers: Dict[str, Callable[[Dict, int], Optional[Dict]]] = {
+            'bill': self._transform_bill,
+            'amendment': self._transform_amendment,
+            'nomination': self._transform_nomination,
+            'treaty': self._transform_treaty,
+            'committee': self._transform_committee,
+            'hearing': self._transform_hearing
+        }
+
     def get_available_endpoints(self) -> Dict[str, Any]:
         """Get list of available API endpoints and their details"""
         try:
             # For health check, just return a simplified mock response
             self.logger.info("Getting available endpoints (simplified mock)")
-            
+
             mock_endpoints = {
                 'endpoints': {
                     'bill': {
@@ -73,7 +241,7 @@ class CongressAPI:
                 },
                 'endpoint_count': 3
             }
-            
+
             # Actually try to verify one endpoint
             if self.api_key:
                 try:
@@ -85,9 +253,9 @@ class CongressAPI:
                     self.logger.info("Successfully verified bill endpoint")
                 except Exception as e:
                     self.logger.warning(f"Could not verify bill endpoint: {str(e)}")
-            
+
             return mock_endpoints
-            
+
         except Exception as e:
             self.logger.error(f"Failed to get available endpoints: {str(e)}")
             return {
@@ -95,13 +263,485 @@ class CongressAPI:
                 'endpoint_count': 0,
                 'error': str(e)
             }
-    
+
     def get_current_congress(self) -> int:
         """Get the current Congress number"""
-        # 118th Congress (2023-2025)
-        return 118
-        
+        return congress_for_date(datetime.now())
+
     def _generate_committee_id(self, committee: Dict, current_congress: int) -> Optional[str]:
-        """Generate a committee ID from committee data"""
-        # For health check, just return a mock ID
-        return f"comm_{current_congress}_mock"
\ No newline at end of file
+        """{congress}-{chamber}-{systemCode}, or None without a system code"""
+        system_code = committee.get('systemCode', '')
+        if not system_code:
+            return None
+        return f"{current_congress}-{committee.get('chamber', '').lower()}-{system_code}"
+
+    @staticmethod
+    def _generate_generic_id(endpoint_name: str, raw: Dict, current_congress: int) -> Optional[str]:
+        """ID of an item without a dedicated transform.
+
+        Endpoints in ID_PATTERNS use their scheme (None when its fields are
+        missing); others use the item's API URL path, or a content hash.
+        """
+        congress = raw.get('congress', current_congress)
+        if endpoint_name in NUMBERED_ID_PREFIXES:
+            item_type = str(raw.get('type', '')).lower()
+            number = str(raw.get('number', ''))
+            if not (item_type and number):
+                return None
+            return f"{congress}-{NUMBERED_ID_PREFIXES[endpoint_name]}-{item_type}-{number}"
+        if endpoint_name == 'congressional-record':
+            chamber = str(raw.get('chamber', '')).lower()
+            date = re.sub(r'[^0-9]', '', str(raw.get('date', '')))
+            return f"{congress}-cr-{chamber}-{date}" if chamber and date else None
+        if endpoint_name == 'member':
+            bioguide_id = raw.get('bioguideId', '')
+            return f"{congress}-mem-{bioguide_id}" if bioguide_id else None
+        url = raw.get('url', '')
+        if url:
+            return url.split('/v3/', 1)[-1].split('?', 1)[0].strip('/').replace('/', '-')
+        digest = hashlib.sha1(json.dumps(raw, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+        return f"{endpoint_name}-{digest}"
+
+    def get_earliest_date(self) -> datetime:
+        """Get earliest available date for data"""
+        try:
+            response = self._make_request('congress/earliest', {'format': 'json'})
+            if 'congress' in response:
+                congress_num = response['congress'].get('number', 1)
+                year = 1789 + (congress_num - 1) * 2
+                return datetime(year, 1, 1)
+        except Exception:
+            self.logger.warning("Failed to get earliest date, using default")
+
+        # Default to First Congress if API call fails
+        return datetime(1789, 3, 4)
+
+    def get_api_stats(self) -> Dict[str, Any]:
+        """Get statistics about API usage"""
+        uptime = time.time() - self.start_time
+        return {
+            'request_count': self.request_count,
+            'error_count': self.error_count,
+            'error_rate': (self.error_count / self.request_count * 100) if self.request_count > 0 else 0,
+            'uptime_seconds': uptime,
+            'uptime_formatted': metrics._format_duration(uptime),
+            'requests_per_second': self.request_count / uptime if uptime > 0 else 0,
+            'rate_limiter_stats': self.rate_limiter.get_stats()
+        }
+
+    def _count(self, errors: bool = False) -> None:
+        with self._counter_lock:
+            if errors:
+                self.error_count += 1
+            else:
+                self.request_count += 1
+
+    def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET an API path, retrying throttled and failed requests; {} for 404"""
+        params = dict(params or {})
+        params['api_key'] = self.api_key
+        params.setdefault('format', 'json')
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        endpoint_name = endpoint.split('/')[0]
+        if self.replay is not None:
+            return self._replay_request(endpoint, endpoint_name, params)
+        timeout = tuple(self.timeout_config.get(endpoint_name, self.timeout_config.get('default', (5, 30))))
+
+        attempts = self.rate_limiter.max_retries + 1
+        for attempt in range(attempts):
+            if attempt:
+                tracer.current().add('retries')
+            with metrics.stage('rate_limit', endpoint_name, items=1):
+                self.rate_limiter.wait(endpoint_name)
+
+            self._count()
+            metrics.track_api_request_start(endpoint_name)
+            start_time = time.time()
+            try:
+                with metrics.stage('http', endpoint_name, items=1):
+                    response = self.session.get(url, params=params, timeout=timeout)
+                    body = response.content
+            except requests.exceptions.RequestException as e:
+                self._count(errors=True)
+                status_code = 408 if isinstance(e, requests.exceptions.Timeout) else 503
+                metrics.track_api_request(endpoint=endpoint_name, status_code=status_code,
+                                          duration=time.time() - start_time)
+                self.rate_limiter.record_error(endpoint_name, type(e).__name__)
+                if attempt + 1 < attempts:
+                    self._retry_sleep(attempt)
+                    continue
+                raise Exception(f"Request failed for {endpoint_name}: {str(e)}")
+
+            metrics.track_api_request(endpoint=endpoint_name, status_code=response.status_code,
+                                      duration=time.time() - start_time)
+            span = tracer.current()
+            span.set('status', response.status_code)
+            span.add('bytes', len(body))
+
+            if response.status_code in (200, 404) and self._record_path:
+                self._record_response(endpoint, params, response.status_code, body)
+
+            if response.status_code == 200:
+                self.rate_limiter.record_success(endpoint_name)
+                try:
+                    with metrics.stage('json_decode', endpoint_name, items=1):
+                        return json.loads(body)
+                except ValueError as e:
+                    self._count(errors=True)
+                    self.rate_limiter.record_error(endpoint_name, 'json_decode')
+                    raise Exception(f"Invalid JSON response from {endpoint_name}: {str(e)}")
+
+            if response.status_code == 404:
+                self.logger.warning(f"Resource not found for {endpoint_name}: {url}")
+                return {}
+
+            self._count(errors=True)
+            self.rate_limiter.record_error(endpoint_name, f'status_{response.status_code}')
+            if response.status_code in RETRY_STATUS_CODES and attempt + 1 < attempts:
+                retry_after = response.headers.get('Retry-After')
+                if response.status_code == 429 and retry_after:
+                    try:
+                        time.sleep(float(retry_after) * random.uniform(1.0, 1.2))
+                        continue
+                    except ValueError:
+                        pass
+                self._retry_sleep(attempt)
+                continue
+
+            if response.status_code == 403:
+                raise Exception("API authentication failed - please verify API key")
+            raise Exception(f"HTTP {response.status_code} from {endpoint_name}: {response.text[:200]}")
+
+        return {}
+
+    def _replay_request(self, endpoint: str, endpoint_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve a request from the recorded responses (no rate limiting or HTTP)"""
+        self._count()
+        recorded = self.replay.get(endpoint, params)
+        if recorded is None:
+            self.logger.warning(f"No recorded response for {endpoint} {params.get('offset', '')}")
+            return {}
+        status, body = recorded
+        tracer.current().set('status', status)
+        if status != 200:
+            return {}
+        tracer.current().add('bytes', len(body))
+        with metrics.stage('json_decode', endpoint_name, items=1):
+            return json.loads(body)
+
+    def _record_response(self, endpoint: str, params: Dict[str, Any], status: int, body: bytes) -> None:
+        """Append a response to the api.record_responses file"""
+        line = json.dumps({
+            'endpoint': endpoint,
+            'params': {k: v for k, v in params.items() if k != 'api_key'},
+            'status': status,
+            'body': body.decode('utf-8') if status == 200 else ''
+        })
+        with self._record_lock:
+            with open(self._record_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def _retry_sleep(self, attempt: int) -> None:
+        """Exponential backoff with jitter between retries"""
+        time.sleep(self.rate_limiter.retry_delay * (2 ** attempt) * random.uniform(0.5, 1.0))
+
+    def get_data_for_date(self, date: datetime) -> List[Dict]:
+        """Get all configured data types for a specific date"""
+        date_str = date.strftime('%Y-%m-%d')
+        # Committee and member lists are per Congress: use the one in session that day
+        current_congress = congress_for_date(date)
+        all_data = []
+
+        for endpoint_name in self.endpoints:
+            try:
+                with tracer.span('endpoint', endpoint=endpoint_name, date=date_str) as span:
+                    data = self._get_endpoint_data(endpoint_name, date_str, current_congress)
+                    span.set('items', len(data))
+                if data:
+                    self.logger.info(f"Processed {len(data)} items from {endpoint_name} for {date_str}")
+                    all_data.extend(data)
+            except Exception as e:
+                self.logger.error(f"Failed to process {endpoint_name} data for {date_str}: {str(e)}")
+
+        self.logger.info(f"Total items processed across all endpoints for {date_str}: {len(all_data)}")
+        return all_data
+
+    def _endpoint_params(self, endpoint_name: str, date_str: str, current_congress: int) -> Dict[str, Any]:
+        """List-call parameters selecting one day of an endpoint"""
+        params = {'format': 'json', 'limit': PAGE_SIZE, 'offset': 0}
+        if endpoint_name in ['daily-congressional-record', 'bound-congressional-record']:
+            dt = datetime.strptime(date_str, '%Y-%m-%d')
+            params.update({'year': dt.year, 'month': dt.month, 'day': dt.day})
+        elif endpoint_name != 'congress':
+            params.update({
+                'fromDateTime': f"{date_str}T00:00:00Z",
+                'toDateTime': f"{date_str}T23:59:59Z"
+            })
+            if endpoint_name in ['committee', 'committee-meeting', 'committee-print', 'member']:
+                params['congress'] = current_congress
+        return params
+
+    def _get_endpoint_data(self, endpoint_name: str, date_str: str, current_congress: int) -> List[Dict]:
+        """All processed items of one endpoint for one day, following pagination"""
+        data_key = ENDPOINT_KEYS.get(endpoint_name)
+        if not data_key:
+            self.logger.warning(f"No response key mapping for {endpoint_name}")
+            return []
+
+        params = self._endpoint_params(endpoint_name, date_str, current_congress)
+        all_items = []
+        offset = 0
+        while True:
+            params['offset'] = offset
+            with tracer.span('page', endpoint=endpoint_name, offset=offset) as span:
+                response = self._make_request(endpoint_name, params)
+                raw_items = response.get(data_key, []) if response else []
+                span.set('items', len(raw_items))
+                if raw_items:
+                    valid = self._process_page(endpoint_name, raw_items, current_congress)
+                    span.set('valid_items', len(valid))
+                    all_items.extend(valid)
+            if not raw_items:
+                break
+
+            offset += len(raw_items)
+            if offset >= response.get('pagination', {}).get('count', 0):
+                break
+            if offset > MAX_OFFSET:
+                self.logger.warning(f"Reached maximum offset for {endpoint_name} on {date_str}")
+                break
+        return all_items
+
+    def _process_page(self, endpoint_name: str, raw_items: List[Dict], current_congress: int) -> List[Dict]:
+        """Transform then validate one page of items.
+
+        Each loop is timed as a whole so the per-item cost of the stage
+        accounting stays negligible.
+        """
+        transform = self._transformers.get(endpoint_name)
+        transformed = []
+        with metrics.stage('transform', endpoint_name) as span:
+            for raw in raw_items:
+                try:
+                    if transform:
+                        item = transform(raw, current_congress)
+                    else:
+                        item = self._transform_generic(endpoint_name, raw, current_congress)
+                except Exception as e:
+                    self.logger.error(f"Failed to transform {endpoint_name} item: {str(e)}")
+                    item = None
+                if item:
+                    transformed.append(item)
+            span.items = len(transformed)
+
+        valid = []
+        with metrics.stage('validate', endpoint_name) as span:
+            for item in transformed:
+                is_valid, errors = self.validator.validate_data(item, endpoint_name)
+                if is_valid:
+                    valid.append(self.validator.cleanup_data(item, endpoint_name))
+                else:
+                    self.logger.warning(f"{endpoint_name} item {item.get('id')} failed validation: {errors}")
+            span.items = len(valid)
+        return valid
+
+    @staticmethod
+    def _latest_action(data: Dict) -> Dict[str, str]:
+        action = data.get('latestAction')
+        if not isinstance(action, dict):
+            return {'text': '', 'action_date': ''}
+        return {'text': action.get('text', ''), 'action_date': action.get('actionDate', '')}
+
+    @staticmethod
+    def _committee_refs(committees: Any) -> List[Dict[str, str]]:
+        if not isinstance(committees, list):
+            return []
+        return [
+            {
+                'name': committee.get('name', ''),
+                'system_code': committee.get('systemCode', ''),
+                'chamber': committee.get('chamber', ''),
+                'type': committee.get('type', ''),
+                'url': committee.get('url', '')
+            }
+            for committee in committees
+            if isinstance(committee, dict)
+        ]
+
+    def _transform_bill(self, bill: Dict, current_congress: int) -> Optional[Dict]:
+        bill_data = bill.get('bill', bill)
+        congress = bill_data.get('congress', current_congress)
+        bill_type = bill_data.get('type', '').lower()
+        number = str(bill_data.get('number', ''))
+        if not (bill_type and number):
+            return None
+        return {
+            'id': f"{congress}-{bill_type}-{number}",
+            'type': 'bill',
+            'congress': int(congress),
+            'update_date': bill_data.get('updateDate', ''),
+            'version': 1,
+            'bill_type': bill_type,
+            'number': number,
+            'title': bill_data.get('title', ''),
+            'origin_chamber': bill_data.get('originChamber', ''),
+            'origin_chamber_code': bill_data.get('originChamberCode', ''),
+            'latest_action': self._latest_action(bill_data),
+            'committees': self._committee_refs(bill_data.get('committees')),
+            'cosponsors_count': int(bill_data.get('cosponsorsCount', 0)),
+            'url': bill_data.get('url', '')
+        }
+
+    def _transform_amendment(self, amendment: Dict, current_congress: int) -> Optional[Dict]:
+        amendment_data = amendment.get('amendment', amendment)
+        congress = amendment_data.get('congress', current_congress)
+        amendment_type = amendment_data.get('type', '').lower()
+        number = str(amendment_data.get('number', ''))
+        if not (amendment_type and number):
+            return None
+        return {
+            'id': f"{congress}-{amendment_type}-{number}",
+            'type': 'amendment',
+            'congress': int(congress),
+            'update_date': amendment_data.get('updateDate', ''),
+            'version': 1,
+            'amendment_type': amendment_type,
+            'number': number,
+            'title': amendment_data.get('title', ''),
+            'purpose': amendment_data.get('purpose', ''),
+            'latest_action': self._latest_action(amendment_data),
+            'url': amendment_data.get('url', '')
+        }
+
+    def _transform_nomination(self, nomination: Dict, current_congress: int) -> Optional[Dict]:
+        nomination_data = nomination.get('nomination', nomination)
+        congress = nomination_data.get('congress', current_congress)
+        number = str(nomination_data.get('number', ''))
+        part = str(nomination_data.get('partNumber', '') or '')
+        if not number:
+            return None
+        nomination_type = nomination_data.get('nominationType')
+        return {
+            'id': f"{congress}-nom-{number}-{part}" if part else f"{congress}-nom-{number}",
+            'type': 'nomination',
+            'congress': int(congress),
+            'update_date': nomination_data.get('updateDate', ''),
+            'version': 1,
+            'number': number,
+            'part_number': part,
+            'description': nomination_data.get('description', ''),
+            'nominee': nomination_data.get('nominee', ''),
+            'position': nomination_data.get('position', ''),
+            'organization': nomination_data.get('organization', ''),
+            'nomination_type': {
+                'is_civilian': nomination_type.get('isCivilian', True) if isinstance(nomination_type, dict) else True
+            },
+            'received_date': nomination_data.get('receivedDate', ''),
+            'latest_action': self._latest_action(nomination_data),
+            'committees': self._committee_refs(nomination_data.get('committees')),
+            'url': nomination_data.get('url', '')
+        }
+
+    def _transform_treaty(self, treaty: Dict, current_congress: int) -> Optional[Dict]:
+        treaty_data = treaty.get('treaty', treaty)
+        congress = treaty_data.get('congress', current_congress)
+        number = str(treaty_data.get('treatyNumber', treaty_data.get('number', '')))
+        if not number:
+            return None
+        return {
+            'id': f"{congress}-treaty-{number}",
+            'type': 'treaty',
+            'congress': int(congress),
+            'update_date': treaty_data.get('updateDate', ''),
+            'version': 1,
+            'treaty_number': number,
+            'description': treaty_data.get('description', ''),
+            'country': treaty_data.get('country', ''),
+            'subject': treaty_data.get('subject', ''),
+            'status': treaty_data.get('status', ''),
+            'received_date': treaty_data.get('receivedDate', ''),
+            'latest_action': self._latest_action(treaty_data),
+            'committees': self._committee_refs(treaty_data.get('committees')),
+            'url': treaty_data.get('url', '')
+        }
+
+    def _transform_committee(self, committee: Dict, current_congress: int) -> Optional[Dict]:
+        committee_data = committee.get('committee', committee)
+        committee_id = self._generate_committee_id(committee_data, current_congress)
+        if not committee_id:
+            return None
+        chamber = committee_data.get('chamber', '').title()
+        system_code = committee_data.get('systemCode', '')
+        parent = committee_data.get('parent')
+        return {
+            'id': committee_id,
+            'type': 'committee',
+            'congress': current_congress,
+            'update_date': committee_data.get('updateDate', ''),
+            'version': 1,
+            'name': committee_data.get('name', ''),
+            'chamber': chamber,
+            'committee_type': committee_data.get('committeeTypeCode', ''),
+            'system_code': system_code,
+            'parent_committee': {
+                'name': parent.get('name', ''),
+                'system_code': parent.get('systemCode', ''),
+                'url': parent.get('url', '')
+            } if isinstance(parent, dict) else {},
+            'subcommittees': [
+                {'name': sub.get('name', ''), 'system_code': sub.get('systemCode', ''), 'url': sub.get('url', '')}
+                for sub in committee_data.get('subcommittees') or []
+                if isinstance(sub, dict)
+            ],
+            'url': committee_data.get('url', '')
+        }
+
+    def _transform_hearing(self, hearing: Dict, current_congress: int) -> Optional[Dict]:
+        hearing_data = hearing.get('hearing', hearing)
+        congress = int(hearing_data.get('congress', current_congress))
+        chamber = hearing_data.get('chamber', '').lower()
+        committee_data = hearing_data.get('committee') or {}
+        date = hearing_data.get('date', '')
+        system_code = committee_data.get('systemCode', '')
+        if not (chamber and system_code and date):
+            return None
+        return {
+            'id': f"{congress}-{chamber}-{system_code}-{re.sub(r'[^0-9]', '', date)}",
+            'type': 'hearing',
+            'congress': congress,
+            'update_date': hearing_data.get('updateDate', ''),
+            'version': 1,
+            'chamber': chamber,
+            'date': date,
+            'time': hearing_data.get('time', ''),
+            'location': hearing_data.get('location', ''),
+            'title': hearing_data.get('title', ''),
+            'committee': {
+                'name': committee_data.get('name', ''),
+                'system_code': system_code,
+                'url': committee_data.get('url', '')
+            },
+            'url': hearing_data.get('url', '')
+        }
+
+    def _transform_generic(self, endpoint_name: str, raw: Dict, current_congress: int) -> Optional[Dict]:
+        """Fallback for endpoints without a dedicated transform: snake_case the API fields.
+
+        IDs come from _generate_generic_id.
+        """
+        if not isinstance(raw, dict):
+            return None
+        item_id = self._generate_generic_id(endpoint_name, raw, current_congress)
+        if not item_id:
+            return None
+
+        item = {re.sub(r'(?<!^)(?=[A-Z])', '_', key).lower(): value for key, value in raw.items()}
+        congress = item.get('congress', current_congress)
+        item.update({
+            'id': item_id,
+            'type': endpoint_name,
+            'congress': int(congress) if str(congress).isdigit() else current_congress,
+            'update_date': item.get('update_date') or item.get('date', ''),
+            'version': 1
+        })
+        return item
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
 import json
+import logging
 import sys
 import os
 from datetime import datetime, timedelta
@@ -11,12 +13,17 @@ from dynamo_handler import DynamoHandler
 from logger_config import setup_logger
 from utils import parse_date
 from monitoring import metrics
+from profiler import RunProfiler, MODES as PROFILE_MODES
+from tracing import tracer
 import threading
 import signal
 import concurrent.futures
 from queue import Queue
 from typing import List, Dict, Any, Tuple
-from export_data import export_to_json, export_to_csv, get_data_from_dynamodb
+from export_data import iter_data_from_dynamodb, stream_export, export_partitioned
+
+# Configured by setup_logger() in main(); used by the monitor thread and the signal handler
+logger = logging.getLogger('congress_downloader')
 
 def load_config():
     try:
@@ -40,14 +47,54 @@ def verify_aws_credentials(logger):
         logger.error(f"AWS credential verification failed: {str(e)}")
         return False
 
+# Set by --profile; stopped (and its files written) however the run ends
+run_profiler = None
+
+# Set when the search index is enabled; flushed however the run ends
+search_writer = None
+
+def stop_profiling(logger):
+    """Stop the --profile profiler, if any, and log where its files went"""
+    if run_profiler is None:
+        return
+    try:
+        paths = run_profiler.stop()
+        for kind, path in paths.items():
+            logger.info(f"Profile {kind} written to {path}")
+    except Exception as e:
+        logger.error(f"Failed to write profile: {str(e)}")
+
+def flush_search_index(logger):
+    """Write the documents still buffered for the search index, if any"""
+    if search_writer is None:
+        return
+    try:
+        search_writer.flush()
+    except Exception as e:
+        logger.error(f"Failed to flush search index: {str(e)}")
+
+def export_trace(logger):
+    """Write the spans recorded by --trace, if tracing is on"""
+    if not tracer.enabled:
+        return
+    tracer.stop()
+    try:
+        path = os.path.join('logs', f"trace-{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+        count = tracer.export(path)
+        logger.info(f"Trace with {count} spans written to {path}")
+    except Exception as e:
+        logger.error(f"Failed to write trace: {str(e)}")
+
 def monitor_resources():
     """Background thread to monitor system resources"""
     while True:
         try:
             metrics.track_resource_usage()
-            time.sleep(60)  # Collect metrics every minute
+            if metrics.stage_stats:
+                logger.info(f"Stages: {metrics.stage_summary_line()}")
         except Exception as e:
             logger.error(f"Error collecting resource metrics: {str(e)}")
+        time.sleep(60)  # Collect metrics every minute
 
 def start_monitoring():
     """Start the resource monitoring thread"""
@@ -69,27 +116,40 @@ def cleanup(signum, frame):
     except Exception as e:
         logger.error(f"Failed to generate metrics reports: {str(e)}")
 
+    flush_search_index(logger)
+    stop_profiling(logger)
+    export_trace(logger)
+
     # Flush metrics
     metrics.flush_metrics()
     sys.exit(0)
 
 def process_date_chunk(api_client: CongressAPI, db_handler: DynamoHandler, 
-                       dates: List[datetime], logger) -> Tuple[int, List[Dict]]:
-    """Process a chunk of dates in parallel"""
+                       dates: List[datetime], logger, parent_span=None) -> Tuple[int, List[Dict]]:
+    """Process a chunk of dates in parallel (parent_span: the run's trace span)"""
     total_items = 0
     chunk_failed_dates = []
 
     for date in dates:
+        in_progress = False
+        # The date span is closed in the finally below
+        spans = contextlib.ExitStack()
         try:
+            date_span = spans.enter_context(
+                tracer.span('date', parent=parent_span, date=date.strftime('%Y-%m-%d')))
+
             # Reset processed IDs tracking for each date to prevent duplicates
             # while still maintaining clean state for each date
             db_handler.reset_processed_ids()
 
             date_str = date.strftime('%Y-%m-%d')
             logger.info(f"Processing date: {date_str}")
+            metrics.adjust_gauge('download_dates_in_progress', 1)
+            in_progress = True
 
             # Get raw data and log it for debugging
             data = api_client.get_data_for_date(date)
+            date_span.set('items', len(data))
             if not data:
                 logger.info(f"No data found for date {date_str}")
                 continue
@@ -112,8 +172,15 @@ def process_date_chunk(api_client: CongressAPI, db_handler: DynamoHandler,
                 logger.info(f"Sample committee data structure:")
                 logger.info(f"{json.dumps(committee_items[0], indent=2)}")
 
-            successful_items, failed_items = db_handler.batch_store_items(data)
+            # Items fetched and waiting for their batch writes to finish
+            metrics.adjust_gauge('items_awaiting_write', len(data))
+            try:
+                successful_items, failed_items = db_handler.batch_store_items(data)
+            finally:
+                metrics.adjust_gauge('items_awaiting_write', -len(data))
             total_items += successful_items
+            date_span.set('stored', successful_items)
+            date_span.set('failed', len(failed_items))
 
             if failed_items:
                 logger.warning(f"{len(failed_items)} items failed for {date_str}")
@@ -144,6 +211,11 @@ def process_date_chunk(api_client: CongressAPI, db_handler: DynamoHandler,
                 'date': date,
                 'error': str(e)
             })
+        finally:
+            metrics.adjust_gauge('download_dates_pending', -1)
+            if in_progress:
+                metrics.adjust_gauge('download_dates_in_progress', -1)
+            spans.close()
 
     return total_items, chunk_failed_dates
 
@@ -163,6 +235,7 @@ def process_date_range(api_client: CongressAPI, db_handler: DynamoHandler,
     while current_date <= end_date:
         dates.append(current_date)
         current_date += timedelta(days=1)
+    metrics.set_gauge('download_dates_pending', len(dates))
 
     # Split dates into chunks for parallel processing
     chunk_size = max(1, len(dates) // max_workers)
@@ -171,10 +244,12 @@ def process_date_range(api_client: CongressAPI, db_handler: DynamoHandler,
     total_items_processed = 0
     all_failed_dates = []
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with tracer.span('run', start_date=start_date.strftime('%Y-%m-%d'), end_date=end_date.strftime('%Y-%m-%d'),
+                     dates=len(dates), workers=max_workers) as run_span, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all chunks for processing
         future_to_chunk = {
-            executor.submit(process_date_chunk, api_client, db_handler, chunk, logger): chunk 
+            executor.submit(process_date_chunk, api_client, db_handler, chunk, logger, run_span): chunk 
             for chunk in date_chunks
         }
 
@@ -192,6 +267,9 @@ def process_date_range(api_client: CongressAPI, db_handler: DynamoHandler,
                     'error': str(e)
                 } for date in chunk])
 
+        run_span.set('items', total_items_processed)
+        run_span.set('failed_dates', len(all_failed_dates))
+
     # Report final statistics
     logger.info("Date range processing completed:")
     logger.info(f"Total items processed: {total_items_processed}")
@@ -282,12 +360,15 @@ def validate_date_range(start_date: datetime, end_date: datetime, config: Dict)
         return False, f"Unexpected error in date validation: {str(e)}"
 
 def main():
+    global run_profiler, search_writer
+
     # Register signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, cleanup)
     signal.signal(signal.SIGTERM, cleanup)
 
     config = load_config()
     logger = setup_logger(config['logging'])
+    metrics.configure(config.get('metrics', {}))
 
     # Start resource monitoring
     monitor_thread = start_monitoring()
@@ -298,8 +379,8 @@ def main():
         sys.exit(1)
 
     parser = argparse.ArgumentParser(description='Congress.gov Data Downloader')
-    parser.add_argument('--mode', choices=['bulk', 'incremental', 'refresh', 'export'],
-                       required=True, help='Download mode or export data')
+    parser.add_argument('--mode', choices=['bulk', 'incremental', 'refresh', 'export', 'rebuild-stats'],
+                       required=True, help='Download mode, export data, or rebuild aggregate counters')
     parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
     parser.add_argument('--lookback-days', type=int,
@@ -310,20 +391,57 @@ def main():
     parser.add_argument('--verbose', action='store_true',
                        help='Enable verbose logging')
     # Export-specific arguments
-    parser.add_argument('--format', choices=['json', 'csv'], default='json',
-                       help='Export format (for export mode)')
+    parser.add_argument('--format', choices=['json', 'ndjson', 'csv'],
+                       help='Export format (for export mode, default json; not valid with --partitioned)')
     parser.add_argument('--data-type', choices=['bill', 'committee', 'hearing', 'amendment', 'nomination', 'treaty'],
                        help='Type of data to export (for export mode)')
     parser.add_argument('--congress', type=int, help='Congress number (for export mode, e.g., 117)')
     parser.add_argument('--output', help='Output file path (for export mode)')
+    parser.add_argument('--partitioned', action='store_true',
+                       help='Export a type/congress partitioned dataset of gzip NDJSON parts with a manifest '
+                            '(always NDJSON, so --format cannot be combined with it)')
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve Prometheus metrics on this port at /metrics while running')
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                       help='Profile the run and write pstats, collapsed stacks and a summary to logs/')
+    parser.add_argument('--profile-interval', type=float, default=5,
+                       help='Sampling interval in milliseconds (for --profile)')
+    parser.add_argument('--trace', action='store_true',
+                       help='Record spans for the run and write them to logs/ as a Chrome trace')
+    parser.add_argument('--record-responses', metavar='PATH',
+                       help='Append every Congress.gov response to this NDJSON file')
+    parser.add_argument('--replay-responses', metavar='PATH',
+                       help='Serve Congress.gov requests from a file written by --record-responses')
 
     args = parser.parse_args()
+    if args.partitioned and args.format:
+        parser.error('--format cannot be used with --partitioned, which always writes gzip NDJSON parts')
+    if not args.format:
+        args.format = 'json'
 
     # Set log level based on verbose flag
     if args.verbose:
         logger.setLevel('DEBUG')
         logger.info("Verbose logging enabled")
 
+    if args.metrics_port:
+        metrics.serve_prometheus(args.metrics_port)
+
+    if args.record_responses:
+        config['api']['record_responses'] = args.record_responses
+    if args.replay_responses:
+        config['api']['replay_responses'] = args.replay_responses
+
+    if args.profile:
+        run_profiler = RunProfiler(args.profile, interval=args.profile_interval / 1000,
+                                   tags=lambda: metrics.active_stages)
+        run_profiler.start()
+        logger.info(f"Profiling enabled ({args.profile})")
+
+    if args.trace:
+        tracer.start()
+        logger.info("Tracing enabled")
+
     try:
         logger.info("Initializing Congress API client...")
         api_client = CongressAPI(config['api'])
@@ -334,6 +452,13 @@ def main():
         # Reset processed IDs tracking at the start of a new session
         db_handler.reset_processed_ids()
 
+        # Feed the local search index with everything stored in this run
+        search_config = config.get('search_index', {})
+        if search_config.get('enabled') and args.mode != 'export':
+            from search_index import SearchIndexWriter
+            search_writer = SearchIndexWriter(search_config.get('path', 'search_index'))
+            db_handler.search_index = search_writer
+
         if args.mode == 'export':
             logger.info("Starting data export")
             
@@ -370,31 +495,29 @@ def main():
                 
                 timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
                 type_str = args.data_type if args.data_type else 'all'
-                output_file = f"exports/{type_str}_{timestamp}.{args.format}"
+                if args.partitioned:
+                    output_file = f"exports/{type_str}_{timestamp}"
+                else:
+                    output_file = f"exports/{type_str}_{timestamp}.{args.format}"
                 
-            # Query data from DynamoDB
-            logger.info(f"Querying data from DynamoDB: type={args.data_type}, congress={congress}, dates={start_date}-{end_date}")
-            data = get_data_from_dynamodb(config['dynamodb'], args.data_type, congress, start_date, end_date)
-            
-            if not data:
-                logger.warning("No data found matching the criteria")
-                sys.exit(1)
-            
-            # Export data to the specified format
-            success = False
-            if args.format == 'json':
-                logger.info(f"Exporting {len(data)} records to JSON: {output_file}")
-                success = export_to_json(data, output_file)
-            elif args.format == 'csv':
-                logger.info(f"Exporting {len(data)} records to CSV: {output_file}")
-                success = export_to_csv(data, output_file)
-            
-            if success:
-                logger.info(f"Successfully exported {len(data)} records to {output_file}")
+            # Stream data from DynamoDB straight into the output file
+            start_str = start_date.strftime('%Y-%m-%d') if start_date else None
+            end_str = end_date.strftime('%Y-%m-%d') if end_date else None
+            logger.info(f"Streaming data from DynamoDB: type={args.data_type}, congress={congress}, dates={start_str}-{end_str}")
+            items = iter_data_from_dynamodb(config['dynamodb'], args.data_type, congress, start_str, end_str)
+            if args.partitioned:
+                count = export_partitioned(items, output_file)['total_rows']
             else:
-                logger.error("Export failed")
+                count = stream_export(items, output_file, args.format, args.data_type)
+
+            if not count:
+                logger.warning("No data found matching the criteria")
+                if not args.partitioned:
+                    os.remove(output_file)
                 sys.exit(1)
-                
+
+            logger.info(f"Successfully exported {count} records to {output_file}")
+
         elif args.mode == 'bulk':
             logger.info("Starting bulk download")
             start_date = api_client.get_earliest_date()
@@ -429,6 +552,11 @@ def main():
             process_date_range(api_client, db_handler, start, end, 
                              logger, args.parallel_workers)
 
+        elif args.mode == 'rebuild-stats':
+            logger.info("Rebuilding aggregate counters from a full table scan")
+            count = db_handler.rebuild_stats()
+            logger.info(f"Rebuilt {count} counters")
+
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}", exc_info=True)
 
@@ -442,6 +570,9 @@ def main():
         except Exception as report_err:
             logger.error(f"Failed to generate metrics reports: {str(report_err)}")
 
+        flush_search_index(logger)
+        stop_profiling(logger)
+        export_trace(logger)
         metrics.flush_metrics()
         sys.exit(1)
 
@@ -455,6 +586,10 @@ def main():
     except Exception as e:
         logger.error(f"Failed to generate metrics reports: {str(e)}")
 
+    flush_search_index(logger)
+    stop_profiling(logger)
+    export_trace(logger)
+
     # Ensure final metrics are sent
     metrics.flush_metrics()
 
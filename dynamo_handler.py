@@ -1,27 +1,149 @@
 import time
+import atexit
+import threading
+import random
 import boto3
 from botocore.exceptions import ClientError
 import logging
+import concurrent.futures
+import contextlib
+from collections import deque
+from datetime import datetime
 from monitoring import metrics
-from typing import Dict, List, Any, Optional, Tuple
+from tracing import tracer
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 from decimal import Decimal
 import json
 
+# Internal bookkeeping items share the table with the data but use types
+# starting with '_' so they never appear in per-type indexes or exports
+INTERNAL_TYPE_PREFIX = '_'
+DATA_VERSION_TYPE = '_meta'
+
+# Minimum seconds between data version bumps of one type. Writes in between
+# only mark the type pending; it is bumped by the next write after the
+# interval, or by flush_data_versions() at exit.
+DATA_VERSION_BUMP_SECONDS = 5
+
+def data_version_key(item_type: str) -> str:
+    """Primary key of the item holding the data version token for a type"""
+    return f"{DATA_VERSION_TYPE}#data_version#{item_type}"
+
+def is_internal_item(item: Dict[str, Any]) -> bool:
+    """Whether an item is internal bookkeeping rather than Congress data"""
+    return str(item.get('type', '')).startswith(INTERNAL_TYPE_PREFIX)
+
+# Aggregate counter items. Each counts the data items sharing one combination
+# of STATS_DIMENSIONS; its update_date holds the dimensions joined by '#' so
+# all counters can be read with one query on type-update_date-index.
+STATS_TYPE = '_stats'
+STATS_DIMENSIONS = ('type', 'congress', 'chamber', 'month')
+
+def stats_dimensions(item: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """Counter dimensions of a data item; month is the month of its update_date"""
+    month = str(item.get('update_date') or '')[:7]
+    return (
+        str(item.get('type') or 'unknown'),
+        str(item.get('congress') or 'none'),
+        str(item.get('chamber') or 'none'),
+        month or 'none'
+    )
+
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Decimal):
             return str(obj)
         return super(DecimalEncoder, self).default(obj)
 
+class ReadPacer:
+    """Paces reads to a read capacity budget, shared by concurrent readers.
+
+    Each page reports the capacity it consumed (ReturnConsumedCapacity) and
+    is charged afterwards; a reader waits before its next request while the
+    budget is overdrawn. At most one second of unused budget is kept.
+    """
+    def __init__(self, units_per_second: float, sleep=time.sleep, clock=time.monotonic):
+        self.units_per_second = units_per_second
+        self._sleep = sleep
+        self._clock = clock
+        self._available = units_per_second
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._available = min(self.units_per_second,
+                              self._available + (now - self._updated) * self.units_per_second)
+        self._updated = now
+
+    def wait(self) -> None:
+        """Block until the budget is no longer overdrawn"""
+        with self._lock:
+            self._refill()
+            delay = -self._available / self.units_per_second
+        if delay > 0:
+            self._sleep(delay)
+
+    def charge(self, units: float) -> None:
+        with self._lock:
+            self._refill()
+            self._available -= units
+
+def dynamodb_resource(config: Dict[str, Any]):
+    """boto3 DynamoDB resource, or the in-memory stand-in (fake_dynamodb) for backend 'memory'"""
+    backend = config.get('backend', 'aws')
+    if backend == 'memory':
+        import fake_dynamodb
+        return fake_dynamodb.resource(config.get('memory'))
+    if backend != 'aws':
+        raise ValueError(f"Unknown DynamoDB backend: {backend}")
+    return boto3.resource('dynamodb', region_name=config['region'])
+
 class DynamoHandler:
-    def __init__(self, config):
+    def __init__(self, config, ensure_table: bool = True):
         self.table_name = config['table_name']
-        self.dynamodb = boto3.resource('dynamodb', region_name=config['region'])
+        self.dynamodb = dynamodb_resource(config)
         self.table = None
         self.logger = logging.getLogger('congress_downloader')
-        self._ensure_table_exists()
+        if config.get('backend') == 'memory':
+            self.logger.warning("Using the in-memory DynamoDB backend; nothing is persisted")
+        if ensure_table:
+            self._ensure_table_exists()
+        else:
+            # Read-only callers (e.g. the API server) skip the describe/create round trips
+            self.table = self.dynamodb.Table(self.table_name)
         self.processed_item_ids = set()  # Track processed item IDs to prevent duplicates
 
+        # Concurrent read settings for large range queries
+        parallel_config = config.get('parallel_reads', {})
+        self.max_parallel_reads = parallel_config.get('max_workers', 4)
+        self.read_capacity_share = parallel_config.get('read_capacity_share', 0.5)
+        self.split_threshold_days = parallel_config.get('split_threshold_days', 31)
+        self._index_read_capacity: Dict[str, Optional[int]] = {}
+        self._read_pacers: Dict[str, Optional[ReadPacer]] = {}
+
+        # Data version bumps deferred by DATA_VERSION_BUMP_SECONDS
+        self._data_version_bumped_at: Dict[str, float] = {}
+        self._pending_data_versions = set()
+        self._data_version_lock = threading.Lock()
+        self._flush_registered = False
+
+        # Optional search_index.SearchIndexWriter fed with every stored item
+        self.search_index = None
+
+        # Aggregate counters (see STATS_DIMENSIONS). Off by default: keeping them
+        # exact replaces BatchWriteItem with one PutItem per item
+        self.maintain_stats = config.get('stats', {}).get('enabled', False)
+
+        # BatchGetItem settings
+        self.max_unprocessed_retries = config.get('batch_get', {}).get('max_retries', 5)
+        self.unprocessed_backoff_seconds = config.get('batch_get', {}).get('backoff_seconds', 0.05)
+        # The in-memory backend may run on a simulated clock, which backoff has to advance
+        if config.get('backend') == 'memory':
+            self._sleep, self._clock = self.dynamodb.clock.sleep, self.dynamodb.clock.time
+        else:
+            self._sleep, self._clock = time.sleep, time.monotonic
+
     def _ensure_table_exists(self):
         """Ensure DynamoDB table exists and is ready with optimized indexes"""
         try:
@@ -298,16 +420,24 @@ class DynamoHandler:
 
             self.logger.debug(f"Attempting to store item: {json.dumps(item, indent=2, cls=DecimalEncoder)}")
 
-            self.table.put_item(
+            response = self.table.put_item(
                 Item=item,
                 ConditionExpression='attribute_not_exists(id) OR (attribute_exists(update_date) AND update_date < :new_update_date)',
                 ExpressionAttributeValues={
                     ':new_update_date': item.get('update_date', '0')
-                }
+                },
+                ReturnValues='ALL_OLD'
             )
 
             # Mark item as processed
             self.processed_item_ids.add(item['id'])
+            self.bump_data_versions([item['type']])
+            if self.search_index is not None:
+                self.search_index.add_items([item])
+            if self.maintain_stats:
+                # The previous image tells a net-new item from an update
+                old_item = response.get('Attributes')
+                self.apply_stats_deltas(self._stats_deltas([item], {item['id']: old_item} if old_item else {}))
 
             duration = time.time() - start_time
             metrics.track_dynamo_operation(
@@ -348,6 +478,8 @@ class DynamoHandler:
         successful_items = 0
         failed_items = []
         duplicate_items = 0
+        stored_types = set()
+        stats_deltas: Dict[Tuple[str, ...], int] = {}
 
         # First, deduplicate the input list based on item ID
         deduplicated_items = []
@@ -380,9 +512,17 @@ class DynamoHandler:
             batch_items = deduplicated_items[i:i + batch_size]
             self.logger.info(f"Processing batch {batch_num}/{total_batches} with {len(batch_items)} items")
 
+            # Previous versions of overwritten items, so counters only count net-new items
+            existing: Dict[str, Dict[str, Any]] = {}
+            written = []
+
+            batch_types = {item.get('type', 'unknown') for item in batch_items}
+            write_tag = batch_types.pop() if len(batch_types) == 1 else 'mixed'
+
             start_time = time.time()
             try:
-                with self.table.batch_writer() as batch:
+                with tracer.span('batch_write', items=len(batch_items), item_type=write_tag) as write_span, \
+                        metrics.stage_tag('dynamo_write', write_tag), self._batch_writer() as batch:
                     for item in batch_items:
                         try:
                             # Add timestamp and TTL
@@ -397,14 +537,24 @@ class DynamoHandler:
                             self.logger.debug(f"Attempting to store item of type {item.get('type')} with ID: {item.get('id')}")
                             self.logger.debug(f"Item content: {json.dumps(item, indent=2, cls=DecimalEncoder)}")
 
-                            batch.put_item(Item=item)
+                            if self.maintain_stats:
+                                # The put returns the image it replaced atomically, so
+                                # concurrent writers cannot double count an item
+                                old_item = batch.put_item(Item=item, ReturnValues='ALL_OLD').get('Attributes')
+                                if old_item:
+                                    existing[item['id']] = old_item
+                            else:
+                                batch.put_item(Item=item)
                             successful_items += 1
+                            stored_types.add(item['type'])
+                            written.append(item)
                             # Mark as processed
                             self.processed_item_ids.add(item['id'])
                             self.logger.info(f"Successfully stored item with ID: {item.get('id')}")
 
                         except Exception as e:
                             self.logger.error(f"Failed to write item {item.get('id', 'unknown')}: {str(e)}")
+                            write_span.add('failed')
                             failed_items.append({
                                 'id': item.get('id', 'unknown'),
                                 'error': str(e),
@@ -418,6 +568,13 @@ class DynamoHandler:
                     success=True,
                     duration=duration
                 )
+                self._record_write_stage(written, duration)
+
+                if self.maintain_stats:
+                    for dimensions, delta in self._stats_deltas(written, existing).items():
+                        stats_deltas[dimensions] = stats_deltas.get(dimensions, 0) + delta
+                if self.search_index is not None:
+                    self.search_index.add_items(written)
 
             except ClientError as e:
                 duration = time.time() - start_time
@@ -438,6 +595,10 @@ class DynamoHandler:
                 } for item in batch_items])
 
         self.logger.info(f"Batch write completed: {successful_items} items successful, {len(failed_items)} failed, {duplicate_items} duplicates skipped")
+        if stored_types:
+            self.bump_data_versions(stored_types)
+        if stats_deltas:
+            self.apply_stats_deltas(stats_deltas)
         if failed_items:
             self.logger.warning("Failed items summary:")
             failed_by_type = {}
@@ -450,6 +611,191 @@ class DynamoHandler:
 
         return successful_items, failed_items
 
+    def _batch_writer(self):
+        """Writer for batch_store_items.
+
+        BatchWriteItem cannot return previous images, so while counters are
+        maintained items are written with single PutItem calls instead.
+        """
+        if self.maintain_stats:
+            return contextlib.nullcontext(self.table)
+        return self.table.batch_writer()
+
+    def _record_write_stage(self, written: List[Dict[str, Any]], duration: float) -> None:
+        """Attribute a batch's write time to the endpoints of its items, by item count"""
+        counts: Dict[str, int] = {}
+        for item in written:
+            counts[item['type']] = counts.get(item['type'], 0) + 1
+        for item_type, count in counts.items():
+            metrics.record_stage('dynamo_write', item_type, duration * count / len(written), count)
+
+    def bump_data_versions(self, item_types, force: bool = False) -> None:
+        """Increment the data version token of each type after new data is written.
+
+        API server caches compare these tokens to know when cached responses
+        for a type are stale. Each type is bumped at most once every
+        DATA_VERSION_BUMP_SECONDS unless force is set.
+        """
+        now = time.monotonic()
+        with self._data_version_lock:
+            self._pending_data_versions.update(item_types)
+            due = {item_type for item_type in self._pending_data_versions
+                   if force or now - self._data_version_bumped_at.get(item_type, float('-inf'))
+                   >= DATA_VERSION_BUMP_SECONDS}
+            self._pending_data_versions -= due
+            for item_type in due:
+                self._data_version_bumped_at[item_type] = now
+            if self._pending_data_versions and not self._flush_registered:
+                atexit.register(self.flush_data_versions)
+                self._flush_registered = True
+
+        for item_type in due:
+            try:
+                self.table.update_item(
+                    Key={'id': data_version_key(item_type)},
+                    UpdateExpression='SET #type = :meta_type, updated_at = :now ADD data_version :one',
+                    ExpressionAttributeNames={'#type': 'type'},
+                    ExpressionAttributeValues={
+                        ':meta_type': DATA_VERSION_TYPE,
+                        ':now': int(time.time()),
+                        ':one': 1
+                    }
+                )
+            except ClientError as e:
+                self.logger.warning(f"Failed to bump data version for type {item_type}: {str(e)}")
+
+    def flush_data_versions(self) -> None:
+        """Bump every type whose bump was deferred"""
+        if self._pending_data_versions:
+            self.bump_data_versions((), force=True)
+
+    @staticmethod
+    def _stats_deltas(written: List[Dict[str, Any]], existing: Dict[str, Dict[str, Any]]
+                      ) -> Dict[Tuple[str, ...], int]:
+        """Counter changes for written items given their previous versions.
+
+        New items add one; updated items only move between counters when
+        their dimensions changed (e.g. a new update month).
+        """
+        deltas: Dict[Tuple[str, ...], int] = {}
+        for item in written:
+            new_dimensions = stats_dimensions(item)
+            old_item = existing.get(item['id'])
+            if old_item is not None:
+                old_dimensions = stats_dimensions(old_item)
+                if old_dimensions == new_dimensions:
+                    continue
+                deltas[old_dimensions] = deltas.get(old_dimensions, 0) - 1
+            deltas[new_dimensions] = deltas.get(new_dimensions, 0) + 1
+        return deltas
+
+    def apply_stats_deltas(self, deltas: Dict[Tuple[str, ...], int]) -> None:
+        """Atomically add deltas to the aggregate counter items"""
+        for dimensions, delta in deltas.items():
+            if not delta:
+                continue
+            stats_key = '#'.join(dimensions)
+            try:
+                self.table.update_item(
+                    Key={'id': f"{STATS_TYPE}#{stats_key}"},
+                    UpdateExpression=('SET #type = :stats_type, update_date = :stats_key, '
+                                      'stat_type = :stat_type, stat_congress = :stat_congress, '
+                                      'stat_chamber = :stat_chamber, stat_month = :stat_month, '
+                                      'updated_at = :now ADD item_count :delta'),
+                    ExpressionAttributeNames={'#type': 'type'},
+                    ExpressionAttributeValues={
+                        ':stats_type': STATS_TYPE,
+                        ':stats_key': stats_key,
+                        ':stat_type': dimensions[0],
+                        ':stat_congress': dimensions[1],
+                        ':stat_chamber': dimensions[2],
+                        ':stat_month': dimensions[3],
+                        ':now': int(time.time()),
+                        ':delta': delta
+                    }
+                )
+            except ClientError as e:
+                self.logger.warning(f"Failed to update stats counter {stats_key}: {str(e)}")
+
+    def get_stats(self, item_type: Optional[str] = None, congress: Optional[str] = None,
+                  chamber: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read aggregate counters, narrowed by a key prefix where possible.
+
+        Returns one row per counter with its dimensions and count.
+        """
+        filters = {'type': item_type, 'congress': congress, 'chamber': chamber}
+
+        # The longest leading run of given dimensions becomes a begins_with prefix
+        prefix_parts = []
+        for dimension in ('type', 'congress', 'chamber'):
+            if filters[dimension] is None:
+                break
+            prefix_parts.append(str(filters[dimension]))
+
+        params = {
+            'IndexName': 'type-update_date-index',
+            'KeyConditionExpression': '#type = :stats_type',
+            'ExpressionAttributeNames': {'#type': 'type'},
+            'ExpressionAttributeValues': {':stats_type': STATS_TYPE}
+        }
+        if prefix_parts:
+            params['KeyConditionExpression'] += ' AND begins_with(update_date, :prefix)'
+            params['ExpressionAttributeValues'][':prefix'] = '#'.join(prefix_parts) + '#'
+
+        rows = []
+        for item in self._iter_pages('Query', params):
+            row = {
+                'type': item.get('stat_type'),
+                'congress': item.get('stat_congress'),
+                'chamber': item.get('stat_chamber'),
+                'month': item.get('stat_month'),
+                'count': int(item.get('item_count', 0))
+            }
+            if all(value is None or row[dimension] == str(value) for dimension, value in filters.items()):
+                rows.append(row)
+        return rows
+
+    def rebuild_stats(self) -> int:
+        """Recompute every counter from a full table scan, e.g. for data written before counters existed.
+
+        Returns the number of counters written.
+        """
+        counts: Dict[Tuple[str, ...], int] = {}
+        for item in self.iter_all_items():
+            dimensions = stats_dimensions(item)
+            counts[dimensions] = counts.get(dimensions, 0) + 1
+
+        # Counters with no remaining items are reset to zero rather than left stale
+        for row in self.get_stats():
+            dimensions = tuple(row[dimension] for dimension in STATS_DIMENSIONS)
+            counts.setdefault(dimensions, 0)
+
+        with self.table.batch_writer() as batch:
+            for dimensions, count in counts.items():
+                stats_key = '#'.join(dimensions)
+                batch.put_item(Item={
+                    'id': f"{STATS_TYPE}#{stats_key}",
+                    'type': STATS_TYPE,
+                    'update_date': stats_key,
+                    'stat_type': dimensions[0],
+                    'stat_congress': dimensions[1],
+                    'stat_chamber': dimensions[2],
+                    'stat_month': dimensions[3],
+                    'item_count': count,
+                    'updated_at': int(time.time())
+                })
+
+        self.logger.info(f"Rebuilt {len(counts)} stats counters")
+        return len(counts)
+
+    def get_data_version(self, item_type: str) -> int:
+        """Read the current data version token of a type (0 if never written)"""
+        response = self.table.get_item(
+            Key={'id': data_version_key(item_type)},
+            ProjectionExpression='data_version'
+        )
+        return int(response.get('Item', {}).get('data_version', 0))
+
     def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a single item from DynamoDB"""
         try:
@@ -462,19 +808,196 @@ class DynamoHandler:
             self.logger.error(f"DynamoDB get operation failed for item {item_id}: {str(e)}")
             raise Exception(f"DynamoDB get operation failed: {str(e)}")
 
+    def _batch_get_chunk(self, item_ids: List[str], projection: Optional[Dict[str, Any]] = None
+                         ) -> List[Dict[str, Any]]:
+        """Fetch up to 100 keys with BatchGetItem, retrying UnprocessedKeys with backoff.
+
+        projection optionally holds ProjectionExpression/ExpressionAttributeNames.
+        """
+        request = {self.table_name: {'Keys': [{'id': item_id} for item_id in item_ids], **(projection or {})}}
+        items = []
+
+        for attempt in range(self.max_unprocessed_retries + 1):
+            start_time = time.time()
+            try:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+            except ClientError as e:
+                metrics.track_dynamo_operation('BatchGetItem', self.table_name, False, time.time() - start_time)
+                self.logger.error(f"DynamoDB batch get failed: {str(e)}")
+                raise Exception(f"DynamoDB batch get failed: {str(e)}")
+            metrics.track_dynamo_operation('BatchGetItem', self.table_name, True, time.time() - start_time)
+
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                return items
+
+            # Exponential backoff with jitter before retrying throttled keys
+            delay = self.unprocessed_backoff_seconds * (2 ** attempt)
+            self._sleep(delay / 2 + random.uniform(0, delay / 2))
+
+        remaining = len(request.get(self.table_name, {}).get('Keys', []))
+        raise Exception(f"DynamoDB batch get left {remaining} keys unprocessed after "
+                        f"{self.max_unprocessed_retries} retries")
+
+    def get_items(self, item_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Retrieve many items by ID with parallel 100-key BatchGetItem calls.
+
+        Returns one entry per requested ID in input order, None where the
+        item does not exist.
+        """
+        found = {
+            item['id']: item
+            for item in self._batch_get(item_ids)
+            if not is_internal_item(item)
+        }
+        return [found.get(item_id) for item_id in item_ids]
+
+    def _batch_get(self, item_ids: List[str], projection: Optional[Dict[str, Any]] = None
+                   ) -> List[Dict[str, Any]]:
+        """Fetch the existing items among item_ids in parallel 100-key chunks (unordered)"""
+        unique_ids = list(dict.fromkeys(item_ids))
+        if not unique_ids:
+            return []
+        chunks = [unique_ids[i:i + 100] for i in range(0, len(unique_ids), 100)]
+
+        if len(chunks) == 1:
+            results = [self._batch_get_chunk(chunks[0], projection)]
+        else:
+            workers = min(len(chunks), self.max_parallel_reads)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda chunk: self._batch_get_chunk(chunk, projection), chunks))
+
+        items = [item for chunk_items in results for item in chunk_items]
+        self.logger.debug(f"Batch get returned {len(items)}/{len(unique_ids)} items in {len(chunks)} requests")
+        return items
+
+    def _iter_pages(self, operation: str, params: Dict[str, Any],
+                    pacer: Optional[ReadPacer] = None) -> Iterator[Dict[str, Any]]:
+        """Yield items from every page of a query or scan, one page in memory at a time.
+
+        With a pacer, each page waits for read budget and is charged the
+        capacity it consumed.
+        """
+        read = self.table.query if operation == 'Query' else self.table.scan
+        params = dict(params)
+        if pacer is not None:
+            params['ReturnConsumedCapacity'] = 'TOTAL'
+        while True:
+            if pacer is not None:
+                pacer.wait()
+            start_time = time.time()
+            try:
+                response = read(**params)
+            except ClientError:
+                metrics.track_dynamo_operation(operation, self.table_name, False, time.time() - start_time)
+                raise
+            metrics.track_dynamo_operation(operation, self.table_name, True, time.time() - start_time)
+            if pacer is not None:
+                pacer.charge(response.get('ConsumedCapacity', {}).get('CapacityUnits', 0))
+
+            yield from response.get('Items', [])
+
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            params['ExclusiveStartKey'] = last_key
+
+    def iter_by_type(self, item_type: str) -> Iterator[Dict[str, Any]]:
+        """Yield all items of a type, following scan pagination"""
+        return self._iter_pages('Scan', {
+            'FilterExpression': '#type = :type',
+            'ExpressionAttributeNames': {
+                '#type': 'type'
+            },
+            'ExpressionAttributeValues': {
+                ':type': item_type
+            }
+        })
+
+    def iter_by_type_from_index(self, item_type: str) -> Iterator[Dict[str, Any]]:
+        """Yield all items of a type from type-update_date-index in update_date order.
+
+        Reads are paced like date range queries. Falls back to iter_by_type
+        (a filtered scan) when the index is unavailable.
+        """
+        pages = self._iter_pages('Query', {
+            'IndexName': 'type-update_date-index',
+            'KeyConditionExpression': '#type = :type',
+            'ExpressionAttributeNames': {
+                '#type': 'type'
+            },
+            'ExpressionAttributeValues': {
+                ':type': item_type
+            }
+        }, self._get_read_pacer('type-update_date-index'))
+
+        try:
+            first_item = next(pages, None)
+        except ClientError as e:
+            if 'ValidationException' in str(e) and 'index' in str(e):
+                self.logger.warning(f"Index not available, falling back to scan operation for type {item_type}")
+                yield from self.iter_by_type(item_type)
+                return
+            raise
+        if first_item is None:
+            return
+        yield first_item
+        yield from pages
+
+    def iter_by_congress_and_type(self, congress: int, item_type: str) -> Iterator[Dict[str, Any]]:
+        """Yield all items for a congress and type from congress-type-index"""
+        return self._iter_pages('Query', {
+            'IndexName': 'congress-type-index',
+            'KeyConditionExpression': 'congress = :congress AND #type = :type',
+            'ExpressionAttributeNames': {
+                '#type': 'type'
+            },
+            'ExpressionAttributeValues': {
+                ':congress': congress,
+                ':type': item_type
+            }
+        })
+
+    def iter_all_items(self) -> Iterator[Dict[str, Any]]:
+        """Yield every data item in the table with a paginated scan"""
+        return (item for item in self._iter_pages('Scan', {}) if not is_internal_item(item))
+
+    def iter_scan_segment_pages(self, segment: int, total_segments: int,
+                                exclusive_start_key: Optional[Dict[str, Any]] = None
+                                ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Yield (items, last_evaluated_key) for each page of one parallel scan segment.
+
+        The key is None on the final page. Passing a previously returned key
+        as exclusive_start_key resumes the segment after that page.
+        """
+        scan_params = {
+            'Segment': segment,
+            'TotalSegments': total_segments
+        }
+        if exclusive_start_key:
+            scan_params['ExclusiveStartKey'] = exclusive_start_key
+
+        while True:
+            start_time = time.time()
+            try:
+                response = self.table.scan(**scan_params)
+            except ClientError:
+                metrics.track_dynamo_operation('Scan', self.table_name, False, time.time() - start_time)
+                raise
+            metrics.track_dynamo_operation('Scan', self.table_name, True, time.time() - start_time)
+
+            last_key = response.get('LastEvaluatedKey')
+            items = [item for item in response.get('Items', []) if not is_internal_item(item)]
+            yield items, last_key
+            if not last_key:
+                return
+            scan_params['ExclusiveStartKey'] = last_key
+
     def scan_by_type(self, item_type: str) -> List[Dict[str, Any]]:
         """Scan items by type attribute"""
         try:
-            response = self.table.scan(
-                FilterExpression='#type = :type',
-                ExpressionAttributeNames={
-                    '#type': 'type'
-                },
-                ExpressionAttributeValues={
-                    ':type': item_type
-                }
-            )
-            items = response.get('Items', [])
+            items = list(self.iter_by_type(item_type))
             self.logger.info(f"Retrieved {len(items)} items of type {item_type}")
             return items
 
@@ -485,18 +1008,7 @@ class DynamoHandler:
     def query_by_congress_and_type(self, congress: int, item_type: str) -> List[Dict[str, Any]]:
         """Query items by congress and type using congress-type-index"""
         try:
-            response = self.table.query(
-                IndexName='congress-type-index',
-                KeyConditionExpression='congress = :congress AND #type = :type',
-                ExpressionAttributeNames={
-                    '#type': 'type'
-                },
-                ExpressionAttributeValues={
-                    ':congress': congress,
-                    ':type': item_type
-                }
-            )
-            items = response.get('Items', [])
+            items = list(self.iter_by_congress_and_type(congress, item_type))
             self.logger.info(f"Retrieved {len(items)} items for congress {congress} and type {item_type}")
             return items
 
@@ -547,50 +1059,156 @@ class DynamoHandler:
             self.logger.error(f"DynamoDB query operation failed: {str(e)}")
             raise Exception(f"DynamoDB query operation failed: {str(e)}")
 
-    def query_by_type_and_date_range(self, item_type: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-        """Query items by type and date range using GSI or fallback to scan"""
+    def _get_index_read_capacity(self, index_name: str) -> Optional[int]:
+        """Get provisioned read capacity of an index, or None for on-demand tables"""
+        if index_name in self._index_read_capacity:
+            return self._index_read_capacity[index_name]
+
+        capacity = None
         try:
-            # First try using the GSI if it exists
-            try:
-                response = self.table.query(
-                    IndexName='type-update_date-index',
-                    KeyConditionExpression='#type = :type AND #update_date BETWEEN :start_date AND :end_date',
-                    ExpressionAttributeNames={
-                        '#type': 'type',
-                        '#update_date': 'update_date'
-                    },
-                    ExpressionAttributeValues={
-                        ':type': item_type,
-                        ':start_date': start_date,
-                        ':end_date': end_date
-                    }
-                )
-                items = response.get('Items', [])
-                self.logger.info(f"Retrieved {len(items)} items of type {item_type} between {start_date} and {end_date} using GSI")
-                return items
+            table_desc = self.dynamodb.meta.client.describe_table(TableName=self.table_name)['Table']
+            billing_mode = table_desc.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED')
+            if billing_mode != 'PAY_PER_REQUEST':
+                for index in table_desc.get('GlobalSecondaryIndexes', []):
+                    if index['IndexName'] == index_name:
+                        capacity = index.get('ProvisionedThroughput', {}).get('ReadCapacityUnits')
+                        break
+        except ClientError as e:
+            self.logger.warning(f"Unable to read capacity for index {index_name}: {str(e)}")
 
-            except ClientError as e:
-                if 'ValidationException' in str(e) and 'index' in str(e):
-                    # Index doesn't exist, fall back to scan with filter
-                    self.logger.warning(f"Index not available, falling back to scan operation for type {item_type}")
-                    response = self.table.scan(
-                        FilterExpression='#type = :type AND #update_date BETWEEN :start_date AND :end_date',
-                        ExpressionAttributeNames={
-                            '#type': 'type',
-                            '#update_date': 'update_date'
-                        },
-                        ExpressionAttributeValues={
-                            ':type': item_type,
-                            ':start_date': start_date,
-                            ':end_date': end_date
-                        }
-                    )
-                    items = response.get('Items', [])
-                    self.logger.info(f"Retrieved {len(items)} items of type {item_type} between {start_date} and {end_date} using scan")
-                    return items
-                else:
+        self._index_read_capacity[index_name] = capacity
+        return capacity
+
+    def _get_read_pacer(self, index_name: str) -> Optional[ReadPacer]:
+        """Pacer holding reads of an index to `read_capacity_share` of its provisioned RCU.
+
+        The rest is left for the API server. On-demand tables are not paced.
+        """
+        if index_name not in self._read_pacers:
+            capacity = self._get_index_read_capacity(index_name)
+            self._read_pacers[index_name] = (
+                ReadPacer(capacity * self.read_capacity_share, self._sleep, self._clock)
+                if capacity else None
+            )
+        return self._read_pacers[index_name]
+
+    def _split_date_range(self, start_date: str, end_date: str) -> List[Tuple[str, str, bool]]:
+        """Split a date range into calendar-month sub-ranges.
+
+        Returns (start, end, end_inclusive) tuples. Every sub-range but the last
+        ends at the next one's start and excludes it, so no item is returned twice.
+        """
+        try:
+            start = datetime.strptime(start_date[:10], '%Y-%m-%d')
+            end = datetime.strptime(end_date[:10], '%Y-%m-%d')
+        except ValueError:
+            return [(start_date, end_date, True)]
+
+        if (end - start).days <= self.split_threshold_days:
+            return [(start_date, end_date, True)]
+
+        boundaries = [start_date]
+        year, month = start.year, start.month
+        while True:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            boundary = datetime(year, month, 1)
+            if boundary > end:
+                break
+            boundaries.append(boundary.strftime('%Y-%m-%d'))
+
+        sub_ranges = [(boundaries[i], boundaries[i + 1], False) for i in range(len(boundaries) - 1)]
+        sub_ranges.append((boundaries[-1], end_date, True))
+        return sub_ranges
+
+    def _query_type_sub_range(self, item_type: str, start_date: str, end_date: str,
+                              end_inclusive: bool, pacer: Optional[ReadPacer] = None) -> List[Dict[str, Any]]:
+        """Read every page of one sub-range from type-update_date-index"""
+        query_params = {
+            'IndexName': 'type-update_date-index',
+            'KeyConditionExpression': '#type = :type AND #update_date BETWEEN :start_date AND :end_date',
+            'ExpressionAttributeNames': {
+                '#type': 'type',
+                '#update_date': 'update_date'
+            },
+            'ExpressionAttributeValues': {
+                ':type': item_type,
+                ':start_date': start_date,
+                ':end_date': end_date
+            }
+        }
+
+        return [
+            item for item in self._iter_pages('Query', query_params, pacer)
+            if end_inclusive or item.get('update_date') != end_date
+        ]
+
+    def _scan_type_and_date_range(self, item_type: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Scan with filter when type-update_date-index is unavailable"""
+        scan_params = {
+            'FilterExpression': '#type = :type AND #update_date BETWEEN :start_date AND :end_date',
+            'ExpressionAttributeNames': {
+                '#type': 'type',
+                '#update_date': 'update_date'
+            },
+            'ExpressionAttributeValues': {
+                ':type': item_type,
+                ':start_date': start_date,
+                ':end_date': end_date
+            }
+        }
+
+        items = list(self._iter_pages('Scan', scan_params))
+        items.sort(key=lambda item: item.get('update_date', ''))
+        return items
+
+    def iter_by_type_and_date_range(self, item_type: str, start_date: str, end_date: str) -> Iterator[Dict[str, Any]]:
+        """Yield items by type and date range in update_date order.
+
+        Large ranges are split into month sub-ranges which are queried
+        concurrently (at most `max_workers` threads, sharing one read capacity
+        pacer); results are yielded sub-range by sub-range, so they stay
+        sorted while later months are still being read.
+        """
+        sub_ranges = self._split_date_range(start_date, end_date)
+        workers = max(1, min(len(sub_ranges), self.max_parallel_reads))
+        pacer = self._get_read_pacer('type-update_date-index')
+        self.logger.info(f"Querying {item_type} between {start_date} and {end_date} "
+                         f"in {len(sub_ranges)} sub-ranges with {workers} concurrent readers")
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            remaining = iter(sub_ranges)
+            pending = deque()
+            for sub_range in remaining:
+                pending.append(executor.submit(self._query_type_sub_range, item_type, *sub_range, pacer))
+                if len(pending) >= workers:
+                    break
+
+            while pending:
+                try:
+                    items = pending.popleft().result()
+                except ClientError as e:
+                    if 'ValidationException' in str(e) and 'index' in str(e):
+                        # Index doesn't exist, fall back to scan with filter
+                        self.logger.warning(f"Index not available, falling back to scan operation for type {item_type}")
+                        yield from self._scan_type_and_date_range(item_type, start_date, end_date)
+                        return
                     raise
 
+                next_range = next(remaining, None)
+                if next_range:
+                    pending.append(executor.submit(self._query_type_sub_range, item_type, *next_range, pacer))
+                yield from items
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def query_by_type_and_date_range(self, item_type: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Query items by type and date range using GSI or fallback to scan"""
+        try:
+            items = list(self.iter_by_type_and_date_range(item_type, start_date, end_date))
+            self.logger.info(f"Retrieved {len(items)} items of type {item_type} between {start_date} and {end_date}")
+            return items
+
         except ClientError as e:
             self.logger.error(f"DynamoDB operation failed: {str(e)}")
-            raise Exception(f"DynamoDB operation failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"DynamoDB operation failed: {str(e)}")
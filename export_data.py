@@ -6,18 +6,22 @@ This tool provides quick access to downloaded data for external analysis.
 """
 
 import os
+import io
 import sys
 import json
 import csv
+import gzip
+import hashlib
+import concurrent.futures
 import argparse
 import logging
+from collections import OrderedDict
 from datetime import datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional
 import boto3
 from botocore.exceptions import ClientError
 from dynamo_handler import DynamoHandler, DecimalEncoder
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('export_data')
 
 def load_config():
@@ -32,96 +36,473 @@ def load_config():
         logger.error("Error: Invalid JSON in config.json")
         return None
 
-def export_to_json(data, output_file):
-    """Export data to a JSON file"""
-    try:
-        # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(data, f, cls=DecimalEncoder, indent=2)
-        
-        logger.info(f"Successfully exported {len(data)} records to {output_file}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to export to JSON: {str(e)}")
-        return False
+# CSV columns per data type. Dotted paths flatten nested objects into their
+# own columns (latest_action.text -> latest_action_text). Fields not listed
+# are kept as JSON in the trailing "extra" column so no data is lost.
+BASE_EXPORT_FIELDS = ['id', 'type', 'congress', 'update_date']
 
-def export_to_csv(data, output_file):
-    """Export data to a CSV file"""
-    try:
-        # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        
-        if not data:
-            logger.warning("No data to export to CSV")
-            return False
-        
-        # Get all possible field names from all records
-        fieldnames = set()
-        for item in data:
-            fieldnames.update(item.keys())
-        
-        # Prioritize and order important fields first
-        priority_fields = ['id', 'type', 'congress', 'update_date', 'title', 'number', 'chamber']
-        ordered_fields = []
-        
-        # Add priority fields first (if they exist in the data)
-        for field in priority_fields:
-            if field in fieldnames:
-                ordered_fields.append(field)
-                fieldnames.remove(field)
-        
-        # Add remaining fields in alphabetical order
-        ordered_fields.extend(sorted(fieldnames))
-        
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=ordered_fields)
-            writer.writeheader()
-            
-            # Convert complex nested objects to strings for CSV compatibility
-            for item in data:
-                row = {}
-                for key, value in item.items():
-                    if isinstance(value, (dict, list)):
-                        row[key] = json.dumps(value, cls=DecimalEncoder)
-                    else:
-                        row[key] = value
-                writer.writerow(row)
-        
-        logger.info(f"Successfully exported {len(data)} records to {output_file}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to export to CSV: {str(e)}")
-        return False
+EXPORT_SCHEMAS = {
+    'bill': BASE_EXPORT_FIELDS + [
+        'bill_type', 'bill_number', 'title', 'origin_chamber',
+        'latest_action.text', 'latest_action.action_date'
+    ],
+    'amendment': BASE_EXPORT_FIELDS + [
+        'amendment_number', 'amendment_type', 'title', 'description', 'purpose',
+        'latest_action.text', 'latest_action.action_date'
+    ],
+    'committee': BASE_EXPORT_FIELDS + [
+        'name', 'chamber', 'committee_type', 'system_code',
+        'parent_committee.name', 'parent_committee.system_code', 'parent_committee.url',
+        'subcommittees'
+    ],
+    'hearing': BASE_EXPORT_FIELDS + [
+        'chamber', 'date', 'time', 'location', 'title',
+        'committee.name', 'committee.system_code', 'committee.url'
+    ],
+    'nomination': BASE_EXPORT_FIELDS + [
+        'number', 'received_date', 'description', 'organization',
+        'nomination_type.is_civilian', 'latest_action.text', 'latest_action.action_date'
+    ],
+    'treaty': BASE_EXPORT_FIELDS + [
+        'treaty_number', 'description', 'country', 'subject', 'received_date',
+        'latest_action.text', 'latest_action.action_date'
+    ],
+}
 
-def get_data_from_dynamodb(config, data_type=None, congress=None, start_date=None, end_date=None):
-    """Get data from DynamoDB with optional filtering"""
-    try:
-        db_handler = DynamoHandler(config)
-        
-        if data_type and congress:
-            logger.info(f"Querying data by congress {congress} and type {data_type}")
-            return db_handler.query_by_congress_and_type(congress, data_type)
-        elif data_type and start_date and end_date:
-            logger.info(f"Querying {data_type} data from {start_date} to {end_date}")
-            return db_handler.query_by_type_and_date_range(data_type, start_date, end_date)
-        elif data_type:
-            logger.info(f"Scanning data by type {data_type}")
-            return db_handler.scan_by_type(data_type)
+DEFAULT_EXPORT_SCHEMA = BASE_EXPORT_FIELDS + ['title', 'number', 'chamber']
+
+def get_csv_columns(data_type: Optional[str] = None) -> List[str]:
+    """Get the CSV column paths for a data type"""
+    return EXPORT_SCHEMAS.get(data_type, DEFAULT_EXPORT_SCHEMA)
+
+def get_csv_header(columns: List[str]) -> List[str]:
+    """Column headers for the given paths, plus the overflow column"""
+    return [column.replace('.', '_') for column in columns] + ['extra']
+
+def flatten_item(item: Dict[str, Any], columns: List[str]) -> List[Any]:
+    """Flatten an item into a CSV row following the given column paths"""
+    row = []
+    for column in columns:
+        value = item
+        for part in column.split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+            if value is None:
+                break
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, cls=DecimalEncoder)
+        row.append('' if value is None else value)
+
+    # Anything outside the schema goes into the "extra" column as JSON
+    roots = {column.split('.')[0] for column in columns}
+    extra = {key: value for key, value in item.items() if key not in roots}
+    row.append(json.dumps(extra, cls=DecimalEncoder, sort_keys=True) if extra else '')
+    return row
+
+def iter_ndjson_lines(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode items as newline-delimited JSON, one line at a time"""
+    for item in items:
+        yield json.dumps(item, cls=DecimalEncoder) + '\n'
+
+def iter_json_array_chunks(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode items as a JSON array without building the list in memory"""
+    yield '['
+    first = True
+    for item in items:
+        yield ('\n' if first else ',\n') + json.dumps(item, cls=DecimalEncoder)
+        first = False
+    yield '\n]\n'
+
+def iter_csv_lines(items: Iterable[Dict[str, Any]], data_type: Optional[str] = None) -> Iterator[str]:
+    """Encode items as CSV rows using the per-type schema, one line at a time"""
+    columns = get_csv_columns(data_type)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(get_csv_header(columns))
+    for item in items:
+        writer.writerow(flatten_item(item, columns))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_export_chunks(items: Iterable[Dict[str, Any]], export_format: str,
+                       data_type: Optional[str] = None) -> Iterator[str]:
+    """Encode items in the requested export format"""
+    if export_format == 'ndjson':
+        return iter_ndjson_lines(items)
+    if export_format == 'csv':
+        return iter_csv_lines(items, data_type)
+    if export_format == 'json':
+        return iter_json_array_chunks(items)
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+class _CountingIterator:
+    """Wrap an iterator and count the items it has produced"""
+    def __init__(self, items: Iterable[Dict[str, Any]]):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        self.count += 1
+        return item
+
+def stream_export(items: Iterable[Dict[str, Any]], output_file: str, export_format: str,
+                  data_type: Optional[str] = None) -> int:
+    """Write items to a file as they are read, in constant memory.
+
+    Returns the number of records written.
+    """
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    counter = _CountingIterator(items)
+    with open(output_file, 'w', newline='') as f:
+        for chunk in iter_export_chunks(counter, export_format, data_type):
+            f.write(chunk)
+
+    logger.info(f"Streamed {counter.count} records to {output_file}")
+    return counter.count
+
+class _HashingWriter:
+    """File wrapper that hashes and counts the bytes written through it"""
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'wb')
+        self.sha256 = hashlib.sha256()
+        self.bytes_written = 0
+
+    def reopen(self) -> None:
+        """Continue appending after close(), keeping the running hash and count"""
+        self._file = open(self.path, 'ab')
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.bytes_written += len(data)
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+class _PartWriter:
+    """A single gzip-compressed NDJSON part file.
+
+    suspend() releases the file handle; the next write reopens the file in
+    append mode and starts a new gzip member, which gzip readers treat as a
+    continuation of the same stream.
+    """
+    def __init__(self, path: str, relative_path: str, partition: Dict[str, str]):
+        self.relative_path = relative_path
+        self.partition = partition
+        self._raw = _HashingWriter(path)
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode='wb', mtime=0)
+        self.is_open = True
+        self.rows = 0
+        self.uncompressed_bytes = 0
+        self.min_update_date = None
+        self.max_update_date = None
+
+    def suspend(self) -> None:
+        """Finish the current gzip member and close the file"""
+        self._gzip.close()
+        self._raw.close()
+        self.is_open = False
+
+    def resume(self) -> None:
+        self._raw.reopen()
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode='wb', mtime=0)
+        self.is_open = True
+
+    def write(self, item: Dict[str, Any]) -> None:
+        line = (json.dumps(item, cls=DecimalEncoder) + '\n').encode('utf-8')
+        self._gzip.write(line)
+        self.rows += 1
+        self.uncompressed_bytes += len(line)
+
+        update_date = item.get('update_date')
+        if update_date:
+            if self.min_update_date is None or update_date < self.min_update_date:
+                self.min_update_date = update_date
+            if self.max_update_date is None or update_date > self.max_update_date:
+                self.max_update_date = update_date
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the part and return its manifest entry"""
+        if self.is_open:
+            self.suspend()
+        return {
+            **self.partition,
+            'path': self.relative_path,
+            'rows': self.rows,
+            'bytes': self._raw.bytes_written,
+            'uncompressed_bytes': self.uncompressed_bytes,
+            'min_update_date': self.min_update_date,
+            'max_update_date': self.max_update_date,
+            'sha256': self._raw.sha256.hexdigest()
+        }
+
+class PartitionedExporter:
+    """Write items into a dataset directory partitioned by type and congress.
+
+    Layout: <output_dir>/<type>/<congress>/part-00000.ndjson.gz, plus a
+    manifest.json listing row counts, update_date ranges and checksums for
+    every part. Parts roll over once they reach max_part_bytes of
+    uncompressed data. At most max_open_parts files are open at once; the
+    least recently used one is suspended and reopened for append when its
+    partition gets another row, so input order never adds parts.
+    """
+    MANIFEST_NAME = 'manifest.json'
+
+    def __init__(self, output_dir: str, max_part_bytes: int = 64 * 1024 * 1024, max_open_parts: int = 32):
+        self.output_dir = output_dir
+        self.max_part_bytes = max_part_bytes
+        self.max_open_parts = max_open_parts
+        # Current part of every partition; the open ones in LRU order
+        self._current_parts: Dict[tuple, _PartWriter] = {}
+        self._open_parts: "OrderedDict[tuple, _PartWriter]" = OrderedDict()
+        self._part_numbers: Dict[tuple, int] = {}
+        self.parts: List[Dict[str, Any]] = []
+        self.total_rows = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    @staticmethod
+    def _partition_key(item: Dict[str, Any]) -> tuple:
+        item_type = str(item.get('type') or 'unknown').replace('/', '_')
+        congress = item.get('congress')
+        try:
+            congress = str(int(congress))
+        except (TypeError, ValueError):
+            congress = 'unknown'
+        return item_type, congress
+
+    def _make_room(self) -> None:
+        # Suspend the least recently used part to bound open file handles
+        if len(self._open_parts) >= self.max_open_parts:
+            _, oldest = self._open_parts.popitem(last=False)
+            oldest.suspend()
+
+    def _open_part(self, key: tuple) -> _PartWriter:
+        self._make_room()
+        part_number = self._part_numbers.get(key, 0)
+        self._part_numbers[key] = part_number + 1
+
+        item_type, congress = key
+        relative_path = f"{item_type}/{congress}/part-{part_number:05d}.ndjson.gz"
+        os.makedirs(os.path.join(self.output_dir, item_type, congress), exist_ok=True)
+        part = _PartWriter(os.path.join(self.output_dir, relative_path), relative_path,
+                           {'type': item_type, 'congress': congress})
+        self._open_parts[key] = part
+        self._current_parts[key] = part
+        return part
+
+    def write(self, item: Dict[str, Any]) -> None:
+        """Append an item to its partition's current part"""
+        key = self._partition_key(item)
+        part = self._current_parts.get(key)
+        if part is None:
+            part = self._open_part(key)
+        elif part.is_open:
+            self._open_parts.move_to_end(key)
         else:
-            logger.warning("No specific query parameters provided, using broader scan (this may be slow)")
-            # This would be a full table scan - potentially expensive and slow
-            # Get all items with a scan (careful, this could be slow and expensive)
-            try:
-                scan_result = db_handler.table.scan(Limit=1000)  # Limit to 1000 items for safety
-                return scan_result.get('Items', [])
-            except Exception as scan_error:
-                logger.error(f"Full scan failed: {str(scan_error)}")
-                return []
-    except Exception as e:
-        logger.error(f"Failed to query DynamoDB: {str(e)}")
-        return []
+            self._make_room()
+            part.resume()
+            self._open_parts[key] = part
+
+        part.write(item)
+        self.total_rows += 1
+
+        if part.uncompressed_bytes >= self.max_part_bytes:
+            self._open_parts.pop(key)
+            self.parts.append(self._current_parts.pop(key).close())
+
+    def close(self) -> Dict[str, Any]:
+        """Finish all parts and write the manifest"""
+        self._open_parts.clear()
+        for part in self._current_parts.values():
+            self.parts.append(part.close())
+        self._current_parts.clear()
+
+        self.parts.sort(key=lambda part: part['path'])
+        manifest = {
+            'created_at': datetime.now().isoformat(),
+            'format': 'ndjson.gz',
+            'partitioning': ['type', 'congress'],
+            'total_rows': self.total_rows,
+            'parts': self.parts
+        }
+
+        # Write atomically so readers never see a partial manifest
+        manifest_path = os.path.join(self.output_dir, self.MANIFEST_NAME)
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        return manifest
+
+def export_partitioned(items: Iterable[Dict[str, Any]], output_dir: str,
+                       max_part_bytes: int = 64 * 1024 * 1024) -> Dict[str, Any]:
+    """Export items as a partitioned, compressed dataset with a manifest"""
+    exporter = PartitionedExporter(output_dir, max_part_bytes=max_part_bytes)
+    for item in items:
+        exporter.write(item)
+    manifest = exporter.close()
+    logger.info(f"Exported {manifest['total_rows']} records in {len(manifest['parts'])} parts to {output_dir}")
+    return manifest
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Write a JSON file via a temporary file so readers never see it half-written"""
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f, cls=DecimalEncoder, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+
+def _file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def _export_scan_segment(config: Dict[str, Any], segment: int, total_segments: int,
+                         output_dir: str) -> Dict[str, Any]:
+    """Export one parallel scan segment to its own part file (runs in a worker process).
+
+    Each page is appended as a separate gzip member, then the checkpoint is
+    updated with the page's LastEvaluatedKey and the file size. On restart
+    the part file is truncated back to the checkpointed size and the scan
+    resumes from the checkpointed key, so no row is lost or duplicated.
+    """
+    part_name = f"segment-{segment:04d}.ndjson.gz"
+    part_path = os.path.join(output_dir, part_name)
+    checkpoint_path = os.path.join(output_dir, f"segment-{segment:04d}.checkpoint.json")
+
+    checkpoint = {'segment': segment, 'last_key': None, 'rows': 0, 'bytes': 0, 'done': False}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint['done']:
+            logger.info(f"Segment {segment} already complete ({checkpoint['rows']} rows), skipping")
+            return checkpoint
+        logger.info(f"Resuming segment {segment} after {checkpoint['rows']} rows")
+
+    db_handler = DynamoHandler(config)
+    pages = db_handler.iter_scan_segment_pages(segment, total_segments, checkpoint['last_key'])
+
+    with open(part_path, 'ab') as f:
+        # Drop anything written after the last checkpoint
+        f.truncate(checkpoint['bytes'])
+        f.seek(checkpoint['bytes'])
+
+        for items, last_key in pages:
+            if items:
+                payload = ''.join(iter_ndjson_lines(items)).encode('utf-8')
+                f.write(gzip.compress(payload, mtime=0))
+                f.flush()
+                os.fsync(f.fileno())
+
+            checkpoint.update({
+                'last_key': last_key,
+                'rows': checkpoint['rows'] + len(items),
+                'bytes': f.tell(),
+                'done': last_key is None
+            })
+            _write_json_atomic(checkpoint_path, checkpoint)
+
+    logger.info(f"Segment {segment}/{total_segments} complete: {checkpoint['rows']} rows")
+    return checkpoint
+
+def export_full_table(config: Dict[str, Any], output_dir: str, total_segments: Optional[int] = None,
+                      workers: Optional[int] = None) -> Dict[str, Any]:
+    """Export the whole table with a parallel scan, one worker process per segment.
+
+    Re-running with the same output_dir resumes an interrupted export from
+    the per-segment checkpoints. total_segments defaults to 4 for a new
+    export and to the export's own count when resuming; a resume with a
+    different count raises ValueError.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Pin the segment count so a resumed export scans the same segments
+    export_info_path = os.path.join(output_dir, 'export.json')
+    if os.path.exists(export_info_path):
+        with open(export_info_path) as f:
+            pinned_segments = json.load(f)['total_segments']
+        if total_segments is not None and total_segments != pinned_segments:
+            raise ValueError(f"{output_dir} was started with {pinned_segments} segments and cannot be "
+                             f"resumed with {total_segments}; omit --segments to resume it")
+        total_segments = pinned_segments
+        logger.info(f"Resuming full-table export in {output_dir} with {total_segments} segments")
+    else:
+        total_segments = total_segments or 4
+        _write_json_atomic(export_info_path, {
+            'total_segments': total_segments,
+            'started_at': datetime.now().isoformat()
+        })
+
+    workers = workers or total_segments
+    logger.info(f"Exporting full table with {total_segments} scan segments across {workers} worker processes")
+
+    checkpoints = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_export_scan_segment, config, segment, total_segments, output_dir): segment
+            for segment in range(total_segments)
+        }
+        for future in concurrent.futures.as_completed(futures):
+            checkpoints.append(future.result())
+
+    parts = []
+    for checkpoint in sorted(checkpoints, key=lambda c: c['segment']):
+        relative_path = f"segment-{checkpoint['segment']:04d}.ndjson.gz"
+        parts.append({
+            'segment': checkpoint['segment'],
+            'path': relative_path,
+            'rows': checkpoint['rows'],
+            'bytes': checkpoint['bytes'],
+            'sha256': _file_sha256(os.path.join(output_dir, relative_path))
+        })
+
+    manifest = {
+        'created_at': datetime.now().isoformat(),
+        'format': 'ndjson.gz',
+        'total_segments': total_segments,
+        'total_rows': sum(part['rows'] for part in parts),
+        'parts': parts
+    }
+    _write_json_atomic(os.path.join(output_dir, PartitionedExporter.MANIFEST_NAME), manifest)
+    logger.info(f"Full-table export complete: {manifest['total_rows']} rows in {output_dir}")
+    return manifest
+
+def iter_data_from_dynamodb(config, data_type=None, congress=None, start_date=None, end_date=None,
+                            db_handler: Optional[DynamoHandler] = None) -> Iterator[Dict[str, Any]]:
+    """Yield data from DynamoDB page by page with optional filtering.
+
+    Pass db_handler to reuse an existing handler instead of creating one from config.
+    """
+    db_handler = db_handler or DynamoHandler(config)
+
+    if data_type and congress:
+        logger.info(f"Streaming data by congress {congress} and type {data_type}")
+        return db_handler.iter_by_congress_and_type(congress, data_type)
+    elif data_type and start_date and end_date:
+        logger.info(f"Streaming {data_type} data from {start_date} to {end_date}")
+        return db_handler.iter_by_type_and_date_range(data_type, start_date, end_date)
+    elif data_type:
+        logger.info(f"Streaming data by type {data_type} from type-update_date-index")
+        return db_handler.iter_by_type_from_index(data_type)
+    else:
+        logger.warning("No specific query parameters provided, streaming a full table scan (this may be slow)")
+        return db_handler.iter_all_items()
 
 def parse_date(date_str):
     """Parse date string in YYYY-MM-DD format"""
@@ -133,17 +514,33 @@ def parse_date(date_str):
 
 def main():
     """Main entry point for the export utility"""
+    # Configured here rather than at import so importing this module (e.g. from
+    # the API server) leaves the process's logging setup alone
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
     parser = argparse.ArgumentParser(description='Export congressional data from DynamoDB')
     parser.add_argument('--type', choices=['bill', 'amendment', 'committee', 'hearing', 'nomination', 'treaty'], 
                         help='Type of data to export')
     parser.add_argument('--congress', type=int, help='Congress number (e.g., 117)')
     parser.add_argument('--start-date', help='Start date for filtering (YYYY-MM-DD)')
     parser.add_argument('--end-date', help='End date for filtering (YYYY-MM-DD)')
-    parser.add_argument('--format', choices=['json', 'csv'], default='json', 
-                        help='Output format (default: json)')
+    parser.add_argument('--format', choices=['json', 'ndjson', 'csv'],
+                        help='Output format (default: json; partitioned exports are always gzip NDJSON)')
     parser.add_argument('--output', help='Output file path (default: ./exports/[type]_[date].json)')
+    parser.add_argument('--partitioned', action='store_true',
+                        help='Write a type/congress partitioned dataset of gzip NDJSON parts with a manifest')
+    parser.add_argument('--max-part-mb', type=int, default=64,
+                        help='Maximum uncompressed size of a partitioned part file in MB (default: 64)')
+    parser.add_argument('--segments', type=int,
+                        help='Parallel scan segments for a full-table export (no --type); >1 writes one part per segment. '
+                             'A resumed export keeps its original count')
+    parser.add_argument('--workers', type=int, help='Worker processes for a segmented export (default: one per segment)')
+    parser.add_argument('--resume', metavar='DIR', help='Resume an interrupted segmented export in DIR')
     
     args = parser.parse_args()
+    if args.partitioned and args.format:
+        parser.error('--format cannot be used with --partitioned, which always writes gzip NDJSON parts')
+    args.format = args.format or 'json'
     
     # Load configuration
     config = load_config()
@@ -162,6 +559,21 @@ def main():
         if not end_date:
             sys.exit(1)
     
+    # Full-table exports can be split into parallel scan segments
+    if not args.type and ((args.segments or 1) > 1 or args.resume):
+        output_dir = args.resume or args.output or f"exports/all_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        try:
+            manifest = export_full_table(config['dynamodb'], output_dir, args.segments, args.workers)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        except Exception as e:
+            logger.error(f"Export failed: {str(e)}")
+            print(f"Export failed; re-run with --resume {output_dir} to continue")
+            sys.exit(1)
+        print(f"Successfully exported {manifest['total_rows']} records to {output_dir}")
+        return
+
     # Generate default output filename if not specified
     if not args.output:
         # Create exports directory if it doesn't exist
@@ -169,27 +581,31 @@ def main():
         
         timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
         type_str = args.type if args.type else 'all'
-        args.output = f"exports/{type_str}_{timestamp}.{args.format}"
-    
-    # Query data from DynamoDB
-    data = get_data_from_dynamodb(config, args.type, args.congress, start_date, end_date)
-    
-    if not data:
-        logger.warning("No data found matching the criteria")
-        sys.exit(1)
-    
-    # Export data to the specified format
-    success = False
-    if args.format == 'json':
-        success = export_to_json(data, args.output)
-    elif args.format == 'csv':
-        success = export_to_csv(data, args.output)
+        if args.partitioned:
+            args.output = f"exports/{type_str}_{timestamp}"
+        else:
+            args.output = f"exports/{type_str}_{timestamp}.{args.format}"
     
-    if success:
-        print(f"Successfully exported {len(data)} records to {args.output}")
-    else:
+    # Stream data from DynamoDB straight into the output file
+    try:
+        items = iter_data_from_dynamodb(config['dynamodb'], args.type, args.congress, start_date, end_date)
+        if args.partitioned:
+            manifest = export_partitioned(items, args.output, args.max_part_mb * 1024 * 1024)
+            count = manifest['total_rows']
+        else:
+            count = stream_export(items, args.output, args.format, args.type)
+    except Exception as e:
+        logger.error(f"Export failed: {str(e)}")
         print("Export failed")
         sys.exit(1)
 
+    if not count:
+        logger.warning("No data found matching the criteria")
+        if not args.partitioned:
+            os.remove(args.output)
+        sys.exit(1)
+
+    print(f"Successfully exported {count} records to {args.output}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
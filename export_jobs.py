@@ -0,0 +1,194 @@
+"""
+Background export jobs for the API server.
+
+Exports run on a small worker pool and are written to the exports/ directory,
+so a large export no longer holds a request worker for the length of the scan.
+Identical requests share one job, and finished files are reused until they
+expire.
+"""
+import os
+import time
+import uuid
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from export_data import iter_data_from_dynamodb, iter_export_chunks
+
+EXPORT_EXTENSIONS = {'json': 'json', 'ndjson': 'ndjson', 'csv': 'csv'}
+
+class ExportJobManager:
+    """Queue of export jobs executed by a bounded pool of background threads"""
+    def __init__(self, handler_factory: Callable[[], Any], output_dir: str = 'exports',
+                 max_concurrent: int = 2, result_ttl_seconds: float = 3600):
+        self.handler_factory = handler_factory
+        self.output_dir = output_dir
+        self.result_ttl_seconds = result_ttl_seconds
+        self.logger = logging.getLogger('congress_downloader')
+        # Bounding the pool bounds the read capacity exports can consume
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='export-job')
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_by_params: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue an export, or return the job already serving identical parameters"""
+        if params.get('format') not in EXPORT_EXTENSIONS:
+            raise ValueError(f"Unsupported export format: {params.get('format')}")
+
+        params_key = self._params_key(params)
+        with self._lock:
+            self._prune_expired()
+            existing_id = self._jobs_by_params.get(params_key)
+            if existing_id and self._jobs[existing_id]['status'] != 'failed':
+                self.logger.info(f"Reusing export job {existing_id} for identical parameters")
+                return self._status(self._jobs[existing_id])
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'id': job_id,
+                'params': params,
+                'status': 'queued',
+                'rows': 0,
+                'estimated_rows': None,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'path': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+            self._jobs_by_params[params_key] = job_id
+
+        self._executor.submit(self._run, job)
+        self.logger.info(f"Queued export job {job_id}: {params}")
+        return self._status(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job, or None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._status(job) if job else None
+
+    def get_result_path(self, job_id: str) -> Optional[str]:
+        """Path of a completed job's file"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job['status'] == 'completed':
+                return job['path']
+            return None
+
+    def _estimate_rows(self, handler, params: Dict[str, Any]) -> Optional[int]:
+        """Approximate export size from the aggregate counters.
+
+        Falls back to the table's item count (refreshed by DynamoDB every ~6
+        hours) when there are no counters for the request.
+        """
+        try:
+            if params.get('data_type'):
+                congress = params.get('congress')
+                rows = handler.get_stats(item_type=params['data_type'],
+                                         congress=str(congress) if congress else None)
+                total = sum(row['count'] for row in rows)
+                if total:
+                    return total
+            return int(handler.table.item_count)
+        except Exception as e:
+            self.logger.warning(f"Unable to estimate export size: {str(e)}")
+            return None
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        params = job['params']
+        job['status'] = 'running'
+        job['started_at'] = time.time()
+        extension = EXPORT_EXTENSIONS[params['format']]
+        path = os.path.join(self.output_dir, f"{job['id']}.{extension}")
+        temp_path = f"{path}.part"
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            handler = self.handler_factory()
+            job['estimated_rows'] = self._estimate_rows(handler, params)
+
+            items = iter_data_from_dynamodb(None, params.get('data_type'), params.get('congress'),
+                                            params.get('start_date'), params.get('end_date'),
+                                            db_handler=handler)
+
+            def counted(source):
+                for item in source:
+                    job['rows'] += 1
+                    yield item
+
+            with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                for chunk in iter_export_chunks(counted(items), params['format'], params.get('data_type')):
+                    f.write(chunk)
+            os.replace(temp_path, path)
+
+            job['path'] = path
+            job['status'] = 'completed'
+            self.logger.info(f"Export job {job['id']} completed with {job['rows']} rows")
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            self.logger.error(f"Export job {job['id']} failed: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        finally:
+            job['finished_at'] = time.time()
+
+    def _prune_expired(self) -> None:
+        """Forget finished jobs older than the result TTL and delete their files"""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job['finished_at'] is None or now - job['finished_at'] < self.result_ttl_seconds:
+                continue
+            if job['path'] and os.path.exists(job['path']):
+                os.remove(job['path'])
+            del self._jobs[job_id]
+            params_key = self._params_key(job['params'])
+            if self._jobs_by_params.get(params_key) == job_id:
+                del self._jobs_by_params[params_key]
+
+    @staticmethod
+    def _status(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Public view of a job with progress and ETA"""
+        rows = job['rows']
+        estimate = job['estimated_rows']
+        percent = None
+        eta_seconds = None
+
+        if job['status'] == 'completed':
+            percent = 100.0
+            eta_seconds = 0
+        elif job['status'] == 'running' and estimate:
+            # The estimate is approximate, so cap progress below 100 until the
+            # export actually finishes
+            percent = round(min(99.0, 100.0 * rows / estimate), 1)
+            elapsed = time.time() - job['started_at']
+            if rows:
+                eta_seconds = round(max(0, estimate - rows) * elapsed / rows, 1)
+
+        def _iso(timestamp):
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'params': job['params'],
+            'rows_written': rows,
+            'estimated_rows': estimate,
+            'percent_complete': percent,
+            'eta_seconds': eta_seconds,
+            'created_at': _iso(job['created_at']),
+            'started_at': _iso(job['started_at']),
+            'finished_at': _iso(job['finished_at']),
+            'error': job['error']
+        }
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Congress.gov v3 API.
+
+Serves generated fixture pages for all 18 list endpoints in the shapes
+CongressAPI expects (ENDPOINT_KEYS), honouring fromDateTime/toDateTime,
+year/month/day, limit and offset. Latency, page size and injected 429 and
+5xx responses are configurable, and every request is counted, so ingestion
+can be measured without the live API:
+
+    python fake_congress_api.py --port 8089 --latency 0.05 --error-rate-429 0.01
+
+then point api.base_url at http://127.0.0.1:8089/v3. Fixtures are derived
+from the endpoint and date alone, so every run serves the same items.
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from typing import Any, Dict, List, Optional
+
+from congress_api import ENDPOINT_KEYS
+
+CHAMBERS = ('House', 'Senate')
+BILL_TYPES = ('HR', 'S', 'HRES', 'SRES')
+AMENDMENT_TYPES = ('HAMDT', 'SAMDT')
+
+def congress_for(day: date) -> int:
+    return (day.year - 1789) // 2 + 1
+
+def _serial(day: date, index: int) -> int:
+    """Number unique within a Congress for up to 1000 items a day"""
+    return (day.year % 2) * 1000000 + day.timetuple().tm_yday * 1000 + index + 1
+
+def fixture_item(endpoint: str, day: date, index: int, base_url: str) -> Dict[str, Any]:
+    """One generated list item for an endpoint and day"""
+    congress = congress_for(day)
+    number = _serial(day, index)
+    chamber = CHAMBERS[index % 2]
+    update_date = f"{day.isoformat()}T12:{index % 60:02d}:00Z"
+    latest_action = {'actionDate': day.isoformat(), 'text': f"Action {index} on {day.isoformat()}"}
+
+    if endpoint == 'bill':
+        bill_type = BILL_TYPES[index % len(BILL_TYPES)]
+        return {
+            'congress': congress, 'type': bill_type, 'number': str(number),
+            'title': f"Fixture bill {number}", 'originChamber': chamber, 'originChamberCode': chamber[0],
+            'updateDate': update_date, 'latestAction': latest_action,
+            'url': f"{base_url}/bill/{congress}/{bill_type.lower()}/{number}?format=json"
+        }
+    if endpoint == 'amendment':
+        amendment_type = AMENDMENT_TYPES[index % 2]
+        return {
+            'congress': congress, 'type': amendment_type, 'number': str(number),
+            'purpose': f"Fixture amendment {number}", 'updateDate': update_date, 'latestAction': latest_action,
+            'url': f"{base_url}/amendment/{congress}/{amendment_type.lower()}/{number}?format=json"
+        }
+    if endpoint == 'nomination':
+        return {
+            'congress': congress, 'number': number, 'partNumber': '00',
+            'description': f"Fixture nomination {number}", 'organization': 'Department of Fixtures',
+            'nominationType': {'isCivilian': True}, 'receivedDate': day.isoformat(),
+            'updateDate': update_date, 'latestAction': latest_action,
+            'url': f"{base_url}/nomination/{congress}/{number}?format=json"
+        }
+    if endpoint == 'treaty':
+        return {
+            'congress': congress, 'number': number, 'topic': 'Fixtures', 'transmittedDate': day.isoformat(),
+            'updateDate': update_date, 'url': f"{base_url}/treaty/{congress}/{number}?format=json"
+        }
+    if endpoint == 'committee':
+        system_code = f"{chamber[0].lower()}s{number:08d}"
+        return {
+            'chamber': chamber, 'name': f"Fixture Committee {number}", 'systemCode': system_code,
+            'committeeTypeCode': 'Standing', 'updateDate': update_date, 'parent': None, 'subcommittees': [],
+            'url': f"{base_url}/committee/{chamber.lower()}/{system_code}?format=json"
+        }
+    if endpoint == 'hearing':
+        return {
+            'congress': congress, 'chamber': chamber, 'jacketNumber': number, 'date': day.isoformat(),
+            'title': f"Fixture hearing {number}", 'updateDate': update_date,
+            'committee': {'name': 'Fixture Committee', 'systemCode': f"{chamber[0].lower()}s{index:05d}"},
+            'url': f"{base_url}/hearing/{congress}/{chamber.lower()}/{number}?format=json"
+        }
+    if endpoint == 'daily-congressional-record':
+        return {
+            'congress': congress, 'volumeNumber': day.year - 1853, 'issueNumber': number,
+            'issueDate': f"{day.isoformat()}T04:00:00Z", 'date': day.isoformat(),
+            'year': day.year, 'month': day.month, 'day': day.day, 'updateDate': update_date,
+            'url': f"{base_url}/daily-congressional-record/{day.year - 1853}/{number}?format=json"
+        }
+    if endpoint == 'bound-congressional-record':
+        return {
+            'congress': congress, 'volume': day.year - 1853, 'date': day.isoformat(),
+            'year': day.year, 'month': day.month, 'day': day.day, 'updateDate': update_date,
+            'url': f"{base_url}/bound-congressional-record/{day.year}/{day.month}/{day.day}/{number}?format=json"
+        }
+    if endpoint == 'house-requirement':
+        return {
+            'number': number, 'title': f"Fixture requirement {number}", 'category': 'Reports',
+            'updateDate': update_date, 'url': f"{base_url}/house-requirement/{number}?format=json"
+        }
+    if endpoint == 'member':
+        bioguide = f"F{number:07d}"
+        return {
+            'bioguideId': bioguide, 'name': f"Member, Fixture {number}", 'state': 'Fixture',
+            'updateDate': update_date, 'url': f"{base_url}/member/{bioguide}?format=json"
+        }
+    if endpoint == 'committee-report':
+        report_type = f"{chamber[0]}RPT"
+        return {
+            'congress': congress, 'chamber': chamber, 'type': report_type, 'number': number,
+            'citation': f"{report_type[0]}. Rept. {congress}-{number}", 'updateDate': update_date,
+            'url': f"{base_url}/committee-report/{congress}/{report_type.lower()}/{number}?format=json"
+        }
+    if endpoint in ('house-communication', 'senate-communication'):
+        return {
+            'congress': congress, 'chamber': endpoint.split('-')[0].title(), 'type': 'EC', 'number': number,
+            'updateDate': update_date,
+            'url': f"{base_url}/{endpoint}/{congress}/ec/{number}?format=json"
+        }
+    if endpoint == 'congressional-record':
+        return {
+            'congress': congress, 'chamber': chamber, 'date': day.isoformat(), 'volume': day.year - 1853,
+            'issue': number, 'updateDate': update_date,
+            'url': f"{base_url}/congressional-record/{day.year - 1853}/{number}/{chamber.lower()}?format=json"
+        }
+    # summaries, committee-print and committee-meeting share a generic shape
+    return {
+        'congress': congress, 'chamber': chamber, 'number': number, 'title': f"Fixture {endpoint} {number}",
+        'updateDate': update_date, 'url': f"{base_url}/{endpoint}/{congress}/{chamber.lower()}/{number}?format=json"
+    }
+
+class FakeCongressServer:
+    """Threaded HTTP server generating Congress.gov list responses.
+
+    items_per_day is the mean number of items an endpoint has per day (each
+    endpoint and day gets a fixed count between 0 and twice that). page_size
+    caps the limit parameter. Requests fail with 429 (with Retry-After) or
+    503 at the given rates before any latency is applied.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, items_per_day: int = 20,
+                 page_size: int = 250, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate_429: float = 0.0, error_rate_5xx: float = 0.0, retry_after: int = 1,
+                 earliest_congress: int = 118, seed: int = 0):
+        self.items_per_day = items_per_day
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.retry_after = retry_after
+        self.earliest_congress = earliest_congress
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {}
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v3"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-congress-api', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {'requests': 0, 'items': 0, 'bytes': 0, 'by_status': {}, 'by_endpoint': {}}
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def _count(self, endpoint: str, status: int, items: int = 0, size: int = 0) -> None:
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['items'] += items
+            self.stats['bytes'] += size
+            self.stats['by_status'][str(status)] = self.stats['by_status'].get(str(status), 0) + 1
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def items_for(self, endpoint: str, day: date) -> int:
+        """Fixed number of items an endpoint has on a day"""
+        return random.Random(f"{self.seed}:{endpoint}:{day.isoformat()}").randint(0, 2 * self.items_per_day)
+
+    def _list_day(self, query: Dict[str, str]) -> Optional[date]:
+        if 'fromDateTime' in query:
+            return datetime.strptime(query['fromDateTime'][:10], '%Y-%m-%d').date()
+        if 'year' in query:
+            return date(int(query['year']), int(query.get('month', 1)), int(query.get('day', 1)))
+        return None
+
+    @staticmethod
+    def path_parts(path: str) -> List[str]:
+        """Path segments after the /v3 prefix"""
+        parts = [part for part in path.split('/') if part]
+        return parts[1:] if parts and parts[0] == 'v3' else parts
+
+    def respond(self, path: str, query: Dict[str, str]) -> tuple:
+        """(status, headers, body) for a request"""
+        parts = self.path_parts(path)
+        endpoint = parts[0] if parts else ''
+
+        if not query.get('api_key'):
+            return 403, {}, {'error': {'code': 'API_KEY_MISSING'}}
+        draw = self._draw()
+        if draw < self.error_rate_429:
+            return 429, {'Retry-After': str(self.retry_after)}, {'error': {'code': 'OVER_RATE_LIMIT'}}
+        if draw < self.error_rate_429 + self.error_rate_5xx:
+            return 503, {}, {'error': 'Service Unavailable'}
+
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self.jitter * self._draw())
+
+        if parts == ['congress', 'earliest']:
+            return 200, {}, {'congress': {'number': self.earliest_congress}}
+        data_key = ENDPOINT_KEYS.get(endpoint)
+        if data_key is None or len(parts) > 1:
+            return 404, {}, {'error': f"Unknown endpoint: {path}"}
+
+        base_url = self.base_url
+        day = self._list_day(query)
+        if day is None:
+            # Undated lists (congress): a fixed handful of items
+            today = date.today()
+            total = 3
+            items: List[Dict[str, Any]] = [
+                {'number': congress_for(today) - index, 'name': f"{congress_for(today) - index}th Congress",
+                 'updateDate': f"{today.isoformat()}T00:00:00Z",
+                 'url': f"{base_url}/congress/{congress_for(today) - index}?format=json"}
+                for index in range(total)
+            ]
+        else:
+            total = self.items_for(endpoint, day)
+            items = None
+
+        limit = min(int(query.get('limit', 20)), self.page_size)
+        offset = int(query.get('offset', 0))
+        if items is None:
+            items = [fixture_item(endpoint, day, index, base_url)
+                     for index in range(offset, min(offset + limit, total))]
+        else:
+            items = items[offset:offset + limit]
+
+        body = {data_key: items, 'pagination': {'count': total}, 'request': {'contentType': 'application/json'}}
+        if offset + limit < total:
+            body['pagination']['next'] = f"{base_url}/{endpoint}?offset={offset + limit}&limit={limit}"
+        return 200, {}, body
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; without TCP_NODELAY
+            # each keep-alive response would stall ~40ms on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                status, headers, body = server.respond(url.path, query)
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+                parts = server.path_parts(url.path)
+                endpoint = parts[0] if parts else ''
+                items = body.get(ENDPOINT_KEYS.get(endpoint, ''), []) if status == 200 else []
+                server._count(endpoint, status, len(items), len(payload))
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Congress.gov API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--items-per-day', type=int, default=20, help='Mean items per endpoint and day')
+    parser.add_argument('--page-size', type=int, default=250, help='Largest page served')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    parser.add_argument('--error-rate-429', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--error-rate-5xx', type=float, default=0.0, help='Share of requests answered with 503')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--earliest-congress', type=int, default=118, help='Congress reported as the earliest')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for fixtures and injected errors')
+    args = parser.parse_args()
+
+    server = FakeCongressServer(args.host, args.port, args.items_per_day, args.page_size, args.latency,
+                                args.jitter, args.error_rate_429, args.error_rate_5xx, args.retry_after,
+                                args.earliest_congress, args.seed)
+    print(f"Serving fake Congress.gov API at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats_snapshot(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1478 @@
+"""
+In-memory stand-in for DynamoDB with a provisioned-capacity model.
+
+Implements the subset of the boto3 resource API that DynamoHandler,
+export_data and api_server use: create/describe/update table, put, update,
+delete and get item, batch_writer, batch get, query on the table or a GSI,
+and scan (including parallel segments). Items are stored the way boto3
+returns them (numbers as Decimal, floats rejected).
+
+Capacity is charged as DynamoDB charges it:
+
+    writes     1 WCU per KB of the larger of the old and new item, on the
+               table and again on every GSI the item is or was in (two
+               writes when a GSI key changes); failed conditions still cost
+    reads      0.5 RCU per 4 KB (1 RCU with ConsistentRead), query and scan
+               rounded over the whole page; GSI reads use the GSI's RCU
+
+Each table and GSI is a token bucket refilled at its provisioned rate that
+holds up to burst_seconds (DynamoDB keeps 300) of unused capacity, starting
+full. Over capacity, single-item calls, queries and scans raise
+ProvisionedThroughputExceededException after the SDK retries (botocore's
+DynamoDB policy: 10 attempts, 50 ms doubling). Batch calls return
+UnprocessedItems / UnprocessedKeys, or raise if nothing could be processed.
+
+Select it with "backend": "memory" in the dynamodb config section (see
+CONFIGURATION.md). Tables live in one FakeDynamoDB per process, so every
+DynamoHandler in the process sees the same data. With a SimulatedClock, SDK
+backoff and request latency advance a virtual clock instead of sleeping, so
+a single-threaded run gives the same throttles, retries and simulated time
+on every run.
+
+Not modelled: streams, TTL expiry, transactions, PartiQL, per-partition
+throttling and adaptive capacity, reserved words, and tables with a
+composite primary key.
+"""
+import re
+import copy
+import math
+import time
+import zlib
+import bisect
+import threading
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+DEFAULT_BURST_SECONDS = 300
+MAX_ITEM_BYTES = 400 * 1024
+MAX_PAGE_BYTES = 1024 * 1024
+MAX_BATCH_WRITE = 25
+MAX_BATCH_GET = 100
+
+# botocore's legacy retry policy for DynamoDB
+SDK_MAX_ATTEMPTS = 10
+SDK_RETRY_BASE = 0.05
+
+THROUGHPUT_MESSAGE = ("The level of configured provisioned throughput for the table was exceeded. "
+                      "Consider increasing your provisioning level with the UpdateTable API.")
+INDEX_THROUGHPUT_MESSAGE = ("The level of configured provisioned throughput for one or more global secondary "
+                            "indexes of the table was exceeded. Consider increasing your provisioning level "
+                            "for the under-provisioned global secondary indexes with the UpdateTable API")
+
+_MISSING = object()
+
+def _client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message},
+                        'ResponseMetadata': {'HTTPStatusCode': 400}}, operation)
+
+class _ValidationError(Exception):
+    """Raised inside operations; reported as a ValidationException ClientError"""
+
+class _Throttled(Exception):
+    """A request found a table or GSI bucket empty"""
+    def __init__(self, table: 'FakeTable', index: bool = False):
+        super().__init__(table.name)
+        self.table = table
+        self.index = index
+
+class RealClock:
+    def time(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+class SimulatedClock:
+    """Virtual time that only moves when something sleeps on it"""
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.now += seconds
+
+def to_dynamo(value: Any) -> Any:
+    """Convert a value as boto3's serializer would accept it (ints become Decimal)"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, Decimal):
+        if value.is_nan() or value.is_infinite():
+            raise TypeError(f"Infinity and NaN not supported: {value}")
+        return value
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, dict):
+        return {key: to_dynamo(child) for key, child in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_dynamo(child) for child in value]
+    if isinstance(value, (set, frozenset)):
+        if not value:
+            raise _ValidationError("One or more parameter values were invalid: An number set  may not be empty")
+        return {to_dynamo(child) for child in value}
+    raise TypeError(f'Unsupported type "{type(value)}" for value "{value}"')
+
+def _kind(value: Any) -> str:
+    """DynamoDB type descriptor of a stored value"""
+    if isinstance(value, str):
+        return 'S'
+    if isinstance(value, bool):
+        return 'BOOL'
+    if isinstance(value, Decimal):
+        return 'N'
+    if isinstance(value, bytes):
+        return 'B'
+    if value is None:
+        return 'NULL'
+    if isinstance(value, dict):
+        return 'M'
+    if isinstance(value, list):
+        return 'L'
+    if isinstance(value, set):
+        return _kind(next(iter(value))) + 'S' if value else 'SS'
+    return '?'
+
+def _value_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, Decimal):
+        return len(str(value).lstrip('-').replace('.', '')) // 2 + 2
+    if isinstance(value, dict):
+        return 3 + sum(len(key.encode('utf-8')) + _value_size(child) + 1 for key, child in value.items())
+    if isinstance(value, list):
+        return 3 + sum(_value_size(child) + 1 for child in value)
+    if isinstance(value, set):
+        return sum(_value_size(child) for child in value)
+    return 0
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Approximate stored size in bytes (attribute names plus values)"""
+    return sum(len(name.encode('utf-8')) + _value_size(value) for name, value in item.items())
+
+def write_units(size: int) -> int:
+    return max(1, math.ceil(size / 1024))
+
+def read_units(size: int, consistent: bool = False) -> float:
+    return max(1, math.ceil(size / 4096)) * (1.0 if consistent else 0.5)
+
+# --- Expressions -------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r'\s*(?:(#[A-Za-z0-9_]+)|(:[A-Za-z0-9_]+)|(\d+)|([A-Za-z_][A-Za-z0-9_]*)'
+                       r'|(<>|<=|>=|[=<>(),.\[\]+-]))')
+_TOKEN_KINDS = ('name', 'value', 'number', 'word', 'op')
+_COMPARATORS = ('=', '<>', '<', '<=', '>', '>=')
+_CONDITION_FUNCTIONS = ('attribute_exists', 'attribute_not_exists', 'attribute_type', 'begins_with', 'contains')
+_UPDATE_CLAUSES = ('SET', 'REMOVE', 'ADD', 'DELETE')
+
+class _Parser:
+    """Recursive-descent parser for condition, update and projection expressions"""
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens: List[Tuple[str, str]] = []
+        text = expression.strip()
+        position = 0
+        while position < len(text):
+            match = _TOKEN_RE.match(text, position)
+            if not match:
+                raise self.error()
+            position = match.end()
+            self.tokens.append(next((kind, token) for kind, token in zip(_TOKEN_KINDS, match.groups())
+                                    if token is not None))
+        self.position = 0
+
+    def error(self) -> _ValidationError:
+        near = self.tokens[self.position][1] if self.position < len(self.tokens) else 'end of expression'
+        return _ValidationError(f"Invalid expression: Syntax error near \"{near}\"; expression: {self.expression}")
+
+    def peek(self, offset: int = 0) -> Tuple[Optional[str], Optional[str]]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise self.error()
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def at(self, text: str, offset: int = 0) -> bool:
+        kind, token = self.peek(offset)
+        if kind == 'word':
+            return token.upper() == text
+        return token == text
+
+    def expect(self, text: str) -> None:
+        if not self.at(text):
+            raise self.error()
+        self.position += 1
+
+    def finish(self, node: Any) -> Any:
+        if self.position != len(self.tokens):
+            raise self.error()
+        return node
+
+    def condition(self):
+        node = self.conjunction()
+        while self.at('OR'):
+            self.position += 1
+            node = ('or', node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.at('AND'):
+            self.position += 1
+            node = ('and', node, self.negation())
+        return node
+
+    def negation(self):
+        if self.at('NOT'):
+            self.position += 1
+            return ('not', self.negation())
+        return self.predicate()
+
+    def predicate(self):
+        kind, token = self.peek()
+        if token == '(':
+            self.position += 1
+            node = self.condition()
+            self.expect(')')
+            return node
+        if kind == 'word' and token in _CONDITION_FUNCTIONS and self.at('(', 1):
+            self.position += 2
+            return ('func', token, self.arguments())
+        left = self.operand()
+        if self.at('BETWEEN'):
+            self.position += 1
+            low = self.operand()
+            self.expect('AND')
+            return ('between', left, low, self.operand())
+        if self.at('IN'):
+            self.position += 1
+            self.expect('(')
+            return ('in', left, self.arguments())
+        _, operator = self.take()
+        if operator not in _COMPARATORS:
+            raise self.error()
+        return ('cmp', operator, left, self.operand())
+
+    def arguments(self) -> List[Any]:
+        """Comma-separated operands up to the closing parenthesis"""
+        arguments = [self.operand()]
+        while self.at(','):
+            self.position += 1
+            arguments.append(self.operand())
+        self.expect(')')
+        return arguments
+
+    def operand(self):
+        kind, token = self.peek()
+        if kind == 'value':
+            self.position += 1
+            return ('value', token)
+        if kind == 'word' and token == 'size' and self.at('(', 1):
+            self.position += 2
+            return ('size', self.arguments()[0])
+        return self.path()
+
+    def path(self):
+        kind, token = self.take()
+        if kind not in ('name', 'word'):
+            raise self.error()
+        parts: List[Any] = [token]
+        while True:
+            if self.at('.'):
+                self.position += 1
+                kind, token = self.take()
+                if kind not in ('name', 'word'):
+                    raise self.error()
+                parts.append(token)
+            elif self.at('['):
+                self.position += 1
+                kind, token = self.take()
+                if kind != 'number':
+                    raise self.error()
+                parts.append(int(token))
+                self.expect(']')
+            else:
+                return ('path', tuple(parts))
+
+    def update(self) -> Dict[str, List[Any]]:
+        actions: Dict[str, List[Any]] = {clause: [] for clause in _UPDATE_CLAUSES}
+        while self.position < len(self.tokens):
+            _, clause = self.take()
+            clause = clause.upper()
+            if clause not in actions:
+                raise self.error()
+            while True:
+                path = self.path()
+                if clause == 'SET':
+                    self.expect('=')
+                    actions[clause].append((path, self.set_value()))
+                elif clause == 'REMOVE':
+                    actions[clause].append((path, None))
+                else:
+                    actions[clause].append((path, self.operand()))
+                if not self.at(','):
+                    break
+                self.position += 1
+        return actions
+
+    def set_value(self):
+        left = self.set_operand()
+        if self.at('+') or self.at('-'):
+            _, operator = self.take()
+            return ('arith', operator, left, self.set_operand())
+        return left
+
+    def set_operand(self):
+        kind, token = self.peek()
+        if kind == 'word' and token in ('if_not_exists', 'list_append') and self.at('(', 1):
+            self.position += 2
+            first = self.set_value()
+            self.expect(',')
+            second = self.set_value()
+            self.expect(')')
+            return (token, first, second)
+        return self.operand()
+
+    def projection(self) -> List[Any]:
+        paths = [self.path()]
+        while self.at(','):
+            self.position += 1
+            paths.append(self.path())
+        return paths
+
+@lru_cache(maxsize=512)
+def _parse(kind: str, expression: str):
+    parser = _Parser(expression)
+    if kind == 'condition':
+        return parser.finish(parser.condition())
+    if kind == 'update':
+        return parser.finish(parser.update())
+    return parser.finish(parser.projection())
+
+class _Context:
+    """ExpressionAttributeNames/Values of one request"""
+    def __init__(self, names: Optional[Dict[str, str]], values: Optional[Dict[str, Any]]):
+        self.names = names or {}
+        self.values = {key: to_dynamo(value) for key, value in (values or {}).items()}
+
+    def name(self, part: str) -> str:
+        if part.startswith('#'):
+            if part not in self.names:
+                raise _ValidationError(f"Value provided in ExpressionAttributeNames unused in expressions "
+                                       f"or undefined: {part}")
+            return self.names[part]
+        return part
+
+    def value(self, token: str) -> Any:
+        if token not in self.values:
+            raise _ValidationError(f"An expression attribute value used in expression is not defined; "
+                                   f"attribute value: {token}")
+        return self.values[token]
+
+    def path(self, node) -> Tuple[Any, ...]:
+        return tuple(part if isinstance(part, int) else self.name(part) for part in node[1])
+
+def _lookup(item: Any, parts: Tuple[Any, ...]) -> Any:
+    value = item
+    for part in parts:
+        if isinstance(part, int):
+            if not isinstance(value, list) or part >= len(value):
+                return _MISSING
+        elif not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _operand(node, item: Dict[str, Any], context: _Context) -> Any:
+    kind = node[0]
+    if kind == 'path':
+        return _lookup(item, context.path(node))
+    if kind == 'value':
+        return context.value(node[1])
+    if kind == 'size':
+        value = _operand(node[1], item, context)
+        if value is _MISSING or not isinstance(value, (str, bytes, list, dict, set)):
+            return _MISSING
+        return Decimal(len(value.encode('utf-8')) if isinstance(value, str) else len(value))
+    if kind == 'if_not_exists':
+        value = _operand(node[1], item, context)
+        return _operand(node[2], item, context) if value is _MISSING else value
+    if kind == 'list_append':
+        first, second = _operand(node[1], item, context), _operand(node[2], item, context)
+        if not isinstance(first, list) or not isinstance(second, list):
+            raise _ValidationError("Invalid UpdateExpression: Incorrect operand type for operator or function; "
+                                   "operator or function: list_append")
+        return first + second
+    if kind == 'arith':
+        left, right = _operand(node[2], item, context), _operand(node[3], item, context)
+        if not isinstance(left, Decimal) or not isinstance(right, Decimal):
+            raise _ValidationError(f"An operand in the update expression has an incorrect data type")
+        return left + right if node[1] == '+' else left - right
+    raise _ValidationError(f"Unsupported operand: {kind}")
+
+def _compare(operator: str, left: Any, right: Any) -> bool:
+    if left is _MISSING or right is _MISSING:
+        return False
+    left_kind, right_kind = _kind(left), _kind(right)
+    if operator == '=':
+        return left_kind == right_kind and left == right
+    if operator == '<>':
+        return left_kind != right_kind or left != right
+    if left_kind != right_kind or left_kind not in ('S', 'N', 'B'):
+        return False
+    if operator == '<':
+        return left < right
+    if operator == '<=':
+        return left <= right
+    if operator == '>':
+        return left > right
+    return left >= right
+
+def _evaluate(node, item: Dict[str, Any], context: _Context) -> bool:
+    kind = node[0]
+    if kind == 'and':
+        return _evaluate(node[1], item, context) and _evaluate(node[2], item, context)
+    if kind == 'or':
+        return _evaluate(node[1], item, context) or _evaluate(node[2], item, context)
+    if kind == 'not':
+        return not _evaluate(node[1], item, context)
+    if kind == 'cmp':
+        return _compare(node[1], _operand(node[2], item, context), _operand(node[3], item, context))
+    if kind == 'between':
+        value = _operand(node[1], item, context)
+        return (_compare('>=', value, _operand(node[2], item, context))
+                and _compare('<=', value, _operand(node[3], item, context)))
+    if kind == 'in':
+        value = _operand(node[1], item, context)
+        return any(_compare('=', value, _operand(option, item, context)) for option in node[2])
+
+    name, arguments = node[1], node[2]
+    value = _operand(arguments[0], item, context)
+    if name == 'attribute_exists':
+        return value is not _MISSING
+    if name == 'attribute_not_exists':
+        return value is _MISSING
+    other = _operand(arguments[1], item, context)
+    if value is _MISSING or other is _MISSING:
+        return False
+    if name == 'attribute_type':
+        return _kind(value) == other
+    if name == 'begins_with':
+        return isinstance(value, (str, bytes)) and type(value) is type(other) and value.startswith(other)
+    if isinstance(value, (str, bytes)):
+        return type(value) is type(other) and other in value
+    if isinstance(value, (list, set)):
+        return other in value
+    return False
+
+def _assign(item: Dict[str, Any], parts: Tuple[Any, ...], value: Any) -> None:
+    parent = _lookup(item, parts[:-1])
+    last = parts[-1]
+    if isinstance(last, int) and isinstance(parent, list):
+        if last < len(parent):
+            parent[last] = value
+        else:
+            parent.append(value)
+    elif isinstance(last, str) and isinstance(parent, dict):
+        parent[last] = value
+    else:
+        raise _ValidationError("The document path provided in the update expression is invalid for update")
+
+def _remove(item: Dict[str, Any], parts: Tuple[Any, ...]) -> None:
+    parent = _lookup(item, parts[:-1])
+    last = parts[-1]
+    if isinstance(last, int) and isinstance(parent, list) and last < len(parent):
+        del parent[last]
+    elif isinstance(last, str) and isinstance(parent, dict):
+        parent.pop(last, None)
+
+def _apply_update(old: Dict[str, Any], actions: Dict[str, List[Any]], context: _Context
+                  ) -> Tuple[Dict[str, Any], set]:
+    """New item after an UpdateExpression, and the top-level attributes it touched.
+
+    Values are computed from the item as it was before the update.
+    """
+    new = copy.deepcopy(old)
+    touched = set()
+    for path, value_node in actions['SET']:
+        parts = context.path(path)
+        value = _operand(value_node, old, context)
+        if value is _MISSING:
+            raise _ValidationError("The provided expression refers to an attribute that does not exist in the item")
+        _assign(new, parts, copy.deepcopy(value))
+        touched.add(parts[0])
+    for path, _ in actions['REMOVE']:
+        parts = context.path(path)
+        _remove(new, parts)
+        touched.add(parts[0])
+    for path, value_node in actions['ADD']:
+        parts = context.path(path)
+        current, addend = _lookup(new, parts), _operand(value_node, old, context)
+        if current is _MISSING:
+            result = copy.deepcopy(addend)
+        elif isinstance(current, Decimal) and isinstance(addend, Decimal):
+            result = current + addend
+        elif isinstance(current, set) and isinstance(addend, set):
+            result = current | addend
+        else:
+            raise _ValidationError("An operand in the update expression has an incorrect data type")
+        if not isinstance(result, (Decimal, set)):
+            raise _ValidationError("An operand in the update expression has an incorrect data type")
+        _assign(new, parts, result)
+        touched.add(parts[0])
+    for path, value_node in actions['DELETE']:
+        parts = context.path(path)
+        current, removed = _lookup(new, parts), _operand(value_node, old, context)
+        if isinstance(current, set) and isinstance(removed, set):
+            if current - removed:
+                _assign(new, parts, current - removed)
+            else:
+                _remove(new, parts)
+            touched.add(parts[0])
+    return new, touched
+
+def _project(item: Dict[str, Any], projection: Optional[List[Any]], context: _Context) -> Dict[str, Any]:
+    if projection is None:
+        return copy.deepcopy(item)
+    result: Dict[str, Any] = {}
+    for path in projection:
+        parts = context.path(path)
+        # Document paths into lists return the whole top-level list
+        if any(isinstance(part, int) for part in parts):
+            parts = parts[:1]
+        value = _lookup(item, parts)
+        if value is _MISSING:
+            continue
+        target = result
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = copy.deepcopy(value)
+    return result
+
+# --- Capacity ----------------------------------------------------------------
+
+class CapacityBucket:
+    """Provisioned read or write capacity of a table or GSI as a token bucket.
+
+    A request is let through while any capacity is left and may take the
+    bucket negative; later requests are throttled until it refills.
+    units_per_second None means on-demand (never throttled).
+    """
+    def __init__(self, units_per_second: Optional[float], burst_seconds: float, clock):
+        self.clock = clock
+        self.rate = units_per_second
+        self.burst_seconds = burst_seconds
+        self.capacity = units_per_second * max(burst_seconds, 1) if units_per_second else None
+        self.tokens = self.capacity
+        self.updated = clock.time()
+        self.consumed = 0.0
+        self.throttled = 0
+
+    def set_rate(self, units_per_second: Optional[float]) -> None:
+        self.available()
+        self.rate = units_per_second
+        self.capacity = units_per_second * max(self.burst_seconds, 1) if units_per_second else None
+        if self.tokens is None or self.capacity is None:
+            self.tokens = self.capacity
+        else:
+            self.tokens = min(self.tokens, self.capacity)
+
+    def available(self) -> bool:
+        if self.rate is None:
+            return True
+        now = self.clock.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens > 0
+
+    def consume(self, units: float) -> None:
+        self.consumed += units
+        if self.rate is not None:
+            self.tokens -= units
+
+class _Index:
+    """A GSI (ALL projection): item IDs per hash key, sorted by range key on demand"""
+    def __init__(self, name: str, hash_key: str, range_key: Optional[str], read: CapacityBucket,
+                 write: CapacityBucket, definition: Dict[str, Any]):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.read = read
+        self.write = write
+        self.definition = definition
+        self.partitions: Dict[Any, Dict[str, Any]] = {}
+        self._sorted: Dict[Any, List[Tuple[Any, str]]] = {}
+        self.size = 0
+
+    def key_of(self, item: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, Any]]:
+        """(hash, range) of an item, or None when the item is not in the index"""
+        if item is None or self.hash_key not in item:
+            return None
+        if self.range_key is None:
+            return item[self.hash_key], ''
+        if self.range_key not in item:
+            return None
+        return item[self.hash_key], item[self.range_key]
+
+    def add(self, item_id: str, key: Tuple[Any, Any]) -> None:
+        self.partitions.setdefault(key[0], {})[item_id] = key[1]
+        self._sorted.pop(key[0], None)
+        self.size += 1
+
+    def remove(self, item_id: str, key: Tuple[Any, Any]) -> None:
+        partition = self.partitions.get(key[0], {})
+        if partition.pop(item_id, _MISSING) is not _MISSING:
+            self.size -= 1
+        if not partition:
+            self.partitions.pop(key[0], None)
+        self._sorted.pop(key[0], None)
+
+    def entries(self, hash_value: Any) -> List[Tuple[Any, str]]:
+        """(range value, item id) of one partition in key order"""
+        entries = self._sorted.get(hash_value)
+        if entries is None:
+            partition = self.partitions.get(hash_value, {})
+            entries = self._sorted[hash_value] = sorted((range_value, item_id)
+                                                        for item_id, range_value in partition.items())
+        return entries
+
+# --- Tables ------------------------------------------------------------------
+
+class FakeTable:
+    """One table: items by primary key, its GSIs and their capacity buckets"""
+    def __init__(self, dynamodb: 'FakeDynamoDB', definition: Dict[str, Any]):
+        self._dynamodb = dynamodb
+        self.name = definition['TableName']
+        key_schema = definition['KeySchema']
+        if len(key_schema) != 1:
+            raise NotImplementedError("The in-memory table supports hash-only primary keys")
+        self.hash_key = key_schema[0]['AttributeName']
+        self.key_schema = key_schema
+        self.attribute_types = {attribute['AttributeName']: attribute['AttributeType']
+                                for attribute in definition.get('AttributeDefinitions', [])}
+        self.stream_specification = definition.get('StreamSpecification')
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.sizes: Dict[str, int] = {}
+        self._scan_order: Optional[List[Tuple[int, str]]] = None
+        self.counters = {
+            'conditional_check_failures': 0,
+            'unprocessed_items': 0,
+            'unprocessed_keys': 0,
+            'sdk_retries': 0,
+            'sdk_backoff_seconds': 0.0,
+            'failed_requests': 0
+        }
+
+        self.on_demand = False
+        self.read = self.write = None
+        self.indexes: Dict[str, _Index] = {}
+        self.configure(definition.get('BillingMode', 'PROVISIONED'), definition.get('ProvisionedThroughput') or {})
+        for index in definition.get('GlobalSecondaryIndexes', []):
+            self.add_index(index)
+
+    # Configuration
+
+    def _rates(self, throughput: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+        if self.on_demand:
+            return None, None
+        settings = self._dynamodb.settings
+        return (settings.get('read_capacity', throughput.get('ReadCapacityUnits')),
+                settings.get('write_capacity', throughput.get('WriteCapacityUnits')))
+
+    def configure(self, billing_mode: str, throughput: Dict[str, Any]) -> None:
+        self.on_demand = billing_mode == 'PAY_PER_REQUEST' or not self._dynamodb.settings.get('provisioned', True)
+        self.throughput = dict(throughput)
+        read_rate, write_rate = self._rates(throughput)
+        if self.read is None:
+            burst = self._dynamodb.burst_seconds
+            self.read = CapacityBucket(read_rate, burst, self._dynamodb.clock)
+            self.write = CapacityBucket(write_rate, burst, self._dynamodb.clock)
+        else:
+            self.read.set_rate(read_rate)
+            self.write.set_rate(write_rate)
+            for index in self.indexes.values():
+                index_read, index_write = self._rates(index.definition.get('ProvisionedThroughput') or {})
+                index.read.set_rate(index_read)
+                index.write.set_rate(index_write)
+
+    def add_index(self, definition: Dict[str, Any]) -> None:
+        name = definition['IndexName']
+        if name in self.indexes:
+            raise _ValidationError(f"Attempting to create an index which already exists: {name}")
+        keys = {key['KeyType']: key['AttributeName'] for key in definition['KeySchema']}
+        read_rate, write_rate = self._rates(definition.get('ProvisionedThroughput') or {})
+        burst = self._dynamodb.burst_seconds
+        index = _Index(name, keys['HASH'], keys.get('RANGE'),
+                       CapacityBucket(read_rate, burst, self._dynamodb.clock),
+                       CapacityBucket(write_rate, burst, self._dynamodb.clock), definition)
+        # Backfill without charging capacity
+        for item_id, item in self.items.items():
+            key = index.key_of(item)
+            if key is not None:
+                index.add(item_id, key)
+        self.indexes[name] = index
+
+    def describe(self) -> Dict[str, Any]:
+        description = {
+            'TableName': self.name,
+            'TableStatus': 'ACTIVE',
+            'TableArn': f"arn:aws:dynamodb:local:000000000000:table/{self.name}",
+            'KeySchema': self.key_schema,
+            'AttributeDefinitions': [{'AttributeName': name, 'AttributeType': attribute_type}
+                                     for name, attribute_type in self.attribute_types.items()],
+            'ItemCount': len(self.items),
+            'TableSizeBytes': sum(self.sizes.values()),
+            'BillingModeSummary': {'BillingMode': 'PAY_PER_REQUEST' if self.on_demand else 'PROVISIONED'},
+            'ProvisionedThroughput': {
+                'ReadCapacityUnits': 0 if self.on_demand else self.read.rate,
+                'WriteCapacityUnits': 0 if self.on_demand else self.write.rate
+            },
+            'GlobalSecondaryIndexes': [{
+                'IndexName': index.name,
+                'KeySchema': index.definition['KeySchema'],
+                'Projection': index.definition.get('Projection', {'ProjectionType': 'ALL'}),
+                'IndexStatus': 'ACTIVE',
+                'ItemCount': index.size,
+                'ProvisionedThroughput': {
+                    'ReadCapacityUnits': 0 if self.on_demand else index.read.rate,
+                    'WriteCapacityUnits': 0 if self.on_demand else index.write.rate
+                }
+            } for index in self.indexes.values()]
+        }
+        if self.stream_specification:
+            description['StreamSpecification'] = self.stream_specification
+        return description
+
+    def capacity_stats(self) -> Dict[str, Any]:
+        """Consumed capacity and throttles per table and GSI since creation"""
+        table_wcu = self.write.consumed
+        total_wcu = table_wcu + sum(index.write.consumed for index in self.indexes.values())
+        return {
+            'items': len(self.items),
+            'consumed_wcu': {'table': table_wcu,
+                             **{name: index.write.consumed for name, index in self.indexes.items()}},
+            'consumed_rcu': {'table': self.read.consumed,
+                             **{name: index.read.consumed for name, index in self.indexes.items()}},
+            'throttled': {'table_writes': self.write.throttled, 'table_reads': self.read.throttled,
+                          'index_writes': sum(index.write.throttled for index in self.indexes.values()),
+                          'index_reads': sum(index.read.throttled for index in self.indexes.values())},
+            'write_amplification': total_wcu / table_wcu if table_wcu else None,
+            **self.counters
+        }
+
+    # Item helpers
+
+    def _key_id(self, key: Dict[str, Any]) -> str:
+        if set(key) != {self.hash_key}:
+            raise _ValidationError("The provided key element does not match the schema")
+        return self._check_key_value(self.hash_key, to_dynamo(key[self.hash_key]))
+
+    def _check_key_value(self, attribute: str, value: Any, index: Optional[str] = None) -> Any:
+        expected = self.attribute_types.get(attribute)
+        if expected and _kind(value) != expected:
+            where = f" IndexName: {index}" if index else ''
+            raise _ValidationError(f"One or more parameter values were invalid: Type mismatch for Index Key "
+                                   f"{attribute} Expected: {expected} Actual: {_kind(value)}{where}")
+        if value == '' or value == b'':
+            raise _ValidationError(f"One or more parameter values are not valid. The AttributeValue for a key "
+                                   f"attribute cannot contain an empty string value. Key: {attribute}")
+        return value
+
+    def _validate_item(self, item: Dict[str, Any]) -> Tuple[str, int]:
+        """Check key attributes and size; returns the item's ID and size"""
+        if self.hash_key not in item:
+            raise _ValidationError(f"One or more parameter values were invalid: Missing the key "
+                                   f"{self.hash_key} in the item")
+        item_id = self._check_key_value(self.hash_key, item[self.hash_key])
+        for index in self.indexes.values():
+            for attribute in (index.hash_key, index.range_key):
+                if attribute and attribute in item:
+                    self._check_key_value(attribute, item[attribute], index.name)
+        size = item_size(item)
+        if size > MAX_ITEM_BYTES:
+            raise _ValidationError("Item size has exceeded the maximum allowed size")
+        return item_id, size
+
+    def _write_units(self, item_id: str, new: Optional[Dict[str, Any]], new_size: int) -> Dict[Any, int]:
+        """WCU a write takes from the table ('table') and from each GSI it touches"""
+        old = self.items.get(item_id)
+        old_size = self.sizes.get(item_id, 0)
+        units: Dict[Any, int] = {'table': write_units(max(old_size, new_size))}
+        for index in self.indexes.values():
+            old_key, new_key = index.key_of(old), index.key_of(new)
+            if old_key is None and new_key is None:
+                continue
+            cost = 0
+            if old_key is not None and old_key != new_key:
+                cost += write_units(old_size)
+            if new_key is not None:
+                cost += write_units(new_size)
+            units[index] = cost
+        return units
+
+    def _reserve(self, units: Dict[Any, float], kind: str = 'write') -> bool:
+        """Consume units from every bucket involved, or count a throttle if any is empty"""
+        buckets = [(getattr(self, kind) if target == 'table' else getattr(target, kind), amount)
+                   for target, amount in units.items()]
+        empty = [bucket for bucket, _ in buckets if not bucket.available()]
+        if empty:
+            for bucket in empty:
+                bucket.throttled += 1
+            return False
+        for bucket, amount in buckets:
+            bucket.consume(amount)
+        return True
+
+    def _reserve_or_raise(self, units: Dict[Any, float], kind: str = 'write') -> None:
+        if not self._reserve(units, kind):
+            raise _Throttled(self, index=getattr(self, kind).available())
+
+    def _store(self, item_id: str, new: Optional[Dict[str, Any]], size: int = 0) -> None:
+        old = self.items.get(item_id)
+        for index in self.indexes.values():
+            old_key, new_key = index.key_of(old), index.key_of(new)
+            if old_key != new_key:
+                if old_key is not None:
+                    index.remove(item_id, old_key)
+                if new_key is not None:
+                    index.add(item_id, new_key)
+        if new is None:
+            if old is not None:
+                del self.items[item_id]
+                del self.sizes[item_id]
+                self._scan_order = None
+            return
+        if old is None:
+            self._scan_order = None
+        self.items[item_id] = new
+        self.sizes[item_id] = size
+
+    def _check_condition(self, expression: Optional[str], item: Optional[Dict[str, Any]],
+                         context: _Context, operation: str) -> None:
+        if expression and not _evaluate(_parse('condition', expression), item or {}, context):
+            self.counters['conditional_check_failures'] += 1
+            raise _client_error('ConditionalCheckFailedException', 'The conditional request failed', operation)
+
+    @staticmethod
+    def _consumed(table_name: str, units: Dict[Any, float], mode: Optional[str]) -> Dict[str, Any]:
+        if not mode or mode == 'NONE':
+            return {}
+        consumed = {'TableName': table_name, 'CapacityUnits': float(sum(units.values()))}
+        if mode == 'INDEXES':
+            consumed['Table'] = {'CapacityUnits': float(units.get('table', 0))}
+            consumed['GlobalSecondaryIndexes'] = {target.name: {'CapacityUnits': float(amount)}
+                                                  for target, amount in units.items() if target != 'table'}
+        return {'ConsumedCapacity': consumed}
+
+    # Table API (boto3 resource signatures)
+
+    def put_item(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb._call('PutItem', self._put_item, **kwargs)
+
+    def update_item(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb._call('UpdateItem', self._update_item, **kwargs)
+
+    def delete_item(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb._call('DeleteItem', self._delete_item, **kwargs)
+
+    def get_item(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb._call('GetItem', self._get_item, **kwargs)
+
+    def query(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb._call('Query', self._query, **kwargs)
+
+    def scan(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb._call('Scan', self._scan, **kwargs)
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> 'BatchWriter':
+        return BatchWriter(self._dynamodb, self.name, overwrite_by_pkeys=overwrite_by_pkeys)
+
+    def wait_until_exists(self) -> None:
+        pass
+
+    def load(self) -> None:
+        pass
+
+    @property
+    def table_name(self) -> str:
+        return self.name
+
+    @property
+    def item_count(self) -> int:
+        return len(self.items)
+
+    def _put_item(self, Item: Dict[str, Any], ConditionExpression: Optional[str] = None,
+                  ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+                  ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+                  ReturnValues: str = 'NONE', ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        item = to_dynamo(Item)
+        item_id, size = self._validate_item(item)
+        context = _Context(ExpressionAttributeNames, ExpressionAttributeValues)
+        old = self.items.get(item_id)
+        units = self._write_units(item_id, item, size)
+        self._reserve_or_raise(units)
+        self._check_condition(ConditionExpression, old, context, 'PutItem')
+        self._store(item_id, item, size)
+
+        response = self._consumed(self.name, units, ReturnConsumedCapacity)
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            response['Attributes'] = copy.deepcopy(old)
+        return response
+
+    def _update_item(self, Key: Dict[str, Any], UpdateExpression: Optional[str] = None,
+                     ConditionExpression: Optional[str] = None,
+                     ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+                     ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+                     ReturnValues: str = 'NONE', ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        item_id = self._key_id(Key)
+        context = _Context(ExpressionAttributeNames, ExpressionAttributeValues)
+        old = self.items.get(item_id)
+        base = old if old is not None else {self.hash_key: item_id}
+        if UpdateExpression:
+            new, touched = _apply_update(base, _parse('update', UpdateExpression), context)
+        else:
+            new, touched = copy.deepcopy(base), set()
+        if new.get(self.hash_key) != item_id:
+            raise _ValidationError("Cannot update attribute id. This attribute is part of the key")
+        _, size = self._validate_item(new)
+        units = self._write_units(item_id, new, size)
+        self._reserve_or_raise(units)
+        self._check_condition(ConditionExpression, old, context, 'UpdateItem')
+        self._store(item_id, new, size)
+
+        response = self._consumed(self.name, units, ReturnConsumedCapacity)
+        if ReturnValues == 'ALL_NEW':
+            response['Attributes'] = copy.deepcopy(new)
+        elif ReturnValues == 'ALL_OLD' and old is not None:
+            response['Attributes'] = copy.deepcopy(old)
+        elif ReturnValues in ('UPDATED_NEW', 'UPDATED_OLD'):
+            source = new if ReturnValues == 'UPDATED_NEW' else (old or {})
+            response['Attributes'] = {name: copy.deepcopy(source[name]) for name in touched if name in source}
+        return response
+
+    def _delete_item(self, Key: Dict[str, Any], ConditionExpression: Optional[str] = None,
+                     ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+                     ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+                     ReturnValues: str = 'NONE', ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        item_id = self._key_id(Key)
+        context = _Context(ExpressionAttributeNames, ExpressionAttributeValues)
+        old = self.items.get(item_id)
+        units = self._write_units(item_id, None, 0)
+        self._reserve_or_raise(units)
+        self._check_condition(ConditionExpression, old, context, 'DeleteItem')
+        self._store(item_id, None)
+
+        response = self._consumed(self.name, units, ReturnConsumedCapacity)
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            response['Attributes'] = old
+        return response
+
+    def _get_item(self, Key: Dict[str, Any], ProjectionExpression: Optional[str] = None,
+                  ExpressionAttributeNames: Optional[Dict[str, str]] = None, ConsistentRead: bool = False,
+                  ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        item_id = self._key_id(Key)
+        context = _Context(ExpressionAttributeNames, None)
+        projection = _parse('projection', ProjectionExpression) if ProjectionExpression else None
+        units = {'table': read_units(self.sizes.get(item_id, 0), ConsistentRead)}
+        self._reserve_or_raise(units, 'read')
+
+        response = self._consumed(self.name, units, ReturnConsumedCapacity)
+        item = self.items.get(item_id)
+        if item is not None:
+            response['Item'] = _project(item, projection, context)
+        return response
+
+    def _key_conditions(self, expression: str, context: _Context, index: Optional[_Index]
+                        ) -> Tuple[Any, Optional[Callable[[Any], bool]]]:
+        """Hash key value and range key predicate of a KeyConditionExpression"""
+        hash_key = index.hash_key if index else self.hash_key
+        range_key = index.range_key if index else None
+        nodes, pending = [], [_parse('condition', expression)]
+        while pending:
+            node = pending.pop()
+            if node[0] == 'and':
+                pending.extend(node[1:])
+            else:
+                nodes.append(node)
+
+        hash_value, range_predicate = _MISSING, None
+        for node in nodes:
+            kind = node[0]
+            if kind == 'cmp':
+                target = node[2]
+            elif kind == 'between':
+                target = node[1]
+            else:
+                target = node[2][0] if kind == 'func' else None
+            if target is None or target[0] != 'path' or len(target[1]) != 1:
+                raise _ValidationError("Invalid operator used in KeyConditionExpression")
+            attribute = context.path(target)[0]
+            values = [_operand(operand, {}, context) for operand in
+                      ([node[3]] if kind == 'cmp' else node[2:4] if kind == 'between' else node[2][1:])]
+            for key_value in values:
+                self._check_key_value(attribute, key_value, index.name if index else None)
+            if attribute == hash_key and kind == 'cmp' and node[1] == '=':
+                hash_value = values[0]
+            elif attribute == range_key and range_predicate is None:
+                if kind == 'cmp' and node[1] != '<>':
+                    range_predicate = (lambda candidate, operator=node[1], value=values[0]:
+                                       _compare(operator, candidate, value))
+                elif kind == 'between':
+                    range_predicate = lambda candidate, low=values[0], high=values[1]: low <= candidate <= high
+                elif kind == 'func' and node[1] == 'begins_with':
+                    range_predicate = lambda candidate, prefix=values[0]: candidate.startswith(prefix)
+                else:
+                    raise _ValidationError("Invalid operator used in KeyConditionExpression")
+            else:
+                raise _ValidationError("Query condition missed key schema element")
+        if hash_value is _MISSING:
+            raise _ValidationError(f"Query condition missed key schema element: {hash_key}")
+        return hash_value, range_predicate
+
+    def _index(self, name: Optional[str]) -> Optional[_Index]:
+        if name is None:
+            return None
+        if name not in self.indexes:
+            raise _ValidationError(f"The table does not have the specified index: {name}")
+        return self.indexes[name]
+
+    def _page(self, candidates, index: Optional[_Index], FilterExpression: Optional[str],
+              ProjectionExpression: Optional[str], context: _Context, Limit: Optional[int],
+              Select: Optional[str], ConsistentRead: bool, ReturnConsumedCapacity: Optional[str]
+              ) -> Dict[str, Any]:
+        """Read candidate IDs in order up to Limit items or 1 MB, then filter and project"""
+        if ConsistentRead and index is not None:
+            raise _ValidationError("Consistent reads are not supported on global secondary indexes")
+        bucket = index.read if index is not None else self.read
+        if not bucket.available():
+            bucket.throttled += 1
+            raise _Throttled(self, index=index is not None)
+
+        filter_tree = _parse('condition', FilterExpression) if FilterExpression else None
+        projection = _parse('projection', ProjectionExpression) if ProjectionExpression else None
+        items, scanned, read_bytes, last = [], 0, 0, None
+        more = False
+        for item_id in candidates:
+            if (Limit and scanned >= Limit) or read_bytes >= MAX_PAGE_BYTES:
+                more = True
+                break
+            item = self.items[item_id]
+            scanned += 1
+            read_bytes += self.sizes[item_id]
+            last = item
+            if filter_tree is not None and not _evaluate(filter_tree, item, context):
+                continue
+            items.append(item)
+
+        units = {index if index is not None else 'table': read_units(read_bytes, ConsistentRead)}
+        bucket.consume(sum(units.values()))
+        response = self._consumed(self.name, units, ReturnConsumedCapacity)
+        response.update({'Count': len(items), 'ScannedCount': scanned})
+        if Select != 'COUNT':
+            response['Items'] = [_project(item, projection, context) for item in items]
+        if more and last is not None:
+            key = {self.hash_key: last[self.hash_key]}
+            if index is not None:
+                key[index.hash_key] = last[index.hash_key]
+                if index.range_key:
+                    key[index.range_key] = last[index.range_key]
+            response['LastEvaluatedKey'] = copy.deepcopy(key)
+        return response
+
+    def _query(self, KeyConditionExpression: str, IndexName: Optional[str] = None,
+               FilterExpression: Optional[str] = None, ProjectionExpression: Optional[str] = None,
+               ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+               ExpressionAttributeValues: Optional[Dict[str, Any]] = None, ScanIndexForward: bool = True,
+               Limit: Optional[int] = None, ExclusiveStartKey: Optional[Dict[str, Any]] = None,
+               ConsistentRead: bool = False, Select: Optional[str] = None,
+               ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        if not isinstance(KeyConditionExpression, str):
+            raise NotImplementedError("The in-memory table takes KeyConditionExpression as a string")
+        index = self._index(IndexName)
+        context = _Context(ExpressionAttributeNames, ExpressionAttributeValues)
+        hash_value, range_predicate = self._key_conditions(KeyConditionExpression, context, index)
+
+        if index is None:
+            entries = [('', hash_value)] if hash_value in self.items else []
+        else:
+            entries = index.entries(hash_value)
+        if range_predicate is not None:
+            entries = [entry for entry in entries if range_predicate(entry[0])]
+
+        if ExclusiveStartKey:
+            start = to_dynamo(ExclusiveStartKey)
+            position = (start.get(index.range_key, '') if index and index.range_key else '', start[self.hash_key])
+            if ScanIndexForward:
+                entries = entries[bisect.bisect_right(entries, position):]
+            else:
+                entries = entries[:bisect.bisect_left(entries, position)]
+        if not ScanIndexForward:
+            entries = entries[::-1]
+
+        return self._page((item_id for _, item_id in entries), index, FilterExpression, ProjectionExpression,
+                          context, Limit, Select, ConsistentRead, ReturnConsumedCapacity)
+
+    def _scan(self, IndexName: Optional[str] = None, FilterExpression: Optional[str] = None,
+              ProjectionExpression: Optional[str] = None, ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+              ExpressionAttributeValues: Optional[Dict[str, Any]] = None, Limit: Optional[int] = None,
+              ExclusiveStartKey: Optional[Dict[str, Any]] = None, Segment: Optional[int] = None,
+              TotalSegments: Optional[int] = None, ConsistentRead: bool = False, Select: Optional[str] = None,
+              ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        index = self._index(IndexName)
+        context = _Context(ExpressionAttributeNames, ExpressionAttributeValues)
+        if (Segment is None) != (TotalSegments is None):
+            raise _ValidationError("The TotalSegments parameter is required but was not present in the request "
+                                   "when Segment parameter is present")
+        if TotalSegments is not None and not (0 <= Segment < TotalSegments <= 1000000):
+            raise _ValidationError("The Segment parameter is zero-based and must be less than parameter "
+                                   "TotalSegments")
+
+        # Items are scanned in hash order, like partitions; a segment is a slice of the hash space
+        if self._scan_order is None:
+            self._scan_order = sorted((zlib.crc32(str(item_id).encode('utf-8')), item_id) for item_id in self.items)
+        order = self._scan_order
+        if ExclusiveStartKey:
+            start_id = to_dynamo(ExclusiveStartKey)[self.hash_key]
+            order = order[bisect.bisect_right(order, (zlib.crc32(str(start_id).encode('utf-8')), start_id)):]
+
+        def candidates():
+            for position, item_id in order:
+                if TotalSegments is not None and position % TotalSegments != Segment:
+                    continue
+                if index is not None and index.key_of(self.items[item_id]) is None:
+                    continue
+                yield item_id
+
+        return self._page(candidates(), index, FilterExpression, ProjectionExpression, context, Limit, Select,
+                          ConsistentRead, ReturnConsumedCapacity)
+
+class BatchWriter:
+    """Table.batch_writer(): puts and deletes sent as 25-item BatchWriteItem calls.
+
+    Same behaviour as boto3's BatchWriter: UnprocessedItems go back on the
+    buffer and are resent with the next flush, without backoff; leaving the
+    context flushes until the buffer is empty.
+    """
+    def __init__(self, dynamodb: 'FakeDynamoDB', table_name: str, flush_amount: int = MAX_BATCH_WRITE,
+                 overwrite_by_pkeys: Optional[List[str]] = None):
+        self._dynamodb = dynamodb
+        self._table_name = table_name
+        self._flush_amount = flush_amount
+        self._overwrite_by_pkeys = overwrite_by_pkeys
+        self._items_buffer: List[Dict[str, Any]] = []
+
+    def put_item(self, Item: Dict[str, Any]) -> None:
+        self._add_request({'PutRequest': {'Item': to_dynamo(Item)}})
+
+    def delete_item(self, Key: Dict[str, Any]) -> None:
+        self._add_request({'DeleteRequest': {'Key': to_dynamo(Key)}})
+
+    def _add_request(self, request: Dict[str, Any]) -> None:
+        if self._overwrite_by_pkeys:
+            key = self._request_key(request)
+            self._items_buffer = [existing for existing in self._items_buffer
+                                  if self._request_key(existing) != key]
+        self._items_buffer.append(request)
+        if len(self._items_buffer) >= self._flush_amount:
+            self._flush()
+
+    def _request_key(self, request: Dict[str, Any]) -> Tuple[Any, ...]:
+        values = request['PutRequest']['Item'] if 'PutRequest' in request else request['DeleteRequest']['Key']
+        return tuple(values.get(key) for key in self._overwrite_by_pkeys)
+
+    def _flush(self) -> None:
+        items_to_send = self._items_buffer[:self._flush_amount]
+        self._items_buffer = self._items_buffer[self._flush_amount:]
+        response = self._dynamodb.batch_write_item(RequestItems={self._table_name: items_to_send})
+        unprocessed = response.get('UnprocessedItems') or {}
+        self._items_buffer.extend(unprocessed.get(self._table_name, []))
+
+    def __enter__(self) -> 'BatchWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        while self._items_buffer:
+            self._flush()
+
+class _TableHandle:
+    """What FakeDynamoDB.Table returns: looks the table up on every call, as boto3 does"""
+    def __init__(self, dynamodb: 'FakeDynamoDB', name: str):
+        self._dynamodb = dynamodb
+        self.table_name = self.name = name
+
+    def __getattr__(self, attribute: str) -> Any:
+        with self._dynamodb._lock:
+            table = self._dynamodb._table(self.table_name, 'DescribeTable')
+        return getattr(table, attribute)
+
+    def wait_until_exists(self) -> None:
+        self._dynamodb._table(self.table_name, 'DescribeTable')
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> BatchWriter:
+        return BatchWriter(self._dynamodb, self.table_name, overwrite_by_pkeys=overwrite_by_pkeys)
+
+class _Waiter:
+    def __init__(self, dynamodb: 'FakeDynamoDB', name: str):
+        self._dynamodb = dynamodb
+        self.name = name
+
+    def wait(self, TableName: str, **kwargs) -> None:
+        if self.name == 'table_exists':
+            self._dynamodb._table(TableName, 'DescribeTable')
+
+class _Client:
+    """FakeDynamoDB.meta.client; items are plain Python values, not AttributeValue maps"""
+    def __init__(self, dynamodb: 'FakeDynamoDB'):
+        self._dynamodb = dynamodb
+
+    def describe_table(self, TableName: str) -> Dict[str, Any]:
+        with self._dynamodb._lock:
+            return {'Table': self._dynamodb._table(TableName, 'DescribeTable').describe()}
+
+    def create_table(self, **kwargs) -> Dict[str, Any]:
+        self._dynamodb.create_table(**kwargs)
+        return self.describe_table(kwargs['TableName'])
+
+    def update_table(self, TableName: str, AttributeDefinitions: Optional[List[Dict[str, str]]] = None,
+                     GlobalSecondaryIndexUpdates: Optional[List[Dict[str, Any]]] = None,
+                     BillingMode: Optional[str] = None, ProvisionedThroughput: Optional[Dict[str, Any]] = None,
+                     **kwargs) -> Dict[str, Any]:
+        return self._dynamodb._call('UpdateTable', self._dynamodb._update_table, TableName=TableName,
+                                    AttributeDefinitions=AttributeDefinitions,
+                                    GlobalSecondaryIndexUpdates=GlobalSecondaryIndexUpdates,
+                                    BillingMode=BillingMode, ProvisionedThroughput=ProvisionedThroughput)
+
+    def delete_table(self, TableName: str) -> Dict[str, Any]:
+        with self._dynamodb._lock:
+            table = self._dynamodb._table(TableName, 'DeleteTable')
+            del self._dynamodb.tables[TableName]
+            return {'TableDescription': table.describe()}
+
+    def list_tables(self, **kwargs) -> Dict[str, Any]:
+        return {'TableNames': sorted(self._dynamodb.tables)}
+
+    def get_waiter(self, name: str) -> _Waiter:
+        return _Waiter(self._dynamodb, name)
+
+    def batch_write_item(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb.batch_write_item(**kwargs)
+
+    def batch_get_item(self, **kwargs) -> Dict[str, Any]:
+        return self._dynamodb.batch_get_item(**kwargs)
+
+class _Meta:
+    def __init__(self, client: _Client):
+        self.client = client
+
+class FakeDynamoDB:
+    """In-memory replacement for boto3.resource('dynamodb').
+
+    settings (the "memory" section of the dynamodb config):
+        provisioned      False makes every table on-demand (default True)
+        write_capacity   WCU of every table and GSI, overriding create_table
+        read_capacity    RCU of every table and GSI, overriding create_table
+        burst_seconds    Unused capacity a bucket keeps, in seconds (300)
+        latency          Seconds added to every request
+        clock            'real' (default) or 'simulated'
+        sdk_max_attempts Attempts before a throttle is raised (10)
+    """
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, clock=None):
+        self.settings = dict(settings or {})
+        if clock is None:
+            clock = SimulatedClock() if self.settings.get('clock') == 'simulated' else RealClock()
+        self.clock = clock
+        self.burst_seconds = self.settings.get('burst_seconds', DEFAULT_BURST_SECONDS)
+        self.latency = self.settings.get('latency', 0.0)
+        self.sdk_max_attempts = max(1, self.settings.get('sdk_max_attempts', SDK_MAX_ATTEMPTS))
+        self.tables: Dict[str, FakeTable] = {}
+        self.meta = _Meta(_Client(self))
+        self._lock = threading.RLock()
+
+    def _table(self, name: str, operation: str) -> FakeTable:
+        table = self.tables.get(name)
+        if table is None:
+            raise _client_error('ResourceNotFoundException', f"Requested resource not found: Table: {name} not found",
+                                operation)
+        return table
+
+    def _call(self, operation: str, function: Callable[..., Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Run one request under the lock, retrying throttles the way botocore does"""
+        if self.latency:
+            self.clock.sleep(self.latency)
+        for attempt in range(self.sdk_max_attempts):
+            try:
+                with self._lock:
+                    return function(**kwargs)
+            except _ValidationError as e:
+                raise _client_error('ValidationException', str(e), operation)
+            except _Throttled as throttled:
+                table = throttled.table
+                if attempt + 1 >= self.sdk_max_attempts:
+                    table.counters['failed_requests'] += 1
+                    raise _client_error('ProvisionedThroughputExceededException',
+                                        INDEX_THROUGHPUT_MESSAGE if throttled.index else THROUGHPUT_MESSAGE, operation)
+                delay = SDK_RETRY_BASE * (2 ** attempt)
+                table.counters['sdk_retries'] += 1
+                table.counters['sdk_backoff_seconds'] += delay
+                self.clock.sleep(delay)
+
+    def Table(self, name: str) -> _TableHandle:
+        return _TableHandle(self, name)
+
+    def create_table(self, **kwargs) -> _TableHandle:
+        with self._lock:
+            name = kwargs['TableName']
+            if name in self.tables:
+                raise _client_error('ResourceInUseException', f"Table already exists: {name}", 'CreateTable')
+            try:
+                self.tables[name] = FakeTable(self, kwargs)
+            except _ValidationError as e:
+                raise _client_error('ValidationException', str(e), 'CreateTable')
+        return _TableHandle(self, name)
+
+    def _update_table(self, TableName: str, AttributeDefinitions: Optional[List[Dict[str, str]]],
+                      GlobalSecondaryIndexUpdates: Optional[List[Dict[str, Any]]], BillingMode: Optional[str],
+                      ProvisionedThroughput: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        table = self._table(TableName, 'UpdateTable')
+        for attribute in AttributeDefinitions or []:
+            table.attribute_types[attribute['AttributeName']] = attribute['AttributeType']
+        if BillingMode or ProvisionedThroughput:
+            table.configure(BillingMode or ('PAY_PER_REQUEST' if table.on_demand else 'PROVISIONED'),
+                            ProvisionedThroughput or table.throughput)
+        for update in GlobalSecondaryIndexUpdates or []:
+            if 'Create' in update:
+                table.add_index(update['Create'])
+            elif 'Delete' in update:
+                table.indexes.pop(update['Delete']['IndexName'], None)
+            elif 'Update' in update:
+                index = table._index(update['Update']['IndexName'])
+                index.definition['ProvisionedThroughput'] = update['Update']['ProvisionedThroughput']
+                read_rate, write_rate = table._rates(update['Update']['ProvisionedThroughput'])
+                index.read.set_rate(read_rate)
+                index.write.set_rate(write_rate)
+        return {'TableDescription': table.describe()}
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]],
+                         ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        return self._call('BatchWriteItem', self._batch_write_item, RequestItems=RequestItems)
+
+    def batch_get_item(self, RequestItems: Dict[str, Dict[str, Any]],
+                       ReturnConsumedCapacity: Optional[str] = None) -> Dict[str, Any]:
+        return self._call('BatchGetItem', self._batch_get_item, RequestItems=RequestItems)
+
+    def _batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        total = sum(len(requests) for requests in RequestItems.values())
+        if not total or total > MAX_BATCH_WRITE:
+            raise _ValidationError("Too many items requested for the BatchWriteItem call" if total else
+                                   "1 validation error detected: Value at 'requestItems' failed to satisfy "
+                                   "constraint: Map value must satisfy constraint: Member must have length "
+                                   "greater than or equal to 1")
+
+        # The whole request is validated before anything is written
+        writes = []
+        for table_name, requests in RequestItems.items():
+            table = self._table(table_name, 'BatchWriteItem')
+            seen = set()
+            for request in requests:
+                if 'PutRequest' in request:
+                    item = to_dynamo(request['PutRequest']['Item'])
+                    item_id, size = table._validate_item(item)
+                else:
+                    item, size = None, 0
+                    item_id = table._key_id(request['DeleteRequest']['Key'])
+                if item_id in seen:
+                    raise _ValidationError("Provided list of item keys contains duplicates")
+                seen.add(item_id)
+                writes.append((table, request, item_id, item, size))
+
+        unprocessed: Dict[str, List[Dict[str, Any]]] = {}
+        throttled = None
+        for table, request, item_id, item, size in writes:
+            if not table._reserve(table._write_units(item_id, item, size)):
+                unprocessed.setdefault(table.name, []).append(request)
+                throttled = table
+                continue
+            table._store(item_id, item, size)
+
+        if len(writes) == sum(len(requests) for requests in unprocessed.values()):
+            raise _Throttled(throttled, index=throttled.write.available())
+        for table_name, requests in unprocessed.items():
+            self.tables[table_name].counters['unprocessed_items'] += len(requests)
+        return {'UnprocessedItems': unprocessed}
+
+    def _batch_get_item(self, RequestItems: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        total = sum(len(request.get('Keys', [])) for request in RequestItems.values())
+        if total > MAX_BATCH_GET:
+            raise _ValidationError("Too many items requested for the BatchGetItem call")
+
+        responses: Dict[str, List[Dict[str, Any]]] = {}
+        unprocessed: Dict[str, Dict[str, Any]] = {}
+        processed = 0
+        throttled = None
+        for table_name, request in RequestItems.items():
+            table = self._table(table_name, 'BatchGetItem')
+            context = _Context(request.get('ExpressionAttributeNames'), None)
+            projection = (_parse('projection', request['ProjectionExpression'])
+                          if request.get('ProjectionExpression') else None)
+            item_ids = [table._key_id(key) for key in request['Keys']]
+            if len(set(item_ids)) != len(item_ids):
+                raise _ValidationError("Provided list of item keys contains duplicates")
+
+            found = responses.setdefault(table_name, [])
+            for key, item_id in zip(request['Keys'], item_ids):
+                units = {'table': read_units(self.tables[table_name].sizes.get(item_id, 0),
+                                             request.get('ConsistentRead', False))}
+                if not table._reserve(units, 'read'):
+                    pending = unprocessed.setdefault(table_name, {
+                        name: value for name, value in request.items() if name != 'Keys'})
+                    pending.setdefault('Keys', []).append(key)
+                    throttled = table
+                    continue
+                processed += 1
+                if item_id in table.items:
+                    found.append(_project(table.items[item_id], projection, context))
+
+        if not processed and unprocessed:
+            raise _Throttled(throttled)
+        for table_name, request in unprocessed.items():
+            self.tables[table_name].counters['unprocessed_keys'] += len(request['Keys'])
+        return {'Responses': responses, 'UnprocessedKeys': unprocessed}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """capacity_stats() of every table"""
+        with self._lock:
+            return {name: table.capacity_stats() for name, table in self.tables.items()}
+
+_shared: Optional[FakeDynamoDB] = None
+_shared_lock = threading.Lock()
+
+def resource(settings: Optional[Dict[str, Any]] = None) -> FakeDynamoDB:
+    """The process-wide in-memory DynamoDB, created with `settings` on first use"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FakeDynamoDB(settings)
+        return _shared
+
+def reset() -> None:
+    """Drop the process-wide instance and its tables"""
+    global _shared
+    with _shared_lock:
+        _shared = None
@@ -3,7 +3,8 @@ import json
 import sys
 import boto3
 import requests
-from congress_api import CongressAPI
+from congress_api import CongressAPI, ID_PATTERNS
+from dynamo_handler import DynamoHandler
 from logger_config import setup_logger
 import os
 import time
@@ -102,6 +103,40 @@ def check_dynamodb(config):
             'error': str(e)
         }
 
+def check_item_ids(config, sample_size=25):
+    """Verify the newest stored items of each type follow the client's ID scheme"""
+    try:
+        handler = DynamoHandler(config['dynamodb'], ensure_table=False)
+        checked = 0
+        mismatched = {}
+        for item_type, pattern in ID_PATTERNS.items():
+            response = handler.table.query(
+                IndexName='type-update_date-index',
+                KeyConditionExpression='#type = :type',
+                ExpressionAttributeNames={'#type': 'type'},
+                ExpressionAttributeValues={':type': item_type},
+                ProjectionExpression='id',
+                ScanIndexForward=False,
+                Limit=sample_size
+            )
+            ids = [item['id'] for item in response.get('Items', [])]
+            checked += len(ids)
+            bad = [item_id for item_id in ids if not pattern.fullmatch(item_id)]
+            if bad:
+                logger.error(f"{len(bad)} of {len(ids)} sampled {item_type} IDs do not match {pattern.pattern}")
+                mismatched[item_type] = bad
+        return {
+            'status': 'healthy' if not mismatched else 'unhealthy',
+            'checked': checked,
+            'mismatched': mismatched
+        }
+    except Exception as e:
+        logger.error(f"Item ID check failed: {str(e)}")
+        return {
+            'status': 'unhealthy',
+            'error': str(e)
+        }
+
 def check_environment():
     """Verify required environment variables"""
     required_vars = [
@@ -157,7 +192,8 @@ def main():
         'aws_credentials': check_aws_credentials(),
         'congress_api': check_congress_api(config),
         'congress_api_endpoints': check_congress_api_endpoints(config),
-        'dynamodb': check_dynamodb(config)
+        'dynamodb': check_dynamodb(config),
+        'item_ids': check_item_ids(config)
     }
 
     # Calculate overall status separately
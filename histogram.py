@@ -0,0 +1,158 @@
+"""
+Log-linear latency histograms.
+
+Values are recorded in microseconds into buckets that double in width every
+octave, with SUB_BUCKETS linear buckets per octave, so any percentile is
+within about 6% of the true value. Each histogram is a fixed array of
+counts: memory is constant however many samples are recorded, and
+histograms from different threads or processes merge by adding counts.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Octaves up to 2^36 microseconds (~19 hours); larger values land in the last bucket
+MAX_SHIFT = 32
+NUM_BUCKETS = (MAX_SHIFT + 2) * SUB_BUCKETS
+
+def bucket_index(micros: int) -> int:
+    """Bucket holding a value in microseconds"""
+    if micros < SUB_BUCKETS:
+        return max(micros, 0)
+    shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+    if shift > MAX_SHIFT:
+        return NUM_BUCKETS - 1
+    return ((shift + 1) << SUB_BUCKET_BITS) + ((micros >> shift) & (SUB_BUCKETS - 1))
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """[lower, upper) range of a bucket in microseconds"""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    sub = index & (SUB_BUCKETS - 1)
+    return (SUB_BUCKETS + sub) << shift, (SUB_BUCKETS + sub + 1) << shift
+
+class LatencyHistogram:
+    """Mergeable histogram of durations in seconds"""
+    __slots__ = ('counts', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.counts: List[int] = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+
+    def record(self, seconds: float) -> None:
+        self.counts[bucket_index(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        if self.minimum is None or seconds < self.minimum:
+            self.minimum = seconds
+        if self.maximum is None or seconds > self.maximum:
+            self.maximum = seconds
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Add another histogram's samples to this one"""
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None and (self.minimum is None or other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if other.maximum is not None and (self.maximum is None or other.maximum > self.maximum):
+            self.maximum = other.maximum
+        return self
+
+    def copy(self) -> 'LatencyHistogram':
+        return LatencyHistogram().merge(self)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Approximate percentile in seconds (None when empty)"""
+        return self.percentiles((percent,))[0]
+
+    def percentiles(self, percents: Iterable[float] = (50, 95, 99)) -> List[Optional[float]]:
+        """Several percentiles in one pass over the buckets"""
+        percents = list(percents)
+        if not self.count:
+            return [None] * len(percents)
+
+        ranks = sorted((max(1, -(-self.count * percent // 100)), position)
+                       for position, percent in enumerate(percents))
+        results: List[Optional[float]] = [None] * len(percents)
+        seen = 0
+        next_rank = 0
+        for index, value in enumerate(self.counts):
+            if not value:
+                continue
+            seen += value
+            while next_rank < len(ranks) and ranks[next_rank][0] <= seen:
+                lower, upper = bucket_bounds(index)
+                # Bucket midpoint, clamped to the observed range
+                estimate = (lower + upper) / 2 / 1_000_000
+                results[ranks[next_rank][1]] = min(max(estimate, self.minimum), self.maximum)
+                next_rank += 1
+            if next_rank == len(ranks):
+                break
+        return results
+
+    def cumulative_counts(self, bounds: Iterable[float]) -> List[int]:
+        """Samples at or below each bound (seconds), by bucket midpoint"""
+        results = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while index < NUM_BUCKETS:
+                lower, upper = bucket_bounds(index)
+                if (lower + upper) / 2 > limit:
+                    break
+                seen += self.counts[index]
+                index += 1
+            results.append(seen)
+        return results
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> Dict[str, object]:
+        """Compact form (non-empty buckets only) for shipping between processes"""
+        return {
+            'buckets': {str(index): value for index, value in enumerate(self.counts) if value},
+            'count': self.count,
+            'sum': self.total,
+            'min': self.minimum,
+            'max': self.maximum
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> 'LatencyHistogram':
+        histogram = cls()
+        for index, value in data.get('buckets', {}).items():
+            histogram.counts[int(index)] = value
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('sum', 0.0)
+        histogram.minimum = data.get('min')
+        histogram.maximum = data.get('max')
+        return histogram
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Count, mean, max and p50/p95/p99 in milliseconds"""
+        p50, p95, p99 = self.percentiles((50, 95, 99))
+
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.mean()),
+            'p50_ms': ms(p50),
+            'p95_ms': ms(p95),
+            'p99_ms': ms(p99),
+            'max_ms': ms(self.maximum)
+        }
+
+def format_ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1000:.1f}ms" if seconds is not None else '-'
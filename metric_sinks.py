@@ -0,0 +1,206 @@
+"""
+Destinations for the metrics published by MetricsCollector.
+
+The publisher thread hands each sink a batch of per-minute aggregates (one
+per metric, dimension set and minute). Sinks are picked by name from the
+`metrics` section of config.json or the METRICS_SINK environment variable:
+
+    cloudwatch  PutMetricData with StatisticSets
+    emf         CloudWatch Embedded Metric Format lines on stdout or a file
+    jsonl       one JSON line per aggregate in a local file
+    null        discard everything (the publisher thread is never started)
+"""
+import os
+import sys
+import abc
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# PutMetricData accepts up to 1000 metrics per request
+MAX_METRIC_DATA_PER_CALL = 1000
+# EMF allows at most 100 metrics per document and 100 values per metric
+EMF_MAX_METRICS = 100
+EMF_MAX_VALUES = 100
+
+class MetricSink(abc.ABC):
+    """Receives aggregates from the publisher thread"""
+    # Whether aggregates should carry (a sample of) the raw values
+    keeps_values = False
+
+    @abc.abstractmethod
+    def send(self, namespace: str, aggregates: List[Dict[str, Any]]) -> None:
+        """Deliver one batch of per-minute aggregates"""
+
+    def close(self) -> None:
+        pass
+
+class NullSink(MetricSink):
+    def send(self, namespace: str, aggregates: List[Dict[str, Any]]) -> None:
+        pass
+
+class CloudWatchSink(MetricSink):
+    """PutMetricData with StatisticSets; the client is created on the first send"""
+    # Consecutive failed calls before the sink gives up for the rest of the process
+    MAX_FAILURES = 3
+
+    def __init__(self, region: str):
+        self.region = region
+        self.client = None
+        self.failures = 0
+        self.logger = logging.getLogger('congress_downloader')
+
+    def send(self, namespace: str, aggregates: List[Dict[str, Any]]) -> None:
+        if self.failures >= self.MAX_FAILURES or not aggregates:
+            return
+        if self.client is None:
+            import boto3
+            self.client = boto3.client('cloudwatch', region_name=self.region)
+
+        metric_data = []
+        for aggregate in aggregates:
+            datum = {
+                'MetricName': aggregate['name'],
+                'Unit': aggregate['unit'],
+                'Timestamp': datetime.fromtimestamp(aggregate['timestamp'], timezone.utc),
+                'StatisticValues': {
+                    'SampleCount': aggregate['count'],
+                    'Sum': aggregate['sum'],
+                    'Minimum': aggregate['min'],
+                    'Maximum': aggregate['max']
+                }
+            }
+            if aggregate['dimensions']:
+                datum['Dimensions'] = [{'Name': k, 'Value': v} for k, v in aggregate['dimensions']]
+            metric_data.append(datum)
+
+        for start in range(0, len(metric_data), MAX_METRIC_DATA_PER_CALL):
+            try:
+                self.client.put_metric_data(Namespace=namespace,
+                                            MetricData=metric_data[start:start + MAX_METRIC_DATA_PER_CALL])
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                if self.failures >= self.MAX_FAILURES:
+                    self.logger.info(f"CloudWatch metrics disabled: {str(e)}")
+                    return
+                self.logger.debug(f"Failed to send metrics to CloudWatch: {str(e)}")
+
+class EMFSink(MetricSink):
+    """Embedded Metric Format documents, extracted into metrics by CloudWatch Logs.
+
+    Count metrics are written as their per-minute sum. Other metrics are
+    written as value arrays so CloudWatch can compute percentiles; past the
+    publisher's per-minute sample cap those arrays are a uniform sample.
+    """
+    keeps_values = True
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._file = None
+
+    def _stream(self):
+        if not self.path:
+            return sys.stdout
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def send(self, namespace: str, aggregates: List[Dict[str, Any]]) -> None:
+        # One document per dimension set and minute, holding all its metrics
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for aggregate in aggregates:
+            groups.setdefault((aggregate['dimensions'], aggregate['timestamp']), []).append(aggregate)
+
+        stream = self._stream()
+        for (dimensions, timestamp), members in groups.items():
+            series = []
+            for aggregate in members:
+                if aggregate['unit'] == 'Count' or not aggregate.get('values'):
+                    values = [aggregate['sum'] if aggregate['unit'] == 'Count' else aggregate['sum'] / aggregate['count']]
+                else:
+                    values = aggregate['values']
+                series.append((aggregate['name'], aggregate['unit'], values))
+
+            rounds = max(-(-len(values) // EMF_MAX_VALUES) for _, _, values in series)
+            for round_index in range(rounds):
+                chunk = [(name, unit, values[round_index * EMF_MAX_VALUES:(round_index + 1) * EMF_MAX_VALUES])
+                         for name, unit, values in series]
+                chunk = [entry for entry in chunk if entry[2]]
+                for start in range(0, len(chunk), EMF_MAX_METRICS):
+                    stream.write(self._document(namespace, dimensions, timestamp,
+                                                chunk[start:start + EMF_MAX_METRICS]) + '\n')
+        stream.flush()
+
+    @staticmethod
+    def _document(namespace, dimensions, timestamp, series) -> str:
+        document = {
+            '_aws': {
+                'Timestamp': int(timestamp * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': namespace,
+                    'Dimensions': [[name for name, _ in dimensions]],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, unit, _ in series]
+                }]
+            }
+        }
+        document.update(dict(dimensions))
+        for name, _, values in series:
+            document[name] = values[0] if len(values) == 1 else values
+        return json.dumps(document, separators=(',', ':'))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class JsonlSink(MetricSink):
+    """Aggregates appended to a local file, for runs without AWS access"""
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def send(self, namespace: str, aggregates: List[Dict[str, Any]]) -> None:
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        for aggregate in aggregates:
+            self._file.write(json.dumps({
+                'namespace': namespace,
+                'timestamp': datetime.fromtimestamp(aggregate['timestamp'], timezone.utc).isoformat(),
+                'name': aggregate['name'],
+                'unit': aggregate['unit'],
+                'dimensions': dict(aggregate['dimensions']),
+                'count': aggregate['count'],
+                'sum': aggregate['sum'],
+                'min': aggregate['min'],
+                'max': aggregate['max']
+            }) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def create_sink(config: Dict[str, Any]) -> MetricSink:
+    """Sink named by METRICS_SINK or config['sink']"""
+    name = os.environ.get('METRICS_SINK') or config.get('sink')
+    if not name:
+        name = 'cloudwatch' if config.get('enable_cloudwatch', True) else 'null'
+
+    if name == 'cloudwatch':
+        return CloudWatchSink(config.get('region') or os.environ.get('AWS_DEFAULT_REGION', 'us-west-2'))
+    if name == 'emf':
+        return EMFSink(config.get('path'))
+    if name == 'jsonl':
+        return JsonlSink(config.get('path', 'logs/metrics.jsonl'))
+    if name == 'null':
+        return NullSink()
+    raise ValueError(f"Unknown metrics sink: {name}")
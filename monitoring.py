@@ -1,84 +1,221 @@
+"""
+Process-wide metrics: counters and latency histograms for the reports and
+/metrics, plus samples published in the background to a configurable sink
+(see metric_sinks.py).
+
+Importing this module does no I/O. The sink is chosen when the first sample
+is recorded, from configure() or else the `metrics` section of config.json.
+"""
+import os
+import json
 import time
-import psutil
+import queue
+import random
+import atexit
 import logging
-import boto3
-from datetime import datetime, timezone
+import threading
+from contextlib import contextmanager
 from functools import wraps
 from typing import Dict, Any, Callable, List, Optional
 
+from histogram import LatencyHistogram, format_ms
+from prometheus import Exposition, CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE
+
+# Ingestion pipeline stages, in pipeline order (see MetricsCollector.stage)
+STAGES = ('rate_limit', 'http', 'json_decode', 'transform', 'validate', 'dynamo_write')
+
+# Raw values kept per metric, dimension set and minute for sinks that want
+# them (EMF); beyond this a uniform sample is kept
+MAX_VALUES_PER_AGGREGATE = 1000
+
+class StageSpan:
+    """Handle yielded by MetricsCollector.stage(); set items to the number of items handled"""
+    __slots__ = ('items',)
+
+    def __init__(self, items: int = 0):
+        self.items = items
+
 class MetricsCollector:
-    def __init__(self, service_name: str, region: str = 'us-west-2'):
+    def __init__(self, service_name: str, flush_interval: float = 60, max_queue_size: int = 100000):
         self.service_name = service_name
         self.logger = logging.getLogger('congress_downloader')
-        self.cloudwatch_enabled = False
         self.request_start_times: Dict[str, float] = {}
 
-        # Enhanced statistics tracking
+        # Enhanced statistics tracking; updated from every worker thread
         self.endpoint_stats: Dict[str, Dict[str, Any]] = {}
         self.ingestion_stats: Dict[str, Dict[str, Any]] = {}
         self.session_start_time = time.time()
-
+        self._stats_lock = threading.Lock()
+
+        # Latency distributions per API endpoint and per DynamoDB operation
+        self.endpoint_latency: Dict[str, LatencyHistogram] = {}
+        self.dynamo_latency: Dict[str, LatencyHistogram] = {}
+        self.dynamo_failures: Dict[str, int] = {}
+
+        # Time and items per (stage, endpoint) of the ingestion pipeline:
+        # [calls, items, seconds, LatencyHistogram]
+        self.stage_stats: Dict[tuple, list] = {}
+        # (stage, endpoint) each thread is currently in, by thread ident
+        self.active_stages: Dict[int, tuple] = {}
+
+        # Point-in-time values set by the application (e.g. work still queued)
+        self.gauges: Dict[str, float] = {}
+
+        # Samples are queued for a background publisher thread, which
+        # aggregates them per minute and hands them to the sink, so recording
+        # a metric never waits on the network
+        self.config: Optional[Dict[str, Any]] = None
+        self.namespace = f'CongressDownloader/{service_name}'
+        self.sink = None
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._publisher: Optional[threading.Thread] = None
+        self._publisher_lock = threading.Lock()
+        self._disabled = False
+        self.dropped_samples = 0
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """Apply the `metrics` config section. Call before the first metric is recorded."""
+        with self._publisher_lock:
+            if self._publisher is not None or self.sink is not None:
+                self.logger.warning("Metrics are already being published; configuration ignored")
+                return
+            self.config = dict(config)
+            self.service_name = config.get('service_name', self.service_name)
+            self.namespace = config.get('namespace', f'CongressDownloader/{self.service_name}')
+            self.flush_interval = config.get('flush_interval', self.flush_interval)
+            if 'max_queue_size' in config:
+                self._queue = queue.Queue(maxsize=config['max_queue_size'])
+
+    def _load_config(self) -> Dict[str, Any]:
+        """The `metrics` section of config.json, if there is one"""
         try:
-            self.cloudwatch = boto3.client('cloudwatch', region_name=region)
-            # Test CloudWatch permissions
-            self.cloudwatch.put_metric_data(
-                Namespace=f'CongressDownloader/{self.service_name}',
-                MetricData=[{
-                    'MetricName': 'startup_test',
-                    'Value': 1.0,
-                    'Unit': 'Count'
-                }]
-            )
-            self.cloudwatch_enabled = True
-            self.metrics_buffer = []
-            self.buffer_size = 20  # Batch size for CloudWatch metrics
-        except Exception as e:
-            self.logger.info(f"CloudWatch metrics disabled: {str(e)}")
-            self.cloudwatch = None
-            self.metrics_buffer = []
+            with open(os.environ.get('METRICS_CONFIG', 'config.json'), 'r') as f:
+                return json.load(f).get('metrics', {})
+        except (OSError, ValueError):
+            return {}
+
+    def _start_publisher(self) -> None:
+        if self.config is None:
+            self.configure(self._load_config())
+        with self._publisher_lock:
+            if self._publisher is not None or self._disabled:
+                return
+            from metric_sinks import create_sink, NullSink
+            try:
+                self.sink = create_sink(self.config)
+            except ValueError as e:
+                self.logger.error(f"Metrics disabled: {str(e)}")
+                self.sink = NullSink()
+            if isinstance(self.sink, NullSink):
+                self._disabled = True
+                return
+            self._publisher = threading.Thread(target=self._publish_loop, name='metrics-publisher', daemon=True)
+            self._publisher.start()
+            atexit.register(self.close)
 
     def _put_metric(self, name: str, value: float, unit: str, dimensions: Optional[Dict[str, str]] = None):
-        """Send metric to CloudWatch with buffering"""
-        if not self.cloudwatch_enabled:
+        """Queue a metric sample for the publisher thread"""
+        if self._disabled:
             return
+        if self._publisher is None:
+            self._start_publisher()
+            if self._disabled:
+                return
 
+        sample = (name, unit, tuple(sorted(dimensions.items())) if dimensions else (), value, time.time())
         try:
-            timestamp = datetime.now(timezone.utc)
-            metric_data = {
-                'MetricName': name,
-                'Value': value,
-                'Unit': unit,
-                'Timestamp': timestamp
-            }
-
-            if dimensions:
-                metric_data['Dimensions'] = [
-                    {'Name': k, 'Value': v} for k, v in dimensions.items()
-                ]
-
-            self.metrics_buffer.append(metric_data)
-
-            # Flush buffer if it reaches the threshold
-            if len(self.metrics_buffer) >= self.buffer_size:
-                self.flush_metrics()
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            # Never block the caller; losing samples beats stalling ingestion
+            self.dropped_samples += 1
+
+    def _publish_loop(self) -> None:
+        """Aggregate queued samples per metric, dimensions and minute and send them periodically"""
+        keeps_values = self.sink.keeps_values
+        # (name, unit, dimensions, minute) -> [count, sum, min, max, values]
+        aggregates: Dict[tuple, list] = {}
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                sample = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                sample = None
+
+            if isinstance(sample, threading.Event):
+                # flush_metrics() is waiting for everything queued before it
+                self._send_aggregates(aggregates)
+                aggregates = {}
+                sample.set()
+                continue
+
+            if sample is not None:
+                name, unit, dimensions, value, timestamp = sample
+                key = (name, unit, dimensions, int(timestamp // 60))
+                stats = aggregates.get(key)
+                if stats is None:
+                    aggregates[key] = [1, value, value, value, [value] if keeps_values else None]
+                else:
+                    stats[0] += 1
+                    stats[1] += value
+                    if value < stats[2]:
+                        stats[2] = value
+                    if value > stats[3]:
+                        stats[3] = value
+                    if keeps_values:
+                        # Reservoir sampling keeps a uniform sample of the minute's values
+                        if len(stats[4]) < MAX_VALUES_PER_AGGREGATE:
+                            stats[4].append(value)
+                        else:
+                            slot = random.randrange(stats[0])
+                            if slot < MAX_VALUES_PER_AGGREGATE:
+                                stats[4][slot] = value
+
+            if time.monotonic() >= next_flush:
+                self._send_aggregates(aggregates)
+                aggregates = {}
+                next_flush = time.monotonic() + self.flush_interval
+
+    def _send_aggregates(self, aggregates: Dict[tuple, list]) -> None:
+        if not aggregates:
+            return
+        batch = [{
+            'name': name,
+            'unit': unit,
+            'dimensions': dimensions,
+            'timestamp': minute * 60,
+            'count': count,
+            'sum': total,
+            'min': minimum,
+            'max': maximum,
+            'values': values
+        } for (name, unit, dimensions, minute), (count, total, minimum, maximum, values) in aggregates.items()]
+        try:
+            self.sink.send(self.namespace, batch)
         except Exception as e:
-            if not str(e).startswith('CloudWatch metrics disabled'):
-                self.logger.debug(f"Failed to buffer metric {name}: {str(e)}")
+            self.logger.debug(f"Failed to publish metrics: {str(e)}")
 
-    def flush_metrics(self):
-        """Flush buffered metrics to CloudWatch"""
-        if not self.cloudwatch_enabled or not self.metrics_buffer:
+    def flush_metrics(self, timeout: float = 10):
+        """Send everything recorded so far and wait for the publisher to finish"""
+        if self._publisher is None or not self._publisher.is_alive():
             return
 
+        done = threading.Event()
         try:
-            self.cloudwatch.put_metric_data(
-                Namespace=f'CongressDownloader/{self.service_name}',
-                MetricData=self.metrics_buffer
-            )
-            self.metrics_buffer.clear()
-        except Exception as e:
-            if not str(e).startswith('CloudWatch metrics disabled'):
-                self.logger.debug(f"Failed to send metrics to CloudWatch: {str(e)}")
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        if not done.wait(timeout):
+            self.logger.debug("Timed out waiting for metrics to be sent")
+        if self.dropped_samples:
+            self.logger.warning(f"Dropped {self.dropped_samples} metric samples because the queue was full")
+            self.dropped_samples = 0
+
+    def close(self) -> None:
+        """Flush and release the sink (runs at exit)"""
+        self.flush_metrics()
+        if self.sink is not None:
+            self.sink.close()
 
     def track_duration(self, operation: str):
         """Decorator to track operation duration"""
@@ -109,7 +246,8 @@ class MetricsCollector:
 
     def track_api_request_start(self, endpoint: str):
         """Track the start of an API request"""
-        self.request_start_times[endpoint] = time.time()
+        with self._stats_lock:
+            self.request_start_times[endpoint] = time.time()
         self._put_metric(
             'api_requests_initiated',
             1,
@@ -117,22 +255,23 @@ class MetricsCollector:
             {'Endpoint': endpoint}
         )
 
-        # Initialize endpoint stats if not exists
-        if endpoint not in self.endpoint_stats:
-            self.endpoint_stats[endpoint] = {
-                'requests': 0,
-                'success': 0,
-                'failures': 0,
-                'timeouts': 0,
-                'rate_limit_hits': 0,
-                'total_duration': 0,
-                'wait_time': 0,
-                'first_request': time.time(),
-                'last_request': time.time()
-            }
-
-        self.endpoint_stats[endpoint]['requests'] += 1
-        self.endpoint_stats[endpoint]['last_request'] = time.time()
+        with self._stats_lock:
+            # Initialize endpoint stats if not exists
+            if endpoint not in self.endpoint_stats:
+                self.endpoint_stats[endpoint] = {
+                    'requests': 0,
+                    'success': 0,
+                    'failures': 0,
+                    'timeouts': 0,
+                    'rate_limit_hits': 0,
+                    'total_duration': 0,
+                    'wait_time': 0,
+                    'first_request': time.time(),
+                    'last_request': time.time()
+                }
+
+            self.endpoint_stats[endpoint]['requests'] += 1
+            self.endpoint_stats[endpoint]['last_request'] = time.time()
 
     def track_api_request(self, endpoint: str, status_code: int, duration: float):
         """Track API request metrics with enhanced monitoring"""
@@ -146,13 +285,15 @@ class MetricsCollector:
 
         # Track request count
         self._put_metric('api_requests', 1, 'Count', dimensions)
+        self._record_latency(self.endpoint_latency, endpoint, duration)
 
         # Track success/failure and update endpoint stats
         if 200 <= status_code < 300:
             self._put_metric('api_request_success', 1, 'Count', dimensions)
-            if endpoint in self.endpoint_stats:
-                self.endpoint_stats[endpoint]['success'] += 1
-                self.endpoint_stats[endpoint]['total_duration'] += duration
+            with self._stats_lock:
+                if endpoint in self.endpoint_stats:
+                    self.endpoint_stats[endpoint]['success'] += 1
+                    self.endpoint_stats[endpoint]['total_duration'] += duration
         else:
             self._put_metric('api_request_failure', 1, 'Count', dimensions)
             error_type = 'rate_limit' if status_code == 429 else 'other'
@@ -163,12 +304,13 @@ class MetricsCollector:
                 {**dimensions, 'ErrorType': error_type}
             )
 
-            if endpoint in self.endpoint_stats:
-                self.endpoint_stats[endpoint]['failures'] += 1
-                if status_code == 429:
-                    self.endpoint_stats[endpoint]['rate_limit_hits'] += 1
-                elif status_code == 408:
-                    self.endpoint_stats[endpoint]['timeouts'] += 1
+            with self._stats_lock:
+                if endpoint in self.endpoint_stats:
+                    self.endpoint_stats[endpoint]['failures'] += 1
+                    if status_code == 429:
+                        self.endpoint_stats[endpoint]['rate_limit_hits'] += 1
+                    elif status_code == 408:
+                        self.endpoint_stats[endpoint]['timeouts'] += 1
 
     def track_rate_limit_wait(self, endpoint: str, wait_time: float):
         """Track rate limit wait times"""
@@ -177,8 +319,9 @@ class MetricsCollector:
         self._put_metric('rate_limit_waits', 1, 'Count', dimensions)
 
         # Update endpoint stats
-        if endpoint in self.endpoint_stats:
-            self.endpoint_stats[endpoint]['wait_time'] += wait_time
+        with self._stats_lock:
+            if endpoint in self.endpoint_stats:
+                self.endpoint_stats[endpoint]['wait_time'] += wait_time
 
     def track_dynamo_operation(self, operation: str, table: str, success: bool, duration: float):
         """Track DynamoDB operation metrics"""
@@ -190,26 +333,164 @@ class MetricsCollector:
 
         self._put_metric('dynamo_operation_duration', duration, 'Seconds', dimensions)
         self._put_metric('dynamo_operations', 1, 'Count', dimensions)
+        self._record_latency(self.dynamo_latency, operation, duration)
+        if not success:
+            with self._stats_lock:
+                self.dynamo_failures[operation] = self.dynamo_failures.get(operation, 0) + 1
+
+    @contextmanager
+    def stage(self, stage: str, endpoint: str, items: int = 0):
+        """Time a block as one call of a pipeline stage for an endpoint"""
+        span = StageSpan(items)
+        with self.stage_tag(stage, endpoint):
+            start = time.perf_counter()
+            try:
+                yield span
+            finally:
+                self.record_stage(stage, endpoint, time.perf_counter() - start, span.items)
+
+    @contextmanager
+    def stage_tag(self, stage: str, endpoint: str):
+        """Mark the calling thread as working in a stage, without timing it.
+
+        The profiler reads these marks to tag its samples by endpoint and stage.
+        """
+        ident = threading.get_ident()
+        previous = self.active_stages.get(ident)
+        self.active_stages[ident] = (stage, endpoint)
+        try:
+            yield
+        finally:
+            if previous is None:
+                self.active_stages.pop(ident, None)
+            else:
+                self.active_stages[ident] = previous
+
+    def record_stage(self, stage: str, endpoint: str, seconds: float, items: int = 0) -> None:
+        """Add time spent in a stage (for callers that time a whole loop themselves)"""
+        with self._stats_lock:
+            stats = self.stage_stats.get((stage, endpoint))
+            if stats is None:
+                stats = self.stage_stats[(stage, endpoint)] = [0, 0, 0.0, LatencyHistogram()]
+            stats[0] += 1
+            stats[1] += items
+            stats[2] += seconds
+            stats[3].record(seconds)
+
+    def _stage_snapshot(self) -> Dict[tuple, list]:
+        with self._stats_lock:
+            return {key: [calls, items, seconds, histogram.copy()]
+                    for key, (calls, items, seconds, histogram) in self.stage_stats.items()}
+
+    @staticmethod
+    def _stage_order(stage: str) -> int:
+        return STAGES.index(stage) if stage in STAGES else len(STAGES)
+
+    def generate_stage_report(self) -> str:
+        """Time, items and throughput per pipeline stage and endpoint"""
+        snapshot = self._stage_snapshot()
+        totals: Dict[str, list] = {}
+        for (stage, _), (calls, items, seconds, _) in snapshot.items():
+            total = totals.setdefault(stage, [0, 0, 0.0])
+            total[0] += calls
+            total[1] += items
+            total[2] += seconds
+        all_seconds = sum(total[2] for total in totals.values()) or 1.0
+
+        lines = ["PIPELINE STAGES", "-" * 80]
+        lines.append(f"{'Stage':<14} {'Endpoint':<22} {'Calls':<8} {'Items':<9} {'Time':<11} {'Share':<8} {'Items/s':<10} {'p95':<10}")
+        lines.append("-" * 80)
+        for stage in sorted(totals, key=self._stage_order):
+            calls, items, seconds = totals[stage]
+            rate = f"{items / seconds:.1f}" if seconds > 0 else '-'
+            lines.append(f"{stage:<14} {'(all)':<22} {calls:<8} {items:<9} {seconds:<11.3f} "
+                         f"{seconds / all_seconds * 100:<8.1f} {rate:<10}")
+            for (key_stage, endpoint), (calls, items, seconds, histogram) in sorted(snapshot.items()):
+                if key_stage != stage:
+                    continue
+                rate = f"{items / seconds:.1f}" if seconds > 0 else '-'
+                lines.append(f"{'':<14} {endpoint:<22} {calls:<8} {items:<9} {seconds:<11.3f} "
+                             f"{seconds / all_seconds * 100:<8.1f} {rate:<10} {format_ms(histogram.percentile(95)):<10}")
+
+        with self._stats_lock:
+            gauges = dict(self.gauges)
+        if gauges:
+            lines.append("")
+            lines.append("Queue depths: " + ", ".join(f"{name}={value:g}" for name, value in sorted(gauges.items())))
+        return "\n".join(lines)
+
+    def stage_summary_line(self) -> str:
+        """One-line live view: seconds and items/s per stage, plus queue depths"""
+        totals: Dict[str, list] = {}
+        for (stage, _), (_, items, seconds, _) in self._stage_snapshot().items():
+            total = totals.setdefault(stage, [0, 0.0])
+            total[0] += items
+            total[1] += seconds
+        parts = []
+        for stage in sorted(totals, key=self._stage_order):
+            items, seconds = totals[stage]
+            rate = items / seconds if seconds > 0 else 0
+            parts.append(f"{stage} {seconds:.1f}s {rate:.0f}/s")
+        with self._stats_lock:
+            gauges = dict(self.gauges)
+        parts.extend(f"{name}={value:g}" for name, value in sorted(gauges.items()))
+        parts.append(f"metrics_queue={self._queue.qsize()}")
+        return " | ".join(parts)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._stats_lock:
+            self.gauges[name] = value
+
+    def adjust_gauge(self, name: str, delta: float) -> None:
+        with self._stats_lock:
+            self.gauges[name] = self.gauges.get(name, 0) + delta
+
+    def _record_latency(self, histograms: Dict[str, LatencyHistogram], key: str, duration: float) -> None:
+        with self._stats_lock:
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = LatencyHistogram()
+            histogram.record(duration)
+
+    def latency_snapshot(self) -> Dict[str, Dict[str, LatencyHistogram]]:
+        """Copies of the latency histograms, safe to read while recording continues"""
+        with self._stats_lock:
+            return {
+                'endpoints': {key: histogram.copy() for key, histogram in self.endpoint_latency.items()},
+                'dynamo_operations': {key: histogram.copy() for key, histogram in self.dynamo_latency.items()}
+            }
+
+    @staticmethod
+    def _latency_lines(title: str, histograms: Dict[str, LatencyHistogram]) -> List[str]:
+        lines = [title, "-" * 80]
+        lines.append(f"{'Name':<25} {'Count':<10} {'p50':<12} {'p95':<12} {'p99':<12} {'Max':<12}")
+        lines.append("-" * 80)
+        for name, histogram in sorted(histograms.items()):
+            p50, p95, p99 = histogram.percentiles((50, 95, 99))
+            lines.append(f"{name:<25} {histogram.count:<10} {format_ms(p50):<12} {format_ms(p95):<12} "
+                         f"{format_ms(p99):<12} {format_ms(histogram.maximum):<12}")
+        return lines
 
     def track_items_processed(self, endpoint: str, total: int, success: int = 0, failed: int = 0, duplicates: int = 0):
         """Track number of items processed per endpoint"""
-        # Initialize ingestion stats for endpoint if not exists
-        if endpoint not in self.ingestion_stats:
-            self.ingestion_stats[endpoint] = {
-                'total_processed': 0,
-                'successful': 0,
-                'failed': 0,
-                'duplicates': 0,
-                'last_updated': time.time()
-            }
-
-        # Update stats
-        stats = self.ingestion_stats[endpoint]
-        stats['total_processed'] += total
-        stats['successful'] += success
-        stats['failed'] += failed
-        stats['duplicates'] += duplicates
-        stats['last_updated'] = time.time()
+        with self._stats_lock:
+            # Initialize ingestion stats for endpoint if not exists
+            if endpoint not in self.ingestion_stats:
+                self.ingestion_stats[endpoint] = {
+                    'total_processed': 0,
+                    'successful': 0,
+                    'failed': 0,
+                    'duplicates': 0,
+                    'last_updated': time.time()
+                }
+
+            # Update stats
+            stats = self.ingestion_stats[endpoint]
+            stats['total_processed'] += total
+            stats['successful'] += success
+            stats['failed'] += failed
+            stats['duplicates'] += duplicates
+            stats['last_updated'] = time.time()
 
         # Send metrics
         status = 'Successful' if success else 'Failed'
@@ -231,6 +512,8 @@ class MetricsCollector:
     def track_resource_usage(self):
         """Track system resource usage"""
         try:
+            import psutil
+
             # Memory usage
             memory = psutil.Process().memory_info()
             self._put_metric('memory_usage', memory.rss / 1024 / 1024, 'Megabytes')
@@ -247,6 +530,89 @@ class MetricsCollector:
         except Exception as e:
             self.logger.debug(f"Failed to collect resource metrics: {str(e)}")
 
+    def render_prometheus(self) -> str:
+        """Counters, gauges and latency histograms in Prometheus text format"""
+        with self._stats_lock:
+            endpoint_stats = {endpoint: dict(stats) for endpoint, stats in self.endpoint_stats.items()}
+            ingestion_stats = {endpoint: dict(stats) for endpoint, stats in self.ingestion_stats.items()}
+            dynamo_failures = dict(self.dynamo_failures)
+            gauges = dict(self.gauges)
+        latency = self.latency_snapshot()
+
+        exposition = Exposition('congress_')
+        exposition.counter('api_requests_total', 'Congress.gov API requests started',
+                           [({'endpoint': e}, s['requests']) for e, s in sorted(endpoint_stats.items())])
+        exposition.counter('api_request_failures_total', 'Congress.gov API requests that failed',
+                           [({'endpoint': e}, s['failures']) for e, s in sorted(endpoint_stats.items())])
+        exposition.counter('api_rate_limit_hits_total', 'Congress.gov API responses with status 429',
+                           [({'endpoint': e}, s['rate_limit_hits']) for e, s in sorted(endpoint_stats.items())])
+        exposition.counter('rate_limit_wait_seconds_total', 'Time spent waiting on the rate limiter',
+                           [({'endpoint': e}, s['wait_time']) for e, s in sorted(endpoint_stats.items())])
+        exposition.histogram('api_request_duration_seconds', 'Congress.gov API request latency',
+                             [({'endpoint': e}, h) for e, h in sorted(latency['endpoints'].items())])
+
+        for field, name, help_text in (('total_processed', 'processed', 'Items retrieved for ingestion'),
+                                       ('successful', 'stored', 'Items stored'),
+                                       ('failed', 'failed', 'Items that failed to store'),
+                                       ('duplicates', 'duplicates', 'Duplicate items skipped')):
+            exposition.counter(f'items_{name}_total', help_text,
+                               [({'type': e}, s[field]) for e, s in sorted(ingestion_stats.items())])
+
+        exposition.histogram('dynamo_operation_duration_seconds', 'DynamoDB operation latency',
+                             [({'operation': o}, h) for o, h in sorted(latency['dynamo_operations'].items())])
+        exposition.counter('dynamo_operation_failures_total', 'DynamoDB operations that failed',
+                           [({'operation': o}, count) for o, count in sorted(dynamo_failures.items())])
+
+        stages = self._stage_snapshot()
+        exposition.counter('stage_seconds_total', 'Time spent in each ingestion pipeline stage',
+                           [({'stage': stage, 'endpoint': endpoint}, round(stats[2], 6))
+                            for (stage, endpoint), stats in sorted(stages.items())])
+        exposition.counter('stage_items_total', 'Items handled by each ingestion pipeline stage',
+                           [({'stage': stage, 'endpoint': endpoint}, stats[1])
+                            for (stage, endpoint), stats in sorted(stages.items())])
+        exposition.histogram('stage_duration_seconds', 'Duration of one call of a pipeline stage',
+                             [({'stage': stage, 'endpoint': endpoint}, stats[3])
+                              for (stage, endpoint), stats in sorted(stages.items())])
+
+        exposition.gauge('metrics_queue_depth', 'Metric samples waiting for the publisher thread',
+                         [(None, self._queue.qsize())])
+        exposition.gauge('uptime_seconds', 'Seconds since the metrics session started',
+                         [(None, round(time.time() - self.session_start_time, 3))])
+        try:
+            import psutil
+            exposition.gauge('process_resident_memory_bytes', 'Resident memory of this process',
+                             [(None, psutil.Process().memory_info().rss)])
+        except Exception:
+            pass
+        for name, value in sorted(gauges.items()):
+            exposition.gauge(name, f'Application gauge {name}', [(None, value)])
+        return exposition.render()
+
+    def serve_prometheus(self, port: int, host: str = '0.0.0.0'):
+        """Serve render_prometheus() at http://host:port/metrics from a daemon thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        collector = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = collector.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                collector.logger.debug(f"Metrics request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        self.logger.info(f"Serving Prometheus metrics on http://{host}:{server.server_port}/metrics")
+        return server
+
     def generate_api_metrics_report(self) -> str:
         """Generate a detailed report on API usage metrics"""
         report_lines = ["API METRICS REPORT"]
@@ -260,7 +626,10 @@ class MetricsCollector:
         report_lines.append(f"{'Endpoint':<25} {'Requests':<10} {'Success':<10} {'Failures':<10} {'Rate Limits':<12} {'Avg Duration':<15}")
         report_lines.append("-" * 80)
 
-        for endpoint, stats in sorted(self.endpoint_stats.items()):
+        with self._stats_lock:
+            endpoint_stats = {endpoint: dict(stats) for endpoint, stats in self.endpoint_stats.items()}
+
+        for endpoint, stats in sorted(endpoint_stats.items()):
             requests = stats['requests']
             successes = stats['success']
             failures = stats['failures']
@@ -278,12 +647,17 @@ class MetricsCollector:
         report_lines.append("SUCCESS RATES")
         report_lines.append("-" * 80)
 
-        for endpoint, stats in sorted(self.endpoint_stats.items()):
+        for endpoint, stats in sorted(endpoint_stats.items()):
             requests = stats['requests']
             successes = stats['success']
             success_rate = (successes / requests * 100) if requests > 0 else 0
             report_lines.append(f"{endpoint:<25} {success_rate:.1f}% success rate")
 
+        latency = self.latency_snapshot()['endpoints']
+        if latency:
+            report_lines.append("")
+            report_lines.extend(self._latency_lines("REQUEST LATENCY", latency))
+
         return "\n".join(report_lines)
 
     def generate_ingestion_report(self) -> str:
@@ -293,11 +667,14 @@ class MetricsCollector:
         report_lines.append(f"Session duration: {self._format_duration(time.time() - self.session_start_time)}")
         report_lines.append("")
 
+        with self._stats_lock:
+            ingestion_stats = {endpoint: dict(stats) for endpoint, stats in self.ingestion_stats.items()}
+
         # Calculate totals
-        total_processed = sum(stats['total_processed'] for stats in self.ingestion_stats.values())
-        total_successful = sum(stats['successful'] for stats in self.ingestion_stats.values())
-        total_failed = sum(stats['failed'] for stats in self.ingestion_stats.values())
-        total_duplicates = sum(stats['duplicates'] for stats in self.ingestion_stats.values())
+        total_processed = sum(stats['total_processed'] for stats in ingestion_stats.values())
+        total_successful = sum(stats['successful'] for stats in ingestion_stats.values())
+        total_failed = sum(stats['failed'] for stats in ingestion_stats.values())
+        total_duplicates = sum(stats['duplicates'] for stats in ingestion_stats.values())
 
         # Add summary
         report_lines.append(f"Total items processed: {total_processed}")
@@ -312,7 +689,7 @@ class MetricsCollector:
         report_lines.append(f"{'Endpoint':<25} {'Processed':<10} {'Success':<10} {'Failed':<10} {'Duplicates':<12} {'Success Rate':<15}")
         report_lines.append("-" * 80)
 
-        for endpoint, stats in sorted(self.ingestion_stats.items()):
+        for endpoint, stats in sorted(ingestion_stats.items()):
             processed = stats['total_processed']
             successful = stats['successful']
             failed = stats['failed']
@@ -322,6 +699,15 @@ class MetricsCollector:
 
             report_lines.append(f"{endpoint:<25} {processed:<10} {successful:<10} {failed:<10} {duplicates:<12} {success_rate:.1f}%")
 
+        latency = self.latency_snapshot()['dynamo_operations']
+        if latency:
+            report_lines.append("")
+            report_lines.extend(self._latency_lines("DYNAMODB OPERATION LATENCY", latency))
+
+        if self.stage_stats:
+            report_lines.append("")
+            report_lines.append(self.generate_stage_report())
+
         return "\n".join(report_lines)
 
     def _format_duration(self, seconds: float) -> str:
@@ -342,10 +728,15 @@ class MetricsCollector:
 
     def reset_stats(self):
         """Reset all statistics for a new session"""
-        self.endpoint_stats.clear()
-        self.ingestion_stats.clear()
+        with self._stats_lock:
+            self.endpoint_stats.clear()
+            self.ingestion_stats.clear()
+            self.endpoint_latency.clear()
+            self.dynamo_latency.clear()
+            self.dynamo_failures.clear()
+            self.stage_stats.clear()
         self.session_start_time = time.time()
         self.logger.info("Metrics statistics have been reset for new session")
 
 # Global metrics collector instance
-metrics = MetricsCollector('Development')
\ No newline at end of file
+metrics = MetricsCollector(os.environ.get('METRICS_SERVICE_NAME', 'Development'))
\ No newline at end of file
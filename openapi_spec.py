@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+OpenAPI document for the Congress Data API.
+
+The document is generated at build time rather than when the server starts:
+
+    python openapi_spec.py [output_path]
+
+writes static/swagger.json from the route docstrings and the schemas below.
+"""
+import os
+import sys
+import json
+from flask import Flask
+from apispec import APISpec
+from apispec.ext.marshmallow import MarshmallowPlugin
+from apispec_webframeworks.flask import FlaskPlugin
+
+DEFAULT_OUTPUT = os.path.join('static', 'swagger.json')
+
+def build_spec(app):
+    """Build the OpenAPI spec for every documented API route of the app"""
+    # Create APISpec
+    spec = APISpec(
+        title="Congress Data API",
+        version="1.0.0",
+        openapi_version="3.0.2",
+        info=dict(
+            description="API for accessing Congress.gov data",
+            contact=dict(email="support@example.com")
+        ),
+        plugins=[FlaskPlugin(), MarshmallowPlugin()],
+    )
+
+    # Create export schema
+    spec.components.schema("ExportOptions", {
+        "type": "object",
+        "properties": {
+            "format": {"type": "string", "enum": ["json", "ndjson", "csv"], "description": "Export format"},
+            "data_type": {"type": "string", "enum": ["bill", "committee", "hearing", "amendment", "nomination", "treaty"], "description": "Type of data to export"},
+            "congress": {"type": "integer", "description": "Congress number to filter by"},
+            "start_date": {"type": "string", "format": "date", "description": "Start date for filtering (YYYY-MM-DD)"},
+            "end_date": {"type": "string", "format": "date", "description": "End date for filtering (YYYY-MM-DD)"}
+        }
+    })
+
+    # Define schemas for Swagger documentation
+    spec.components.schema("Error", {
+        "type": "object",
+        "properties": {
+            "error": {"type": "string", "description": "Error message"},
+            "status": {"type": "integer", "description": "HTTP status code"}
+        }
+    })
+
+    spec.components.schema("Bill", {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string", "description": "Unique identifier for the bill"},
+            "type": {"type": "string", "description": "Type of data (always 'bill')"},
+            "congress": {"type": "integer", "description": "Congress number"},
+            "update_date": {"type": "string", "format": "date", "description": "Last update date"},
+            "bill_type": {"type": "string", "description": "Type of bill (hr, s, etc.)"},
+            "bill_number": {"type": "integer", "description": "Bill number"},
+            "title": {"type": "string", "description": "Bill title"},
+            "origin_chamber": {"type": "string", "description": "Chamber where bill originated"},
+            "latest_action": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "description": "Latest action text"},
+                    "action_date": {"type": "string", "format": "date", "description": "Action date"}
+                }
+            }
+        }
+    })
+
+    spec.components.schema("Committee", {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string", "description": "Unique identifier for the committee"},
+            "type": {"type": "string", "description": "Type of data (always 'committee')"},
+            "congress": {"type": "integer", "description": "Congress number"},
+            "update_date": {"type": "string", "format": "date", "description": "Last update date"},
+            "name": {"type": "string", "description": "Committee name"},
+            "chamber": {"type": "string", "description": "Chamber (House/Senate)"},
+            "committee_type": {"type": "string", "description": "Committee type (standing, etc.)"},
+            "system_code": {"type": "string", "description": "Committee system code"},
+            "parent_committee": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Parent committee name"},
+                    "system_code": {"type": "string", "description": "Parent committee system code"},
+                    "url": {"type": "string", "description": "URL to parent committee data"}
+                }
+            },
+            "subcommittees": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Subcommittee name"},
+                        "system_code": {"type": "string", "description": "Subcommittee system code"},
+                        "url": {"type": "string", "description": "URL to subcommittee data"}
+                    }
+                }
+            }
+        }
+    })
+
+    spec.components.schema("Hearing", {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string", "description": "Unique identifier for the hearing"},
+            "type": {"type": "string", "description": "Type of data (always 'hearing')"},
+            "congress": {"type": "integer", "description": "Congress number"},
+            "update_date": {"type": "string", "format": "date", "description": "Last update date"},
+            "chamber": {"type": "string", "description": "Chamber (House/Senate)"},
+            "date": {"type": "string", "format": "date", "description": "Hearing date"},
+            "time": {"type": "string", "description": "Hearing time"},
+            "location": {"type": "string", "description": "Hearing location"},
+            "title": {"type": "string", "description": "Hearing title"},
+            "committee": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Committee name"},
+                    "system_code": {"type": "string", "description": "Committee system code"},
+                    "url": {"type": "string", "description": "URL to committee data"}
+                }
+            }
+        }
+    })
+
+    spec.components.schema("Amendment", {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string", "description": "Unique identifier for the amendment"},
+            "type": {"type": "string", "description": "Type of data (always 'amendment')"},
+            "congress": {"type": "integer", "description": "Congress number"},
+            "update_date": {"type": "string", "format": "date", "description": "Last update date"},
+            "amendment_number": {"type": "integer", "description": "Amendment number"},
+            "amendment_type": {"type": "string", "description": "Type of amendment"},
+            "title": {"type": "string", "description": "Amendment title"},
+            "description": {"type": "string", "description": "Amendment description"},
+            "purpose": {"type": "string", "description": "Amendment purpose"},
+            "latest_action": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "description": "Latest action text"},
+                    "action_date": {"type": "string", "format": "date", "description": "Action date"}
+                }
+            }
+        }
+    })
+
+    spec.components.schema("Nomination", {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string", "description": "Unique identifier for the nomination"},
+            "type": {"type": "string", "description": "Type of data (always 'nomination')"},
+            "congress": {"type": "integer", "description": "Congress number"},
+            "update_date": {"type": "string", "format": "date", "description": "Last update date"},
+            "number": {"type": "integer", "description": "Nomination number"},
+            "received_date": {"type": "string", "format": "date", "description": "Date nomination was received"},
+            "description": {"type": "string", "description": "Nomination description"},
+            "organization": {"type": "string", "description": "Organization"},
+            "nomination_type": {
+                "type": "object",
+                "properties": {
+                    "is_civilian": {"type": "boolean", "description": "Whether the nomination is civilian"}
+                }
+            },
+            "latest_action": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "description": "Latest action text"},
+                    "action_date": {"type": "string", "format": "date", "description": "Action date"}
+                }
+            }
+        }
+    })
+
+    spec.components.schema("Treaty", {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string", "description": "Unique identifier for the treaty"},
+            "type": {"type": "string", "description": "Type of data (always 'treaty')"},
+            "congress": {"type": "integer", "description": "Congress number"},
+            "update_date": {"type": "string", "format": "date", "description": "Last update date"},
+            "treaty_number": {"type": "string", "description": "Treaty number"},
+            "description": {"type": "string", "description": "Treaty description"},
+            "country": {"type": "string", "description": "Country"},
+            "subject": {"type": "string", "description": "Subject"},
+            "received_date": {"type": "string", "format": "date", "description": "Date received"},
+            "latest_action": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "description": "Latest action text"},
+                    "action_date": {"type": "string", "format": "date", "description": "Action date"}
+                }
+            }
+        }
+    })
+
+    # Add paths to spec
+    with app.test_request_context():
+        for endpoint, view in app.view_functions.items():
+            if endpoint.startswith('api.') and view.__doc__ and '---' in view.__doc__:
+                spec.path(view=view)
+
+    return spec
+
+def spec_app():
+    """Bare app holding the API routes.
+
+    Unlike api_server.create_app() it configures no logging (no log file is
+    written) and needs no cursor secret, so building the spec has no side effects.
+    """
+    from api_server import api
+    app = Flask('openapi_spec')
+    app.register_blueprint(api)
+    return app
+
+def write_spec(app, output_path=DEFAULT_OUTPUT):
+    """Write the OpenAPI document to a JSON file"""
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(build_spec(app).to_dict(), f)
+    return output_path
+
+if __name__ == "__main__":
+    path = write_spec(spec_app(), sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT)
+    print(f"Wrote OpenAPI spec to {path}")
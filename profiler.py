@@ -0,0 +1,234 @@
+"""
+Profiling for downloader runs (congress_downloader.py --profile).
+
+Two modes:
+
+    sampling       a background thread samples the stack of every thread
+                   (wall clock) at a fixed interval; low overhead
+    deterministic  cProfile in every thread, plus the sampler for stacks
+
+Each run writes three files to logs/:
+
+    profile-<mode>-<timestamp>.pstats     load with pstats or snakeviz
+    profile-<mode>-<timestamp>.collapsed  collapsed stacks for flamegraph.pl
+                                          or speedscope
+    profile-<mode>-<timestamp>.txt        time per endpoint and stage, then
+                                          the top functions
+
+Samples are tagged with the endpoint and pipeline stage their thread was in
+(MetricsCollector.stage), so each collapsed stack starts with
+`endpoint:<name>;stage:<stage>`.
+"""
+import os
+import io
+import sys
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+MODES = ('sampling', 'deterministic')
+DEFAULT_INTERVAL = 0.005
+
+Frame = Tuple[str, int, str]
+
+def _frame_label(frame: Frame) -> str:
+    filename, lineno, name = frame
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for all threads of the process"""
+    def __init__(self, interval: float = DEFAULT_INTERVAL,
+                 tags: Optional[Callable[[], Dict[int, tuple]]] = None):
+        self.interval = interval
+        self.tags = tags
+        # (tag, stack root first) -> samples
+        self.stacks: Dict[tuple, int] = {}
+        self.rounds = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        started = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            tags = dict(self.tags()) if self.tags else {}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                key = (tags.get(ident), tuple(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.rounds += 1
+        self.elapsed = time.perf_counter() - started
+
+    @property
+    def seconds_per_sample(self) -> float:
+        """Measured time between sampling rounds (at least the configured interval)"""
+        return self.elapsed / self.rounds if self.rounds else self.interval
+
+    def collapsed(self) -> List[str]:
+        """Lines of `endpoint:x;stage:y;frame;frame... count`, root frame first"""
+        lines: Dict[str, int] = {}
+        for (tag, stack), count in self.stacks.items():
+            stage, endpoint = tag if tag else ('none', 'none')
+            line = ';'.join([f"endpoint:{endpoint}", f"stage:{stage}"] + [_frame_label(frame) for frame in stack])
+            lines[line] = lines.get(line, 0) + count
+        return [f"{line} {count}" for line, count in sorted(lines.items())]
+
+    def by_stage(self) -> Dict[tuple, int]:
+        """Samples per (stage, endpoint); untagged samples under ('none', 'none')"""
+        totals: Dict[tuple, int] = {}
+        for (tag, _), count in self.stacks.items():
+            key = tag or ('none', 'none')
+            totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def pstats_dict(self) -> Dict[Frame, tuple]:
+        """Samples as the raw dict pstats reads: {func: (cc, nc, tt, ct, callers)}.
+
+        Times are sample counts times the sampling interval, so they are
+        wall-clock estimates rather than exact call timings.
+        """
+        unit = self.seconds_per_sample
+        stats: Dict[Frame, list] = {}
+        for (_, stack), count in self.stacks.items():
+            if not stack:
+                continue
+            seconds = count * unit
+            seen = set()
+            for depth, frame in enumerate(stack):
+                entry = stats.setdefault(frame, [0, 0, 0.0, 0.0, {}])
+                if frame not in seen:
+                    seen.add(frame)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += seconds
+                if depth:
+                    edge = entry[4].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                    edge[0] += count
+                    edge[1] += count
+                    edge[3] += seconds
+                    if depth == len(stack) - 1:
+                        edge[2] += seconds
+            stats[stack[-1]][2] += seconds
+        return {frame: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+                for frame, (cc, nc, tt, ct, callers) in stats.items()}
+
+class DeterministicProfiler:
+    """cProfile across every thread started after start()"""
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _enable_in_thread(self, *args) -> None:
+        # Installed with threading.setprofile: runs once at the start of each
+        # new thread and replaces itself with a profiler for that thread
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        profile.enable()
+
+    def start(self) -> None:
+        if sys.version_info >= (3, 12):
+            # cProfile is built on sys.monitoring, which already sees every
+            # thread (their calls share one profiler, so nesting is approximate)
+            self._enable_in_thread()
+        else:
+            threading.setprofile(self._enable_in_thread)
+            self._enable_in_thread()
+
+    def stop(self) -> None:
+        threading.setprofile(None)
+        for profile in self.profiles:
+            profile.disable()
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(*self.profiles)
+
+class RunProfiler:
+    """Profiles one downloader run and writes its artifacts"""
+    def __init__(self, mode: str, output_dir: str = 'logs', interval: float = DEFAULT_INTERVAL,
+                 tags: Optional[Callable[[], Dict[int, tuple]]] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.sampler = SamplingProfiler(interval, tags)
+        self.deterministic = DeterministicProfiler() if mode == 'deterministic' else None
+        self.started = None
+        self.stopped = False
+
+    def start(self) -> None:
+        self.started = time.time()
+        # The sampler thread starts first so cProfile does not profile it
+        self.sampler.start()
+        if self.deterministic:
+            self.deterministic.start()
+
+    def stop(self) -> Dict[str, str]:
+        """Stop profiling and write the artifacts; returns their paths by kind"""
+        if self.stopped:
+            return {}
+        self.stopped = True
+        if self.deterministic:
+            self.deterministic.stop()
+        self.sampler.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.fromtimestamp(self.started).strftime('%Y%m%d%H%M%S')
+        base = os.path.join(self.output_dir, f"profile-{self.mode}-{stamp}")
+        paths = {'pstats': base + '.pstats', 'collapsed': base + '.collapsed', 'summary': base + '.txt'}
+
+        if self.deterministic:
+            stats = self.deterministic.stats()
+            stats.dump_stats(paths['pstats'])
+        else:
+            with open(paths['pstats'], 'wb') as f:
+                marshal.dump(self.sampler.pstats_dict(), f)
+            stats = pstats.Stats(paths['pstats'])
+
+        with open(paths['collapsed'], 'w', encoding='utf-8') as f:
+            for line in self.sampler.collapsed():
+                f.write(line + '\n')
+
+        with open(paths['summary'], 'w', encoding='utf-8') as f:
+            f.write(self.summary(stats))
+        return paths
+
+    def summary(self, stats: pstats.Stats, limit: int = 40) -> str:
+        unit = self.sampler.seconds_per_sample
+        lines = [f"Profile mode: {self.mode}",
+                 f"Wall time: {time.time() - self.started:.1f}s, "
+                 f"{self.sampler.rounds} sampling rounds at {unit * 1000:.1f}ms",
+                 "",
+                 "Thread time by stage (sampled)",
+                 f"{'Stage':<14} {'Endpoint':<28} {'Samples':<10} {'Seconds':<10}"]
+        by_stage = self.sampler.by_stage()
+        for (stage, endpoint), count in sorted(by_stage.items(), key=lambda entry: -entry[1]):
+            lines.append(f"{stage:<14} {endpoint:<28} {count:<10} {count * unit:<10.2f}")
+        lines.append("")
+
+        output = io.StringIO()
+        stats.stream = output
+        stats.sort_stats('cumulative').print_stats(limit)
+        lines.append(output.getvalue())
+        return "\n".join(lines)
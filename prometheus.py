@@ -0,0 +1,72 @@
+"""
+Prometheus text exposition format (version 0.0.4).
+
+Small helpers shared by monitoring.py and api_server.py to render counters,
+gauges and LatencyHistograms without depending on prometheus_client.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from histogram import LatencyHistogram
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram bucket boundaries (seconds) exposed to Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+Labels = Optional[Dict[str, str]]
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list((labels or {}).items())
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class Exposition:
+    """Accumulates metric families and renders them as one text document"""
+    def __init__(self, prefix: str = ''):
+        self.prefix = prefix
+        self._lines: List[str] = []
+
+    def _header(self, name: str, metric_type: str, help_text: str) -> str:
+        name = self.prefix + name
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {metric_type}")
+        return name
+
+    def counter(self, name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> None:
+        name = self._header(name, 'counter', help_text)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> None:
+        name = self._header(name, 'gauge', help_text)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[Tuple[Labels, LatencyHistogram]],
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        name = self._header(name, 'histogram', help_text)
+        for labels, histogram in samples:
+            for bound, count in zip(buckets, histogram.cumulative_counts(buckets)):
+                self._lines.append(f"{name}_bucket{_labels(labels, ('le', _number(float(bound))))} {count}")
+            self._lines.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {histogram.count}")
+            self._lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.total)}")
+            self._lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def extend(self, other: 'Exposition') -> None:
+        self._lines.extend(other._lines)
+
+    def render(self) -> str:
+        return '\n'.join(self._lines) + '\n'
@@ -0,0 +1,340 @@
+"""
+Query planner for the API server list routes.
+
+Given the parameters of a list request, picks the cheapest DynamoDB access
+path (one of the table's GSIs) and pushes every remaining predicate into a
+FilterExpression, so a page request reads only the key range it needs
+instead of scanning the table from the start.
+"""
+import json
+import hmac
+import base64
+import hashlib
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+# Key schema of the GSIs the planner can use (hash key, range key)
+INDEX_KEYS = {
+    'type-update_date-index': ('type', 'update_date'),
+    'congress-type-index': ('congress', 'type'),
+    'chamber-date-index': ('chamber', 'date'),
+}
+
+# A date range no longer than a congress (two years) is assumed to be more
+# selective than a congress equality match
+MAX_DATE_RANGE_PREFERENCE_DAYS = 730
+
+# Bounds for the reads behind one page request (see QueryPlan.fetch_page)
+MAX_READS_PER_PAGE = 10
+MAX_READ_SIZE = 1000
+MIN_SELECTIVITY = 0.05
+
+# Truncated HMAC-SHA256 length in cursor tokens
+CURSOR_SIGNATURE_BYTES = 16
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def cursor_scope(*parts: Any) -> str:
+    """Digest of the query a cursor belongs to, signed together with the cursor's key"""
+    data = json.dumps(parts, default=str, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+def _sign(secret: bytes, payload: bytes, scope: str) -> bytes:
+    return hmac.new(secret, scope.encode('utf-8') + b'|' + payload, hashlib.sha256).digest()[:CURSOR_SIGNATURE_BYTES]
+
+def encode_cursor(key: Dict[str, Any], secret: bytes, scope: str = '') -> str:
+    """Encode a start key as a compact signed token: base64url(json).base64url(hmac).
+
+    The signature also covers `scope` (see cursor_scope), so a token is only
+    accepted by the query it was issued for.
+    """
+    def _number(value):
+        if isinstance(value, Decimal):
+            return int(value) if value == value.to_integral_value() else float(value)
+        raise TypeError(f"Cannot encode {type(value).__name__} in a start key")
+    payload = json.dumps(key, default=_number, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    signature = _sign(secret, payload, scope)
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+def decode_cursor(token: str, secret: bytes, scope: str = '') -> Dict[str, Any]:
+    """Verify and decode a cursor token back into an ExclusiveStartKey"""
+    try:
+        encoded_payload, encoded_signature = token.split('.')
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except ValueError:
+        raise ValueError("Invalid next_token")
+
+    expected = _sign(secret, payload, scope)
+    if not hmac.compare_digest(signature, expected):
+        raise ValueError("Invalid next_token")
+
+    try:
+        key = json.loads(payload, parse_int=Decimal, parse_float=Decimal)
+    except ValueError:
+        raise ValueError("Invalid next_token")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid next_token")
+    return key
+
+def _is_missing_index_error(error: ClientError) -> bool:
+    return 'ValidationException' in str(error) and 'index' in str(error)
+
+class QueryPlan:
+    """A chosen access path plus the request parameters for it"""
+    def __init__(self, operation: str, index_name: Optional[str], params: Dict[str, Any],
+                 fallback: Optional['QueryPlan'] = None):
+        self.operation = operation
+        self.index_name = index_name
+        self.params = params
+        self.fallback = fallback
+
+    @property
+    def key_attributes(self) -> Tuple[str, ...]:
+        """Attributes that make up a LastEvaluatedKey for this plan"""
+        if self.index_name:
+            return ('id',) + INDEX_KEYS[self.index_name]
+        return ('id',)
+
+    @property
+    def cursor_scope(self) -> str:
+        """Scope binding this plan's cursors to its index and expressions"""
+        return cursor_scope(self.operation, self.index_name, self.params)
+
+    def key_for(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Start key that resumes the plan right after the given item"""
+        return {attribute: item[attribute] for attribute in self.key_attributes if attribute in item}
+
+    def describe(self) -> str:
+        target = f"{self.operation} on {self.index_name}" if self.index_name else self.operation
+        return f"{target} key={self.params.get('KeyConditionExpression')} filter={self.params.get('FilterExpression')}"
+
+    def execute(self, table, exclusive_start_key: Optional[Dict[str, Any]] = None,
+                limit: Optional[int] = None) -> Dict[str, Any]:
+        """Run one page of the plan, falling back to a scan if the index is missing"""
+        params = dict(self.params)
+        if limit:
+            params['Limit'] = limit
+        if exclusive_start_key:
+            params['ExclusiveStartKey'] = exclusive_start_key
+
+        try:
+            if self.operation == 'Query':
+                return table.query(**params)
+            return table.scan(**params)
+        except ClientError as e:
+            if self.fallback and _is_missing_index_error(e):
+                logging.getLogger('congress_downloader').warning(
+                    f"Index {self.index_name} not available, falling back to scan"
+                )
+                return self.fallback.execute(table, exclusive_start_key, limit)
+            raise
+
+    def fetch_page(self, table, exclusive_start_key: Optional[Dict[str, Any]], limit: int,
+                   read_budget: float, max_reads: int = MAX_READS_PER_PAGE
+                   ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]], float]:
+        """Read until `limit` matching items are collected or the read budget is spent.
+
+        DynamoDB applies Limit before the FilterExpression, so a single read can
+        return few or no matches. Returns (items, next_start_key, consumed
+        capacity units); next_start_key is None once the key range is exhausted.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        try:
+            return self._fill(table, exclusive_start_key, limit, read_budget, max_reads)
+        except ClientError as e:
+            if self.fallback and _is_missing_index_error(e):
+                logging.getLogger('congress_downloader').warning(
+                    f"Index {self.index_name} not available, falling back to scan"
+                )
+                return self.fallback.fetch_page(table, exclusive_start_key, limit, read_budget, max_reads)
+            raise
+
+    def _fill(self, table, start_key: Optional[Dict[str, Any]], limit: int,
+              read_budget: float, max_reads: int):
+        items: List[Dict[str, Any]] = []
+        consumed = 0.0
+        evaluated = 0
+
+        for _ in range(max_reads):
+            # Size the next read by the filter selectivity seen so far
+            remaining = limit - len(items)
+            selectivity = len(items) / evaluated if evaluated else 1.0
+            read_size = min(MAX_READ_SIZE, max(remaining, int(remaining / max(selectivity, MIN_SELECTIVITY))))
+
+            params = dict(self.params, Limit=read_size, ReturnConsumedCapacity='TOTAL')
+            if start_key:
+                params['ExclusiveStartKey'] = start_key
+            response = table.query(**params) if self.operation == 'Query' else table.scan(**params)
+
+            consumed += float(response.get('ConsumedCapacity', {}).get('CapacityUnits', 0))
+            evaluated += response.get('ScannedCount', read_size)
+            page_items = response.get('Items', [])
+            start_key = response.get('LastEvaluatedKey')
+
+            if len(page_items) > remaining:
+                # Over-read: resume after the last item actually returned
+                items.extend(page_items[:remaining])
+                start_key = self.key_for(items[-1])
+                break
+
+            items.extend(page_items)
+            if not start_key or len(items) >= limit or consumed >= read_budget:
+                break
+
+        return items, start_key, consumed
+
+class _ExpressionBuilder:
+    """Collects key and filter conditions with their placeholder names and values"""
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+        self.values: Dict[str, Any] = {}
+        self.key_conditions: List[str] = []
+        self.filters: List[str] = []
+
+    def _name(self, attribute_path: str) -> str:
+        placeholders = []
+        for part in attribute_path.split('.'):
+            placeholder = f"#{part}"
+            self.names[placeholder] = part
+            placeholders.append(placeholder)
+        return '.'.join(placeholders)
+
+    def _value(self, attribute_path: str, value: Any, suffix: str = '') -> str:
+        placeholder = f":{attribute_path.replace('.', '_')}{suffix}"
+        self.values[placeholder] = value
+        return placeholder
+
+    def condition(self, attribute_path: str, operator: str, value: Any) -> str:
+        name = self._name(attribute_path)
+        if operator == 'between':
+            low = self._value(attribute_path, value[0], '_start')
+            high = self._value(attribute_path, value[1], '_end')
+            return f"{name} BETWEEN {low} AND {high}"
+        placeholder = self._value(attribute_path, value)
+        if operator == 'contains':
+            return f"contains({name}, {placeholder})"
+        return f"{name} = {placeholder}"
+
+    def key(self, attribute_path: str, operator: str, value: Any) -> None:
+        self.key_conditions.append(self.condition(attribute_path, operator, value))
+
+    def filter(self, attribute_path: str, operator: str, value: Any) -> None:
+        self.filters.append(self.condition(attribute_path, operator, value))
+
+    def params(self) -> Dict[str, Any]:
+        params = {}
+        if self.key_conditions:
+            params['KeyConditionExpression'] = ' AND '.join(self.key_conditions)
+        if self.filters:
+            params['FilterExpression'] = ' AND '.join(self.filters)
+        if self.names:
+            params['ExpressionAttributeNames'] = self.names
+        if self.values:
+            params['ExpressionAttributeValues'] = self.values
+        return params
+
+class QueryPlanner:
+    """Chooses an access path for list requests.
+
+    Predicates are (attribute_path, operator, value) tuples where operator is
+    '=', 'contains' or 'between' (value is a (start, end) pair for 'between').
+    """
+    def __init__(self):
+        self.logger = logging.getLogger('congress_downloader')
+
+    @staticmethod
+    def _date_range_days(date_range: Optional[Tuple[str, str]]) -> Optional[int]:
+        try:
+            start = datetime.strptime(date_range[0][:10], '%Y-%m-%d')
+            end = datetime.strptime(date_range[1][:10], '%Y-%m-%d')
+            return (end - start).days
+        except (TypeError, ValueError):
+            return None
+
+    def _choose_index(self, congress: Optional[int], chamber: Optional[str],
+                      date_field: str, date_range: Optional[Tuple[str, str]]) -> str:
+        # Hearings: chamber + date range is an exact key range on chamber-date-index
+        if date_field == 'date' and chamber and date_range:
+            return 'chamber-date-index'
+
+        if congress is not None:
+            range_days = self._date_range_days(date_range) if date_field == 'update_date' else None
+            if range_days is not None and range_days <= MAX_DATE_RANGE_PREFERENCE_DAYS:
+                return 'type-update_date-index'
+            return 'congress-type-index'
+
+        return 'type-update_date-index'
+
+    def plan(self, item_type: str, congress: Optional[int] = None, chamber: Optional[str] = None,
+             date_field: str = 'update_date', date_range: Optional[Tuple[str, str]] = None,
+             predicates: Optional[List[Tuple[str, str, Any]]] = None) -> QueryPlan:
+        """Build a plan for listing items of a type with the given filters"""
+        predicates = list(predicates or [])
+        index_name = self._choose_index(congress, chamber, date_field, date_range)
+        builder = _ExpressionBuilder()
+
+        if index_name == 'chamber-date-index':
+            builder.key('chamber', '=', chamber)
+            builder.key(date_field, 'between', date_range)
+            builder.filter('type', '=', item_type)
+            if congress is not None:
+                builder.filter('congress', '=', congress)
+        elif index_name == 'congress-type-index':
+            builder.key('congress', '=', congress)
+            builder.key('type', '=', item_type)
+            if chamber:
+                builder.filter('chamber', '=', chamber)
+            if date_range:
+                builder.filter(date_field, 'between', date_range)
+        else:
+            builder.key('type', '=', item_type)
+            if date_range and date_field == 'update_date':
+                builder.key('update_date', 'between', date_range)
+            elif date_range:
+                builder.filter(date_field, 'between', date_range)
+            if congress is not None:
+                builder.filter('congress', '=', congress)
+            if chamber:
+                builder.filter('chamber', '=', chamber)
+
+        for attribute_path, operator, value in predicates:
+            builder.filter(attribute_path, operator, value)
+
+        params = builder.params()
+        params['IndexName'] = index_name
+        if index_name == 'type-update_date-index':
+            # Newest updates first
+            params['ScanIndexForward'] = False
+
+        plan = QueryPlan('Query', index_name, params,
+                         fallback=self._scan_plan(item_type, congress, chamber, date_field, date_range, predicates))
+        self.logger.debug(f"Planned {item_type} list request: {plan.describe()}")
+        return plan
+
+    def _scan_plan(self, item_type: str, congress: Optional[int], chamber: Optional[str],
+                   date_field: str, date_range: Optional[Tuple[str, str]],
+                   predicates: List[Tuple[str, str, Any]]) -> QueryPlan:
+        """Scan-with-filter plan used when an index is unavailable"""
+        builder = _ExpressionBuilder()
+        builder.filter('type', '=', item_type)
+        if congress is not None:
+            builder.filter('congress', '=', congress)
+        if chamber:
+            builder.filter('chamber', '=', chamber)
+        if date_range:
+            builder.filter(date_field, 'between', date_range)
+        for attribute_path, operator, value in predicates:
+            builder.filter(attribute_path, operator, value)
+        return QueryPlan('Scan', None, builder.params())
+
+planner = QueryPlanner()
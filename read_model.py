@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Local SQLite read model of the DynamoDB table, kept in sync from DynamoDB Streams.
+
+The table's stream (NEW_AND_OLD_IMAGES) is applied to an indexed SQLite copy
+that the API server can serve list, filter and sort queries from, so browse
+traffic no longer costs DynamoDB read capacity.
+
+    python read_model.py bootstrap              # initial copy from a table scan
+    python read_model.py consume [--once]       # follow the table's stream
+    python read_model.py replay records.ndjson  # apply recorded stream records
+
+Recorded files hold one GetRecords stream record per line; pass --record to
+`consume` to capture them.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Columns copied out of each item for filtering and sorting; the full item is
+# kept as JSON in `doc`. Missing values are stored as '' (or -1 for congress)
+# so sort order and keyset pagination never meet NULLs.
+ITEM_COLUMNS = {
+    'type': '',
+    'congress': -1,
+    'chamber': '',
+    'update_date': '',
+    'date': '',
+    'title': ''
+}
+SORTABLE_COLUMNS = ('update_date', 'date', 'congress', 'title')
+
+# Consecutive empty GetRecords pages after which an open shard counts as caught
+# up for this poll. Pages can be empty even when later records exist.
+MAX_EMPTY_PAGES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    congress INTEGER NOT NULL,
+    chamber TEXT NOT NULL,
+    update_date TEXT NOT NULL,
+    date TEXT NOT NULL,
+    title TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_type_update_date ON items (type, update_date, id);
+CREATE INDEX IF NOT EXISTS items_type_congress ON items (type, congress, update_date, id);
+CREATE INDEX IF NOT EXISTS items_type_chamber_date ON items (type, chamber, date, id);
+CREATE INDEX IF NOT EXISTS items_type_title ON items (type, title, id);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    shard_id TEXT PRIMARY KEY,
+    sequence_number TEXT NOT NULL,
+    closed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _sql_value(value: Any) -> Any:
+    """Convert decoded cursor/parameter values into types sqlite3 can bind"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+class ReadModel:
+    """SQLite copy of the table's data items"""
+    def __init__(self, db_path: str = 'read_model.db'):
+        self.db_path = db_path
+        self.logger = logging.getLogger('congress_downloader')
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run while the consumer writes
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _row(item: Dict[str, Any]) -> Tuple[Any, ...]:
+        values = []
+        for column, default in ITEM_COLUMNS.items():
+            value = item.get(column)
+            if column == 'congress':
+                value = int(value) if value is not None and str(value).lstrip('-').isdigit() else default
+            else:
+                value = str(value) if value is not None else default
+            values.append(value)
+        return (item['id'], *values, json.dumps(item, default=_json_default, separators=(',', ':')))
+
+    def upsert_items(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace data items (internal bookkeeping items are skipped)"""
+        rows = [self._row(item) for item in items
+                if 'id' in item and not str(item.get('type', '')).startswith('_')]
+        if rows:
+            with self._connection() as connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO items (id, type, congress, chamber, update_date, date, title, doc) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows
+                )
+        return len(rows)
+
+    def apply_records(self, records: List[Dict[str, Any]], shard_id: Optional[str] = None) -> int:
+        """Apply stream records in order and advance the shard checkpoint in the same transaction"""
+        from boto3.dynamodb.types import TypeDeserializer
+        deserializer = TypeDeserializer()
+
+        def deserialize(image):
+            return {key: deserializer.deserialize(value) for key, value in image.items()}
+
+        applied = 0
+        with self._connection() as connection:
+            for record in records:
+                change = record.get('dynamodb', {})
+                if record.get('eventName') == 'REMOVE':
+                    keys = deserialize(change.get('Keys', {}))
+                    connection.execute('DELETE FROM items WHERE id = ?', (keys.get('id'),))
+                else:
+                    item = deserialize(change.get('NewImage', {}))
+                    if 'id' not in item or str(item.get('type', '')).startswith('_'):
+                        continue
+                    connection.execute(
+                        'INSERT OR REPLACE INTO items (id, type, congress, chamber, update_date, date, title, doc) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self._row(item)
+                    )
+                applied += 1
+
+            if shard_id and records:
+                connection.execute(
+                    'INSERT INTO checkpoints (shard_id, sequence_number) VALUES (?, ?) '
+                    'ON CONFLICT(shard_id) DO UPDATE SET sequence_number = excluded.sequence_number',
+                    (shard_id, records[-1]['dynamodb']['SequenceNumber'])
+                )
+        return applied
+
+    def get_checkpoint(self, shard_id: str) -> Tuple[Optional[str], bool]:
+        """(last applied sequence number, whether the shard was fully consumed)"""
+        row = self._connection().execute(
+            'SELECT sequence_number, closed FROM checkpoints WHERE shard_id = ?', (shard_id,)
+        ).fetchone()
+        return (row[0], bool(row[1])) if row else (None, False)
+
+    def close_shard(self, shard_id: str) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT INTO checkpoints (shard_id, sequence_number, closed) VALUES (?, ?, 1) '
+                'ON CONFLICT(shard_id) DO UPDATE SET closed = 1', (shard_id, '')
+            )
+
+    def list_items(self, item_type: str, congress: Optional[int] = None, chamber: Optional[str] = None,
+                   date_field: str = 'update_date', date_range: Optional[Tuple[str, str]] = None,
+                   predicates: Optional[List[Tuple[str, str, Any]]] = None,
+                   sort: str = 'update_date', descending: bool = True, limit: int = 20,
+                   after: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """One page of items using keyset pagination.
+
+        Takes the same filters as the query planner. Returns (items, cursor),
+        where cursor is a {'v': sort value, 'id': id} dict for the next page
+        or None on the last page.
+        """
+        if sort not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort}")
+
+        where = ['type = ?']
+        params: List[Any] = [item_type]
+        if congress is not None:
+            where.append('congress = ?')
+            params.append(int(congress))
+        if chamber:
+            where.append('chamber = ?')
+            params.append(chamber)
+        if date_range:
+            column = date_field if date_field in ITEM_COLUMNS else None
+            expression = column or f"json_extract(doc, '$.{date_field}')"
+            where.append(f"{expression} BETWEEN ? AND ?")
+            params.extend(date_range)
+
+        for attribute_path, operator, value in predicates or []:
+            expression = f"json_extract(doc, '$.{attribute_path}')"
+            if operator == 'contains':
+                where.append(f"instr({expression}, ?) > 0")
+                params.append(value)
+            elif operator == 'between':
+                where.append(f"{expression} BETWEEN ? AND ?")
+                params.extend(value)
+            else:
+                where.append(f"{expression} = ?")
+                params.append(value)
+
+        comparison = '<' if descending else '>'
+        if after:
+            where.append(f"({sort} {comparison} ? OR ({sort} = ? AND id {comparison} ?))")
+            value = _sql_value(after.get('v'))
+            params.extend([value, value, after.get('id')])
+
+        direction = 'DESC' if descending else 'ASC'
+        sql = (f"SELECT id, {sort}, doc FROM items WHERE {' AND '.join(where)} "
+               f"ORDER BY {sort} {direction}, id {direction} LIMIT ?")
+        rows = self._connection().execute(sql, params + [limit + 1]).fetchall()
+
+        cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            cursor = {'v': rows[-1][1], 'id': rows[-1][0]}
+        return [json.loads(row[2]) for row in rows], cursor
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+class StreamConsumer:
+    """Follows the table's DynamoDB stream and applies it to a ReadModel"""
+    def __init__(self, table_name: str, region: str, read_model: ReadModel,
+                 record_to: Optional[str] = None):
+        import boto3
+        self.table_name = table_name
+        self.read_model = read_model
+        self.record_to = record_to
+        self.logger = logging.getLogger('congress_downloader')
+        self.dynamodb = boto3.client('dynamodb', region_name=region)
+        self.streams = boto3.client('dynamodbstreams', region_name=region)
+        # Next iterator of each open shard, so a poll resumes where the last one stopped
+        self._iterators: Dict[str, str] = {}
+
+    def _stream_arn(self) -> str:
+        table = self.dynamodb.describe_table(TableName=self.table_name)['Table']
+        arn = table.get('LatestStreamArn')
+        if not arn:
+            raise Exception(f"Table {self.table_name} has no stream enabled")
+        return arn
+
+    def _shards(self, stream_arn: str) -> List[Dict[str, Any]]:
+        shards = []
+        params = {'StreamArn': stream_arn}
+        while True:
+            description = self.streams.describe_stream(**params)['StreamDescription']
+            shards.extend(description.get('Shards', []))
+            last_shard = description.get('LastEvaluatedShardId')
+            if not last_shard:
+                return shards
+            params['ExclusiveStartShardId'] = last_shard
+
+    @staticmethod
+    def _parents_first(shards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Order shards so a parent's records are applied before its children's"""
+        by_id = {shard['ShardId']: shard for shard in shards}
+        ordered, seen = [], set()
+
+        def visit(shard):
+            if shard['ShardId'] in seen:
+                return
+            seen.add(shard['ShardId'])
+            parent = by_id.get(shard.get('ParentShardId'))
+            if parent:
+                visit(parent)
+            ordered.append(shard)
+
+        for shard in shards:
+            visit(shard)
+        return ordered
+
+    def _new_iterator(self, stream_arn: str, shard_id: str) -> str:
+        """Shard iterator positioned after the shard's checkpoint"""
+        sequence_number, _ = self.read_model.get_checkpoint(shard_id)
+        if sequence_number:
+            iterator_args = {'ShardIteratorType': 'AFTER_SEQUENCE_NUMBER', 'SequenceNumber': sequence_number}
+        else:
+            iterator_args = {'ShardIteratorType': 'TRIM_HORIZON'}
+        return self.streams.get_shard_iterator(StreamArn=stream_arn, ShardId=shard_id,
+                                               **iterator_args)['ShardIterator']
+
+    def _consume_shard(self, stream_arn: str, shard_id: str) -> int:
+        """Apply a shard's new records; an open shard's position is kept for the next poll"""
+        _, closed = self.read_model.get_checkpoint(shard_id)
+        if closed:
+            return 0
+
+        iterator = self._iterators.pop(shard_id, None) or self._new_iterator(stream_arn, shard_id)
+        applied = 0
+        empty_pages = 0
+        while iterator:
+            try:
+                response = self.streams.get_records(ShardIterator=iterator, Limit=1000)
+            except self.streams.exceptions.ExpiredIteratorException:
+                # Iterators expire after 15 minutes; continue from the checkpoint
+                iterator = self._new_iterator(stream_arn, shard_id)
+                continue
+            records = response.get('Records', [])
+            if records:
+                if self.record_to:
+                    with open(self.record_to, 'a', encoding='utf-8') as f:
+                        for record in records:
+                            f.write(json.dumps(record, default=str) + '\n')
+                applied += self.read_model.apply_records(records, shard_id)
+                empty_pages = 0
+            else:
+                empty_pages += 1
+
+            iterator = response.get('NextShardIterator')
+            if iterator and empty_pages >= MAX_EMPTY_PAGES:
+                # Caught up with an open shard
+                self._iterators[shard_id] = iterator
+                return applied
+
+        # No next iterator: the shard is closed and fully applied
+        self.read_model.close_shard(shard_id)
+        return applied
+
+    def run(self, once: bool = False, poll_seconds: float = 5) -> None:
+        """Apply the stream until interrupted (or until caught up when once=True)"""
+        stream_arn = self._stream_arn()
+        while True:
+            applied = 0
+            for shard in self._parents_first(self._shards(stream_arn)):
+                applied += self._consume_shard(stream_arn, shard['ShardId'])
+            if applied:
+                self.logger.info(f"Applied {applied} stream records to the read model")
+            if once:
+                return
+            time.sleep(poll_seconds)
+
+def replay_recorded_stream(path: str, read_model: ReadModel, batch_size: int = 500) -> int:
+    """Apply stream records recorded as NDJSON (a local stand-in for a live stream)"""
+    applied = 0
+    batch: List[Dict[str, Any]] = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                applied += read_model.apply_records(batch, shard_id=f"recorded:{os.path.basename(path)}")
+                batch = []
+    if batch:
+        applied += read_model.apply_records(batch, shard_id=f"recorded:{os.path.basename(path)}")
+    return applied
+
+def bootstrap_from_table(config: Dict[str, Any], read_model: ReadModel, batch_size: int = 1000) -> int:
+    """Copy every data item from the table; run before following the stream"""
+    from dynamo_handler import DynamoHandler
+
+    count = 0
+    batch = []
+    for item in DynamoHandler(config, ensure_table=False).iter_all_items():
+        batch.append(item)
+        if len(batch) >= batch_size:
+            count += read_model.upsert_items(batch)
+            batch = []
+    count += read_model.upsert_items(batch)
+    return count
+
+def main():
+    """Command line entry point"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger('congress_downloader').setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description='Maintain the local SQLite read model')
+    parser.add_argument('command', choices=['bootstrap', 'consume', 'replay'])
+    parser.add_argument('path', nargs='?', help='Recorded stream file (for replay)')
+    parser.add_argument('--db', default=os.environ.get('API_READ_MODEL', 'read_model.db'),
+                        help='SQLite database path')
+    parser.add_argument('--once', action='store_true', help='Stop once caught up with the stream')
+    parser.add_argument('--record', help='Also append consumed stream records to this NDJSON file')
+    args = parser.parse_args()
+
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+    read_model = ReadModel(args.db)
+
+    if args.command == 'bootstrap':
+        print(f"Copied {bootstrap_from_table(config['dynamodb'], read_model)} items into {args.db}")
+    elif args.command == 'replay':
+        if not args.path:
+            parser.error('replay needs a recorded stream file')
+        print(f"Applied {replay_recorded_stream(args.path, read_model)} records to {args.db}")
+    else:
+        StreamConsumer(config['dynamodb']['table_name'], config['dynamodb']['region'], read_model,
+                       record_to=args.record).run(once=args.once)
+
+if __name__ == "__main__":
+    main()
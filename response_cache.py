@@ -0,0 +1,90 @@
+"""
+In-process LRU cache used by the API server.
+
+Entries expire after a TTL and the least recently used entries are evicted
+once the cache exceeds its entry or size limit. Lookups return MISSING on a
+miss so that None can be cached as a value (negative caching).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+MISSING = object()
+
+class LRUCache:
+    """Thread-safe LRU cache with a TTL, an entry limit and an optional size limit"""
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300,
+                 max_size: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or MISSING if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, size: int = 1) -> None:
+        """Store a value; size counts against max_size (e.g. a body length in bytes)"""
+        if self.max_size is not None and size > self.max_size:
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._size += size
+
+            while len(self._entries) > self.max_entries or (
+                    self.max_size is not None and self._size > self.max_size):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0
+            }
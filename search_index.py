@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Local full-text search index over item titles and descriptions.
+
+The index is a set of immutable segments in one directory. Ingestion appends a
+segment per flush (SearchIndexWriter); the API server memory-maps the postings
+of every segment and ranks matches with BM25 (SearchIndex). When an item is
+re-ingested its newest segment wins, and compaction merges segments into one.
+
+Segment files:
+    seg-NNNNNN.post        postings as native uint32 (doc number, term frequency) pairs
+    seg-NNNNNN.terms.json  term -> [first posting, posting count]
+    seg-NNNNNN.docs.json   per document: [id, type, title, length]
+index.json lists the live segments, plus compacted-away segments awaiting
+deletion, and is replaced atomically.
+
+Rebuild from DynamoDB with:  python search_index.py build
+"""
+import os
+import re
+import json
+import math
+import mmap
+import time
+import heapq
+import logging
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Fields that are indexed, with their term frequency weight
+SEARCH_FIELDS = {'title': 2, 'description': 1, 'purpose': 1, 'subject': 1}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Documents buffered before the writer flushes a segment on its own, and the
+# segment count above which a flush also compacts the index
+FLUSH_EVERY_DOCS = 5000
+MAX_SEGMENTS = 8
+
+# Segments replaced by a compaction are deleted by a later compaction once
+# this long has passed, so readers have reloaded the manifest by then
+RETIRED_SEGMENT_GRACE_SECONDS = 300
+
+MANIFEST_FILE = 'index.json'
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has in is it of on or that the to was were will with'.split()
+)
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords or single characters"""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, dict):
+        return ' '.join(_field_text(v) for v in value.values())
+    if isinstance(value, list):
+        return ' '.join(_field_text(v) for v in value)
+    return str(value) if value is not None else ''
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+def _read_manifest(index_dir: str) -> Dict[str, Any]:
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'segments': [], 'next_segment': 1, 'retired': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest.setdefault('retired', [])
+    return manifest
+
+def _remove_segment(index_dir: str, name: str) -> None:
+    for suffix in ('.post', '.terms.json', '.docs.json'):
+        path = os.path.join(index_dir, name + suffix)
+        if os.path.exists(path):
+            os.remove(path)
+
+def _write_segment(index_dir: str, name: str, docs: List[list],
+                   postings: Dict[str, List[Tuple[int, int]]]) -> None:
+    """Write one segment's postings, term dictionary and document table"""
+    data = array('I')
+    terms = {}
+    for term in sorted(postings):
+        term_postings = postings[term]
+        terms[term] = [len(data) // 2, len(term_postings)]
+        for doc_number, frequency in term_postings:
+            data.append(doc_number)
+            data.append(frequency)
+
+    with open(os.path.join(index_dir, f"{name}.post"), 'wb') as f:
+        data.tofile(f)
+    _write_json_atomic(os.path.join(index_dir, f"{name}.terms.json"), terms)
+    _write_json_atomic(os.path.join(index_dir, f"{name}.docs.json"), docs)
+
+class SearchIndexWriter:
+    """Buffers ingested items and appends them to the index as segments"""
+    def __init__(self, index_dir: str = 'search_index', flush_every: int = FLUSH_EVERY_DOCS):
+        self.index_dir = index_dir
+        self.flush_every = flush_every
+        self.logger = logging.getLogger('congress_downloader')
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+
+    def add_items(self, items: Iterable[Dict[str, Any]]) -> None:
+        """Queue items for indexing; a re-added ID replaces its earlier version"""
+        with self._lock:
+            for item in items:
+                if 'id' in item and not str(item.get('type', '')).startswith('_'):
+                    self._pending[item['id']] = item
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending items as a new segment"""
+        with self._lock:
+            if not self._pending:
+                return
+            items = list(self._pending.values())
+            self._pending = {}
+
+            docs = []
+            postings: Dict[str, List[Tuple[int, int]]] = {}
+            for doc_number, item in enumerate(items):
+                frequencies: Dict[str, int] = {}
+                for field, weight in SEARCH_FIELDS.items():
+                    for token in tokenize(_field_text(item.get(field))):
+                        frequencies[token] = frequencies.get(token, 0) + weight
+                for term, frequency in frequencies.items():
+                    postings.setdefault(term, []).append((doc_number, frequency))
+                title = item.get('title') or item.get('name') or ''
+                docs.append([item['id'], item.get('type'), str(title)[:300], sum(frequencies.values())])
+
+            manifest = _read_manifest(self.index_dir)
+            name = f"seg-{manifest['next_segment']:06d}"
+            _write_segment(self.index_dir, name, docs, postings)
+            manifest['segments'].append(name)
+            manifest['next_segment'] += 1
+            _write_json_atomic(os.path.join(self.index_dir, MANIFEST_FILE), manifest)
+            self.logger.info(f"Wrote search segment {name} with {len(docs)} documents")
+
+            if len(manifest['segments']) > MAX_SEGMENTS:
+                self._compact(manifest)
+
+    def compact(self) -> None:
+        """Merge all segments into one, dropping superseded documents"""
+        with self._lock:
+            self._compact(_read_manifest(self.index_dir))
+
+    def _compact(self, manifest: Dict[str, Any]) -> None:
+        if len(manifest['segments']) < 2:
+            return
+        reader = SearchIndex(self.index_dir)
+
+        # Renumber the live documents of every segment into one table
+        docs = []
+        renumbered = []
+        for segment in reader.segments:
+            mapping = {}
+            for doc_number, doc in enumerate(segment.docs):
+                if doc_number in segment.live:
+                    mapping[doc_number] = len(docs)
+                    docs.append(doc)
+            renumbered.append(mapping)
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for segment, mapping in zip(reader.segments, renumbered):
+            for term in segment.terms:
+                for doc_number, frequency in segment.postings(term):
+                    if doc_number in mapping:
+                        postings.setdefault(term, []).append((mapping[doc_number], frequency))
+        reader.close()
+
+        old_segments = manifest['segments']
+        name = f"seg-{manifest['next_segment']:06d}"
+        _write_segment(self.index_dir, name, docs, postings)
+
+        # Readers may still be loading the old segments from the previous
+        # manifest, so they are only retired now and deleted after the grace period
+        now = time.time()
+        expired = [old for old, retired_at in manifest['retired']
+                   if now - retired_at >= RETIRED_SEGMENT_GRACE_SECONDS]
+        manifest['retired'] = [[old, retired_at] for old, retired_at in manifest['retired']
+                               if old not in expired]
+        manifest['retired'].extend([old, now] for old in old_segments)
+        manifest['segments'] = [name]
+        manifest['next_segment'] += 1
+        _write_json_atomic(os.path.join(self.index_dir, MANIFEST_FILE), manifest)
+
+        for old in expired:
+            _remove_segment(self.index_dir, old)
+        self.logger.info(f"Compacted {len(old_segments)} search segments into {name} ({len(docs)} documents)")
+
+class _Segment:
+    """One memory-mapped segment"""
+    def __init__(self, index_dir: str, name: str):
+        self.name = name
+        with open(os.path.join(index_dir, f"{name}.terms.json"), 'r', encoding='utf-8') as f:
+            self.terms: Dict[str, List[int]] = json.load(f)
+        with open(os.path.join(index_dir, f"{name}.docs.json"), 'r', encoding='utf-8') as f:
+            self.docs: List[list] = json.load(f)
+        self.live = set(range(len(self.docs)))
+
+        self._file = open(os.path.join(index_dir, f"{name}.post"), 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._postings = memoryview(self._mmap).cast('I')
+        else:
+            self._mmap = None
+            self._postings = memoryview(b'').cast('I')
+
+    def postings(self, term: str) -> Iterable[Tuple[int, int]]:
+        entry = self.terms.get(term)
+        if not entry:
+            return ()
+        start, count = entry
+        data = self._postings[start * 2:(start + count) * 2]
+        return zip(data[0::2], data[1::2])
+
+    def close(self) -> None:
+        self._postings.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+class SearchIndex:
+    """Read side of the index, ranking documents with BM25"""
+    def __init__(self, index_dir: str = 'search_index', reload_seconds: float = 10):
+        self.index_dir = index_dir
+        self.reload_seconds = reload_seconds
+        # (segments, doc_count, average_length), replaced as a whole on reload
+        self._snapshot: Tuple[List[_Segment], int, float] = ([], 0, 0.0)
+        self._manifest_mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def segments(self) -> List[_Segment]:
+        return self._snapshot[0]
+
+    @property
+    def doc_count(self) -> int:
+        return self._snapshot[1]
+
+    @property
+    def average_length(self) -> float:
+        return self._snapshot[2]
+
+    @property
+    def available(self) -> bool:
+        return bool(self.segments)
+
+    def _load(self) -> None:
+        manifest_path = os.path.join(self.index_dir, MANIFEST_FILE)
+        mtime = os.path.getmtime(manifest_path) if os.path.exists(manifest_path) else None
+        self._checked_at = time.monotonic()
+        if mtime == self._manifest_mtime:
+            return
+
+        manifest = _read_manifest(self.index_dir)
+        segments = [_Segment(self.index_dir, name) for name in manifest['segments']]
+
+        # A re-ingested item is only live in the newest segment holding it
+        newest = {}
+        for segment_index, segment in enumerate(segments):
+            for doc_number, doc in enumerate(segment.docs):
+                previous = newest.get(doc[0])
+                if previous:
+                    segments[previous[0]].live.discard(previous[1])
+                newest[doc[0]] = (segment_index, doc_number)
+
+        doc_count = len(newest)
+        average_length = (
+            sum(segment.docs[n][3] for segment in segments for n in segment.live) / doc_count
+            if doc_count else 0.0
+        )
+        # Old segments are not closed here: a concurrent search may still be
+        # reading them, and their maps are released once unreferenced
+        self._snapshot = (segments, doc_count, average_length)
+        self._manifest_mtime = mtime
+
+    def maybe_reload(self) -> None:
+        """Pick up new segments, checking the manifest at most every reload_seconds"""
+        if time.monotonic() - self._checked_at < self.reload_seconds:
+            return
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.reload_seconds:
+                self._load()
+
+    def search(self, query: str, limit: int = 20, item_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Documents matching any query term, best BM25 score first"""
+        self.maybe_reload()
+        # One consistent view of the index, even if a reload swaps it mid-search
+        segments, doc_count, average_length = self._snapshot
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not doc_count:
+            return []
+
+        scores: Dict[Tuple[int, int], float] = {}
+        for term in terms:
+            document_frequency = sum(segment.terms[term][1] for segment in segments
+                                     if term in segment.terms)
+            if not document_frequency:
+                continue
+            # Superseded copies are counted in the postings but not in doc_count
+            document_frequency = min(document_frequency, doc_count)
+            idf = math.log(1 + (doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+            for segment_index, segment in enumerate(segments):
+                for doc_number, frequency in segment.postings(term):
+                    if doc_number not in segment.live:
+                        continue
+                    doc = segment.docs[doc_number]
+                    if item_type and doc[1] != item_type:
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc[3] / average_length)
+                    score = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                    key = (segment_index, doc_number)
+                    scores[key] = scores.get(key, 0.0) + score
+
+        results = []
+        for (segment_index, doc_number), score in heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1]):
+            doc_id, doc_type, title, _ = segments[segment_index].docs[doc_number]
+            results.append({'id': doc_id, 'type': doc_type, 'title': title, 'score': round(score, 4)})
+        return results
+
+    def close(self) -> None:
+        segments = self.segments
+        self._snapshot = ([], 0, 0.0)
+        for segment in segments:
+            segment.close()
+
+def build_from_dynamodb(config: Dict[str, Any], index_dir: str) -> int:
+    """Rebuild the index from every item in the table. Returns the document count."""
+    from dynamo_handler import DynamoHandler
+
+    # Start from an empty index so documents deleted from the table disappear
+    manifest = _read_manifest(index_dir)
+    for name in manifest['segments'] + [old for old, _ in manifest['retired']]:
+        _remove_segment(index_dir, name)
+    if manifest['segments'] or manifest['retired']:
+        _write_json_atomic(os.path.join(index_dir, MANIFEST_FILE),
+                           {'segments': [], 'next_segment': manifest['next_segment'], 'retired': []})
+
+    writer = SearchIndexWriter(index_dir)
+    count = 0
+    for item in DynamoHandler(config, ensure_table=False).iter_all_items():
+        writer.add_items([item])
+        count += 1
+    writer.flush()
+    writer.compact()
+    return count
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Build or query the local search index')
+    parser.add_argument('command', choices=['build', 'compact', 'query'])
+    parser.add_argument('query', nargs='?', help='Query text (for query)')
+    parser.add_argument('--index-dir', default=None, help='Index directory (default from config.json)')
+    args = parser.parse_args()
+
+    with open('config.json', 'r') as f:
+        app_config = json.load(f)
+    index_dir = args.index_dir or app_config.get('search_index', {}).get('path', 'search_index')
+
+    if args.command == 'build':
+        print(f"Indexed {build_from_dynamodb(app_config['dynamodb'], index_dir)} documents")
+    elif args.command == 'compact':
+        SearchIndexWriter(index_dir).compact()
+    else:
+        for result in SearchIndex(index_dir).search(args.query or ''):
+            print(f"{result['score']:8.3f}  {result['id']}  {result['title']}")
@@ -0,0 +1,48 @@
+import logging
+import os
+
+import pytest
+
+# Keep metrics in-process; nothing under test should talk to CloudWatch
+os.environ.setdefault('METRICS_SINK', 'null')
+
+import fake_dynamodb
+from dynamo_handler import DynamoHandler
+
+# A handler on the app logger stops create_app() from writing logs/api_server.log
+logging.getLogger('congress_downloader').addHandler(logging.NullHandler())
+
+
+@pytest.fixture
+def memory_config():
+    """Handler config for the in-memory backend with an unthrottled table"""
+    return {'table_name': 'test-table', 'backend': 'memory', 'memory': {'provisioned': False}}
+
+
+@pytest.fixture
+def handler(memory_config):
+    """DynamoHandler on a fresh in-memory table"""
+    fake_dynamodb.reset()
+    yield DynamoHandler(memory_config)
+    fake_dynamodb.reset()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """(Flask test client, DynamoHandler) for an API server on a fresh in-memory table"""
+    import api_server
+
+    fake_dynamodb.reset()
+    monkeypatch.setenv('API_DYNAMODB_BACKEND', 'memory')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    for name in ('_table', '_db_handler', '_read_model', '_search_index', '_export_jobs'):
+        monkeypatch.setattr(api_server, name, None)
+    monkeypatch.setattr(api_server, '_data_versions', {})
+    monkeypatch.setattr(api_server, 'CURSOR_SECRET', b'test-secret')
+    api_server.response_cache.clear()
+    api_server.item_cache.clear()
+
+    app = api_server.create_app()
+    app.testing = True
+    yield app.test_client(), api_server.get_db_handler()
+    fake_dynamodb.reset()
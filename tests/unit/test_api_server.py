@@ -0,0 +1,340 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+import api_server
+import dynamo_handler
+import response_cache
+
+
+def test_list_route_filters_on_the_chosen_index(api):
+    client, db_handler = api
+    db_handler.batch_store_items([
+        {'id': f'bill-{n}', 'type': 'bill', 'congress': 118 if n % 2 else 117, 'update_date': f'2024-01-{n + 1:02d}',
+         'bill_type': 'hr' if n % 3 else 's', 'title': f'Bill {n}'}
+        for n in range(12)
+    ])
+
+    response = client.get('/api/bills?congress=118&bill_type=hr&limit=50')
+    assert response.status_code == 200
+    ids = sorted(bill['id'] for bill in response.get_json()['bills'])
+    assert ids == sorted(f'bill-{n}' for n in range(12) if n % 2 and n % 3)
+
+
+def test_hearings_are_listed_by_chamber_and_date(api):
+    client, db_handler = api
+    db_handler.batch_store_items([
+        {'id': f'hearing-{n}', 'type': 'hearing', 'congress': 118, 'chamber': 'House' if n % 2 else 'Senate',
+         'date': f'2024-02-{n + 1:02d}', 'update_date': '2024-03-01'}
+        for n in range(10)
+    ])
+
+    response = client.get('/api/hearings?chamber=House&start_date=2024-02-03&end_date=2024-02-08')
+    assert response.status_code == 200
+    assert sorted(hearing['date'] for hearing in response.get_json()['hearings']) == \
+        ['2024-02-04', '2024-02-06', '2024-02-08']
+
+
+def test_cached_list_pages_are_invalidated_by_ingestion(api, monkeypatch):
+    client, db_handler = api
+    monkeypatch.setattr(api_server, 'DATA_VERSION_CHECK_SECONDS', 0)
+    db_handler.batch_store_items([{'id': 'bill-1', 'type': 'bill', 'congress': 118, 'update_date': '2024-01-01'}])
+
+    first = client.get('/api/bills?congress=118&limit=20')
+    assert first.headers['X-Cache'] == 'MISS'
+    again = client.get('/api/bills?limit=20&congress=118')
+    assert again.headers['X-Cache'] == 'HIT'
+    assert again.get_json() == first.get_json()
+
+    db_handler.batch_store_items([{'id': 'bill-2', 'type': 'bill', 'congress': 118, 'update_date': '2024-01-02'}])
+    db_handler.flush_data_versions()
+    fresh = client.get('/api/bills?congress=118')
+    assert fresh.headers['X-Cache'] == 'MISS'
+    assert fresh.get_json()['count'] == 2
+
+
+def _bills(db_handler, count):
+    db_handler.batch_store_items([
+        {'id': f'bill-{n}', 'type': 'bill', 'congress': 118, 'update_date': f'2024-01-{n % 28 + 1:02d}',
+         'title': f'A bill to do thing number {n}'}
+        for n in range(count)
+    ])
+
+
+def test_revalidation_returns_304_without_serializing_the_page(api, monkeypatch):
+    client, db_handler = api
+    _bills(db_handler, 3)
+    etag = client.get('/api/bills?congress=118').headers['ETag'].strip('"')
+
+    api_server.response_cache.clear()
+    monkeypatch.setattr(api_server, 'jsonify', None)
+    response = client.get('/api/bills?congress=118', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == f'"{etag}"'
+
+
+def test_compressed_pages_get_their_own_etag(api):
+    client, db_handler = api
+    _bills(db_handler, 40)
+    plain = client.get('/api/bills?congress=118&limit=40')
+    assert 'Content-Encoding' not in plain.headers
+
+    response = client.get('/api/bills?congress=118&limit=40', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+    revalidated = client.get('/api/bills?congress=118&limit=40',
+                             headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_small_responses_are_not_compressed(api):
+    client, _ = api
+    response = client.get('/api/bills?congress=118', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_export_streams_ndjson_for_a_type(api, monkeypatch):
+    client, db_handler = api
+    _bills(db_handler, 30)
+    db_handler.batch_store_items([{'id': 'hearing-1', 'type': 'hearing', 'update_date': '2024-01-01'}])
+    # A type-only export reads type-update_date-index instead of scanning the table
+    monkeypatch.setattr(db_handler.table, 'scan', None)
+
+    response = client.get('/api/export?format=ndjson&data_type=bill')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'attachment; filename="bill_export_' in response.headers['Content-Disposition']
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(row['id'] for row in rows) == sorted(f'bill-{n}' for n in range(30))
+
+
+def test_export_writes_csv_with_the_type_schema(api):
+    client, db_handler = api
+    _bills(db_handler, 2)
+    lines = client.get('/api/export?format=csv&data_type=bill&congress=118').get_data(as_text=True).splitlines()
+    assert lines[0].startswith('id,type,congress,update_date')
+    assert len(lines) == 3
+
+
+def test_export_rejects_unknown_formats_and_empty_results(api):
+    client, _ = api
+    assert client.get('/api/export?format=xml').status_code == 400
+    assert client.get('/api/export?format=json&data_type=treaty').status_code == 404
+
+
+def test_export_job_can_be_polled_and_downloaded(api, monkeypatch, tmp_path):
+    client, db_handler = api
+    monkeypatch.setenv('EXPORT_JOBS_DIR', str(tmp_path))
+    _bills(db_handler, 5)
+
+    created = client.post('/api/export/jobs', json={'format': 'csv', 'data_type': 'bill'})
+    assert created.status_code == 202
+    location = created.headers['Location']
+    api_server.get_export_jobs()._executor.shutdown(wait=True)
+
+    status = client.get(location).get_json()
+    assert status['status'] == 'completed'
+    assert status['rows_written'] == 5
+    download = client.get(f'{location}/download')
+    assert download.status_code == 200
+    assert len(download.get_data(as_text=True).splitlines()) == 6
+    assert client.get('/api/export/jobs/unknown').status_code == 404
+
+
+def test_limit_is_clamped(api):
+    client, db_handler = api
+    _bills(db_handler, 120)
+    assert client.get('/api/bills?congress=118&limit=1000').get_json()['count'] == api_server.MAX_PAGE_SIZE
+    assert client.get('/api/bills?congress=118&limit=0').get_json()['count'] == 1
+    assert client.get('/api/bills?congress=118&limit=ten').status_code == 400
+
+
+def test_cursors_page_through_every_item(api):
+    client, db_handler = api
+    _bills(db_handler, 45)
+    seen = []
+    url = '/api/bills?congress=118&limit=20'
+    while True:
+        page = client.get(url).get_json()
+        seen.extend(bill['id'] for bill in page['bills'])
+        if 'next_token' not in page:
+            break
+        url = f"/api/bills?congress=118&limit=20&next_token={page['next_token']}"
+    assert sorted(seen) == sorted(f'bill-{n}' for n in range(45))
+
+
+def test_cursor_from_another_query_is_rejected(api):
+    client, db_handler = api
+    _bills(db_handler, 5)
+    token = client.get('/api/bills?congress=118&limit=2').get_json()['next_token']
+    assert client.get(f'/api/bills?congress=117&limit=2&next_token={token}').status_code == 400
+    assert client.get(f'/api/hearings?limit=2&next_token={token}').status_code == 400
+    assert client.get('/api/bills?congress=118&next_token=forged.token').status_code == 400
+
+
+def test_create_app_requires_a_cursor_secret(monkeypatch):
+    monkeypatch.setattr(api_server, 'CURSOR_SECRET', None)
+    with pytest.raises(RuntimeError):
+        api_server.create_app()
+
+    api_server.create_app(development=True)
+    assert len(api_server.CURSOR_SECRET) == 32
+
+
+def test_import_does_no_aws_disk_or_logging_work(tmp_path):
+    # A fresh interpreter, so modules imported by other tests don't hide the imports
+    script = (
+        "import logging, sys, boto3\n"
+        "def fail(*args, **kwargs): raise AssertionError('AWS client created at import')\n"
+        "boto3.client = boto3.resource = fail\n"
+        "import api_server\n"
+        "assert api_server._table is None and api_server._db_handler is None\n"
+        "assert 'export_data' not in sys.modules\n"
+        "assert not logging.getLogger().handlers\n"
+        "assert not logging.getLogger('congress_downloader').handlers\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(api_server.__file__))))
+    assert result.returncode == 0, result.stderr
+    assert not os.listdir(tmp_path)
+
+
+def test_items_are_returned_in_request_order(api):
+    client, db_handler = api
+    _bills(db_handler, 5)
+    response = client.get('/api/items?ids=bill-3,missing&ids=bill-0,bill-3')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [item['id'] for item in body['items']] == ['bill-3', 'bill-0']
+    assert body['missing'] == ['missing']
+
+    posted = client.post('/api/items', json={'ids': ['bill-4', 'bill-1']}).get_json()
+    assert [item['id'] for item in posted['items']] == ['bill-4', 'bill-1']
+
+
+def test_items_request_is_validated(api, monkeypatch):
+    client, _ = api
+    monkeypatch.setattr(api_server, 'MAX_BATCH_IDS', 3)
+    assert client.get('/api/items').status_code == 400
+    assert client.get('/api/items?ids=a,b,c,d').status_code == 400
+    assert client.post('/api/items', json={'ids': 'bill-1'}).status_code == 400
+
+
+def test_concurrent_first_requests_share_one_handler(monkeypatch):
+    created = []
+
+    class SlowHandler:
+        def __init__(self, config, ensure_table=True):
+            created.append(self)
+            time.sleep(0.05)
+
+    monkeypatch.setattr(dynamo_handler, 'DynamoHandler', SlowHandler)
+    monkeypatch.setattr(api_server, '_db_handler', None)
+    handlers = []
+    threads = [threading.Thread(target=lambda: handlers.append(api_server.get_db_handler())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(handler is created[0] for handler in handlers)
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_single_items_are_served_through_the_item_cache(api):
+    client, db_handler = api
+    _bills(db_handler, 2)
+
+    first = client.get('/api/bills/bill-1')
+    assert first.status_code == 200
+    assert first.get_json()['id'] == 'bill-1'
+    assert first.headers['X-Cache'] == 'MISS'
+    assert client.get('/api/bills/bill-1').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/bills/bill-1', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    # The item exists, but not in this collection
+    assert client.get('/api/hearings/bill-1').status_code == 404
+
+    stats = client.get('/api/cache/stats').get_json()['items']
+    assert stats['hits'] == 3
+    assert stats['misses'] == 1
+
+
+def test_misses_are_cached_for_the_shorter_negative_ttl(api, monkeypatch):
+    client, db_handler = api
+    clock = FakeMonotonic()
+    # Only the cache's clock: the in-memory table's capacity runs on the real one
+    monkeypatch.setattr(response_cache, 'time', types.SimpleNamespace(monotonic=clock))
+
+    assert client.get('/api/bills/bill-new').status_code == 404
+    db_handler.store_item({'id': 'bill-new', 'type': 'bill', 'congress': 118, 'update_date': '2024-01-01'})
+    assert client.get('/api/bills/bill-new').status_code == 404
+
+    clock.now += api_server.ITEM_CACHE_NEGATIVE_TTL
+    found = client.get('/api/bills/bill-new')
+    assert found.status_code == 200
+    assert found.headers['X-Cache'] == 'MISS'
+
+    # Found items stay cached for the full TTL
+    clock.now += api_server.ITEM_CACHE_NEGATIVE_TTL
+    assert client.get('/api/bills/bill-new').headers['X-Cache'] == 'HIT'
+
+
+
+def test_list_routes_can_be_served_from_the_read_model(api, monkeypatch, tmp_path):
+    from read_model import ReadModel
+
+    client, _ = api
+    path = str(tmp_path / 'read_model.db')
+    ReadModel(path).upsert_items([
+        {'id': f'bill-{n}', 'type': 'bill', 'congress': 118, 'update_date': f'2024-01-{n + 1:02d}', 'title': f'Bill {n}'}
+        for n in range(5)
+    ])
+    monkeypatch.setattr(api_server, 'READ_MODEL_PATH', path)
+
+    first = client.get('/api/bills?congress=118&limit=3&sort=title&order=asc').get_json()
+    assert [bill['id'] for bill in first['bills']] == ['bill-0', 'bill-1', 'bill-2']
+    rest = client.get(f"/api/bills?congress=118&limit=3&sort=title&order=asc&next_token={first['next_token']}")
+    assert [bill['id'] for bill in rest.get_json()['bills']] == ['bill-3', 'bill-4']
+
+
+def test_route_latency_is_reported_per_rule(api):
+    client, db_handler = api
+    _bills(db_handler, 1)
+    client.get('/api/bills/bill-0')
+    client.get('/api/bills/bill-0')
+
+    latency = client.get('/api/metrics/latency').get_json()
+    route = latency['/api/<any(bills, committees, hearings, amendments, nominations, treaties):collection>/<path:item_id>']
+    assert route['count'] >= 2
+    assert {'p50_ms', 'p95_ms', 'p99_ms'} <= set(route)
+
+
+def test_metrics_endpoint_serves_prometheus_text(api):
+    client, _ = api
+    client.get('/api/bills?congress=118')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    body = response.get_data(as_text=True)
+    assert 'congress_api_server_request_duration_seconds_count{route="/api/bills"}' in body
+    assert 'congress_api_server_cache_misses_total{cache="responses"}' in body
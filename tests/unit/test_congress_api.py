@@ -0,0 +1,204 @@
+import json
+from datetime import datetime
+
+import pytest
+import requests
+
+import congress_api
+from congress_api import CongressAPI, ID_PATTERNS, RateLimiter, congress_for_date
+
+# One list-call item per endpoint, shaped like Congress.gov responses
+RAW_ITEMS = {
+    'bill': {'congress': 118, 'type': 'HR', 'number': '1234', 'title': 'A bill', 'updateDate': '2024-01-02'},
+    'amendment': {'congress': 118, 'type': 'SAMDT', 'number': '45', 'updateDate': '2024-01-02'},
+    'nomination': {'congress': 118, 'number': '7', 'partNumber': '2', 'updateDate': '2024-01-02'},
+    'treaty': {'congress': 118, 'treatyNumber': 3, 'updateDate': '2024-01-02'},
+    'committee': {'chamber': 'House', 'systemCode': 'hsag00', 'name': 'Agriculture', 'updateDate': '2024-01-02'},
+    'hearing': {'congress': 118, 'chamber': 'Senate', 'date': '2024-01-02',
+                'committee': {'systemCode': 'ssju00'}, 'updateDate': '2024-01-02'},
+    'committee-report': {'congress': 118, 'type': 'HRPT', 'number': 12, 'updateDate': '2024-01-02'},
+    'house-communication': {'congress': 118, 'type': 'EC', 'number': 301, 'updateDate': '2024-01-02'},
+    'senate-communication': {'congress': 118, 'type': 'PM', 'number': 9, 'updateDate': '2024-01-02'},
+    'congressional-record': {'congress': 118, 'chamber': 'House', 'date': '2024-01-02'},
+    'member': {'bioguideId': 'P000197', 'name': 'Pelosi, Nancy', 'updateDate': '2024-01-02'}
+}
+
+EXPECTED_IDS = {
+    'bill': '118-hr-1234',
+    'amendment': '118-samdt-45',
+    'nomination': '118-nom-7-2',
+    'treaty': '118-treaty-3',
+    'committee': '118-house-hsag00',
+    'hearing': '118-senate-ssju00-20240102',
+    'committee-report': '118-crpt-hrpt-12',
+    'house-communication': '118-hcomm-ec-301',
+    'senate-communication': '118-scomm-pm-9',
+    'congressional-record': '118-cr-house-20240102',
+    'member': '118-mem-P000197'
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode('utf-8')
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Returns the queued responses in order (exceptions are raised)"""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('CONGRESS_API_KEY', 'test-key')
+    return CongressAPI({'rate_limit': {'test_mode': True, 'max_retries': 2, 'retry_delay': 0}})
+
+
+def _transform(client, endpoint_name):
+    transform = client._transformers.get(endpoint_name)
+    if transform:
+        return transform(RAW_ITEMS[endpoint_name], 118)
+    return client._transform_generic(endpoint_name, RAW_ITEMS[endpoint_name], 118)
+
+
+@pytest.mark.parametrize('endpoint_name', sorted(EXPECTED_IDS))
+def test_transform_ids_follow_the_stored_schemes(client, endpoint_name):
+    item = _transform(client, endpoint_name)
+
+    assert item['id'] == EXPECTED_IDS[endpoint_name]
+    assert item['type'] == endpoint_name
+    assert ID_PATTERNS[endpoint_name].fullmatch(item['id'])
+
+
+def test_committee_id_needs_a_system_code(client):
+    assert client._generate_committee_id({'chamber': 'Senate', 'systemCode': 'ssju00'}, 117) == '117-senate-ssju00'
+    assert client._generate_committee_id({'chamber': 'Senate'}, 117) is None
+    assert client._transform_committee({'committee': {'chamber': 'House'}}, 117) is None
+
+
+def test_items_missing_scheme_fields_are_dropped(client):
+    assert client._transform_generic('committee-report', {'congress': 118, 'number': 1}, 118) is None
+    assert client._transform_generic('member', {'name': 'No bioguide'}, 118) is None
+
+
+def test_endpoints_without_a_scheme_use_the_url_or_a_hash(client):
+    item = client._transform_generic('committee-print', {
+        'url': 'https://api.congress.gov/v3/committee-print/118/house/53221?format=json'
+    }, 118)
+    assert item['id'] == 'committee-print-118-house-53221'
+
+    first = client._transform_generic('summaries', {'text': 'Summary'}, 118)
+    second = client._transform_generic('summaries', {'text': 'Summary'}, 118)
+    assert first['id'] == second['id']
+    assert first['id'].startswith('summaries-')
+
+
+@pytest.mark.parametrize('date, congress', [
+    (datetime(2023, 1, 2), 117),
+    (datetime(2023, 1, 3), 118),
+    (datetime(2024, 12, 31), 118),
+    (datetime(1789, 3, 4), 1)
+])
+def test_congress_for_date(date, congress):
+    assert congress_for_date(date) == congress
+
+
+def test_rate_limiter_spaces_requests(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(congress_api.time, 'sleep', sleeps.append)
+    limiter = RateLimiter({'requests_per_second': 2}, {'bill': 10})
+
+    for _ in range(3):
+        limiter.wait('bill')
+    limiter.wait('amendment')
+
+    # 3 bill requests at 10/s queue up 0.1 s apart; amendment has its own slot
+    assert len(sleeps) == 2
+    assert sleeps[-1] == pytest.approx(0.2, abs=0.05)
+    assert limiter.get_rate_limit('amendment') == 2
+    stats = limiter.get_stats()
+    assert stats['endpoint_counts'] == {'bill': 3, 'amendment': 1}
+
+
+def test_rate_limiter_counts_consecutive_errors():
+    limiter = RateLimiter({'test_mode': True})
+    limiter.record_error('bill', 'status_500')
+    limiter.record_error('bill', 'status_500')
+    assert limiter.get_stats()['consecutive_errors'] == {'bill': 2}
+    limiter.record_success('bill')
+    assert limiter.get_stats()['consecutive_errors'] == {'bill': 0}
+
+
+def test_make_request_retries_failures(client, monkeypatch):
+    monkeypatch.setattr(congress_api.time, 'sleep', lambda seconds: None)
+    client.session = FakeSession([
+        requests.exceptions.ConnectionError('reset'),
+        FakeResponse(503, b'busy'),
+        FakeResponse(200, b'{"bills": []}')
+    ])
+
+    assert client._make_request('bill', {'limit': 1}) == {'bills': []}
+    assert len(client.session.calls) == 3
+    assert client.session.calls[0][1]['api_key'] == 'test-key'
+    assert client.request_count == 3
+    assert client.error_count == 2
+    assert client.rate_limiter.consecutive_errors['bill'] == 0
+
+
+def test_make_request_gives_up_after_max_retries(client, monkeypatch):
+    monkeypatch.setattr(congress_api.time, 'sleep', lambda seconds: None)
+    client.session = FakeSession([FakeResponse(500, b'error')] * 3)
+
+    with pytest.raises(Exception, match='HTTP 500'):
+        client._make_request('bill')
+    assert len(client.session.calls) == 3
+
+
+def test_make_request_does_not_retry_not_found(client):
+    client.session = FakeSession([FakeResponse(404, b'')])
+    assert client._make_request('bill/118/hr/99999') == {}
+    assert len(client.session.calls) == 1
+
+
+def test_recorded_responses_replay_without_http(client, tmp_path, monkeypatch):
+    path = tmp_path / 'responses.ndjson'
+    client._record_path = str(path)
+    page = {'bills': [RAW_ITEMS['bill']], 'pagination': {'count': 1}}
+    client.session = FakeSession([FakeResponse(200, json.dumps(page).encode('utf-8'))])
+    client._make_request('bill', {'offset': 0})
+
+    record = json.loads(path.read_text().splitlines()[0])
+    assert 'api_key' not in record['params']
+
+    monkeypatch.setenv('CONGRESS_API_KEY', 'another-key')
+    replaying = CongressAPI({'replay_responses': str(path), 'rate_limit': {'test_mode': True}})
+    replaying.session = None
+    assert replaying._make_request('bill', {'offset': 0}) == page
+    assert replaying._make_request('bill', {'offset': 250}) == {}
+
+
+def test_pages_are_timed_per_stage(client, monkeypatch):
+    monkeypatch.setattr(congress_api.metrics, 'stage_stats', {})
+    page = {'bills': [RAW_ITEMS['bill'], {'title': 'No type or number'}], 'pagination': {'count': 2}}
+    client.session = FakeSession([FakeResponse(200, json.dumps(page).encode('utf-8'))])
+
+    items = client._get_endpoint_data('bill', '2024-01-02', 118)
+
+    assert [item['id'] for item in items] == ['118-hr-1234']
+    stats = congress_api.metrics.stage_stats
+    for stage in ('rate_limit', 'http', 'json_decode', 'transform', 'validate'):
+        assert stats[(stage, 'bill')][0] == 1
+    assert stats[('transform', 'bill')][1] == 1
+    assert stats[('validate', 'bill')][1] == 1
@@ -0,0 +1,34 @@
+import signal
+
+import pytest
+
+import congress_downloader
+
+
+def test_cleanup_flushes_profiles_and_traces_before_exiting(monkeypatch):
+    calls = []
+    for name in ('flush_search_index', 'stop_profiling', 'export_trace'):
+        monkeypatch.setattr(congress_downloader, name, lambda logger, name=name: calls.append((name, logger)))
+    monkeypatch.setattr(congress_downloader.metrics, 'generate_api_metrics_report', lambda: 'api report')
+    monkeypatch.setattr(congress_downloader.metrics, 'generate_ingestion_report', lambda: 'ingestion report')
+    monkeypatch.setattr(congress_downloader.metrics, 'flush_metrics', lambda: calls.append(('flush_metrics', None)))
+
+    with pytest.raises(SystemExit) as exc:
+        congress_downloader.cleanup(signal.SIGTERM, None)
+    assert exc.value.code == 0
+    assert calls == [
+        ('flush_search_index', congress_downloader.logger),
+        ('stop_profiling', congress_downloader.logger),
+        ('export_trace', congress_downloader.logger),
+        ('flush_metrics', None),
+    ]
+
+
+def test_cleanup_still_flushes_when_the_reports_fail(monkeypatch):
+    flushed = []
+    monkeypatch.setattr(congress_downloader, 'flush_search_index', flushed.append)
+    monkeypatch.setattr(congress_downloader.metrics, 'generate_api_metrics_report', lambda: 1 / 0)
+    monkeypatch.setattr(congress_downloader.metrics, 'flush_metrics', lambda: None)
+    with pytest.raises(SystemExit):
+        congress_downloader.cleanup(signal.SIGINT, None)
+    assert flushed == [congress_downloader.logger]
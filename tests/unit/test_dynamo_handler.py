@@ -0,0 +1,247 @@
+import threading
+import time
+
+import pytest
+
+import dynamo_handler
+import fake_dynamodb
+from dynamo_handler import DynamoHandler, ReadPacer
+
+
+def _bill(number, chamber='House', update_date='2024-01-15'):
+    return {'id': f'bill-{number}', 'type': 'bill', 'congress': 118, 'chamber': chamber,
+            'update_date': update_date, 'title': f'Bill {number}'}
+
+
+def test_short_ranges_are_not_split(handler):
+    assert handler._split_date_range('2024-01-01', '2024-01-20') == [('2024-01-01', '2024-01-20', True)]
+    assert handler._split_date_range('not-a-date', '2024-01-20') == [('not-a-date', '2024-01-20', True)]
+
+
+def test_long_ranges_split_on_month_boundaries(handler):
+    assert handler._split_date_range('2024-01-10', '2024-03-05') == [
+        ('2024-01-10', '2024-02-01', False),
+        ('2024-02-01', '2024-03-01', False),
+        ('2024-03-01', '2024-03-05', True),
+    ]
+
+
+def test_range_query_across_months_is_sorted_and_complete(handler):
+    dates = [f'2024-{month:02d}-{day:02d}T00:00:00Z' for month in range(1, 7) for day in (1, 10, 28)]
+    handler.batch_store_items([_bill(n, update_date=date) for n, date in enumerate(dates)])
+    handler.batch_store_items([{'id': 'hearing-1', 'type': 'hearing', 'update_date': '2024-02-01'}])
+
+    items = handler.query_by_type_and_date_range('bill', '2024-01-10', '2024-05-28')
+    returned = [item['update_date'] for item in items]
+    assert returned == sorted(returned)
+    # Bounds compare as strings, so a bare end date excludes later times on that day
+    assert returned == [date for date in dates if '2024-01-10' <= date <= '2024-05-28']
+
+
+def test_sub_ranges_are_read_concurrently(handler, monkeypatch):
+    handler.batch_store_items([_bill(month, update_date=f'2024-{month:02d}-15') for month in range(1, 7)])
+    threads = set()
+    read_sub_range = handler._query_type_sub_range
+
+    def recording(*args, **kwargs):
+        threads.add(threading.get_ident())
+        time.sleep(0.02)
+        return read_sub_range(*args, **kwargs)
+
+    monkeypatch.setattr(handler, '_query_type_sub_range', recording)
+    assert len(handler.query_by_type_and_date_range('bill', '2024-01-01', '2024-06-30')) == 6
+    assert 1 < len(threads) <= handler.max_parallel_reads
+
+
+def test_parallel_reads_stay_within_the_read_capacity_share():
+    fake_dynamodb.reset()
+    handler = DynamoHandler({'table_name': 't', 'backend': 'memory',
+                             'memory': {'clock': 'simulated', 'burst_seconds': 0,
+                                        'read_capacity': 2, 'write_capacity': 10000}})
+    title = 'x' * 3000
+    handler.batch_store_items([dict(_bill(n, update_date=f'2024-{n % 6 + 1:02d}-{n % 27 + 1:02d}'), title=title)
+                               for n in range(300)])
+    dynamodb = fake_dynamodb.resource()
+    start = dynamodb.clock.time()
+
+    items = handler.query_by_type_and_date_range('bill', '2024-01-01', '2024-06-30')
+    assert len(items) == 300
+    stats = dynamodb.stats()['t']
+    consumed = stats['consumed_rcu']['type-update_date-index']
+    assert stats['throttled']['index_reads'] == 0
+    # Paced at half of the 2 RCU/s; each reader's last page is charged after it is read
+    assert consumed > 50
+    assert dynamodb.clock.time() - start >= consumed / 2
+    fake_dynamodb.reset()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_read_pacer_waits_off_overdrawn_capacity():
+    clock = FakeClock()
+    pacer = ReadPacer(5, sleep=clock.sleep, clock=clock.time)
+
+    pacer.wait()
+    pacer.charge(15)
+    pacer.wait()
+    assert clock.sleeps == [pytest.approx(2.0)]
+
+    # Unused budget is capped at one second's worth
+    clock.now += 100
+    pacer.charge(5)
+    pacer.wait()
+    assert len(clock.sleeps) == 1
+
+
+def test_data_version_bumps_are_rate_limited_and_flushed(handler, memory_config, monkeypatch):
+    monkeypatch.setattr(dynamo_handler, 'DATA_VERSION_BUMP_SECONDS', 3600)
+    assert handler.get_data_version('bill') == 0
+
+    handler.batch_store_items([_bill(1)])
+    assert handler.get_data_version('bill') == 1
+
+    handler.batch_store_items([_bill(2)])
+    handler.store_item(_bill(3))
+    assert handler.get_data_version('bill') == 1
+
+    handler.flush_data_versions()
+    assert handler.get_data_version('bill') == 2
+    handler.flush_data_versions()
+    assert handler.get_data_version('bill') == 2
+
+
+def test_type_reads_query_the_update_date_index(handler, monkeypatch):
+    handler.batch_store_items([_bill(n, update_date=f'2024-01-{28 - n:02d}') for n in range(5)])
+    handler.batch_store_items([{'id': 'hearing-1', 'type': 'hearing', 'update_date': '2024-01-01'}])
+    monkeypatch.setattr(handler.table, 'scan', None)
+
+    items = list(handler.iter_by_type_from_index('bill'))
+    assert [item['id'] for item in items] == [f'bill-{n}' for n in reversed(range(5))]
+
+
+def test_get_items_keeps_input_order_and_marks_missing_items(handler):
+    handler.batch_store_items([_bill(n) for n in range(250)])
+    ids = ['bill-249', 'missing', 'bill-0', 'bill-150', 'bill-0']
+    items = handler.get_items(ids)
+    assert [item and item['id'] for item in items] == ['bill-249', None, 'bill-0', 'bill-150', 'bill-0']
+
+
+def test_get_items_skips_internal_items(handler):
+    handler.batch_store_items([_bill(1)])
+    assert handler.get_items([dynamo_handler.data_version_key('bill')]) == [None]
+
+
+def _withholding(handler, monkeypatch, rounds):
+    """Make BatchGetItem return half of its keys as UnprocessedKeys for `rounds` calls"""
+    batch_get_item = handler.dynamodb.batch_get_item
+    calls = []
+
+    def partial(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) > rounds:
+            return batch_get_item(RequestItems=RequestItems)
+        keys = RequestItems[handler.table_name]['Keys']
+        response = batch_get_item(RequestItems={handler.table_name: {'Keys': keys[:len(keys) // 2]}})
+        response['UnprocessedKeys'] = {handler.table_name: {'Keys': keys[len(keys) // 2:]}}
+        return response
+
+    monkeypatch.setattr(handler.dynamodb, 'batch_get_item', partial)
+    return calls
+
+
+def test_get_items_retries_unprocessed_keys_with_backoff(handler, monkeypatch):
+    handler.batch_store_items([_bill(n) for n in range(40)])
+    sleeps = []
+    monkeypatch.setattr(handler, '_sleep', sleeps.append)
+    calls = _withholding(handler, monkeypatch, rounds=2)
+
+    items = handler.get_items([f'bill-{n}' for n in range(40)])
+    assert [item['id'] for item in items] == [f'bill-{n}' for n in range(40)]
+    assert [len(call[handler.table_name]['Keys']) for call in calls] == [40, 20, 10]
+    assert len(sleeps) == 2
+    assert sleeps[1] >= handler.unprocessed_backoff_seconds
+
+
+def test_get_items_gives_up_after_the_retry_limit(handler, monkeypatch):
+    handler.batch_store_items([_bill(n) for n in range(4)])
+    monkeypatch.setattr(handler, '_sleep', lambda seconds: None)
+    _withholding(handler, monkeypatch, rounds=handler.max_unprocessed_retries + 1)
+    with pytest.raises(Exception, match='unprocessed'):
+        handler.get_items([f'bill-{n}' for n in range(4)])
+
+
+@pytest.fixture
+def stats_config(memory_config):
+    return dict(memory_config, stats={'enabled': True})
+
+
+@pytest.fixture
+def stats_handler(handler, stats_config):
+    return DynamoHandler(stats_config)
+
+
+def _counts(handler, **filters):
+    return {(row['chamber'], row['month']): row['count'] for row in handler.get_stats(**filters) if row['count']}
+
+
+def test_batch_store_counts_new_items(stats_handler):
+    stored, failed = stats_handler.batch_store_items([_bill(n, 'House' if n % 2 else 'Senate') for n in range(10)])
+    assert (stored, failed) == (10, [])
+    assert _counts(stats_handler, item_type='bill') == {('House', '2024-01'): 5, ('Senate', '2024-01'): 5}
+    assert _counts(stats_handler, item_type='bill', congress='118', chamber='Senate') == {('Senate', '2024-01'): 5}
+
+
+def test_rewrites_only_move_items_between_counters(stats_handler, stats_config):
+    stats_handler.batch_store_items([_bill(n) for n in range(4)])
+
+    # A new session re-ingests the same items, one of them with a later update
+    again = DynamoHandler(stats_config)
+    again.batch_store_items([_bill(0), _bill(1), _bill(2, update_date='2024-02-01')])
+    again.store_item(_bill(3, update_date='2024-03-01'))
+
+    assert _counts(stats_handler, item_type='bill') == {
+        ('House', '2024-01'): 2, ('House', '2024-02'): 1, ('House', '2024-03'): 1
+    }
+
+
+def test_concurrent_writers_count_each_item_once(stats_handler, stats_config):
+    def ingest(worker):
+        DynamoHandler(stats_config).batch_store_items([_bill(n) for n in range(worker * 10, worker * 10 + 30)])
+
+    threads = [threading.Thread(target=ingest, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _counts(stats_handler, item_type='bill') == {('House', '2024-01'): 60}
+
+
+def test_rebuild_stats_repairs_counters(stats_handler):
+    stats_handler.batch_store_items([_bill(n) for n in range(3)])
+    stats_handler.apply_stats_deltas({('bill', '118', 'House', '2024-01'): 7, ('bill', '117', 'none', 'none'): 2})
+
+    stats_handler.rebuild_stats()
+    assert _counts(stats_handler) == {('House', '2024-01'): 3}
+
+
+def test_stats_are_off_by_default_and_batch_writes_are_kept(handler, monkeypatch):
+    # Counted writes go through put_item; batch writes must not
+    monkeypatch.setattr(handler.table, 'put_item', None)
+    assert handler.batch_store_items([_bill(n) for n in range(30)]) == (30, [])
+    assert handler.get_stats() == []
+
+    handler.rebuild_stats()
+    assert _counts(handler) == {('House', '2024-01'): 30}
+
@@ -0,0 +1,192 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+import export_data
+from dynamo_handler import DynamoHandler
+from export_data import (
+    PartitionedExporter, _export_scan_segment, export_full_table, export_partitioned, flatten_item, get_csv_header, iter_csv_lines, iter_export_chunks, iter_json_array_chunks,
+    iter_ndjson_lines, stream_export
+)
+
+ITEMS = [
+    {'id': 'bill-1', 'type': 'bill', 'congress': Decimal('118'), 'update_date': '2024-01-01',
+     'title': 'First', 'latest_action': {'text': 'Introduced', 'action_date': '2024-01-01'}},
+    {'id': 'bill-2', 'type': 'bill', 'congress': Decimal('118'), 'update_date': '2024-01-02',
+     'title': 'Second', 'cosponsors': [Decimal('1'), Decimal('2')]},
+]
+
+
+def test_json_array_is_valid_for_empty_and_non_empty_input():
+    assert json.loads(''.join(iter_json_array_chunks([]))) == []
+    decoded = json.loads(''.join(iter_json_array_chunks(ITEMS)))
+    assert [item['id'] for item in decoded] == ['bill-1', 'bill-2']
+    # DecimalEncoder writes numbers from DynamoDB as strings
+    assert decoded[0]['congress'] == '118'
+
+
+def test_ndjson_writes_one_line_per_item():
+    lines = list(iter_ndjson_lines(ITEMS))
+    assert len(lines) == 2
+    assert all(line.endswith('\n') for line in lines)
+    assert json.loads(lines[1])['cosponsors'] == ['1', '2']
+
+
+def test_flatten_item_follows_dotted_paths_and_keeps_extra_fields():
+    columns = ['id', 'latest_action.text', 'missing.path']
+    row = flatten_item({'id': 'x', 'latest_action': {'text': 'Passed'}, 'other': 1}, columns)
+    assert row == ['x', 'Passed', '', '{"other": 1}']
+    assert get_csv_header(columns) == ['id', 'latest_action_text', 'missing_path', 'extra']
+
+
+def test_csv_uses_the_type_schema():
+    rows = list(csv.reader(io.StringIO(''.join(iter_csv_lines(ITEMS, 'bill')))))
+    header = rows[0]
+    assert header[:4] == ['id', 'type', 'congress', 'update_date']
+    assert header[-1] == 'extra'
+    first = dict(zip(header, rows[1]))
+    assert first['latest_action_text'] == 'Introduced'
+    assert first['extra'] == ''
+    second = dict(zip(header, rows[2]))
+    assert json.loads(second['extra']) == {'cosponsors': ['1', '2']}
+
+
+def test_csv_header_is_written_without_items():
+    assert list(csv.reader(io.StringIO(''.join(iter_csv_lines([], 'bill')))))[0][0] == 'id'
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        iter_export_chunks(ITEMS, 'xml')
+
+
+def test_stream_export_counts_records(tmp_path):
+    output_file = tmp_path / 'nested' / 'bills.ndjson'
+    assert stream_export(iter(ITEMS), str(output_file), 'ndjson') == 2
+    assert len(output_file.read_text().splitlines()) == 2
+
+
+def _read_part(output_dir, part):
+    path = os.path.join(output_dir, part['path'])
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert hashlib.sha256(data).hexdigest() == part['sha256']
+    return [json.loads(line) for line in gzip.decompress(data).decode('utf-8').splitlines()]
+
+
+def test_partitioned_export_with_few_open_files_keeps_one_part_per_partition(tmp_path):
+    # Round-robin over more partitions than open files: every write resumes a suspended part
+    items = [{'id': f'bill-{congress}-{n}', 'type': 'bill', 'congress': congress, 'update_date': '2024-01-01'}
+             for n in range(5) for congress in range(100, 120)]
+    exporter = PartitionedExporter(str(tmp_path), max_open_parts=3)
+    for item in items:
+        exporter.write(item)
+    manifest = exporter.close()
+
+    assert manifest['total_rows'] == 100
+    assert len(manifest['parts']) == 20
+    for part in manifest['parts']:
+        rows = _read_part(str(tmp_path), part)
+        assert len(rows) == part['rows'] == 5
+        assert {row['congress'] for row in rows} == {int(part['congress'])}
+
+    with open(tmp_path / PartitionedExporter.MANIFEST_NAME) as f:
+        assert json.load(f)['total_rows'] == 100
+
+
+def test_partitioned_export_rolls_parts_over_by_size(tmp_path):
+    items = [{'id': f'bill-{n}', 'type': 'bill', 'congress': 118, 'title': 'x' * 100} for n in range(50)]
+    manifest = export_partitioned(items, str(tmp_path), max_part_bytes=1000)
+
+    assert len(manifest['parts']) > 1
+    assert all(part['path'].startswith('bill/118/part-') for part in manifest['parts'])
+    rows = [row for part in manifest['parts'] for row in _read_part(str(tmp_path), part)]
+    assert [row['id'] for row in rows] == [item['id'] for item in items]
+
+
+def test_items_without_partition_values_go_to_unknown(tmp_path):
+    manifest = export_partitioned([{'id': 'x', 'congress': 'n/a'}], str(tmp_path))
+    assert manifest['parts'][0]['path'] == 'unknown/unknown/part-00000.ndjson.gz'
+
+
+def _run_main(monkeypatch, tmp_path, memory_config, *args):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(export_data, 'load_config', lambda: {'dynamodb': memory_config})
+    monkeypatch.setattr(sys, 'argv', ['export_data.py', *args])
+    export_data.main()
+
+
+def test_cli_rejects_a_format_for_partitioned_exports(monkeypatch, tmp_path, memory_config, capsys):
+    with pytest.raises(SystemExit) as exc:
+        _run_main(monkeypatch, tmp_path, memory_config, '--type', 'bill', '--partitioned', '--format', 'csv')
+    assert exc.value.code == 2
+    assert '--format cannot be used with --partitioned' in capsys.readouterr().err
+
+
+def test_cli_writes_a_partitioned_export(monkeypatch, tmp_path, handler, memory_config):
+    handler.batch_store_items([dict(item, congress=int(item['congress'])) for item in ITEMS])
+    _run_main(monkeypatch, tmp_path, memory_config, '--type', 'bill', '--partitioned', '--output', 'out')
+
+    with open(tmp_path / 'out' / PartitionedExporter.MANIFEST_NAME) as f:
+        manifest = json.load(f)
+    assert manifest['total_rows'] == 2
+    assert [part['path'] for part in manifest['parts']] == ['bill/118/part-00000.ndjson.gz']
+
+
+def test_resuming_a_full_export_with_other_segments_is_rejected(tmp_path):
+    (tmp_path / 'export.json').write_text(json.dumps({'total_segments': 4}))
+    with pytest.raises(ValueError):
+        export_full_table({'table_name': 't', 'backend': 'memory'}, str(tmp_path), total_segments=8)
+
+
+def _read_segment(output_dir, segment=0):
+    with gzip.open(os.path.join(output_dir, f'segment-{segment:04d}.ndjson.gz'), 'rt') as f:
+        return [json.loads(line)['id'] for line in f]
+
+
+def test_interrupted_segment_resumes_without_losing_or_repeating_rows(tmp_path, handler, memory_config,
+                                                                      monkeypatch):
+    # About 3MB of items, so the segment is scanned in several 1MB pages
+    handler.batch_store_items([{'id': f'bill-{n:03d}', 'type': 'bill', 'congress': 118, 'text': 'x' * 10000}
+                               for n in range(300)])
+    read_pages = DynamoHandler.iter_scan_segment_pages
+
+    def interrupted(self, *args, **kwargs):
+        pages = read_pages(self, *args, **kwargs)
+        yield next(pages)
+        # A page written after the last checkpoint is dropped on resume
+        with open(tmp_path / 'segment-0000.ndjson.gz', 'ab') as f:
+            f.write(gzip.compress(b'{"id": "torn"}\n'))
+        raise RuntimeError('worker killed')
+
+    monkeypatch.setattr(DynamoHandler, 'iter_scan_segment_pages', interrupted)
+    with pytest.raises(RuntimeError):
+        _export_scan_segment(memory_config, 0, 1, str(tmp_path))
+    checkpoint = json.loads((tmp_path / 'segment-0000.checkpoint.json').read_text())
+    assert not checkpoint['done']
+    assert 0 < checkpoint['rows'] < 300
+
+    monkeypatch.setattr(DynamoHandler, 'iter_scan_segment_pages', read_pages)
+    checkpoint = _export_scan_segment(memory_config, 0, 1, str(tmp_path))
+    assert checkpoint['done'] and checkpoint['rows'] == 300
+    assert sorted(_read_segment(str(tmp_path))) == [f'bill-{n:03d}' for n in range(300)]
+
+    # A finished segment is not scanned again
+    monkeypatch.setattr(DynamoHandler, 'iter_scan_segment_pages', interrupted)
+    assert _export_scan_segment(memory_config, 0, 1, str(tmp_path))['rows'] == 300
+
+
+def test_scan_segments_split_the_table_between_them(tmp_path, handler, memory_config):
+    handler.batch_store_items([{'id': f'bill-{n}', 'type': 'bill', 'congress': 118} for n in range(40)])
+    rows = []
+    for segment in range(3):
+        assert _export_scan_segment(memory_config, segment, 3, str(tmp_path))['done']
+        rows.extend(_read_segment(str(tmp_path), segment))
+    assert sorted(rows) == sorted(f'bill-{n}' for n in range(40))
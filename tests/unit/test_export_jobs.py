@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+import pytest
+
+from export_jobs import ExportJobManager
+
+
+def _bills(handler, count):
+    handler.batch_store_items([{'id': f'bill-{n}', 'type': 'bill', 'congress': 118, 'update_date': '2024-01-01'}
+                               for n in range(count)])
+
+
+def _wait(manager):
+    manager._executor.shutdown(wait=True)
+
+
+def _finished(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id)['status'] in ('queued', 'running'):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return manager.get(job_id)
+
+
+def test_job_writes_the_export_and_reports_completion(handler, tmp_path):
+    _bills(handler, 25)
+    manager = ExportJobManager(lambda: handler, output_dir=str(tmp_path))
+    job = manager.submit({'format': 'ndjson', 'data_type': 'bill'})
+    assert job['status'] in ('queued', 'running', 'completed')
+    _wait(manager)
+
+    status = manager.get(job['id'])
+    assert status['status'] == 'completed'
+    assert status['rows_written'] == 25
+    assert status['percent_complete'] == 100.0
+    path = manager.get_result_path(job['id'])
+    with open(path) as f:
+        assert len([json.loads(line) for line in f]) == 25
+    assert not os.path.exists(f'{path}.part')
+
+
+def test_identical_requests_share_a_job(handler, tmp_path):
+    manager = ExportJobManager(lambda: handler, output_dir=str(tmp_path))
+    first = manager.submit({'format': 'json', 'data_type': 'bill', 'congress': 118})
+    again = manager.submit({'congress': 118, 'data_type': 'bill', 'format': 'json'})
+    other = manager.submit({'format': 'csv', 'data_type': 'bill', 'congress': 118})
+    assert again['id'] == first['id']
+    assert other['id'] != first['id']
+    _wait(manager)
+
+
+def test_failed_jobs_are_retried_by_a_new_job(tmp_path):
+    def broken_handler():
+        raise RuntimeError('no table')
+
+    manager = ExportJobManager(broken_handler, output_dir=str(tmp_path))
+    job = manager.submit({'format': 'json'})
+    status = _finished(manager, job['id'])
+    assert status['status'] == 'failed'
+    assert status['error'] == 'no table'
+    assert manager.get_result_path(job['id']) is None
+    assert manager.submit({'format': 'json'})['id'] != job['id']
+    _wait(manager)
+
+
+def test_unknown_formats_are_rejected(handler, tmp_path):
+    with pytest.raises(ValueError):
+        ExportJobManager(lambda: handler, output_dir=str(tmp_path)).submit({'format': 'xml'})
+
+
+def test_expired_results_are_deleted(handler, tmp_path):
+    _bills(handler, 1)
+    manager = ExportJobManager(lambda: handler, output_dir=str(tmp_path), result_ttl_seconds=0, max_concurrent=1)
+    job = manager.submit({'format': 'json', 'data_type': 'bill'})
+    assert _finished(manager, job['id'])['status'] == 'completed'
+    path = manager.get_result_path(job['id'])
+    assert os.path.exists(path)
+
+    # Submitting prunes finished jobs past their TTL
+    assert manager.submit({'format': 'csv', 'data_type': 'bill'})['id'] != job['id']
+    assert manager.get(job['id']) is None
+    assert not os.path.exists(path)
+    _wait(manager)
+
+
+def test_progress_is_capped_until_the_job_finishes():
+    job = {'id': 'x', 'params': {}, 'status': 'running', 'rows': 150, 'estimated_rows': 100,
+           'created_at': time.time() - 10, 'started_at': time.time() - 10, 'finished_at': None, 'error': None}
+    status = ExportJobManager._status(job)
+    assert status['percent_complete'] == 99.0
+    assert status['eta_seconds'] == 0
+
+    job['rows'] = 25
+    assert ExportJobManager._status(job)['percent_complete'] == 25.0
@@ -0,0 +1,103 @@
+import json
+import urllib.error
+import urllib.request
+from datetime import date, datetime
+
+import pytest
+
+import benchmark_ingestion
+from congress_api import ENDPOINT_KEYS, ID_PATTERNS, CongressAPI
+from fake_congress_api import FakeCongressServer, fixture_item
+
+
+@pytest.fixture
+def server():
+    server = FakeCongressServer(items_per_day=5, page_size=4)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+def _client(server, endpoints):
+    return CongressAPI({'base_url': server.base_url, 'api_key': 'fixture', 'endpoints': endpoints,
+                        'rate_limit': {'test_mode': True, 'retry_delay': 0}})
+
+
+def test_fixtures_are_deterministic():
+    day = date(2024, 3, 5)
+    assert fixture_item('bill', day, 3, 'http://x/v3') == fixture_item('bill', day, 3, 'http://x/v3')
+    server = FakeCongressServer(items_per_day=5)
+    try:
+        assert server.items_for('bill', day) == server.items_for('bill', day)
+    finally:
+        server.httpd.server_close()
+
+
+def test_client_ingests_every_endpoint(server):
+    day = datetime(2024, 3, 5)
+    items = _client(server, list(ENDPOINT_KEYS)).get_data_for_date(day)
+
+    by_type = {}
+    for item in items:
+        by_type.setdefault(item['type'], []).append(item['id'])
+    for endpoint, pattern in ID_PATTERNS.items():
+        expected = server.items_for(endpoint, day.date())
+        assert len(by_type.get(endpoint, [])) == expected, endpoint
+        assert all(pattern.fullmatch(item_id) for item_id in by_type.get(endpoint, [])), endpoint
+    # Pages of 4 were followed to the end
+    assert server.stats_snapshot()['items'] == sum(server.items_for(endpoint, day.date())
+                                                   for endpoint in ENDPOINT_KEYS if endpoint != 'congress') + 3
+
+
+def test_requests_need_an_api_key(server):
+    status, _, body = _get(f"{server.base_url}/bill?fromDateTime=2024-03-05T00:00:00Z")
+    assert status == 403
+    assert body['error']['code'] == 'API_KEY_MISSING'
+
+
+def test_unknown_paths_are_not_found(server):
+    status, _, _ = _get(f"{server.base_url}/bill/118/hr/1?api_key=fixture")
+    assert status == 404
+    assert server.stats_snapshot()['by_status'] == {'404': 1}
+
+
+def test_injected_throttling_sends_retry_after():
+    server = FakeCongressServer(error_rate_429=1.0, retry_after=7)
+    server.start()
+    try:
+        status, headers, _ = _get(f"{server.base_url}/bill?api_key=fixture")
+    finally:
+        server.stop()
+    assert status == 429
+    assert headers['Retry-After'] == '7'
+
+
+def test_discard_store_counts_items():
+    store = benchmark_ingestion.DiscardStore()
+    assert store.batch_store_items([{'id': 'a'}, {'id': 'b'}]) == (2, [])
+    assert store.items == 2
+
+
+def test_benchmark_runs_a_mode_against_the_server(server):
+    spec = {
+        'mode': 'refresh', 'base_url': server.base_url, 'endpoints': ['bill', 'committee'], 'workers': 2,
+        'requests_per_second': 1000, 'lookback_days': 1, 'refresh_start': '2024-03-05',
+        'refresh_end': '2024-03-06', 'store': 'discard', 'memory': {}
+    }
+    sample = benchmark_ingestion.run_mode(server, spec)
+
+    expected = sum(server.items_for(endpoint, day) for endpoint in ('bill', 'committee')
+                   for day in (date(2024, 3, 5), date(2024, 3, 6)))
+    assert sample['dates'] == 2
+    assert sample['items'] == expected
+    assert sample['failed_dates'] == 0
+    assert sample['server_requests'] == sample['client_requests']
+    assert sample['throttled'] == 0
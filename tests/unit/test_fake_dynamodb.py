@@ -0,0 +1,241 @@
+from decimal import Decimal
+
+import pytest
+from botocore.exceptions import ClientError
+
+import fake_dynamodb
+from fake_dynamodb import FakeDynamoDB, SimulatedClock, item_size, read_units, write_units
+
+CONDITION = 'attribute_not_exists(id) OR (attribute_exists(update_date) AND update_date < :new)'
+
+
+def _create(dynamodb, read=None, write=None):
+    throughput = {'ReadCapacityUnits': read or 5, 'WriteCapacityUnits': write or 5}
+    return dynamodb.create_table(
+        TableName='t',
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'},
+                              {'AttributeName': 'type', 'AttributeType': 'S'},
+                              {'AttributeName': 'update_date', 'AttributeType': 'S'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': 'type-update_date-index',
+            'KeySchema': [{'AttributeName': 'type', 'KeyType': 'HASH'},
+                          {'AttributeName': 'update_date', 'KeyType': 'RANGE'}],
+            'Projection': {'ProjectionType': 'ALL'},
+            'ProvisionedThroughput': throughput
+        }],
+        ProvisionedThroughput=throughput
+    )
+
+
+@pytest.fixture
+def table():
+    return _create(FakeDynamoDB({'provisioned': False}))
+
+
+def _error_code(error):
+    return error.value.response['Error']['Code']
+
+
+def test_items_come_back_the_way_boto3_returns_them(table):
+    table.put_item(Item={'id': 'a', 'n': 1, 'tags': {'x'}, 'nested': {'list': [1, 'b']}})
+    item = table.get_item(Key={'id': 'a'})['Item']
+    assert item['n'] == Decimal('1')
+    assert item['nested']['list'] == [Decimal('1'), 'b']
+    with pytest.raises(TypeError):
+        table.put_item(Item={'id': 'b', 'f': 1.5})
+
+
+def test_key_type_mismatch_is_a_validation_error(table):
+    with pytest.raises(ClientError) as error:
+        table.put_item(Item={'id': 'a', 'update_date': 5, 'type': 'bill'})
+    assert _error_code(error) == 'ValidationException'
+
+
+def test_conditional_put_and_return_values(table):
+    table.put_item(Item={'id': 'a', 'update_date': '2024-02-01'})
+    with pytest.raises(ClientError) as error:
+        table.put_item(Item={'id': 'a', 'update_date': '2024-01-01'}, ConditionExpression=CONDITION,
+                       ExpressionAttributeValues={':new': '2024-01-01'})
+    assert _error_code(error) == 'ConditionalCheckFailedException'
+
+    response = table.put_item(Item={'id': 'a', 'update_date': '2024-03-01'}, ConditionExpression=CONDITION,
+                              ExpressionAttributeValues={':new': '2024-03-01'}, ReturnValues='ALL_OLD')
+    assert response['Attributes']['update_date'] == '2024-02-01'
+    assert 'Attributes' not in table.put_item(Item={'id': 'new'}, ReturnValues='ALL_OLD')
+
+
+def test_update_expressions(table):
+    response = table.update_item(
+        Key={'id': 'c'},
+        UpdateExpression='SET #type = :t, cnt = if_not_exists(cnt, :zero) + :one ADD tags :tags',
+        ExpressionAttributeNames={'#type': 'type'},
+        ExpressionAttributeValues={':t': '_meta', ':zero': 0, ':one': 1, ':tags': {'p'}},
+        ReturnValues='ALL_NEW'
+    )
+    assert response['Attributes'] == {'id': 'c', 'type': '_meta', 'cnt': 1, 'tags': {'p'}}
+
+    response = table.update_item(Key={'id': 'c'}, UpdateExpression='ADD cnt :one REMOVE tags',
+                                 ExpressionAttributeValues={':one': 1}, ReturnValues='UPDATED_NEW')
+    assert response['Attributes'] == {'cnt': 2}
+
+    with pytest.raises(ClientError) as error:
+        table.update_item(Key={'id': 'c'}, UpdateExpression='SET missing.path = :v',
+                          ExpressionAttributeValues={':v': 1})
+    assert _error_code(error) == 'ValidationException'
+
+
+def test_projection_and_filter_expressions(table):
+    table.put_item(Item={'id': 'a', 'tags': {'x'}, 'm': {'k': [1, 2]}, 'n': 1, 'other': 'y'})
+    table.put_item(Item={'id': 'b', 'tags': {'y'}, 'm': {'k': [1]}, 'n': 2})
+
+    item = table.get_item(Key={'id': 'a'}, ProjectionExpression='#n, m.k', ExpressionAttributeNames={'#n': 'n'})
+    assert item['Item'] == {'n': 1, 'm': {'k': [1, 2]}}
+
+    page = table.scan(FilterExpression='contains(tags, :x) AND size(m.k) = :two AND n IN (:one, :two)',
+                      ExpressionAttributeValues={':x': 'x', ':two': 2, ':one': 1})
+    assert (page['Count'], page['ScannedCount']) == (1, 2)
+
+
+def test_query_pages_through_a_gsi_in_key_order(table):
+    for number in range(30):
+        table.put_item(Item={'id': f'bill-{number}', 'type': 'bill', 'update_date': f'2024-01-{number % 28 + 1:02d}'})
+    table.put_item(Item={'id': 'no-date', 'type': 'bill'})
+
+    params = {'IndexName': 'type-update_date-index', 'KeyConditionExpression': '#t = :t',
+              'ExpressionAttributeNames': {'#t': 'type'}, 'ExpressionAttributeValues': {':t': 'bill'},
+              'ScanIndexForward': False, 'Limit': 12}
+    dates = []
+    start_key = None
+    while True:
+        page = table.query(**params, **({'ExclusiveStartKey': start_key} if start_key else {}))
+        dates.extend(item['update_date'] for item in page['Items'])
+        start_key = page.get('LastEvaluatedKey')
+        if not start_key:
+            break
+    # Items without the index key are not in the sparse index
+    assert len(dates) == 30
+    assert dates == sorted(dates, reverse=True)
+
+
+def test_missing_index_and_table_errors(table):
+    with pytest.raises(ClientError) as error:
+        table.query(IndexName='nope-index', KeyConditionExpression='#t = :t',
+                    ExpressionAttributeNames={'#t': 'type'}, ExpressionAttributeValues={':t': 'bill'})
+    assert _error_code(error) == 'ValidationException'
+    assert 'index' in str(error.value)
+
+    with pytest.raises(ClientError) as error:
+        FakeDynamoDB().Table('missing').get_item(Key={'id': 'x'})
+    assert _error_code(error) == 'ResourceNotFoundException'
+
+
+def test_parallel_scan_segments_partition_the_table(table):
+    for number in range(200):
+        table.put_item(Item={'id': f'i{number}'})
+
+    ids = []
+    for segment in range(3):
+        start_key = None
+        while True:
+            kwargs = {'Segment': segment, 'TotalSegments': 3, 'Limit': 40}
+            if start_key:
+                kwargs['ExclusiveStartKey'] = start_key
+            page = table.scan(**kwargs)
+            ids.extend(item['id'] for item in page['Items'])
+            start_key = page.get('LastEvaluatedKey')
+            if not start_key:
+                break
+    assert sorted(ids) == sorted(f'i{number}' for number in range(200))
+
+
+def test_batch_writer_rejects_duplicate_keys_unless_overwriting(table):
+    with pytest.raises(ClientError):
+        with table.batch_writer() as batch:
+            batch.put_item(Item={'id': 'dup'})
+            batch.put_item(Item={'id': 'dup'})
+
+    with table.batch_writer(overwrite_by_pkeys=['id']) as batch:
+        batch.put_item(Item={'id': 'dup', 'v': 1})
+        batch.put_item(Item={'id': 'dup', 'v': 2})
+    assert table.get_item(Key={'id': 'dup'})['Item']['v'] == 2
+
+
+def test_batch_get_skips_missing_keys():
+    dynamodb = FakeDynamoDB({'provisioned': False})
+    _create(dynamodb).put_item(Item={'id': 'a', 'x': 1})
+    response = dynamodb.batch_get_item(RequestItems={'t': {'Keys': [{'id': 'a'}, {'id': 'zz'}]}})
+    assert response['Responses']['t'] == [{'id': 'a', 'x': 1}]
+    assert response['UnprocessedKeys'] == {}
+
+
+def test_capacity_units():
+    assert write_units(1) == 1
+    assert write_units(1025) == 2
+    assert read_units(4096) == 0.5
+    assert read_units(4097, consistent=True) == 2
+    assert item_size({'id': 'ab', 'n': Decimal('1')}) > 0
+
+
+def _throttled_store(clock):
+    dynamodb = FakeDynamoDB({'burst_seconds': 0}, clock=clock)
+    return dynamodb, _create(dynamodb, read=1, write=1)
+
+
+def test_single_writes_over_capacity_retry_on_the_simulated_clock():
+    clock = SimulatedClock()
+    dynamodb, table = _throttled_store(clock)
+    for number in range(5):
+        table.put_item(Item={'id': f'i{number}'})
+
+    stats = dynamodb.stats()['t']
+    assert stats['sdk_retries'] > 0
+    assert stats['failed_requests'] == 0
+    assert stats['consumed_wcu']['table'] == 5
+    # A write goes through while any capacity is left, so 5 WCU at 1 WCU/s take a little over 3 seconds
+    assert clock.time() >= 3
+
+
+def test_throttles_surface_after_the_sdk_gives_up():
+    dynamodb = FakeDynamoDB({'burst_seconds': 0, 'sdk_max_attempts': 1}, clock=SimulatedClock())
+    table = _create(dynamodb, read=1, write=1)
+    table.put_item(Item={'id': 'a'})
+    with pytest.raises(ClientError) as error:
+        table.put_item(Item={'id': 'b'})
+    assert _error_code(error) == 'ProvisionedThroughputExceededException'
+
+
+def test_batch_write_over_capacity_returns_unprocessed_items():
+    dynamodb = FakeDynamoDB({'burst_seconds': 0}, clock=SimulatedClock())
+    _create(dynamodb, read=1, write=3)
+    response = dynamodb.batch_write_item(RequestItems={'t': [{'PutRequest': {'Item': {'id': f'i{n}'}}}
+                                                             for n in range(10)]})
+    assert len(response['UnprocessedItems']['t']) == 7
+    assert dynamodb.stats()['t']['unprocessed_items'] == 7
+
+
+def test_simulated_runs_are_deterministic():
+    def run():
+        clock = SimulatedClock()
+        dynamodb, table = _throttled_store(clock)
+        for number in range(8):
+            table.put_item(Item={'id': f'i{number}', 'type': 'bill', 'update_date': '2024'})
+        stats = dynamodb.stats()['t']
+        return clock.time(), stats['sdk_retries'], stats['consumed_wcu']
+
+    assert run() == run()
+
+
+def test_shared_resource_is_reset():
+    first = fake_dynamodb.resource({'provisioned': False})
+    assert fake_dynamodb.resource() is first
+    fake_dynamodb.reset()
+    assert fake_dynamodb.resource() is not first
+    fake_dynamodb.reset()
+
+
+def test_api_server_creates_the_memory_table_in_a_fresh_process(api):
+    client, _ = api
+    response = client.get('/api/bills?congress=118')
+    assert response.status_code == 200
+    assert response.get_json()['bills'] == []
@@ -0,0 +1,29 @@
+import health_check
+
+
+def _config(memory_config):
+    return {'dynamodb': memory_config}
+
+
+def test_item_ids_matching_the_schemes_are_healthy(handler, memory_config):
+    handler.batch_store_items([
+        {'id': '118-hr-1234', 'type': 'bill', 'congress': 118, 'update_date': '2024-01-02'},
+        {'id': '118-house-hsag00', 'type': 'committee', 'congress': 118, 'update_date': '2024-01-02'},
+        {'id': '118-mem-P000197', 'type': 'member', 'congress': 118, 'update_date': '2024-01-02'}
+    ])
+
+    result = health_check.check_item_ids(_config(memory_config))
+
+    assert result == {'status': 'healthy', 'checked': 3, 'mismatched': {}}
+
+
+def test_item_ids_with_another_scheme_are_reported(handler, memory_config):
+    handler.batch_store_items([
+        {'id': '118-hr-1234', 'type': 'bill', 'congress': 118, 'update_date': '2024-01-02'},
+        {'id': 'comm_118_mock', 'type': 'committee', 'congress': 118, 'update_date': '2024-01-02'}
+    ])
+
+    result = health_check.check_item_ids(_config(memory_config))
+
+    assert result['status'] == 'unhealthy'
+    assert result['mismatched'] == {'committee': ['comm_118_mock']}
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from histogram import LatencyHistogram, NUM_BUCKETS, bucket_bounds, bucket_index
+
+
+@pytest.mark.parametrize('micros', [0, 1, 15, 16, 17, 31, 32, 1000, 123_456, 10 ** 9, 2 ** 36 - 1])
+def test_value_falls_within_its_bucket_bounds(micros):
+    lower, upper = bucket_bounds(bucket_index(micros))
+    assert lower <= micros < upper
+
+
+def test_bucket_indexes_are_monotonic_and_bounded():
+    indexes = [bucket_index(value) for value in range(0, 200_000, 7)]
+    assert indexes == sorted(indexes)
+    assert bucket_index(2 ** 60) == NUM_BUCKETS - 1
+
+
+def test_bucket_width_stays_within_relative_error():
+    for index in range(32, NUM_BUCKETS):
+        lower, upper = bucket_bounds(index)
+        assert (upper - lower) / lower <= 1 / 16
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.mean() is None
+    assert histogram.summary()['p99_ms'] is None
+
+
+def test_percentiles_are_close_to_exact_values():
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-4, 1) for _ in range(10_000)]
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+
+    ordered = sorted(samples)
+    for percent in (50, 90, 99, 99.9):
+        exact = ordered[int(len(ordered) * percent / 100) - 1]
+        assert histogram.percentile(percent) == pytest.approx(exact, rel=0.07)
+    assert histogram.percentile(100) == max(samples)
+    assert histogram.mean() == pytest.approx(sum(samples) / len(samples))
+
+
+def test_merge_matches_recording_everything_in_one_histogram():
+    first, second, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for value in (0.001, 0.002, 0.5):
+        first.record(value)
+        combined.record(value)
+    for value in (0.0005, 3.0):
+        second.record(value)
+        combined.record(value)
+
+    merged = first.copy().merge(second)
+    assert merged.counts == combined.counts
+    assert merged.count == 5
+    assert merged.minimum == 0.0005
+    assert merged.maximum == 3.0
+    # copy() leaves the original untouched
+    assert first.count == 3
+
+
+def test_dict_round_trip():
+    histogram = LatencyHistogram()
+    for value in (0.01, 0.02, 0.02, 1.5):
+        histogram.record(value)
+
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.counts == histogram.counts
+    assert restored.summary() == histogram.summary()
+    assert len(histogram.to_dict()['buckets']) == 3
+
+
+def test_cumulative_counts():
+    histogram = LatencyHistogram()
+    for value in (0.001, 0.01, 0.1, 1.0):
+        histogram.record(value)
+    assert histogram.cumulative_counts([0.005, 0.05, 0.5, 5]) == [1, 2, 3, 4]
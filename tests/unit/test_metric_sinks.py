@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import metric_sinks
+from metric_sinks import (
+    EMF_MAX_VALUES, MAX_METRIC_DATA_PER_CALL, CloudWatchSink, EMFSink, JsonlSink, MetricSink, NullSink, create_sink
+)
+
+
+def _aggregate(name='Latency', unit='Seconds', dimensions=(('Endpoint', 'bill'),), timestamp=1_700_000_040,
+               count=3, total=6.0, minimum=1.0, maximum=3.0, values=None):
+    return {'name': name, 'unit': unit, 'dimensions': dimensions, 'timestamp': timestamp,
+            'count': count, 'sum': total, 'min': minimum, 'max': maximum, 'values': values}
+
+
+class FakeCloudWatch:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def put_metric_data(self, Namespace, MetricData):
+        self.calls.append((Namespace, MetricData))
+        if self.fail:
+            raise RuntimeError('AccessDenied')
+
+
+def test_cloudwatch_sends_statistic_sets_in_chunks():
+    sink = CloudWatchSink('us-east-1')
+    sink.client = FakeCloudWatch()
+    sink.send('CongressDownloader/Test', [_aggregate()] + [_aggregate(dimensions=())] * MAX_METRIC_DATA_PER_CALL)
+
+    assert [len(data) for _, data in sink.client.calls] == [MAX_METRIC_DATA_PER_CALL, 1]
+    namespace, data = sink.client.calls[0]
+    assert namespace == 'CongressDownloader/Test'
+    assert data[0]['StatisticValues'] == {'SampleCount': 3, 'Sum': 6.0, 'Minimum': 1.0, 'Maximum': 3.0}
+    assert data[0]['Dimensions'] == [{'Name': 'Endpoint', 'Value': 'bill'}]
+    assert data[0]['Timestamp'].timestamp() == 1_700_000_040
+    assert 'Dimensions' not in data[1]
+
+
+def test_cloudwatch_gives_up_after_repeated_failures():
+    sink = CloudWatchSink('us-east-1')
+    sink.client = FakeCloudWatch(fail=True)
+    for _ in range(CloudWatchSink.MAX_FAILURES + 2):
+        sink.send('ns', [_aggregate()])
+    assert len(sink.client.calls) == CloudWatchSink.MAX_FAILURES
+
+
+def test_cloudwatch_client_is_created_on_first_send(monkeypatch):
+    import boto3
+
+    created = []
+    monkeypatch.setattr(boto3, 'client', lambda service, region_name: created.append(region_name) or FakeCloudWatch())
+    sink = CloudWatchSink('eu-west-1')
+    assert created == []
+    sink.send('ns', [])
+    assert created == []
+    sink.send('ns', [_aggregate()])
+    assert created == ['eu-west-1']
+
+
+def test_sinks_must_implement_send():
+    class Incomplete(MetricSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize('config, sink_type', [
+    ({}, CloudWatchSink),
+    ({'enable_cloudwatch': False}, NullSink),
+    ({'sink': 'emf'}, EMFSink),
+    ({'sink': 'jsonl', 'path': 'metrics.jsonl'}, JsonlSink),
+    ({'sink': 'null'}, NullSink),
+])
+def test_create_sink_from_config(monkeypatch, config, sink_type):
+    monkeypatch.delenv('METRICS_SINK', raising=False)
+    assert type(create_sink(config)) is sink_type
+
+
+def test_environment_overrides_the_configured_sink(monkeypatch):
+    monkeypatch.setenv('METRICS_SINK', 'null')
+    assert isinstance(create_sink({'sink': 'cloudwatch'}), NullSink)
+    monkeypatch.setenv('METRICS_SINK', 'statsd')
+    with pytest.raises(ValueError):
+        create_sink({})
+
+
+def test_emf_writes_counts_as_sums_and_other_metrics_as_values(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setattr(sys, 'stdout', stream)
+    EMFSink().send('CongressDownloader/Test', [
+        _aggregate(name='Items', unit='Count', count=2, total=40, values=[15, 25]),
+        _aggregate(values=[1.0, 2.0, 3.0]),
+        _aggregate(name='Queue', unit='None', count=4, total=10.0, values=None),
+    ])
+
+    document = json.loads(stream.getvalue())
+    assert document['_aws']['Timestamp'] == 1_700_000_040_000
+    metrics = document['_aws']['CloudWatchMetrics'][0]
+    assert metrics['Namespace'] == 'CongressDownloader/Test'
+    assert metrics['Dimensions'] == [['Endpoint']]
+    assert document['Endpoint'] == 'bill'
+    assert document['Items'] == 40
+    assert document['Latency'] == [1.0, 2.0, 3.0]
+    assert document['Queue'] == 2.5
+
+
+def test_emf_splits_long_value_arrays(tmp_path):
+    path = tmp_path / 'logs' / 'emf.log'
+    sink = EMFSink(str(path))
+    values = [float(n) for n in range(EMF_MAX_VALUES + 5)]
+    sink.send('ns', [_aggregate(count=len(values), values=values)])
+    sink.close()
+
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [len(document['Latency']) for document in documents] == [EMF_MAX_VALUES, 5]
+
+
+def test_jsonl_appends_one_line_per_aggregate(tmp_path):
+    path = tmp_path / 'metrics' / 'metrics.jsonl'
+    sink = JsonlSink(str(path))
+    sink.send('ns', [_aggregate(), _aggregate(name='Items', unit='Count')])
+    sink.send('ns', [_aggregate()])
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 3
+    assert lines[0]['dimensions'] == {'Endpoint': 'bill'}
+    assert lines[0]['timestamp'].startswith('2023-11-14T22:14:00')
+    assert (lines[1]['name'], lines[1]['count'], lines[1]['sum']) == ('Items', 3, 6.0)
+
+
+def test_importing_monitoring_makes_no_aws_calls(tmp_path):
+    # A fresh interpreter with no config.json, where the default sink is CloudWatch
+    script = (
+        "import boto3\n"
+        "def fail(*args, **kwargs): raise AssertionError('AWS client created')\n"
+        "boto3.client = boto3.resource = fail\n"
+        "from monitoring import metrics\n"
+        "assert metrics.sink is None and metrics._publisher is None\n"
+    )
+    env = {key: value for key, value in os.environ.items() if key != 'METRICS_SINK'}
+    env['PYTHONPATH'] = os.path.dirname(os.path.abspath(metric_sinks.__file__))
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stderr
+    assert not os.listdir(tmp_path)
+
@@ -0,0 +1,121 @@
+import threading
+import urllib.request
+
+import pytest
+
+import metric_sinks
+from monitoring import MetricsCollector
+
+
+class RecordingSink(metric_sinks.MetricSink):
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def send(self, namespace, aggregates):
+        self.batches.append((namespace, aggregates))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    sink = RecordingSink()
+    monkeypatch.setattr(metric_sinks, 'create_sink', lambda config: sink)
+    return sink
+
+
+def test_samples_are_aggregated_into_statistic_sets(sink):
+    collector = MetricsCollector('Test', flush_interval=3600)
+    collector.configure({'service_name': 'Unit'})
+    for value in (3.0, 1.0, 2.0):
+        collector._put_metric('Latency', value, 'Seconds', {'Endpoint': 'bill'})
+    collector._put_metric('Latency', 10.0, 'Seconds', {'Endpoint': 'amendment'})
+    collector.flush_metrics()
+
+    assert len(sink.batches) == 1
+    namespace, aggregates = sink.batches[0]
+    assert namespace == 'CongressDownloader/Unit'
+    by_endpoint = {dict(aggregate['dimensions'])['Endpoint']: aggregate for aggregate in aggregates}
+    assert {key: by_endpoint['bill'][key] for key in ('count', 'sum', 'min', 'max')} == \
+        {'count': 3, 'sum': 6.0, 'min': 1.0, 'max': 3.0}
+    assert by_endpoint['amendment']['count'] == 1
+    assert by_endpoint['bill']['values'] is None
+    assert by_endpoint['bill']['timestamp'] % 60 == 0
+
+    # Nothing new since the last flush: no empty batch is sent
+    collector.flush_metrics()
+    assert len(sink.batches) == 1
+    collector.close()
+    assert sink.closed
+
+
+def test_recording_never_blocks_on_a_full_queue(sink, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(sink, 'send', lambda namespace, aggregates: release.wait(5))
+    collector = MetricsCollector('Test', flush_interval=0, max_queue_size=2)
+
+    for value in range(50):
+        collector._put_metric('Items', value, 'Count')
+    assert collector.dropped_samples > 0
+    release.set()
+
+
+def test_null_sink_disables_publishing(monkeypatch):
+    monkeypatch.setattr(metric_sinks, 'create_sink', lambda config: metric_sinks.NullSink())
+    collector = MetricsCollector('Test')
+    collector._put_metric('Items', 1, 'Count')
+    assert collector._publisher is None
+    assert collector._queue.empty()
+
+
+def test_latency_percentiles_per_endpoint_and_operation(monkeypatch):
+    monkeypatch.setattr(metric_sinks, 'create_sink', lambda config: metric_sinks.NullSink())
+    collector = MetricsCollector('Test')
+    for n in range(1, 101):
+        collector.track_api_request('bill', 200, n / 1000)
+    collector.track_dynamo_operation('BatchWriteItem', 'table', True, 0.02)
+    collector.track_dynamo_operation('BatchWriteItem', 'table', False, 0.5)
+
+    snapshot = collector.latency_snapshot()
+    endpoint = snapshot['endpoints']['bill']
+    assert endpoint.count == 100
+    p50, p99 = endpoint.percentiles((50, 99))
+    assert p50 == pytest.approx(0.050, rel=0.05)
+    assert p99 == pytest.approx(0.099, rel=0.05)
+    assert snapshot['dynamo_operations']['BatchWriteItem'].count == 2
+
+    # The snapshot is a copy
+    collector.track_api_request('bill', 200, 0.001)
+    assert endpoint.count == 100
+
+    assert 'REQUEST LATENCY' in collector.generate_api_metrics_report()
+    assert 'DYNAMODB OPERATION LATENCY' in collector.generate_ingestion_report()
+
+
+def test_collector_metrics_are_served_for_scraping(monkeypatch):
+    monkeypatch.setattr(metric_sinks, 'create_sink', lambda config: metric_sinks.NullSink())
+    collector = MetricsCollector('Test')
+    collector.track_api_request_start('bill')
+    collector.track_api_request('bill', 200, 0.2)
+    collector.set_gauge('work_queue_depth', 7)
+
+    server = collector.serve_prometheus(0, host='127.0.0.1')
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_port}/metrics') as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            body = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+    assert 'congress_api_requests_total{endpoint="bill"} 1' in body
+    assert 'congress_api_request_duration_seconds_count{endpoint="bill"} 1' in body
+    assert 'congress_work_queue_depth 7' in body
+
+
+def test_unknown_sink_disables_publishing(monkeypatch):
+    monkeypatch.setenv('METRICS_SINK', 'statsd')
+    collector = MetricsCollector('Test')
+    collector._put_metric('Items', 1, 'Count')
+    assert isinstance(collector.sink, metric_sinks.NullSink)
+    assert collector._publisher is None
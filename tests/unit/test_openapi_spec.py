@@ -0,0 +1,22 @@
+import json
+import logging
+
+from openapi_spec import spec_app, write_spec
+
+
+def test_spec_documents_every_api_route(tmp_path):
+    output = write_spec(spec_app(), str(tmp_path / 'static' / 'swagger.json'))
+    with open(output) as f:
+        spec = json.load(f)
+
+    assert spec['openapi'] == '3.0.2'
+    assert {'/api/bills', '/api/export', '/api/items', '/api/export/jobs'} <= set(spec['paths'])
+    assert 'Bill' in spec['components']['schemas']
+
+
+def test_building_the_spec_configures_no_logging(tmp_path):
+    root_handlers = list(logging.getLogger().handlers)
+    app_handlers = list(logging.getLogger('congress_downloader').handlers)
+    write_spec(spec_app(), str(tmp_path / 'swagger.json'))
+    assert logging.getLogger().handlers == root_handlers
+    assert logging.getLogger('congress_downloader').handlers == app_handlers
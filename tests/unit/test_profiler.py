@@ -0,0 +1,62 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+from profiler import MODES, RunProfiler, SamplingProfiler
+
+
+def _busy_worker(seconds):
+    """Start a thread spinning in a named function for a while"""
+    started = threading.Event()
+
+    def spin_for_profile():
+        started.set()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    thread = threading.Thread(target=spin_for_profile)
+    thread.start()
+    started.wait()
+    return thread
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        RunProfiler('tracing', output_dir=str(tmp_path))
+
+
+def test_sampler_tags_stacks_by_stage():
+    tags = {}
+    sampler = SamplingProfiler(interval=0.001, tags=lambda: tags)
+    sampler.start()
+    thread = _busy_worker(0.1)
+    tags[thread.ident] = ('http', 'bill')
+    thread.join()
+    sampler.stop()
+
+    assert sampler.rounds > 0
+    assert sampler.by_stage().get(('http', 'bill'), 0) > 0
+    tagged = [line for line in sampler.collapsed() if line.startswith('endpoint:bill;stage:http;')]
+    assert any('spin_for_profile' in line for line in tagged)
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_run_writes_loadable_artifacts(tmp_path, mode):
+    profiler = RunProfiler(mode, output_dir=str(tmp_path), interval=0.001)
+    profiler.start()
+    _busy_worker(0.1).join()
+    paths = profiler.stop()
+
+    assert set(paths) == {'pstats', 'collapsed', 'summary'}
+    functions = {name for _, _, name in pstats.Stats(paths['pstats']).stats}
+    assert 'spin_for_profile' in functions
+    with open(paths['summary'], encoding='utf-8') as f:
+        assert f.readline().strip() == f"Profile mode: {mode}"
+    with open(paths['collapsed'], encoding='utf-8') as f:
+        assert all(line.startswith('endpoint:') for line in f)
+
+    # A second stop (e.g. from the exit handler) writes nothing
+    assert profiler.stop() == {}
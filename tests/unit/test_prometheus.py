@@ -0,0 +1,36 @@
+from histogram import LatencyHistogram
+from prometheus import Exposition
+
+
+def test_counters_and_gauges_escape_labels():
+    exposition = Exposition('congress_')
+    exposition.counter('items_total', 'Items stored', [({'type': 'bill'}, 3), ({'type': 'say "hi"\n'}, 1.0)])
+    exposition.gauge('queue_depth', 'Queued work', [(None, 2.5)])
+
+    assert exposition.render().splitlines() == [
+        '# HELP congress_items_total Items stored',
+        '# TYPE congress_items_total counter',
+        'congress_items_total{type="bill"} 3',
+        'congress_items_total{type="say \\"hi\\"\\n"} 1',
+        '# HELP congress_queue_depth Queued work',
+        '# TYPE congress_queue_depth gauge',
+        'congress_queue_depth 2.5',
+    ]
+
+
+def test_histograms_have_cumulative_buckets_sum_and_count():
+    histogram = LatencyHistogram()
+    for seconds in (0.001, 0.02, 0.02, 3.0):
+        histogram.record(seconds)
+    exposition = Exposition()
+    exposition.histogram('latency_seconds', 'Latency', [({'route': '/'}, histogram)], buckets=(0.01, 0.1, 1))
+
+    lines = exposition.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/",le="0.01"} 1',
+        'latency_seconds_bucket{route="/",le="0.1"} 3',
+        'latency_seconds_bucket{route="/",le="1"} 3',
+        'latency_seconds_bucket{route="/",le="+Inf"} 4',
+        f'latency_seconds_sum{{route="/"}} {histogram.total!r}',
+        'latency_seconds_count{route="/"} 4',
+    ]
@@ -0,0 +1,157 @@
+from decimal import Decimal
+
+import pytest
+
+from query_planner import QueryPlan, QueryPlanner, cursor_scope, decode_cursor, encode_cursor
+
+SECRET = b'test-secret'
+
+
+def test_cursor_round_trip():
+    key = {'id': 'bill-1', 'congress': Decimal('118'), 'type': 'bill'}
+    token = encode_cursor(key, SECRET, scope='list-bills')
+    assert decode_cursor(token, SECRET, scope='list-bills') == key
+
+
+@pytest.mark.parametrize('secret, scope', [(b'other-secret', 'list-bills'), (SECRET, 'list-hearings')])
+def test_cursor_is_rejected_with_another_secret_or_scope(secret, scope):
+    token = encode_cursor({'id': 'bill-1'}, SECRET, scope='list-bills')
+    with pytest.raises(ValueError):
+        decode_cursor(token, secret, scope=scope)
+
+
+@pytest.mark.parametrize('token', ['', 'no-separator', 'a.b.c', '!!!.???'])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, SECRET)
+
+
+def test_tampered_cursor_is_rejected():
+    token = encode_cursor({'id': 'bill-1'}, SECRET)
+    other = encode_cursor({'id': 'bill-2'}, SECRET)
+    forged = other.split('.')[0] + '.' + token.split('.')[1]
+    with pytest.raises(ValueError):
+        decode_cursor(forged, SECRET)
+
+
+def test_signed_non_object_payload_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(['bill-1'], SECRET), SECRET)
+
+
+def test_cursor_scope_depends_on_every_part():
+    assert cursor_scope('Query', 'a', {'x': 1}) == cursor_scope('Query', 'a', {'x': 1})
+    assert cursor_scope('Query', 'a', {'x': 1}) != cursor_scope('Query', 'a', {'x': 2})
+
+
+def test_plans_for_different_filters_have_different_scopes():
+    planner = QueryPlanner()
+    assert planner.plan('bill', congress=118).cursor_scope != planner.plan('bill', congress=117).cursor_scope
+    assert planner.plan('bill', congress=118).cursor_scope == planner.plan('bill', congress=118).cursor_scope
+
+
+@pytest.mark.parametrize('kwargs, index_name', [
+    ({'chamber': 'House', 'date_field': 'date', 'date_range': ('2024-01-01', '2024-02-01')}, 'chamber-date-index'),
+    ({'congress': 118}, 'congress-type-index'),
+    ({'congress': 118, 'date_range': ('2024-01-01', '2024-03-01')}, 'type-update_date-index'),
+    ({'congress': 118, 'date_range': ('2015-01-01', '2024-03-01')}, 'congress-type-index'),
+    ({}, 'type-update_date-index'),
+])
+def test_index_choice(kwargs, index_name):
+    plan = QueryPlanner().plan('bill', **kwargs)
+    assert plan.index_name == index_name
+    assert plan.fallback.operation == 'Scan'
+
+
+def test_newest_updates_first_on_the_update_date_index():
+    assert QueryPlanner().plan('bill').params['ScanIndexForward'] is False
+
+
+class FakeTable:
+    """Returns fixed pages regardless of Limit, recording each request"""
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.requests = []
+
+    def query(self, **params):
+        self.requests.append(params)
+        return self.pages.pop(0)
+
+
+def _page(items, last_key=None, scanned=None, consumed=1.0):
+    page = {'Items': items, 'ScannedCount': len(items) if scanned is None else scanned,
+            'ConsumedCapacity': {'CapacityUnits': consumed}}
+    if last_key:
+        page['LastEvaluatedKey'] = last_key
+    return page
+
+
+def _bills(*numbers):
+    return [{'id': f'bill-{n}', 'congress': 118, 'type': 'bill', 'title': 't'} for n in numbers]
+
+
+def test_over_read_resumes_after_the_last_returned_item():
+    plan = QueryPlanner().plan('bill', congress=118)
+    table = FakeTable([_page(_bills(1, 2, 3, 4, 5), last_key={'id': 'bill-5', 'congress': 118, 'type': 'bill'})])
+
+    items, start_key, consumed = plan.fetch_page(table, None, 3, read_budget=100)
+    assert [item['id'] for item in items] == ['bill-1', 'bill-2', 'bill-3']
+    assert start_key == {'id': 'bill-3', 'congress': 118, 'type': 'bill'}
+    assert consumed == 1.0
+
+
+def test_sparse_filter_reads_more_and_sizes_reads_by_selectivity():
+    plan = QueryPlanner().plan('bill', congress=118, chamber='Senate')
+    table = FakeTable([
+        _page(_bills(1), last_key={'id': 'k1'}, scanned=10),
+        _page(_bills(2, 3), last_key={'id': 'k2'}, scanned=20),
+        _page(_bills(4), scanned=10),
+    ])
+
+    items, start_key, _ = plan.fetch_page(table, {'id': 'start'}, 4, read_budget=100)
+    assert [item['id'] for item in items] == ['bill-1', 'bill-2', 'bill-3', 'bill-4']
+    assert start_key is None
+    assert table.requests[0]['ExclusiveStartKey'] == {'id': 'start'}
+    assert table.requests[0]['Limit'] == 4
+    # One match in ten scanned: the next read asks for about ten per missing item
+    assert table.requests[1]['Limit'] == 30
+    assert table.requests[1]['ExclusiveStartKey'] == {'id': 'k1'}
+
+
+def test_read_budget_ends_a_page_early():
+    plan = QueryPlanner().plan('bill', congress=118, chamber='Senate')
+    table = FakeTable([_page([], last_key={'id': 'k1'}, scanned=10, consumed=5.0)] * 3)
+
+    items, start_key, consumed = plan.fetch_page(table, None, 10, read_budget=5)
+    assert items == []
+    assert start_key == {'id': 'k1'}
+    assert consumed == 5.0
+    assert len(table.requests) == 1
+
+
+def test_limit_must_be_positive():
+    with pytest.raises(ValueError):
+        QueryPlanner().plan('bill').fetch_page(FakeTable([]), None, 0, read_budget=10)
+
+
+def test_pages_cover_every_match_on_the_memory_backend(handler):
+    items = [{'id': f'bill-{n}', 'type': 'bill', 'congress': 118, 'update_date': f'2024-01-{n % 28 + 1:02d}',
+              'chamber': 'Senate' if n % 5 == 0 else 'House'} for n in range(60)]
+    handler.batch_store_items(items)
+    plan = QueryPlanner().plan('bill', congress=118, chamber='Senate')
+
+    seen = []
+    start_key = None
+    while True:
+        page, start_key, _ = plan.fetch_page(handler.table, start_key, 3, read_budget=1000)
+        assert len(page) <= 3
+        seen.extend(item['id'] for item in page)
+        if start_key is None:
+            break
+    assert sorted(seen) == sorted(item['id'] for item in items if item['chamber'] == 'Senate')
+
+
+def test_key_for_uses_the_index_key_attributes():
+    plan = QueryPlan('Query', 'chamber-date-index', {})
+    item = {'id': 'hearing-1', 'chamber': 'House', 'date': '2024-01-01', 'title': 'x'}
+    assert plan.key_for(item) == {'id': 'hearing-1', 'chamber': 'House', 'date': '2024-01-01'}
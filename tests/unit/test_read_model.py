@@ -0,0 +1,146 @@
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+
+from read_model import ReadModel, StreamConsumer
+
+serializer = TypeSerializer()
+
+
+def _image(item):
+    return {key: serializer.serialize(value) for key, value in item.items()}
+
+
+def _record(event_name, sequence_number, item=None, key=None):
+    change = {'SequenceNumber': sequence_number}
+    if item is not None:
+        change['NewImage'] = _image(item)
+    if key is not None:
+        change['Keys'] = _image({'id': key})
+    return {'eventName': event_name, 'dynamodb': change}
+
+
+@pytest.fixture
+def model(tmp_path):
+    return ReadModel(str(tmp_path / 'read_model.db'))
+
+
+def _bill(number, update_date='2024-01-01'):
+    return {'id': f'bill-{number}', 'type': 'bill', 'congress': 118, 'chamber': 'House',
+            'update_date': update_date, 'title': f'Bill {number}'}
+
+
+def test_apply_records_inserts_updates_and_removes(model):
+    applied = model.apply_records([
+        _record('INSERT', '100', _bill(1)),
+        _record('INSERT', '101', _bill(2)),
+        _record('MODIFY', '102', dict(_bill(1), title='Renamed')),
+        _record('REMOVE', '103', key='bill-2'),
+    ], shard_id='shard-1')
+
+    assert applied == 4
+    items, cursor = model.list_items('bill')
+    assert [(item['id'], item['title']) for item in items] == [('bill-1', 'Renamed')]
+    assert cursor is None
+    assert model.get_checkpoint('shard-1') == ('103', False)
+
+
+def test_apply_records_skips_internal_items_but_advances_the_checkpoint(model):
+    stats_item = {'id': 'stats#bill', 'type': '_stats', 'item_count': 3}
+    applied = model.apply_records([_record('INSERT', '7', stats_item)], shard_id='shard-1')
+    assert applied == 0
+    assert model.count() == 0
+    assert model.get_checkpoint('shard-1') == ('7', False)
+
+
+def test_documents_keep_their_attributes(model):
+    item = dict(_bill(1), cosponsors=['A', 'B'], latest_action={'text': 'Passed'})
+    model.apply_records([_record('INSERT', '1', item)])
+    items, _ = model.list_items('bill', predicates=[('latest_action.text', '=', 'Passed')])
+    assert items[0]['cosponsors'] == ['A', 'B']
+    assert items[0]['congress'] == 118
+
+
+def test_close_shard(model):
+    model.close_shard('shard-1')
+    assert model.get_checkpoint('shard-1') == ('', True)
+
+
+def test_list_items_pages_through_ties_without_gaps(model):
+    model.upsert_items([_bill(number, update_date=f'2024-01-0{number % 3 + 1}') for number in range(10)])
+
+    seen = []
+    cursor = None
+    while True:
+        items, cursor = model.list_items('bill', limit=3, after=cursor)
+        seen.extend(item['id'] for item in items)
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(f'bill-{number}' for number in range(10))
+    assert len(seen) == 10
+
+    dates = [item['update_date'] for item in model.list_items('bill', limit=10)[0]]
+    assert dates == sorted(dates, reverse=True)
+
+
+def test_list_items_filters(model):
+    model.upsert_items([_bill(1, '2024-01-01'), _bill(2, '2024-03-01'),
+                        dict(_bill(3), congress=117), dict(_bill(4), chamber='Senate')])
+    assert len(model.list_items('bill', congress=118, chamber='House')[0]) == 2
+    in_range = model.list_items('bill', date_range=('2024-02-01', '2024-12-31'))[0]
+    assert [item['id'] for item in in_range] == ['bill-2']
+    with pytest.raises(ValueError):
+        model.list_items('bill', sort='doc')
+
+
+class FakeStreams:
+    """Shard whose iterators are positions in a record list"""
+    class exceptions:
+        class ExpiredIteratorException(Exception):
+            pass
+
+    def __init__(self, records):
+        self.records = records
+        self.iterator_requests = 0
+        self.expire_next = False
+
+    def get_shard_iterator(self, StreamArn, ShardId, ShardIteratorType, SequenceNumber=None):
+        self.iterator_requests += 1
+        if ShardIteratorType == 'TRIM_HORIZON':
+            return {'ShardIterator': 'pos-0'}
+        numbers = [record['dynamodb']['SequenceNumber'] for record in self.records]
+        return {'ShardIterator': f'pos-{numbers.index(SequenceNumber) + 1}'}
+
+    def get_records(self, ShardIterator, Limit):
+        if self.expire_next:
+            self.expire_next = False
+            raise self.exceptions.ExpiredIteratorException()
+        position = int(ShardIterator.split('-')[1])
+        return {'Records': self.records[position:position + 2],
+                'NextShardIterator': f'pos-{min(position + 2, len(self.records))}'}
+
+
+def test_consumer_keeps_its_shard_position_between_polls(model):
+    streams = FakeStreams([_record('INSERT', str(number), _bill(number)) for number in range(3)])
+    consumer = StreamConsumer('table', 'us-east-1', model)
+    consumer.streams = streams
+
+    assert consumer._consume_shard('arn', 'shard-1') == 3
+    assert streams.iterator_requests == 1
+
+    streams.records.append(_record('INSERT', '3', _bill(3)))
+    assert consumer._consume_shard('arn', 'shard-1') == 1
+    assert streams.iterator_requests == 1
+    assert model.count() == 4
+
+
+def test_consumer_resumes_from_the_checkpoint_when_the_iterator_expires(model):
+    streams = FakeStreams([_record('INSERT', str(number), _bill(number)) for number in range(2)])
+    consumer = StreamConsumer('table', 'us-east-1', model)
+    consumer.streams = streams
+    consumer._consume_shard('arn', 'shard-1')
+
+    streams.records.append(_record('INSERT', '2', _bill(2)))
+    streams.expire_next = True
+    assert consumer._consume_shard('arn', 'shard-1') == 1
+    assert streams.iterator_requests == 2
+    assert model.count() == 3
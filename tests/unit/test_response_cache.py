@@ -0,0 +1,96 @@
+import response_cache
+from response_cache import LRUCache, MISSING
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_missing_until_set():
+    cache = LRUCache()
+    assert cache.get('key') is MISSING
+
+    cache.set('key', {'value': 1})
+    assert cache.get('key') == {'value': 1}
+
+
+def test_none_is_cached_as_a_value():
+    cache = LRUCache()
+    cache.set('absent-item', None)
+    assert cache.get('absent-item') is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeMonotonic()
+    monkeypatch.setattr(response_cache.time, 'monotonic', clock)
+    cache = LRUCache(ttl_seconds=10)
+    cache.set('default', 1)
+    cache.set('short', 2, ttl_seconds=1)
+
+    clock.now += 5
+    assert cache.get('short') is MISSING
+    assert cache.get('default') == 1
+
+    clock.now += 5
+    assert cache.get('default') is MISSING
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_size_limit_evicts_and_skips_oversized_values():
+    cache = LRUCache(max_size=10)
+    cache.set('a', 'x', size=6)
+    cache.set('b', 'y', size=6)
+    assert cache.get('a') is MISSING
+    assert cache.stats()['size'] == 6
+
+    cache.set('huge', 'z', size=11)
+    assert cache.get('huge') is MISSING
+    assert cache.get('b') == 'y'
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = LRUCache(max_size=10)
+    cache.set('a', 'x', size=8)
+    cache.set('a', 'y', size=2)
+    assert cache.stats()['size'] == 2
+    assert cache.get('a') == 'y'
+
+
+def test_invalidate_and_clear():
+    cache = LRUCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.invalidate('a')
+    cache.invalidate('not-there')
+    assert cache.get('a') is MISSING
+
+    cache.clear()
+    assert cache.get('b') is MISSING
+    assert cache.stats()['size'] == 0
+
+
+def test_stats_hit_ratio():
+    cache = LRUCache()
+    assert cache.stats()['hit_ratio'] == 0.0
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('b')
+    assert cache.stats()['hit_ratio'] == 0.5
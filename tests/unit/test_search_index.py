@@ -0,0 +1,115 @@
+import os
+
+import search_index
+from search_index import SearchIndex, SearchIndexWriter, _read_manifest, tokenize
+
+
+def _bill(item_id, title, item_type='bill'):
+    return {'id': item_id, 'type': item_type, 'title': title}
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize('The Clean-Water Act of 2024') == ['clean', 'water', 'act', '2024']
+
+
+def test_empty_index_returns_no_results(tmp_path):
+    index = SearchIndex(str(tmp_path))
+    assert not index.available
+    assert index.doc_count == 0
+    assert index.average_length == 0.0
+    assert index.search('water') == []
+
+
+def test_search_ranks_and_filters_by_type(tmp_path):
+    writer = SearchIndexWriter(str(tmp_path))
+    writer.add_items([
+        _bill('bill-1', 'Clean water infrastructure'),
+        _bill('bill-2', 'Highway funding'),
+        _bill('hearing-1', 'Oversight of water utilities', item_type='hearing'),
+        {'id': 'stats#x', 'type': '_stats', 'title': 'water'},
+    ])
+    writer.flush()
+
+    index = SearchIndex(str(tmp_path))
+    assert index.doc_count == 3
+    assert {result['id'] for result in index.search('water')} == {'bill-1', 'hearing-1'}
+    assert [result['id'] for result in index.search('water', item_type='hearing')] == ['hearing-1']
+    assert index.search('clean water')[0]['id'] == 'bill-1'
+    assert index.search('the of') == []
+
+
+def test_reingested_item_only_matches_its_newest_version(tmp_path):
+    writer = SearchIndexWriter(str(tmp_path))
+    writer.add_items([_bill('bill-1', 'Farm subsidies')])
+    writer.flush()
+    writer.add_items([_bill('bill-1', 'Energy storage')])
+    writer.flush()
+
+    index = SearchIndex(str(tmp_path))
+    assert index.doc_count == 1
+    assert index.search('farm') == []
+    assert [result['title'] for result in index.search('energy')] == ['Energy storage']
+
+
+def test_writer_flushes_when_the_buffer_is_full(tmp_path):
+    writer = SearchIndexWriter(str(tmp_path), flush_every=2)
+    writer.add_items([_bill('bill-1', 'One')])
+    assert _read_manifest(str(tmp_path))['segments'] == []
+    writer.add_items([_bill('bill-2', 'Two')])
+    assert len(_read_manifest(str(tmp_path))['segments']) == 1
+
+
+def test_reader_picks_up_new_segments(tmp_path):
+    writer = SearchIndexWriter(str(tmp_path))
+    index = SearchIndex(str(tmp_path), reload_seconds=0)
+    writer.add_items([_bill('bill-1', 'Veterans health care')])
+    writer.flush()
+    assert [result['id'] for result in index.search('veterans')] == ['bill-1']
+
+
+def test_compaction_retires_segments_before_deleting_them(tmp_path, monkeypatch):
+    index_dir = str(tmp_path)
+    writer = SearchIndexWriter(index_dir)
+    for number in range(3):
+        writer.add_items([_bill(f'bill-{number}', f'Rural broadband {number}')])
+        writer.flush()
+    writer.add_items([_bill('bill-0', 'Tax credit')])
+    writer.flush()
+    old_segments = _read_manifest(index_dir)['segments']
+
+    # A reader opened before compaction keeps working afterwards
+    reader = SearchIndex(index_dir)
+    writer.compact()
+    manifest = _read_manifest(index_dir)
+    assert len(manifest['segments']) == 1
+    assert [name for name, _ in manifest['retired']] == old_segments
+    assert all(os.path.exists(os.path.join(index_dir, f"{name}.docs.json")) for name in old_segments)
+    assert len(reader.search('broadband')) == 2
+
+    compacted = SearchIndex(index_dir)
+    assert compacted.doc_count == 3
+    assert {result['id'] for result in compacted.search('broadband')} == {'bill-1', 'bill-2'}
+
+    # The next compaction deletes segments retired longer than the grace period
+    monkeypatch.setattr(search_index, 'RETIRED_SEGMENT_GRACE_SECONDS', 0)
+    writer.add_items([_bill('bill-9', 'Spectrum auction')])
+    writer.flush()
+    writer.compact()
+    assert not any(os.path.exists(os.path.join(index_dir, f"{name}.docs.json")) for name in old_segments)
+    assert [result['id'] for result in SearchIndex(index_dir).search('spectrum')] == ['bill-9']
+
+
+def test_search_reads_one_snapshot_of_the_index(tmp_path, monkeypatch):
+    writer = SearchIndexWriter(str(tmp_path))
+    writer.add_items([_bill('bill-1', 'Clean water act'), _bill('bill-2', 'Water rights')])
+    writer.flush()
+    index = SearchIndex(str(tmp_path), reload_seconds=0)
+
+    def swapping_tokenize(text):
+        # A reload that lands mid-search must not mix old segments with new counts
+        index._snapshot = ([], 0, 0.0)
+        return tokenize(text)
+
+    monkeypatch.setattr(search_index, 'tokenize', swapping_tokenize)
+    assert {result['id'] for result in index.search('water')} == {'bill-1', 'bill-2'}
+
@@ -0,0 +1,84 @@
+import json
+import threading
+
+import pytest
+
+import tracing
+from tracing import NULL_SPAN, Tracer
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    tracer.start()
+    yield tracer
+    tracer.stop()
+
+
+def test_spans_are_no_ops_until_started():
+    tracer = Tracer()
+    with tracer.span('run') as span:
+        span.add('items')
+    assert span is NULL_SPAN
+    assert tracer.current() is NULL_SPAN
+    assert tracer.spans == []
+
+
+def test_spans_nest_per_thread(tracer):
+    with tracer.span('run') as run:
+        with tracer.span('date', date='2024-01-02') as date:
+            tracer.current().add('retries')
+            tracer.current().add('retries')
+
+            def worker():
+                with tracer.span('endpoint', parent=date, endpoint='bill'):
+                    with tracer.span('page'):
+                        pass
+
+            thread = threading.Thread(target=worker, name='worker-1')
+            thread.start()
+            thread.join()
+
+    by_name = {span.name: span for span in tracer.spans}
+    assert run.parent_id is None
+    assert date.parent_id == run.span_id
+    assert date.attributes == {'date': '2024-01-02', 'retries': 2}
+    # The worker's span names its parent explicitly; its child nests under it
+    assert by_name['endpoint'].parent_id == date.span_id
+    assert by_name['page'].parent_id == by_name['endpoint'].span_id
+    assert by_name['page'].thread_id != run.thread_id
+
+
+def test_failed_span_records_the_error(tracer):
+    with pytest.raises(ValueError):
+        with tracer.span('batch_write'):
+            raise ValueError('throttled')
+    assert tracer.spans[0].attributes['error'] == 'ValueError: throttled'
+    assert tracer.current() is NULL_SPAN
+
+
+def test_export_writes_a_chrome_trace(tracer, tmp_path):
+    with tracer.span('run'):
+        with tracer.span('page', items=3):
+            pass
+
+    path = tmp_path / 'traces' / 'run.json'
+    assert tracer.export(str(path)) == 2
+
+    document = json.loads(path.read_text())
+    events = {event['name']: event for event in document['traceEvents']}
+    assert events['thread_name']['ph'] == 'M'
+    assert events['page']['ph'] == 'X'
+    assert events['page']['args']['items'] == 3
+    assert events['page']['args']['parent_id'] == events['run']['args']['span_id']
+    assert events['run']['dur'] >= events['page']['dur']
+    assert document['otherData'] == {'dropped_spans': 0}
+
+
+def test_spans_past_the_limit_are_counted_not_kept(tracer, monkeypatch):
+    monkeypatch.setattr(tracing, 'MAX_SPANS', 1)
+    for _ in range(3):
+        with tracer.span('page'):
+            pass
+    assert len(tracer.spans) == 1
+    assert tracer.dropped == 2
@@ -0,0 +1,164 @@
+"""
+Span tracing for downloader runs (congress_downloader.py --trace).
+
+Spans nest per thread: run -> date -> endpoint -> page, and
+date -> batch_write for storage. Each span carries attributes such as
+item counts, bytes and retries. A span that starts on another thread than
+its parent (dates run in worker threads) names the parent explicitly.
+
+Finished spans are exported in the Chrome trace event format, which
+chrome://tracing, Perfetto (ui.perfetto.dev) and speedscope open directly:
+one lane per thread, with the attributes shown for each span.
+
+Tracing is off until Tracer.start(); spans are then no-ops costing one
+attribute check, so call sites do not need to guard them.
+"""
+import os
+import json
+import time
+import itertools
+import threading
+from typing import Any, Dict, List, Optional
+
+# Spans kept per run; past this new spans are counted but not stored
+MAX_SPANS = 1000000
+
+class Span:
+    """One timed operation; use as a context manager"""
+    __slots__ = ('tracer', 'name', 'span_id', 'parent_id', 'thread_id', 'start', 'end', 'attributes')
+
+    def __init__(self, tracer: 'Tracer', name: str, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = next(tracer._ids)
+        self.parent_id = parent_id
+        self.thread_id = None
+        self.start = 0.0
+        self.end = 0.0
+        self.attributes = attributes
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Increment a numeric attribute (e.g. retries, bytes)"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def __enter__(self) -> 'Span':
+        stack = self.tracer._stack()
+        if self.parent_id is None and stack:
+            self.parent_id = stack[-1].span_id
+        stack.append(self)
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attributes['error'] = f"{exc_type.__name__}: {exc}"
+        self.tracer._stack().pop()
+        self.tracer._finish(self)
+
+class _NullSpan:
+    """Stand-in returned while tracing is off"""
+    span_id = None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: float = 1) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.origin = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._thread_names: Dict[int, str] = {}
+
+    def start(self) -> None:
+        """Begin recording spans (clears anything recorded before)"""
+        self.spans = []
+        self.dropped = 0
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, parent: Optional[Any] = None, **attributes):
+        """A span under the thread's current span, or under `parent` when given"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, parent.span_id if parent is not None else None, attributes)
+
+    def current(self):
+        """The innermost open span of this thread (a no-op span if none)"""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else NULL_SPAN
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span: Span) -> None:
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        if span.thread_id not in self._thread_names:
+            self._thread_names[span.thread_id] = threading.current_thread().name
+        self.spans.append(span)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Finished spans as a Chrome trace event document"""
+        pid = os.getpid()
+        lanes = {ident: lane for lane, ident in enumerate(sorted(self._thread_names), 1)}
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': lanes[ident],
+                   'args': {'name': self._thread_names[ident]}}
+                  for ident in sorted(self._thread_names)]
+        for span in sorted(self.spans, key=lambda span: span.start):
+            args = {'span_id': span.span_id}
+            if span.parent_id is not None:
+                args['parent_id'] = span.parent_id
+            args.update(span.attributes)
+            events.append({
+                'name': span.name,
+                'cat': span.name,
+                'ph': 'X',
+                'ts': round((span.start - self.origin) * 1_000_000, 1),
+                'dur': round((span.end - span.start) * 1_000_000, 1),
+                'pid': pid,
+                'tid': lanes[span.thread_id],
+                'args': args
+            })
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'dropped_spans': self.dropped}
+        }
+
+    def export(self, path: str) -> int:
+        """Write the Chrome trace to a file; returns the number of spans written"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return len(self.spans)
+
+# Global tracer instance
+tracer = Tracer()